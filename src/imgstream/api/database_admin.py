@@ -6,7 +6,7 @@ from typing import Any
 import streamlit as st
 from datetime import datetime
 
-from ..services.metadata import get_metadata_service, MetadataError
+from ..services.metadata import get_database_cache_usage, get_metadata_service, MetadataError
 from ..services.auth import get_auth_service
 from ..logging_config import get_logger, log_user_action
 
@@ -123,6 +123,7 @@ def get_database_status(user_id: str) -> dict[str, Any]:
             "environment": os.getenv("ENVIRONMENT", "production"),
             "database_info": db_info,
             "integrity_validation": integrity_result,
+            "database_cache": get_database_cache_usage(),
             "status_timestamp": datetime.now().isoformat(),
         }
 
@@ -0,0 +1,64 @@
+import os
+import sys
+from invoke import task, Context
+from dotenv import load_dotenv
+import structlog
+
+# Add src to path to allow for absolute imports from the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+
+from imgstream.services.backfill import BACKFILL_JOBS, PhotoDetailsBackfill
+
+logger = structlog.get_logger()
+
+
+@task
+def backfill_photo_details(
+    c: Context,
+    user_id: str,
+    env_file: str = ".env",
+    jobs: str = "",
+    dry_run: bool = True,
+    batch_size: int = 200,
+    workers: int = 8,
+):
+    """
+    Fill the image detail columns (dimensions, content hash, placeholder) of a user's existing photos.
+
+    Args:
+        c (Context): Invoke context.
+        user_id (str): The user ID to backfill.
+        env_file (str): Path to the environment file. Default is '.env'.
+        jobs (str): Comma-separated jobs to run (content_hash, dimensions, placeholder). Default is every job.
+        dry_run (bool): If True, only reports photos to backfill. Pass --no-dry-run to backfill. Default is True.
+        batch_size (int): Photos processed and written per batch. Default is 200.
+        workers (int): Maximum photos processed concurrently. Default is 8.
+    """
+    # 1. Load environment variables
+    if os.path.exists(env_file):
+        logger.info(f"Loading environment variables from {env_file}")
+        load_dotenv(dotenv_path=env_file)
+    else:
+        logger.warning(f"Environment file not found at {env_file}. Using existing environment.")
+
+    selected_jobs = [job.strip() for job in jobs.split(",") if job.strip()] or list(BACKFILL_JOBS)
+    logger.info("Starting photo details backfill", user_id=user_id, jobs=selected_jobs, dry_run=dry_run)
+
+    # 2. Run backfill
+    report = PhotoDetailsBackfill(user_id).backfill(
+        jobs=selected_jobs, dry_run=dry_run, batch_size=batch_size, max_workers=workers
+    )
+
+    # 3. Print report
+    print(f"\n--- Photo Details Backfill ({'Dry Run' if dry_run else 'Backfill'}) ---")
+    print(f"Jobs:        {', '.join(report['jobs'])}")
+    print(f"Pending:     {report['pending']}")
+
+    if dry_run:
+        print("\nDry run completed. No photos were updated. Re-run with --no-dry-run to backfill.")
+        return
+
+    print(f"Backfilled:  {report['backfilled']}")
+    print(f"Failed:      {len(report['failed'])}")
+    for failure in report["failed"]:
+        logger.error("Backfill failed", photo_id=failure["photo_id"], error=failure["error"])
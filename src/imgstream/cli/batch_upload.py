@@ -9,6 +9,7 @@ from unittest.mock import patch, MagicMock
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
 
 from imgstream.services.auth import UserInfo
+from imgstream.services.metadata import get_metadata_service
 from imgstream.ui.handlers.upload import process_single_upload
 
 logger = structlog.get_logger()
@@ -85,10 +86,22 @@ def batch_upload(c: Context, directory: str, user_id: str, on_collision: str = "
     mock_auth_service = MagicMock()
     mock_auth_service.ensure_authenticated.return_value = mock_user_info
 
-    # 6. Process each file
+    # 6. Skip files that already exist, checked in one query
+    metadata_service = get_metadata_service(user_id)
+    is_overwrite = on_collision == "overwrite"
+    skipped_uploads = 0
+    if not is_overwrite:
+        existing = metadata_service.check_multiple_filename_exists([os.path.basename(p) for p in image_files])
+        skipped = [p for p in image_files if os.path.basename(p) in existing]
+        for file_path in skipped:
+            logger.info("Skipping existing file", filename=os.path.basename(file_path))
+        skipped_uploads = len(skipped)
+        image_files = [p for p in image_files if os.path.basename(p) not in existing]
+
+    # 7. Process each file; metadata is saved for the whole batch at the end
     successful_uploads = 0
     failed_uploads = 0
-    is_overwrite = on_collision == "overwrite"
+    pending_metadata = []
 
     with patch('imgstream.ui.handlers.upload.get_auth_service') as mock_get_auth:
         mock_get_auth.return_value = mock_auth_service
@@ -106,11 +119,11 @@ def batch_upload(c: Context, directory: str, user_id: str, on_collision: str = "
                     "size": len(file_data),
                 }
 
-                result = process_single_upload(file_info, is_overwrite=is_overwrite)
+                result = process_single_upload(file_info, is_overwrite=is_overwrite, defer_metadata=True)
 
                 if result.get("success"):
                     logger.info("Upload successful", filename=filename)
-                    successful_uploads += 1
+                    pending_metadata.append(result["photo_metadata"])
                 else:
                     logger.error("Upload failed", filename=filename, error=result.get("error", "Unknown error"))
                     failed_uploads += 1
@@ -119,10 +132,22 @@ def batch_upload(c: Context, directory: str, user_id: str, on_collision: str = "
                 logger.error("An unexpected error occurred", filename=filename, error=str(e))
                 failed_uploads += 1
 
+    # 8. Save all metadata in one transaction
+    if pending_metadata:
+        try:
+            metadata_service.save_photos_metadata_bulk(pending_metadata, [is_overwrite] * len(pending_metadata))
+            successful_uploads += len(pending_metadata)
+        except Exception as e:
+            logger.error("Saving metadata failed", files=len(pending_metadata), error=str(e))
+            failed_uploads += len(pending_metadata)
+
     logger.info(
         "Batch upload finished.",
         successful=successful_uploads,
         failed=failed_uploads,
-        total=len(image_files),
+        skipped=skipped_uploads,
+        total=len(image_files) + skipped_uploads,
+    )
+    print(
+        f"\nBatch upload complete. Successful: {successful_uploads}, Failed: {failed_uploads}, Skipped: {skipped_uploads}"
     )
-    print(f"\nBatch upload complete. Successful: {successful_uploads}, Failed: {failed_uploads}")
@@ -0,0 +1,54 @@
+import os
+import sys
+from invoke import task, Context
+from dotenv import load_dotenv
+import structlog
+
+# Add src to path to allow for absolute imports from the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+
+from imgstream.services.thumbnail_packs import ThumbnailPackService
+
+logger = structlog.get_logger()
+
+
+@task
+def compact_thumbnail_packs(
+    c: Context, user_id: str, env_file: str = ".env", dry_run: bool = True, min_dead_ratio: float = 0.3
+):
+    """
+    Rewrite a user's sealed thumbnail packs that contain mostly deleted thumbnails.
+
+    Args:
+        c (Context): Invoke context.
+        user_id (str): The user ID whose packs are compacted.
+        env_file (str): Path to the environment file. Default is '.env'.
+        dry_run (bool): If True, only reports packs to compact. Pass --no-dry-run to compact. Default is True.
+        min_dead_ratio (float): Minimum fraction of unreferenced bytes that triggers a rewrite. Default is 0.3.
+    """
+    # 1. Load environment variables
+    if os.path.exists(env_file):
+        logger.info(f"Loading environment variables from {env_file}")
+        load_dotenv(dotenv_path=env_file)
+    else:
+        logger.warning(f"Environment file not found at {env_file}. Using existing environment.")
+
+    logger.info("Starting thumbnail pack compaction", user_id=user_id, dry_run=dry_run, min_dead_ratio=min_dead_ratio)
+
+    # 2. Run compaction
+    report = ThumbnailPackService(user_id).compact(min_dead_ratio=min_dead_ratio, dry_run=dry_run)
+
+    # 3. Print report
+    print(f"\n--- Thumbnail Pack Compaction ({'Dry Run' if dry_run else 'Compact'}) ---")
+    print(f"Sealed packs:      {report['sealed_packs']}")
+    print(f"Candidates:        {len(report['candidates'])}")
+    for candidate in report["candidates"]:
+        print(f"  - {candidate['pack_path']} ({candidate['live_bytes']} / {candidate['total_bytes']} bytes live)")
+    print(f"Reclaimable bytes: {report['reclaimed_bytes']}")
+
+    if dry_run:
+        print("\nDry run completed. No packs were rewritten. Re-run with --no-dry-run to compact.")
+        return
+
+    print(f"Rewritten:         {report['rewritten']}")
+    print(f"Removed:           {report['removed']}")
@@ -0,0 +1,63 @@
+import os
+import sys
+from invoke import task, Context
+from dotenv import load_dotenv
+import structlog
+
+# Add src to path to allow for absolute imports from the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+
+from imgstream.services.export import PhotoExportService
+
+logger = structlog.get_logger()
+
+
+@task
+def export_photos(c: Context, user_id: str, output: str, env_file: str = ".env", year: int = 0, workers: int = 0):
+    """
+    Export a user's original photos into a ZIP archive streamed to a local file.
+
+    Args:
+        c (Context): Invoke context.
+        user_id (str): The user ID whose photos are exported.
+        output (str): Path of the ZIP file to write.
+        env_file (str): Path to the environment file. Default is '.env'.
+        year (int): Only export photos created in this year. Default is 0 (all photos).
+        workers (int): Concurrent chunk downloads. Default is 0 (GCS_DOWNLOAD_MAX_WORKERS).
+    """
+    # 1. Load environment variables
+    if os.path.exists(env_file):
+        logger.info(f"Loading environment variables from {env_file}")
+        load_dotenv(dotenv_path=env_file)
+    else:
+        logger.warning(f"Environment file not found at {env_file}. Using existing environment.")
+
+    # 2. Select photos
+    service = PhotoExportService(user_id)
+    photos = service.select_photos(year=year or None)
+    if not photos:
+        print("No photos to export.")
+        return
+
+    total_mb = sum(photo.file_size or 0 for photo in photos) / (1024 * 1024)
+    logger.info(
+        "Starting photo export", user_id=user_id, photos=len(photos), total_mb=round(total_mb, 1), output=output
+    )
+
+    def print_progress(progress):
+        done_mb = progress["bytes_done"] / (1024 * 1024)
+        print(
+            f"\r{progress['files_done']}/{progress['total_files']} files, {done_mb:.1f}/{total_mb:.1f} MB",
+            end="",
+            flush=True,
+        )
+
+    # 3. Stream the archive to disk
+    with open(output, "wb") as f:
+        summary = service.export_to_file(photos, f, progress_callback=print_progress, max_workers=workers or None)
+
+    print("\n\n--- Export Completed ---")
+    print(f"Files:         {summary['files']}")
+    print(f"Archive size:  {summary['archive_bytes'] / (1024 * 1024):.1f} MB")
+    print(f"Duration:      {summary['duration_seconds']:.1f} s")
+    print(f"Output:        {output}")
@@ -0,0 +1,57 @@
+import os
+import sys
+from invoke import task, Context
+from dotenv import load_dotenv
+import structlog
+
+# Add src to path to allow for absolute imports from the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+
+from imgstream.services.layout_migration import ObjectLayoutMigrator
+
+logger = structlog.get_logger()
+
+
+@task
+def migrate_object_layout(
+    c: Context, user_id: str, env_file: str = ".env", dry_run: bool = True, delete_old: bool = False, workers: int = 8
+):
+    """
+    Migrate a user's photos to the content-addressed object layout.
+
+    Args:
+        c (Context): Invoke context.
+        user_id (str): The user ID to migrate.
+        env_file (str): Path to the environment file. Default is '.env'.
+        dry_run (bool): If True, only reports photos to migrate. Pass --no-dry-run to migrate. Default is True.
+        delete_old (bool): Delete the old filename-based objects after the database is synced. Default is False.
+        workers (int): Maximum photos copied concurrently. Default is 8.
+    """
+    # 1. Load environment variables
+    if os.path.exists(env_file):
+        logger.info(f"Loading environment variables from {env_file}")
+        load_dotenv(dotenv_path=env_file)
+    else:
+        logger.warning(f"Environment file not found at {env_file}. Using existing environment.")
+
+    logger.info("Starting object layout migration", user_id=user_id, dry_run=dry_run, delete_old=delete_old)
+
+    # 2. Run migration
+    report = ObjectLayoutMigrator(user_id).migrate(dry_run=dry_run, delete_old=delete_old, max_workers=workers)
+
+    # 3. Print report
+    print(f"\n--- Object Layout Migration ({'Dry Run' if dry_run else 'Migrate'}) ---")
+    print(f"Total photos:      {report['total_photos']}")
+    print(f"Already migrated:  {report['already_migrated']}")
+    print(f"Pending:           {report['pending']}")
+
+    if dry_run:
+        print("\nDry run completed. No objects were copied. Re-run with --no-dry-run to migrate.")
+        return
+
+    print(f"Migrated:          {report['migrated']}")
+    print(f"Deduplicated:      {report['deduplicated_objects']} object(s)")
+    print(f"Old objects removed: {report['deleted_old_objects']}")
+    print(f"Failed:            {len(report['failed'])}")
+    for failure in report["failed"]:
+        logger.error("Migration failed", photo_id=failure["photo_id"], error=failure["error"])
@@ -0,0 +1,78 @@
+import os
+import sys
+from invoke import task, Context
+from dotenv import load_dotenv
+import structlog
+
+# Add src to path to allow for absolute imports from the project root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+
+from imgstream.services.reconciliation import ReconciliationService
+
+logger = structlog.get_logger()
+
+
+@task
+def reconcile_orphans(
+    c: Context,
+    user_id: str,
+    env_file: str = ".env",
+    dry_run: bool = True,
+    grace_minutes: int = 60,
+    batch_size: int = 500,
+    workers: int = 32,
+    show: int = 20,
+):
+    """
+    Find GCS photo objects with no matching photos row and optionally delete them.
+
+    Args:
+        c (Context): Invoke context.
+        user_id (str): The user ID to reconcile.
+        env_file (str): Path to the environment file. Default is '.env'.
+        dry_run (bool): If True, only reports orphans. Pass --no-dry-run to delete them. Default is True.
+        grace_minutes (int): Ignore objects updated within this many minutes. Default is 60.
+        batch_size (int): Number of objects deleted per batch. Default is 500.
+        workers (int): Maximum concurrent delete requests. Default is 32.
+        show (int): Number of orphan paths to print. Default is 20.
+    """
+    # 1. Load environment variables
+    if os.path.exists(env_file):
+        logger.info(f"Loading environment variables from {env_file}")
+        load_dotenv(dotenv_path=env_file)
+    else:
+        logger.warning(f"Environment file not found at {env_file}. Using existing environment.")
+
+    logger.info("Starting orphan reconciliation", user_id=user_id, dry_run=dry_run, grace_minutes=grace_minutes)
+
+    # 2. Run reconciliation
+    service = ReconciliationService(user_id)
+    report = service.reconcile(
+        dry_run=dry_run,
+        grace_period_minutes=grace_minutes,
+        batch_size=batch_size,
+        max_workers=workers,
+    )
+
+    # 3. Print report
+    costs = report["cost_estimate"]
+    print(f"\n--- Orphan Reconciliation ({'Dry Run' if dry_run else 'Delete'}) ---")
+    print(f"Scanned objects:   {report['scanned_objects']} ({report['scanned_bytes']} bytes)")
+    print(f"Skipped (recent):  {report['skipped_recent']}")
+    print(f"Orphans found:     {report['orphan_count']} ({report['orphan_bytes']} bytes)")
+    for orphan in report["orphans"][:show]:
+        print(f"- {orphan['name']} ({orphan['size']} bytes)")
+    if report["orphan_count"] > show:
+        print(f"... and {report['orphan_count'] - show} more")
+
+    print("\nCost estimate:")
+    print(f"  List requests:   {costs['list_requests']} (~${costs['list_cost_usd']:.6f})")
+    print("  Deletes:         free")
+    print(f"  Storage savings: {costs['orphan_gb']} GB (~${costs['monthly_storage_savings_usd']:.4f}/month)")
+
+    if dry_run:
+        print("\nDry run completed. No objects were deleted. Re-run with --no-dry-run to delete.")
+    else:
+        print(f"\nDeleted: {report['deleted']}, Failed: {len(report['failed'])}")
+        for failure in report["failed"]:
+            logger.error("Delete failed", name=failure["name"], error=failure["error"])
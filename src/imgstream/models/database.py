@@ -3,18 +3,48 @@ Database initialization and management for imgstream application.
 
 This module provides functions to initialize DuckDB databases and manage
 database connections.
+
+DatabaseManager opens a connection on demand and closes it when its context
+exits. SharedDatabaseManager keeps one long-lived connection per database file
+so the catalog and buffer cache survive between queries, hands each thread its
+own cursor, and closes the connection after an idle timeout.
 """
 
 import logging
+import os
+import threading
+import time
+import weakref
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any
 
 import duckdb
 
-from .schema import get_schema_statements, validate_schema_compatibility
+try:
+    import numpy  # noqa: F401  # DuckDB's fetchnumpy() needs it
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from .schema import (
+    SCHEMA_VERSION,
+    get_migrations,
+    get_schema_statements,
+    get_schema_version_statement,
+    validate_schema_compatibility,
+)
 
 logger = logging.getLogger(__name__)
 
+# Shared connections are closed after being unused for this long (seconds)
+DEFAULT_IDLE_TIMEOUT = float(os.getenv("DUCKDB_IDLE_TIMEOUT_SECONDS", "300"))
+
+# How often idle shared connections are looked for (seconds)
+IDLE_CHECK_INTERVAL = 30.0
+
 
 class DatabaseManager:
     """
@@ -67,18 +97,84 @@ class DatabaseManager:
         conn = self.connect()
 
         try:
+            # Migrate a database created by an older version first, as indexes may cover newer columns
+            if conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='photos'").fetchone():
+                self.upgrade_schema()
+
             # Execute all schema creation statements
             for statement in get_schema_statements():
                 logger.debug(f"Executing SQL: {statement}")
                 conn.execute(statement)
 
             conn.commit()
+
+            # Record the schema version of a new database (its tables already have every migrated column)
+            self.upgrade_schema()
             logger.info("Database schema initialized successfully")
 
         except duckdb.Error as e:
             logger.error(f"Failed to initialize database schema: {e}")
             raise
 
+    def get_schema_version(self) -> int:
+        """
+        Get the schema version recorded in the database.
+
+        Returns:
+            int: Schema version, 0 for a database created before versions were recorded
+        """
+        conn = self.connect()
+        conn.execute(get_schema_version_statement())
+        row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+        return row[0] if row and row[0] is not None else 0
+
+    def pending_migrations(self) -> list[int]:
+        """
+        Get the schema versions upgrade_schema would migrate the database to.
+
+        Returns:
+            List of versions, oldest first
+        """
+        return [version for version, _ in get_migrations(self.get_schema_version())]
+
+    def upgrade_schema(self) -> list[int]:
+        """
+        Migrate a database created by an older version up to SCHEMA_VERSION.
+
+        Each migration runs in its own transaction together with recording
+        its version, so an interrupted upgrade resumes from the last completed
+        migration. A database of a newer version than this code is left alone.
+
+        Returns:
+            List of the versions migrated to, oldest first
+
+        Raises:
+            duckdb.Error: If database operations fail
+        """
+        current_version = self.get_schema_version()
+        if current_version > SCHEMA_VERSION:
+            logger.warning(f"Database schema version {current_version} is newer than {SCHEMA_VERSION}, not migrating")
+            return []
+
+        applied = []
+        try:
+            for version, statements in get_migrations(current_version):
+                with self.transaction():
+                    for statement in statements:
+                        logger.debug(f"Executing SQL: {statement}")
+                        self.connect().execute(statement)
+                    self.connect().execute("DELETE FROM schema_version")
+                    self.connect().execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+                applied.append(version)
+
+        except duckdb.Error as e:
+            logger.error(f"Failed to migrate database schema to version {current_version + len(applied) + 1}: {e}")
+            raise
+
+        if applied:
+            logger.info(f"Migrated database schema from version {current_version} to {applied[-1]}")
+        return applied
+
     def verify_schema(self) -> bool:
         """
         Verify that the database schema is correctly set up.
@@ -178,6 +274,65 @@ class DatabaseManager:
             logger.error(f"Query execution failed: {query}, error: {e}")
             raise
 
+    def execute_columns(self, query: str, parameters: tuple | None = None) -> dict[str, Any]:
+        """
+        Execute a SQL query and return its result column by column.
+
+        With NumPy installed, each column is fetched as one array, without
+        building a tuple per row; NULLs become masked entries. Call tolist()
+        on a column to get Python values, with None for NULL.
+
+        Args:
+            query: SQL query string
+            parameters: Optional query parameters
+
+        Returns:
+            dict: Column name -> NumPy array, or list of values without NumPy,
+                in result column order
+
+        Raises:
+            duckdb.Error: If query execution fails
+        """
+        conn = self.connect()
+
+        try:
+            result = conn.execute(query, parameters) if parameters else conn.execute(query)
+            if NUMPY_AVAILABLE:
+                return result.fetchnumpy()
+
+            names = [column[0] for column in result.description]
+            rows = result.fetchall()
+            return {name: [row[index] for row in rows] for index, name in enumerate(names)}
+
+        except duckdb.Error as e:
+            logger.error(f"Query execution failed: {query}, error: {e}")
+            raise
+
+    @contextmanager
+    def transaction(self) -> Iterator["DatabaseManager"]:
+        """
+        Run a group of statements in a single transaction.
+
+        The transaction is committed when the block exits normally and rolled
+        back if it raises.
+
+        Yields:
+            This DatabaseManager, for executing queries inside the transaction
+
+        Raises:
+            duckdb.Error: If the transaction cannot be started or committed
+        """
+        conn = self.connect()
+        conn.execute("BEGIN TRANSACTION")
+
+        try:
+            yield self
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+        conn.execute("COMMIT")
+
     def __enter__(self) -> "DatabaseManager":
         """Context manager entry."""
         return self
@@ -187,6 +342,203 @@ class DatabaseManager:
         self.close()
 
 
+class SharedDatabaseManager(DatabaseManager):
+    """
+    DatabaseManager that keeps one long-lived connection and hands out per-thread cursors.
+
+    Entering the context marks the calling thread as a user of the database;
+    leaving the outermost context closes that thread's cursor but keeps the
+    underlying connection (and its buffer cache) open. The connection is closed
+    by close(), or automatically once it has been idle for idle_timeout seconds.
+
+    exclusive() waits for other threads to leave their contexts and keeps new
+    ones out, which is how checkpoint-and-copy for sync and reset run safely.
+    """
+
+    def __init__(self, db_path: str, idle_timeout: float | None = None):
+        """
+        Initialize SharedDatabaseManager.
+
+        Args:
+            db_path: Path to the DuckDB database file
+            idle_timeout: Seconds without use after which the connection is closed
+                (defaults to DUCKDB_IDLE_TIMEOUT_SECONDS)
+        """
+        super().__init__(db_path)
+        self.idle_timeout = DEFAULT_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self._condition = threading.Condition(threading.RLock())
+        self._cursors: dict[int, duckdb.DuckDBPyConnection] = {}
+        self._depths: dict[int, int] = {}
+        self._exclusive_owner: int | None = None
+        self._last_used = time.monotonic()
+
+    def connect(self) -> duckdb.DuckDBPyConnection:
+        """
+        Get the calling thread's cursor, opening the shared connection if needed.
+
+        Returns:
+            DuckDB cursor for the current thread
+        """
+        thread_id = threading.get_ident()
+        with self._condition:
+            self._last_used = time.monotonic()
+            cursor = self._cursors.get(thread_id)
+            if cursor is None:
+                if self._connection is None:
+                    self._connection = duckdb.connect(self.db_path)
+                    _register_shared_manager(self)
+                    logger.info(f"Opened shared DuckDB connection to {self.db_path}")
+                cursor = self._connection.cursor()
+                self._cursors[thread_id] = cursor
+            return cursor
+
+    def _others_active(self, thread_id: int) -> bool:
+        return any(depth for owner, depth in self._depths.items() if owner != thread_id)
+
+    def _release_cursor(self, thread_id: int) -> None:
+        cursor = self._cursors.pop(thread_id, None)
+        if cursor is not None:
+            cursor.close()
+
+    def _close_connection(self) -> None:
+        for thread_id in list(self._cursors):
+            self._release_cursor(thread_id)
+        super().close()
+
+    @contextmanager
+    def exclusive(self) -> Iterator["SharedDatabaseManager"]:
+        """
+        Hold the database exclusively for the calling thread.
+
+        Waits until no other thread is inside the manager's context and blocks
+        other threads from entering until the block exits.
+
+        Yields:
+            This manager
+        """
+        thread_id = threading.get_ident()
+        with self._condition:
+            while (self._exclusive_owner not in (None, thread_id)) or self._others_active(thread_id):
+                self._condition.wait()
+            previous_owner = self._exclusive_owner
+            self._exclusive_owner = thread_id
+
+        try:
+            yield self
+        finally:
+            with self._condition:
+                self._exclusive_owner = previous_owner
+                self._condition.notify_all()
+
+    def checkpoint(self) -> None:
+        """
+        Write all committed changes into the database file.
+
+        Call this inside exclusive() before copying the file (e.g. for GCS sync),
+        since the long-lived connection otherwise keeps recent changes in the WAL.
+        """
+        with self._condition:
+            if self._connection is not None:
+                self._connection.execute("CHECKPOINT")
+
+    def close(self) -> None:
+        """Close every cursor and the shared connection, waiting for other threads to finish."""
+        with self.exclusive():
+            with self._condition:
+                self._close_connection()
+
+    def close_if_idle(self) -> bool:
+        """
+        Close the shared connection if nobody has used it for idle_timeout seconds.
+
+        Returns:
+            bool: True if the connection was closed
+        """
+        with self._condition:
+            idle = time.monotonic() - self._last_used
+            if (
+                self._connection is None
+                or self._exclusive_owner is not None
+                or any(self._depths.values())
+                or idle < self.idle_timeout
+            ):
+                return False
+
+            self._close_connection()
+            logger.info(f"Closed idle DuckDB connection to {self.db_path} after {idle:.0f}s")
+            return True
+
+    def __enter__(self) -> "SharedDatabaseManager":
+        """Context manager entry: mark the calling thread as using the database."""
+        thread_id = threading.get_ident()
+        with self._condition:
+            # Nested entries never wait, or a thread inside the context would block exclusive() forever
+            while self._exclusive_owner not in (None, thread_id) and not self._depths.get(thread_id):
+                self._condition.wait()
+            self._depths[thread_id] = self._depths.get(thread_id, 0) + 1
+        return self
+
+    def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Context manager exit: release the thread's cursor, keeping the connection open."""
+        thread_id = threading.get_ident()
+        with self._condition:
+            depth = self._depths.get(thread_id, 1) - 1
+            if depth > 0:
+                self._depths[thread_id] = depth
+                return
+
+            self._depths.pop(thread_id, None)
+            self._release_cursor(thread_id)
+            self._last_used = time.monotonic()
+            self._condition.notify_all()
+
+
+# Shared managers with an open connection, checked periodically for idleness
+_shared_managers: "weakref.WeakSet[SharedDatabaseManager]" = weakref.WeakSet()
+_shared_managers_lock = threading.Lock()
+_idle_reaper: threading.Thread | None = None
+
+
+def _register_shared_manager(manager: SharedDatabaseManager) -> None:
+    """Track a manager whose connection was opened and start the idle reaper if needed."""
+    global _idle_reaper
+
+    with _shared_managers_lock:
+        _shared_managers.add(manager)
+        if _idle_reaper is None or not _idle_reaper.is_alive():
+            _idle_reaper = threading.Thread(target=_reap_idle_connections, name="duckdb-idle-reaper", daemon=True)
+            _idle_reaper.start()
+
+
+def _reap_idle_connections() -> None:
+    """Close shared connections that have been idle longer than their timeout."""
+    while True:
+        time.sleep(IDLE_CHECK_INTERVAL)
+        close_idle_connections()
+
+
+def close_idle_connections() -> int:
+    """
+    Close every shared connection that has exceeded its idle timeout.
+
+    Returns:
+        int: Number of connections closed
+    """
+    with _shared_managers_lock:
+        managers = list(_shared_managers)
+
+    closed = 0
+    for manager in managers:
+        try:
+            if manager.close_if_idle():
+                closed += 1
+                with _shared_managers_lock:
+                    _shared_managers.discard(manager)
+        except Exception as e:
+            logger.warning(f"Failed to close idle DuckDB connection to {manager.db_path}: {e}")
+    return closed
+
+
 def create_database(db_path: str) -> DatabaseManager:
     """
     Create and initialize a new DuckDB database.
@@ -220,13 +572,14 @@ def create_database(db_path: str) -> DatabaseManager:
         raise RuntimeError(f"Database creation failed: {e}") from e
 
 
-def get_database_manager(db_path: str, create_if_missing: bool = True) -> DatabaseManager:
+def get_database_manager(db_path: str, create_if_missing: bool = True, shared: bool = False) -> DatabaseManager:
     """
     Get a DatabaseManager instance, optionally creating the database if it doesn't exist.
 
     Args:
         db_path: Path to the database file
         create_if_missing: Whether to create the database if it doesn't exist
+        shared: Return a SharedDatabaseManager that keeps its connection open between uses
 
     Returns:
         DatabaseManager instance
@@ -238,13 +591,14 @@ def get_database_manager(db_path: str, create_if_missing: bool = True) -> Databa
     db_file = Path(db_path)
 
     if not db_file.exists():
-        if create_if_missing:
-            return create_database(db_path)
-        else:
+        if not create_if_missing:
             raise FileNotFoundError(f"Database file not found: {db_path}")
+        if not shared:
+            return create_database(db_path)
+        create_database(db_path).close()
 
     # Database exists, create manager and verify schema
-    db_manager = DatabaseManager(db_path)
+    db_manager = SharedDatabaseManager(db_path) if shared else DatabaseManager(db_path)
 
     if not db_manager.verify_schema():
         logger.warning("Schema verification failed, reinitializing...")
@@ -2,15 +2,18 @@
 Photo metadata model for imgstream application.
 
 This module contains the PhotoMetadata dataclass that represents
-photo metadata stored in DuckDB.
+photo metadata stored in DuckDB, and PhotoPage, a list of photos kept in
+the columnar form DuckDB returns them in.
 """
 
 import uuid
-from dataclasses import dataclass
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, fields
 from datetime import UTC, datetime
+from typing import Any, overload
 
 
-@dataclass
+@dataclass(slots=True)
 class PhotoMetadata:
     """
     Represents metadata for a photo in the imgstream system.
@@ -28,6 +31,14 @@ class PhotoMetadata:
     uploaded_at: datetime
     file_size: int
     mime_type: str
+    # Image details; None until recorded at upload or by a backfill job
+    width: int | None = None
+    height: int | None = None
+    orientation: int | None = None
+    content_hash: str | None = None
+    renditions: list[str] | None = None
+    placeholder: str | None = None
+    thumbnail_generation: int | None = None
 
     @classmethod
     def create_new(
@@ -40,6 +51,7 @@ class PhotoMetadata:
         mime_type: str,
         created_at: datetime | None = None,
         uploaded_at: datetime | None = None,
+        **details: Any,
     ) -> "PhotoMetadata":
         """
         Create a new PhotoMetadata instance with generated ID and current timestamp.
@@ -53,6 +65,8 @@ class PhotoMetadata:
             mime_type: MIME type of the photo (e.g., 'image/jpeg')
             created_at: When the photo was originally taken (from EXIF)
             uploaded_at: When the photo was uploaded (defaults to now)
+            **details: Image detail fields (width, height, orientation, content_hash,
+                renditions, placeholder, thumbnail_generation) known at upload
 
         Returns:
             New PhotoMetadata instance
@@ -67,8 +81,19 @@ class PhotoMetadata:
             uploaded_at=uploaded_at or datetime.now(UTC),
             file_size=file_size,
             mime_type=mime_type,
+            **details,
         )
 
+    @property
+    def sort_timestamp(self) -> datetime:
+        """
+        Get the timestamp photos are ordered by: the creation date, or the upload date if unknown.
+
+        Returns:
+            The value stored in the database's sort_ts column
+        """
+        return self.created_at or self.uploaded_at
+
     def to_dict(self) -> dict:
         """
         Convert PhotoMetadata to dictionary for database storage.
@@ -86,6 +111,13 @@ class PhotoMetadata:
             "uploaded_at": self.uploaded_at.isoformat(),
             "file_size": self.file_size,
             "mime_type": self.mime_type,
+            "width": self.width,
+            "height": self.height,
+            "orientation": self.orientation,
+            "content_hash": self.content_hash,
+            "renditions": self.renditions,
+            "placeholder": self.placeholder,
+            "thumbnail_generation": self.thumbnail_generation,
         }
 
     @classmethod
@@ -119,6 +151,13 @@ class PhotoMetadata:
             uploaded_at=uploaded_at,
             file_size=data["file_size"],
             mime_type=data["mime_type"],
+            width=data.get("width"),
+            height=data.get("height"),
+            orientation=data.get("orientation"),
+            content_hash=data.get("content_hash"),
+            renditions=data.get("renditions"),
+            placeholder=data.get("placeholder"),
+            thumbnail_generation=data.get("thumbnail_generation"),
         )
 
     def validate(self) -> bool:
@@ -165,3 +204,130 @@ class PhotoMetadata:
         """
         time_diff = datetime.now(UTC) - self.uploaded_at
         return time_diff.days <= days
+
+
+# Columns of the photos table that make up a PhotoMetadata, in field order
+PHOTO_COLUMNS = tuple(field.name for field in fields(PhotoMetadata))
+
+# Fields that to_dict() serializes as ISO 8601 strings
+_TIMESTAMP_FIELDS = ("created_at", "uploaded_at")
+
+# Fields holding a list per photo
+_LIST_FIELDS = ("renditions",)
+
+
+class PhotoPage(Sequence[PhotoMetadata]):
+    """
+    Read-only list of photos stored column by column.
+
+    A page keeps the columns of a query result as returned by
+    DatabaseManager.execute_columns. A column is converted to Python values
+    the first time it is read, and a PhotoMetadata is built only for the
+    photos that are accessed, so reading a few fields or converting a page to
+    dictionaries does not create an object per row. Slices share the columns
+    of the page they are taken from.
+    """
+
+    __slots__ = ("_columns", "_values", "_rows")
+
+    def __init__(self, columns: Mapping[str, Any]):
+        """
+        Initialize the page.
+
+        Args:
+            columns: Column name -> NumPy array or list of values, starting with the 'id' column;
+                PHOTO_COLUMNS missing from it read as None
+        """
+        self._columns = columns
+        # Column name -> converted Python values, shared with slices of this page
+        self._values: dict[str, list[Any]] = {}
+        self._rows = range(len(columns["id"]))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple], columns: Sequence[str] | None = None) -> "PhotoPage":
+        """
+        Build a page from result tuples.
+
+        Args:
+            rows: Result rows
+            columns: Names of the row values, in order; None takes as many leading
+                PHOTO_COLUMNS as the rows have values
+
+        Returns:
+            PhotoPage: Page of the rows
+        """
+        values = list(zip(*rows, strict=True))
+        if columns is None:
+            columns = PHOTO_COLUMNS[: len(values) or 1]
+        return cls({name: list(column) for name, column in zip(columns, values or [()] * len(columns), strict=True)})
+
+    def _view(self, rows: range) -> "PhotoPage":
+        page = PhotoPage.__new__(PhotoPage)
+        page._columns = self._columns
+        page._values = self._values
+        page._rows = rows
+        return page
+
+    def _column_values(self, name: str) -> list[Any]:
+        values = self._values.get(name)
+        if values is None:
+            column = self._columns.get(name)
+            if column is None:
+                values = [None] * len(self._columns["id"])
+            else:
+                values = column.tolist() if hasattr(column, "tolist") else list(column)
+                if name in _LIST_FIELDS:
+                    # NumPy returns each list value as an array of its own
+                    values = [value.tolist() if hasattr(value, "tolist") else value for value in values]
+            self._values[name] = values
+        return values
+
+    def column(self, name: str) -> list[Any]:
+        """
+        Get the values of one column, in page order.
+
+        Args:
+            name: Column name, e.g. 'id'
+
+        Returns:
+            list: Values, with None for NULL
+        """
+        values = self._column_values(name)
+        if self._rows.step == 1:
+            return values[self._rows.start : self._rows.stop]
+        return [values[index] for index in self._rows]
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        """
+        Convert the page to dictionaries, as PhotoMetadata.to_dict does, without building PhotoMetadata.
+
+        Returns:
+            list: One dictionary per photo
+        """
+        columns = [self.column(name) for name in PHOTO_COLUMNS]
+        for name in _TIMESTAMP_FIELDS:
+            index = PHOTO_COLUMNS.index(name)
+            columns[index] = [value.isoformat() if value is not None else None for value in columns[index]]
+        return [dict(zip(PHOTO_COLUMNS, row, strict=True)) for row in zip(*columns, strict=True)]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @overload
+    def __getitem__(self, index: int) -> PhotoMetadata: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "PhotoPage": ...
+
+    def __getitem__(self, index: int | slice) -> "PhotoMetadata | PhotoPage":
+        if isinstance(index, slice):
+            return self._view(self._rows[index])
+        row = self._rows[index]
+        return PhotoMetadata(*(self._column_values(name)[row] for name in PHOTO_COLUMNS))
+
+    def __iter__(self) -> Iterator[PhotoMetadata]:
+        for values in zip(*(self.column(name) for name in PHOTO_COLUMNS), strict=True):
+            yield PhotoMetadata(*values)
+
+    def __repr__(self) -> str:
+        return f"PhotoPage({len(self)} photos)"
@@ -2,8 +2,34 @@
 Database schema definitions for imgstream application.
 
 This module contains SQL schema definitions and database initialization functions.
+
+Every user's DuckDB file records the version of the schema it has in the
+schema_version table. SCHEMA_MIGRATIONS lists, per version, the statements
+that bring a database of the previous version up to it; a change to the
+schema of existing tables adds a migration and bumps SCHEMA_VERSION, and
+DatabaseManager.upgrade_schema applies the pending migrations when a
+database is opened. Columns added by a migration start out NULL; the
+backfill jobs of services.backfill fill them in for existing photos.
 """
 
+import re
+
+from .photo import PHOTO_COLUMNS
+
+# Columns describing the image itself, filled in at upload or by a backfill job.
+# renditions lists the GCS paths of derived images (e.g. web display JPEGs),
+# placeholder is a tiny downscaled preview as a data: URI, shown while the thumbnail loads,
+# and thumbnail_generation is the GCS generation of the thumbnail object, pinned in its URL.
+PHOTO_DETAIL_COLUMNS = {
+    "width": "INTEGER",
+    "height": "INTEGER",
+    "orientation": "SMALLINT",
+    "content_hash": "TEXT",
+    "renditions": "TEXT[]",
+    "placeholder": "TEXT",
+    "thumbnail_generation": "BIGINT",
+}
+
 # SQL schema for the photos table
 PHOTOS_TABLE_SCHEMA = """
 CREATE TABLE IF NOT EXISTS photos (
@@ -15,7 +41,15 @@ CREATE TABLE IF NOT EXISTS photos (
     created_at TIMESTAMP,
     uploaded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     file_size INTEGER NOT NULL,
-    mime_type TEXT NOT NULL
+    mime_type TEXT NOT NULL,
+    sort_ts TIMESTAMP,
+    width INTEGER,
+    height INTEGER,
+    orientation SMALLINT,
+    content_hash TEXT,
+    renditions TEXT[],
+    placeholder TEXT,
+    thumbnail_generation BIGINT
 );
 """
 
@@ -25,10 +59,108 @@ PHOTOS_TABLE_INDEXES = [
     "CREATE INDEX IF NOT EXISTS idx_photos_user_id ON photos(user_id);",
     "CREATE INDEX IF NOT EXISTS idx_photos_uploaded_at ON photos(uploaded_at DESC);",
     "CREATE INDEX IF NOT EXISTS idx_photos_user_created ON photos(user_id, created_at DESC);",
+    "CREATE INDEX IF NOT EXISTS idx_photos_user_sort ON photos(user_id, sort_ts DESC, id DESC);",
+]
+
+# Upgrades for databases created before a column existed. sort_ts holds
+# COALESCE(created_at, uploaded_at), the gallery's sort key, so that keyset
+# pagination can filter and order on a plain column. The index comes before
+# the UPDATE: DuckDB cannot create an index in a transaction with outstanding updates.
+PHOTOS_TABLE_UPGRADES = [
+    "ALTER TABLE photos ADD COLUMN IF NOT EXISTS sort_ts TIMESTAMP;",
+    "CREATE INDEX IF NOT EXISTS idx_photos_user_sort ON photos(user_id, sort_ts DESC, id DESC);",
+    "UPDATE photos SET sort_ts = COALESCE(created_at, uploaded_at) WHERE sort_ts IS NULL;",
+]
+
+# Schema version bookkeeping: a single row holding the version of this database
+SCHEMA_VERSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER NOT NULL
+);
+"""
+
+# Migrations by the schema version they upgrade to. Statements must be
+# idempotent: a new database already has the current tables and still
+# runs every migration once to record its version.
+SCHEMA_MIGRATIONS = {
+    1: PHOTOS_TABLE_UPGRADES,
+    2: [
+        f"ALTER TABLE photos ADD COLUMN IF NOT EXISTS {column} {column_type};"
+        for column, column_type in PHOTO_DETAIL_COLUMNS.items()
+        if column != "thumbnail_generation"
+    ],
+    3: ["ALTER TABLE photos ADD COLUMN IF NOT EXISTS thumbnail_generation BIGINT;"],
+}
+
+# Version of the schema this code creates and expects
+SCHEMA_VERSION = max(SCHEMA_MIGRATIONS)
+
+# Thumbnail pack objects and the byte-offset index of the thumbnails stored in them
+THUMBNAIL_PACK_SCHEMA = [
+    """
+CREATE TABLE IF NOT EXISTS thumbnail_packs (
+    pack_path TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    total_bytes BIGINT NOT NULL DEFAULT 0,
+    entry_count INTEGER NOT NULL DEFAULT 0,
+    component_count INTEGER NOT NULL DEFAULT 0,
+    generation BIGINT,
+    sealed BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+""",
+    """
+CREATE TABLE IF NOT EXISTS thumbnail_pack_entries (
+    entry_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    pack_path TEXT NOT NULL,
+    byte_offset BIGINT NOT NULL,
+    byte_length BIGINT NOT NULL
+);
+""",
+    "CREATE INDEX IF NOT EXISTS idx_thumbnail_pack_entries_pack ON thumbnail_pack_entries(pack_path);",
+]
+
+# Incremental sync bookkeeping: sequence numbers of the shipped change log and
+# the hash of every row as of the last shipped change, used to find what changed since
+SYNC_LOG_SCHEMA = [
+    """
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value BIGINT NOT NULL
+);
+""",
+    """
+CREATE TABLE IF NOT EXISTS sync_shadow (
+    table_name TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    row_hash UBIGINT NOT NULL
+);
+""",
+]
+
+# Filename search index: the trigrams ('g') and words ('w') of each photo's
+# searchable text, and the hash of the text they were built from
+SEARCH_INDEX_SCHEMA = [
+    """
+CREATE TABLE IF NOT EXISTS search_terms (
+    photo_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    term TEXT NOT NULL
+);
+""",
+    """
+CREATE TABLE IF NOT EXISTS search_documents (
+    photo_id TEXT PRIMARY KEY,
+    doc_hash UBIGINT NOT NULL
+);
+""",
+    "CREATE INDEX IF NOT EXISTS idx_search_terms_term ON search_terms(term);",
+    "CREATE INDEX IF NOT EXISTS idx_search_terms_photo ON search_terms(photo_id);",
 ]
 
 # All schema creation statements
-ALL_SCHEMA_STATEMENTS = [PHOTOS_TABLE_SCHEMA] + PHOTOS_TABLE_INDEXES
+ALL_SCHEMA_STATEMENTS = [PHOTOS_TABLE_SCHEMA] + PHOTOS_TABLE_INDEXES + THUMBNAIL_PACK_SCHEMA
 
 
 def get_schema_statements() -> list[str]:
@@ -61,33 +193,82 @@ def get_index_creation_statements() -> list[str]:
     return PHOTOS_TABLE_INDEXES
 
 
+def get_schema_version_statement() -> str:
+    """
+    Get the schema version table creation statement.
+
+    Returns:
+        SQL statement to create the schema_version table
+    """
+    return SCHEMA_VERSION_SCHEMA
+
+
+def get_migrations(current_version: int) -> list[tuple[int, list[str]]]:
+    """
+    Get the migrations that bring a database up to SCHEMA_VERSION.
+
+    Args:
+        current_version: Schema version recorded in the database (0 if none)
+
+    Returns:
+        List of (version, statements) in the order they must be applied
+    """
+    return [(version, SCHEMA_MIGRATIONS[version]) for version in sorted(SCHEMA_MIGRATIONS) if version > current_version]
+
+
+def get_thumbnail_pack_statements() -> list[str]:
+    """
+    Get the thumbnail pack table and index creation statements.
+
+    Returns:
+        List of SQL statements to create the thumbnail pack tables
+    """
+    return THUMBNAIL_PACK_SCHEMA
+
+
+def get_sync_log_statements() -> list[str]:
+    """
+    Get the incremental sync table creation statements.
+
+    Returns:
+        List of SQL statements to create the sync bookkeeping tables
+    """
+    return SYNC_LOG_SCHEMA
+
+
+def get_search_index_statements() -> list[str]:
+    """
+    Get the filename search index table and index creation statements.
+
+    Returns:
+        List of SQL statements to create the search index tables
+    """
+    return SEARCH_INDEX_SCHEMA
+
+
+def get_table_columns(statement: str) -> list[str]:
+    """
+    Get the column names declared by a CREATE TABLE statement.
+
+    Args:
+        statement: CREATE TABLE statement with one column definition per line
+
+    Returns:
+        List of column names, in declaration order
+    """
+    return re.findall(r"^\s+(\w+)\s+[A-Z]", statement, flags=re.MULTILINE)
+
+
 def validate_schema_compatibility() -> bool:
     """
     Validate that the schema is compatible with PhotoMetadata model.
 
-    This function checks that all required fields from PhotoMetadata
-    are represented in the database schema.
+    This function checks that every field of PhotoMetadata is a column of
+    the photos table, and that every column a migration adds is also
+    created for new databases.
 
     Returns:
         True if schema is compatible, False otherwise
     """
-    required_columns = {
-        "id",
-        "user_id",
-        "filename",
-        "original_path",
-        "thumbnail_path",
-        "created_at",
-        "uploaded_at",
-        "file_size",
-        "mime_type",
-    }
-
-    # Extract column names from schema (simple parsing)
-    schema_lower = PHOTOS_TABLE_SCHEMA.lower()
-
-    for column in required_columns:
-        if column not in schema_lower:
-            return False
-
-    return True
+    columns = set(get_table_columns(PHOTOS_TABLE_SCHEMA))
+    return set(PHOTO_COLUMNS) <= columns and set(PHOTO_DETAIL_COLUMNS) <= columns
@@ -4,15 +4,24 @@ Services module for imgstream application.
 This module contains all service classes that handle business logic:
 - AuthService: Cloud IAP authentication and user management
 - StorageService: Google Cloud Storage operations
+- AsyncStorageService: Asyncio facade for concurrent storage operations
+- AsyncMetadataService: Asyncio facade serialising metadata queries per user
 - ImageProcessor: Image processing and thumbnail generation
 - MetadataService: DuckDB metadata management
 """
 
+from .async_metadata import AsyncMetadataService, get_async_metadata_service
+from .async_storage import AsyncStorageService, get_async_storage_service, run_async
 from .auth import CloudIAPAuthService, UserInfo, get_auth_service
 from .image_processor import ImageProcessingError, ImageProcessor, UnsupportedFormatError, get_image_processor
 from .storage import StorageError, StorageService, UploadProgress, get_storage_service
 
 __all__ = [
+    "AsyncMetadataService",
+    "get_async_metadata_service",
+    "AsyncStorageService",
+    "get_async_storage_service",
+    "run_async",
     "CloudIAPAuthService",
     "UserInfo",
     "get_auth_service",
@@ -0,0 +1,172 @@
+"""Asyncio facade for photo metadata operations.
+
+DuckDB connections must not be used from several threads at once, so every
+query for a user is funnelled through that user's single-thread DuckDB
+executor. Coroutines from the event loop therefore never block on DuckDB and
+never race each other on the same database file.
+
+Usage Examples:
+    service = get_async_metadata_service(user_id)
+
+    photos, count = await asyncio.gather(
+        service.get_photos_by_date(limit=20),
+        service.get_photos_count(),
+    )
+"""
+
+import asyncio
+import functools
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from ..logging_config import get_logger
+from ..models.photo import PhotoMetadata, PhotoPage
+from .metadata import (
+    METADATA_SERVICE_CACHE_SIZE,
+    METADATA_SERVICE_IDLE_SECONDS,
+    MetadataService,
+    PageCursor,
+    get_metadata_service,
+)
+from .service_registry import ServiceRegistry
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncMetadataService:
+    """
+    Asynchronous wrapper around MetadataService.
+
+    All calls for one user are executed on a single dedicated thread, which
+    serialises access to the user's DuckDB file while keeping the event loop free.
+    """
+
+    def __init__(self, metadata_service: MetadataService) -> None:
+        """
+        Initialize the async metadata service.
+
+        Args:
+            metadata_service: Underlying MetadataService for the user
+        """
+        self.metadata_service = metadata_service
+        self.user_id = metadata_service.user_id
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"duckdb-{self.user_id}")
+
+    async def _run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Execute a blocking MetadataService call on the user's DuckDB executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def ensure_local_database(self) -> bool:
+        """Ensure the local database exists. See MetadataService.ensure_local_database."""
+        return await self._run(self.metadata_service.ensure_local_database)
+
+    async def get_photo_by_id(self, photo_id: str) -> PhotoMetadata | None:
+        """Get photo metadata by ID. See MetadataService.get_photo_by_id."""
+        return await self._run(self.metadata_service.get_photo_by_id, photo_id)
+
+    async def get_photos_by_date(self, limit: int = 50, offset: int = 0) -> list[PhotoMetadata]:
+        """Get photos ordered by date. See MetadataService.get_photos_by_date."""
+        return await self._run(self.metadata_service.get_photos_by_date, limit, offset)
+
+    async def get_photos_page(
+        self,
+        limit: int = 50,
+        cursor: PageCursor | None = None,
+        oldest_first: bool = False,
+        backward: bool = False,
+        offset: int = 0,
+    ) -> tuple[PhotoPage, bool]:
+        """Get a page of photos by keyset pagination. See MetadataService.get_photos_page."""
+        return await self._run(self.metadata_service.get_photos_page, limit, cursor, oldest_first, backward, offset)
+
+    async def get_photos_count(self) -> int:
+        """Get total photo count. See MetadataService.get_photos_count."""
+        return await self._run(self.metadata_service.get_photos_count)
+
+    async def check_filename_exists(self, filename: str) -> dict | None:
+        """Check for a filename collision. See MetadataService.check_filename_exists."""
+        return await self._run(self.metadata_service.check_filename_exists, filename)
+
+    async def check_multiple_filename_exists(self, filenames: list[str]) -> dict[str, dict[str, Any]]:
+        """Check many filenames for collisions in one query. See MetadataService.check_multiple_filename_exists."""
+        return await self._run(self.metadata_service.check_multiple_filename_exists, filenames)
+
+    async def search_photos_by_filename(
+        self, filename_pattern: str, limit: int = 50, offset: int = 0
+    ) -> list[PhotoMetadata]:
+        """Search photos by filename. See MetadataService.search_photos_by_filename."""
+        return await self._run(self.metadata_service.search_photos_by_filename, filename_pattern, limit, offset)
+
+    async def get_date_histogram(self, granularity: str = "month", oldest_first: bool = False) -> list[dict[str, Any]]:
+        """Get photo counts per year, month or day. See MetadataService.get_date_histogram."""
+        return await self._run(self.metadata_service.get_date_histogram, granularity, oldest_first)
+
+    async def search_photos(self, query: str, mode: str = "substring", limit: int = 50, offset: int = 0) -> PhotoPage:
+        """Search photos by filename, best matches first. See MetadataService.search_photos."""
+        return await self._run(self.metadata_service.search_photos, query, mode, limit, offset)
+
+    async def save_or_update_photo_metadata(self, photo_metadata: PhotoMetadata, is_overwrite: bool = False) -> None:
+        """Save or update photo metadata. See MetadataService.save_or_update_photo_metadata."""
+        await self._run(self.metadata_service.save_or_update_photo_metadata, photo_metadata, is_overwrite)
+
+    async def save_photos_metadata_bulk(
+        self, photos: list[PhotoMetadata], overwrites: list[bool] | None = None
+    ) -> dict[str, Any]:
+        """Save many photos' metadata in one transaction. See MetadataService.save_photos_metadata_bulk."""
+        return await self._run(self.metadata_service.save_photos_metadata_bulk, photos, overwrites)
+
+    async def delete_photo_metadata(self, photo_id: str) -> bool:
+        """Delete photo metadata. See MetadataService.delete_photo_metadata."""
+        return await self._run(self.metadata_service.delete_photo_metadata, photo_id)
+
+    async def delete_photos(self, photo_ids: list[str], max_workers: int | None = None) -> dict[str, Any]:
+        """Delete photos, their objects and rows in bulk. See MetadataService.delete_photos."""
+        return await self._run(self.metadata_service.delete_photos, photo_ids, max_workers)
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Shut down the DuckDB executor.
+
+        Args:
+            wait: Wait for calls already submitted to finish
+        """
+        self._executor.shutdown(wait=wait)
+
+
+def _release_async_metadata_service(service: AsyncMetadataService) -> None:
+    """Shut down an evicted facade's executor without waiting for its queued calls."""
+    service.close(wait=False)
+
+
+# Global async metadata service instances, keyed by the MetadataService they wrap. A metadata
+# service that is released and replaced gets a new facade; the old one is never requested again
+# and is released with the same bounds as the metadata services themselves.
+_async_metadata_services: ServiceRegistry[AsyncMetadataService] = ServiceRegistry(
+    "async_metadata_services",
+    AsyncMetadataService,
+    _release_async_metadata_service,
+    max_size=METADATA_SERVICE_CACHE_SIZE,
+    idle_ttl=METADATA_SERVICE_IDLE_SECONDS,
+)
+
+
+def get_async_metadata_service(user_id: str) -> AsyncMetadataService:
+    """
+    Get async metadata service instance for a user.
+
+    Args:
+        user_id: User identifier
+
+    Returns:
+        AsyncMetadataService: Async metadata service wrapping the user's current MetadataService
+    """
+    return _async_metadata_services.get(get_metadata_service(user_id))
+
+
+def cleanup_async_metadata_services() -> None:
+    """Shut down all async metadata service executors."""
+    _async_metadata_services.clear()
@@ -0,0 +1,317 @@
+"""Asyncio facade for Google Cloud Storage operations.
+
+The google-cloud-storage client is synchronous, so every call made from the
+Streamlit script thread blocks until GCS answers. This module exposes the hot
+StorageService operations as coroutines that are offloaded to a bounded thread
+pool, which lets a single event loop keep dozens of uploads, downloads and
+signed-URL requests in flight at the same time.
+
+Usage Examples:
+    service = get_async_storage_service()
+
+    # Sign a whole gallery page concurrently
+    urls = await service.get_signed_urls(thumbnail_paths)
+
+    # Run the async API from synchronous Streamlit code
+    urls = run_async(service.get_signed_urls(thumbnail_paths))
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from collections.abc import Awaitable, Callable, Coroutine, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, TypeVar
+
+import aiofiles
+
+from imgstream.ui.handlers.error import StorageError
+from ..logging_config import get_logger
+from .storage import StorageService, get_storage_service
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Chunk size used when streaming local files with aiofiles
+LOCAL_FILE_CHUNK_SIZE = 1024 * 1024
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Streamlit executes scripts in a worker thread without a running event loop,
+    so a fresh loop is created for the call. If a loop is already running in the
+    current thread, the coroutine is executed on a helper thread instead.
+
+    Args:
+        coro: Coroutine to execute
+
+    Returns:
+        Result of the coroutine
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result: dict[str, Any] = {}
+
+    def runner() -> None:
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:  # noqa: B036 - re-raised in the caller thread
+            result["error"] = e
+
+    thread = threading.Thread(target=runner, name="run-async")
+    thread.start()
+    thread.join()
+
+    if "error" in result:
+        raise result["error"]
+    return result["value"]  # type: ignore[no-any-return]
+
+
+class AsyncStorageService:
+    """
+    Asynchronous wrapper around StorageService.
+
+    Each coroutine delegates to the synchronous StorageService method on a
+    dedicated thread pool. The pool size bounds the number of concurrent GCS
+    requests, so batch helpers can be handed arbitrarily large inputs.
+    """
+
+    def __init__(self, storage_service: StorageService | None = None, max_concurrency: int | None = None) -> None:
+        """
+        Initialize the async storage service.
+
+        Args:
+            storage_service: Underlying StorageService (defaults to the global instance)
+            max_concurrency: Maximum concurrent GCS operations
+                             (defaults to GCS_ASYNC_MAX_CONCURRENCY environment variable or 32)
+        """
+        self.storage_service = storage_service or get_storage_service()
+        self.max_concurrency = max_concurrency or int(os.getenv("GCS_ASYNC_MAX_CONCURRENCY", "32"))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="gcs-async")
+
+        logger.info("async_storage_service_initialized", max_concurrency=self.max_concurrency)
+
+    async def _run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Execute a blocking StorageService call on the I/O thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def _gather(self, operations: Iterable[Awaitable[T]]) -> list[T | BaseException]:
+        """Run operations concurrently, returning exceptions in place of failed results."""
+        return await asyncio.gather(*operations, return_exceptions=True)
+
+    # Single operations
+
+    async def upload_original_photo(
+        self,
+        user_id: str,
+        file_data: bytes,
+        filename: str,
+        progress_callback: Callable[[int, int, str], None] | None = None,
+    ) -> dict:
+        """Upload an original photo. See StorageService.upload_original_photo."""
+        return await self._run(
+            self.storage_service.upload_original_photo, user_id, file_data, filename, progress_callback
+        )
+
+    async def upload_original_photo_from_path(
+        self, user_id: str, local_path: str | Path, filename: str | None = None
+    ) -> dict:
+        """
+        Upload an original photo read asynchronously from the local filesystem.
+
+        Args:
+            user_id: User identifier
+            local_path: Path of the local image file
+            filename: Target filename (defaults to the local file name)
+
+        Returns:
+            dict: Upload result with metadata
+
+        Raises:
+            StorageError: If reading or uploading fails
+        """
+        path = Path(local_path)
+        try:
+            async with aiofiles.open(path, "rb") as f:
+                file_data = await f.read()
+        except OSError as e:
+            raise StorageError(f"Failed to read local file '{path}': {e}") from e
+
+        return await self.upload_original_photo(user_id, file_data, filename or path.name)
+
+    async def upload_thumbnail(
+        self,
+        user_id: str,
+        thumbnail_data: bytes,
+        original_filename: str,
+        progress_callback: Callable[[int, int, str], None] | None = None,
+    ) -> dict:
+        """Upload a thumbnail. See StorageService.upload_thumbnail."""
+        return await self._run(
+            self.storage_service.upload_thumbnail, user_id, thumbnail_data, original_filename, progress_callback
+        )
+
+    async def download_file(self, gcs_path: str) -> bytes:
+        """Download an object into memory. See StorageService.download_file."""
+        return await self._run(self.storage_service.download_file, gcs_path)
+
+    async def download_to_path(self, gcs_path: str, local_path: str | Path) -> int:
+        """
+        Download an object and write it to the local filesystem without blocking the loop.
+
+        Args:
+            gcs_path: GCS object path
+            local_path: Destination file path
+
+        Returns:
+            int: Number of bytes written
+
+        Raises:
+            StorageError: If downloading or writing fails
+        """
+        file_data = await self.download_file(gcs_path)
+        path = Path(local_path)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            async with aiofiles.open(path, "wb") as f:
+                for start in range(0, len(file_data), LOCAL_FILE_CHUNK_SIZE):
+                    await f.write(file_data[start : start + LOCAL_FILE_CHUNK_SIZE])
+        except OSError as e:
+            raise StorageError(f"Failed to write '{gcs_path}' to '{path}': {e}") from e
+
+        return len(file_data)
+
+    async def get_signed_url(self, gcs_path: str, expiration: int | None = None) -> str:
+        """Generate a signed URL. See StorageService.get_signed_url."""
+        return await self._run(self.storage_service.get_signed_url, gcs_path, expiration)
+
+    async def file_exists(self, gcs_path: str) -> bool:
+        """Check object existence. See StorageService.file_exists."""
+        return await self._run(self.storage_service.file_exists, gcs_path)
+
+    async def list_user_files(self, user_id: str, prefix: str = "") -> list[str]:
+        """List a user's objects. See StorageService.list_user_files."""
+        return await self._run(self.storage_service.list_user_files, user_id, prefix)
+
+    # Batch operations
+
+    async def upload_photos(self, user_id: str, photos: list[tuple[bytes, str]]) -> list[dict]:
+        """
+        Upload multiple original photos concurrently.
+
+        Args:
+            user_id: User identifier
+            photos: List of (file_data, filename) tuples
+
+        Returns:
+            list[dict]: Per-file results in input order, each with 'success' and 'result' or 'error'
+        """
+        outcomes = await self._gather(
+            self.upload_original_photo(user_id, file_data, filename) for file_data, filename in photos
+        )
+
+        results = []
+        for (_, filename), outcome in zip(photos, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                logger.error("async_upload_failed", user_id=user_id, filename=filename, error=str(outcome))
+                results.append({"success": False, "filename": filename, "error": str(outcome)})
+            else:
+                results.append({"success": True, "filename": filename, "result": outcome})
+
+        successful = sum(1 for r in results if r["success"])
+        logger.info("async_batch_upload_completed", user_id=user_id, successful=successful, total=len(results))
+        return results
+
+    async def download_files(self, gcs_paths: list[str]) -> dict[str, bytes | None]:
+        """
+        Download multiple objects concurrently.
+
+        Args:
+            gcs_paths: GCS object paths
+
+        Returns:
+            dict: Mapping of path to file data, or None if that download failed
+        """
+        outcomes = await self._gather(self.download_file(path) for path in gcs_paths)
+
+        results: dict[str, bytes | None] = {}
+        for path, outcome in zip(gcs_paths, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                logger.warning("async_download_failed", gcs_path=path, error=str(outcome))
+                results[path] = None
+            else:
+                results[path] = outcome
+        return results
+
+    async def get_signed_urls(self, gcs_paths: list[str], expiration: int | None = None) -> dict[str, str | None]:
+        """
+        Generate signed URLs for multiple objects concurrently.
+
+        Args:
+            gcs_paths: GCS object paths
+            expiration: URL expiration time in seconds
+
+        Returns:
+            dict: Mapping of path to signed URL, or None if signing failed
+        """
+        outcomes = await self._gather(self.get_signed_url(path, expiration) for path in gcs_paths)
+
+        results: dict[str, str | None] = {}
+        for path, outcome in zip(gcs_paths, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                logger.warning("async_signed_url_failed", gcs_path=path, error=str(outcome))
+                results[path] = None
+            else:
+                results[path] = outcome
+        return results
+
+    async def files_exist(self, gcs_paths: list[str]) -> dict[str, bool | None]:
+        """
+        Check existence of multiple objects concurrently.
+
+        Args:
+            gcs_paths: GCS object paths
+
+        Returns:
+            dict: Mapping of path to existence, or None if the check failed
+        """
+        outcomes = await self._gather(self.file_exists(path) for path in gcs_paths)
+        return {
+            path: None if isinstance(outcome, BaseException) else outcome
+            for path, outcome in zip(gcs_paths, outcomes, strict=True)
+        }
+
+    def close(self) -> None:
+        """Shut down the I/O thread pool."""
+        self._executor.shutdown(wait=True)
+
+
+# Global async storage service instance
+_async_storage_service: AsyncStorageService | None = None
+_async_storage_service_lock = threading.Lock()
+
+
+def get_async_storage_service() -> AsyncStorageService:
+    """
+    Get the global async storage service instance.
+
+    Returns:
+        AsyncStorageService: Global async storage service instance
+    """
+    global _async_storage_service
+
+    if _async_storage_service is None:
+        with _async_storage_service_lock:
+            if _async_storage_service is None:
+                _async_storage_service = AsyncStorageService()
+
+    return _async_storage_service
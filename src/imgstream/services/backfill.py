@@ -0,0 +1,243 @@
+"""
+Backfill of the image detail columns of existing photos.
+
+Schema version 2 added width, height, orientation, content_hash, renditions
+and placeholder to the photos table (see models/schema.py). New uploads fill
+them in; photos uploaded before are migrated with the columns NULL, and a
+PhotoDetailsBackfill fills them in batches, reading as little of each object
+as it can: the content hash of a content-addressed original is its object
+name, image dimensions and orientation come from the first bytes of the
+original, and the placeholder is made from the thumbnail. Photos are walked in
+ID order, so a backfill can be stopped and re-run at any time.
+"""
+
+import hashlib
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from ..logging_config import get_logger, log_performance, log_user_action
+from ..models.photo import PhotoMetadata
+from .image_processor import ImageProcessor, get_image_processor
+from .metadata import MetadataService, get_metadata_service
+from .storage import StorageService, content_hash_from_path, get_storage_service, is_pack_thumbnail_path
+from .thumbnail_packs import get_thumbnail_pack_service
+
+logger = get_logger(__name__)
+
+# Backfill jobs and the detail columns each of them fills
+BACKFILL_JOBS = {
+    "content_hash": ("content_hash",),
+    "dimensions": ("width", "height", "orientation"),
+    "placeholder": ("placeholder",),
+}
+
+# Bytes of the original read to get its dimensions before downloading it whole
+HEADER_BYTES = 256 * 1024
+
+# EXIF orientation of an image without one (no rotation)
+DEFAULT_ORIENTATION = 1
+
+
+def describe_image(image_data: bytes, image_processor: ImageProcessor | None = None) -> dict[str, Any]:
+    """
+    Get the dimension detail columns of an image.
+
+    Args:
+        image_data: Image data; the start of the file is enough for most formats
+        image_processor: Image processor to use (defaults to the global instance)
+
+    Returns:
+        dict: 'width', 'height' and 'orientation'
+
+    Raises:
+        ImageProcessingError: If the image cannot be read
+    """
+    info = (image_processor or get_image_processor()).get_image_info(image_data)
+    return {
+        "width": info["width"],
+        "height": info["height"],
+        # Recorded even without EXIF orientation, so the photo is not picked up by the backfill again
+        "orientation": info["orientation"] or DEFAULT_ORIENTATION,
+    }
+
+
+def compute_image_details(
+    image_data: bytes, thumbnail_data: bytes, image_processor: ImageProcessor | None = None
+) -> dict[str, Any]:
+    """
+    Get every backfilled detail column of a photo being uploaded.
+
+    Args:
+        image_data: Original image data
+        thumbnail_data: Generated thumbnail data
+        image_processor: Image processor to use (defaults to the global instance)
+
+    Returns:
+        dict: Values by detail column
+
+    Raises:
+        ImageProcessingError: If the image cannot be read
+    """
+    image_processor = image_processor or get_image_processor()
+    return {
+        **describe_image(image_data, image_processor),
+        "content_hash": hashlib.sha256(image_data).hexdigest(),
+        "placeholder": image_processor.generate_placeholder(thumbnail_data),
+    }
+
+
+class PhotoDetailsBackfill:
+    """
+    Fill the image detail columns of a user's photos that do not have them yet.
+
+    The renditions column has no job: no photo has stored renditions besides
+    its original and thumbnail yet, so there is nothing to record. Neither has
+    thumbnail_generation (schema version 3): thumbnails uploaded before it are
+    served with URLs that are not pinned to a generation, which is still correct.
+    """
+
+    def __init__(
+        self,
+        user_id: str,
+        storage_service: StorageService | None = None,
+        metadata_service: MetadataService | None = None,
+        image_processor: ImageProcessor | None = None,
+    ):
+        """
+        Initialize the backfill for a specific user.
+
+        Args:
+            user_id: User identifier
+            storage_service: Storage service to use (defaults to the global instance)
+            metadata_service: Metadata service to use (defaults to the user's global instance)
+            image_processor: Image processor to use (defaults to the global instance)
+        """
+        self.user_id = user_id
+        self.storage_service = storage_service or get_storage_service()
+        self.metadata_service = metadata_service or get_metadata_service(user_id)
+        self.image_processor = image_processor or get_image_processor()
+
+    def _read_thumbnail(self, thumbnail_path: str) -> bytes:
+        if is_pack_thumbnail_path(thumbnail_path):
+            data = get_thumbnail_pack_service(self.user_id).read_thumbnails([thumbnail_path])[thumbnail_path]
+            if data is None:
+                raise FileNotFoundError(f"Thumbnail not found: {thumbnail_path}")
+            return data
+        return self.storage_service.download_file(thumbnail_path)
+
+    def _backfill_photo(self, photo: PhotoMetadata, columns: set[str]) -> dict[str, Any]:
+        """Compute one photo's missing detail columns and return the outcome."""
+        try:
+            missing = {column for column in columns if getattr(photo, column) is None}
+            details: dict[str, Any] = {}
+            original: bytes | None = None
+
+            if "content_hash" in missing:
+                details["content_hash"] = content_hash_from_path(photo.original_path)
+                if details["content_hash"] is None:
+                    original = self.storage_service.download_file(photo.original_path)
+                    details["content_hash"] = hashlib.sha256(original).hexdigest()
+
+            if missing & set(BACKFILL_JOBS["dimensions"]):
+                if original is None:
+                    header = self.storage_service.read_byte_range(photo.original_path, 0, HEADER_BYTES)
+                    try:
+                        dimensions = describe_image(header, self.image_processor)
+                    except Exception:
+                        # Metadata beyond the header (e.g. some HEIC files): read the whole original
+                        original = self.storage_service.download_file(photo.original_path)
+                if original is not None:
+                    dimensions = describe_image(original, self.image_processor)
+                details.update((column, value) for column, value in dimensions.items() if column in missing)
+
+            if "placeholder" in missing:
+                thumbnail = self._read_thumbnail(photo.thumbnail_path)
+                details["placeholder"] = self.image_processor.generate_placeholder(thumbnail)
+
+            return {"photo_id": photo.id, "success": True, "details": details, "error": None}
+
+        except Exception as e:
+            return {"photo_id": photo.id, "success": False, "error": str(e)}
+
+    def backfill(
+        self,
+        jobs: Iterable[str] | None = None,
+        dry_run: bool = True,
+        batch_size: int = 200,
+        max_workers: int = 8,
+    ) -> dict[str, Any]:
+        """
+        Fill the detail columns of every photo of the user that misses some of them.
+
+        Args:
+            jobs: Jobs to run (keys of BACKFILL_JOBS); None runs every job
+            dry_run: Only report the photos that would be backfilled
+            batch_size: Photos read, processed and written per batch
+            max_workers: Maximum photos processed concurrently
+
+        Returns:
+            dict: Report with counts and per-photo failures
+
+        Raises:
+            ValueError: If a job is unknown
+            MetadataError: If reading or updating the photos table fails
+        """
+        jobs = list(BACKFILL_JOBS) if jobs is None else list(jobs)
+        unknown = [job for job in jobs if job not in BACKFILL_JOBS]
+        if unknown:
+            raise ValueError(f"Unknown backfill jobs {unknown}, expected some of {', '.join(BACKFILL_JOBS)}")
+
+        start_time = time.perf_counter()
+        columns = {column for job in jobs for column in BACKFILL_JOBS[job]}
+        report: dict[str, Any] = {
+            "user_id": self.user_id,
+            "dry_run": dry_run,
+            "jobs": jobs,
+            "pending": 0,
+            "backfilled": 0,
+            "failed": [],
+        }
+
+        after_id = None
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="details-backfill") as executor:
+            while True:
+                photos = self.metadata_service.get_photos_missing_details(columns, limit=batch_size, after_id=after_id)
+                if not photos:
+                    break
+                after_id = photos.column("id")[-1]
+                report["pending"] += len(photos)
+                if dry_run:
+                    continue
+
+                outcomes = list(executor.map(lambda photo: self._backfill_photo(photo, columns), photos))
+                report["failed"].extend(
+                    {"photo_id": outcome["photo_id"], "error": outcome["error"]}
+                    for outcome in outcomes
+                    if not outcome["success"]
+                )
+                report["backfilled"] += self.metadata_service.update_photo_details_bulk(
+                    {outcome["photo_id"]: outcome["details"] for outcome in outcomes if outcome["success"]}
+                )
+                logger.info(
+                    "photo_details_backfill_batch",
+                    user_id=self.user_id,
+                    backfilled=report["backfilled"],
+                    failed=len(report["failed"]),
+                )
+
+        if dry_run:
+            return report
+
+        log_performance(
+            "photo_details_backfill",
+            time.perf_counter() - start_time,
+            user_id=self.user_id,
+            backfilled=report["backfilled"],
+            failed=len(report["failed"]),
+        )
+        log_user_action(
+            self.user_id, "photo_details_backfilled", backfilled=report["backfilled"], failed=len(report["failed"])
+        )
+        return report
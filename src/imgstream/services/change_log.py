@@ -0,0 +1,262 @@
+"""
+Row-level change log for incremental metadata sync.
+
+Instead of re-uploading a user's whole DuckDB file after every write, the rows
+that changed since the last sync are shipped to GCS as a small Parquet delta
+segment at databases/{user_id}/deltas/{generation}/{seq}.parquet, grouped by
+the GCS generation of the base snapshot it applies to. Changes are found by
+comparing each row's hash with the hash recorded when it was last shipped
+(sync_shadow), so every write path is covered without instrumenting it.
+
+A segment holds upserted rows of every synced table, tagged with _table, _op
+('upsert' or 'delete'), _key and _hash. The uploaded base snapshot records the
+sequence number it includes (sync_state.base_seq); bootstrap downloads the
+base and replays later segments in order, and compaction uploads a new base
+and deletes the segments of the old one. A segment only counts as shipped if
+its base snapshot is still current after the upload, and compaction ships
+segments of the old base it had not replayed again on the new one, so a
+segment never lands on a base that no instance reads any more.
+
+Instances on different schema versions can share a log: replay copies the
+columns both sides have, and schema migrations keep the shadow in step
+(see migrate_schema), so only real changes are shipped.
+"""
+
+import os
+from pathlib import Path
+
+from ..logging_config import get_logger
+from ..models.database import DatabaseManager
+from ..models.schema import get_sync_log_statements, get_thumbnail_pack_statements
+
+logger = get_logger(__name__)
+
+# Synced tables and their key columns
+SYNCED_TABLES = {
+    "photos": "id",
+    "thumbnail_packs": "pack_path",
+    "thumbnail_pack_entries": "entry_id",
+}
+
+# Columns added to every segment row
+SEGMENT_COLUMNS = ("_table", "_op", "_key", "_hash")
+
+# Segments shipped since the base snapshot before the log is compacted into a new base
+COMPACT_AFTER_SEGMENTS = int(os.getenv("METADATA_SYNC_COMPACT_SEGMENTS", "50"))
+
+
+def _execute(db: DatabaseManager, query: str, parameters: tuple | None = None) -> list[tuple]:
+    """Run a bookkeeping statement on the manager's connection, as its schema methods do."""
+    result = db.connect().execute(query, parameters) if parameters else db.connect().execute(query)
+    return result.fetchall()
+
+
+def ensure_change_log_tables(db: DatabaseManager) -> None:
+    """
+    Create the sync bookkeeping tables and every synced table if missing.
+
+    Args:
+        db: Database to prepare
+    """
+    for statement in get_sync_log_statements() + get_thumbnail_pack_statements():
+        _execute(db, statement)
+
+
+def read_sync_state(db: DatabaseManager) -> dict[str, int]:
+    """
+    Read the sync sequence numbers.
+
+    Args:
+        db: Database to read
+
+    Returns:
+        dict: 'base_seq' (last segment included in the uploaded base), 'last_seq'
+            (last segment shipped) and 'base_generation' (GCS generation of the snapshot
+            this database is based on); a key is missing if it is not known
+    """
+    return dict(_execute(db, "SELECT key, value FROM sync_state"))
+
+
+def write_sync_state(db: DatabaseManager, **values: int) -> None:
+    """
+    Record sync sequence numbers.
+
+    Args:
+        db: Database to update
+        **values: Sequence numbers by key ('base_seq', 'last_seq')
+    """
+    for key, value in values.items():
+        _execute(db, "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+
+
+def clear_sync_state(db: DatabaseManager, *keys: str) -> None:
+    """
+    Forget sync state values, e.g. 'base_seq' so that the next sync uploads a full snapshot.
+
+    Args:
+        db: Database to update
+        *keys: Keys to remove
+    """
+    for key in keys:
+        _execute(db, "DELETE FROM sync_state WHERE key = ?", (key,))
+
+
+def reset_shadow(db: DatabaseManager) -> None:
+    """
+    Record every current row as shipped, as done when a full snapshot is uploaded.
+
+    Args:
+        db: Database to update
+    """
+    _execute(db, "DELETE FROM sync_shadow")
+    for table, key in SYNCED_TABLES.items():
+        _execute(
+            db,
+            f"INSERT INTO sync_shadow SELECT '{table}', CAST(t.{key} AS VARCHAR), hash(t) FROM {table} t",  # nosec B608
+        )
+
+
+def migrate_schema(db: DatabaseManager) -> list[int]:
+    """
+    Upgrade the database schema, keeping shipped rows recorded as shipped.
+
+    Adding a column changes the hash of every row, which would make the next
+    sync ship whole tables as changed. Rows that matched their shadow hash
+    before the migration get their new hash recorded; rows with unshipped
+    changes stay pending.
+
+    Args:
+        db: Database to migrate
+
+    Returns:
+        list: Schema versions migrated to (see DatabaseManager.upgrade_schema)
+    """
+    if not db.pending_migrations():
+        return []
+
+    ensure_change_log_tables(db)
+    shipped = []
+    for table, key in SYNCED_TABLES.items():
+        query = f"""SELECT s.table_name, s.row_key FROM sync_shadow s
+                    JOIN {table} t ON s.table_name = '{table}' AND s.row_key = CAST(t.{key} AS VARCHAR)
+                    WHERE s.row_hash = hash(t)"""  # nosec B608
+        shipped.append(query)
+    _execute(db, f"CREATE OR REPLACE TEMP TABLE migration_shipped AS {' UNION ALL '.join(shipped)}")
+    try:
+        applied = db.upgrade_schema()
+        with db.transaction():
+            _execute(
+                db,
+                """DELETE FROM sync_shadow USING migration_shipped m
+                   WHERE sync_shadow.table_name = m.table_name AND sync_shadow.row_key = m.row_key""",
+            )
+            for table, key in SYNCED_TABLES.items():
+                _execute(
+                    db,
+                    f"""INSERT INTO sync_shadow SELECT '{table}', CAST(t.{key} AS VARCHAR), hash(t) FROM {table} t
+                        WHERE CAST(t.{key} AS VARCHAR) IN
+                              (SELECT row_key FROM migration_shipped WHERE table_name = '{table}')""",  # nosec B608
+                )
+    finally:
+        _execute(db, "DROP TABLE IF EXISTS migration_shipped")
+
+    logger.info("change_log_schema_migrated", versions=applied)
+    return applied
+
+
+def capture_changes(db: DatabaseManager, segment_path: Path) -> int:
+    """
+    Write the rows changed since the last shipped segment to a Parquet file.
+
+    Args:
+        db: Database to compare with its shadow
+        segment_path: File to write; removed again if nothing changed
+
+    Returns:
+        int: Number of changed rows in the segment
+    """
+    parts = []
+    for table, key in SYNCED_TABLES.items():
+        parts.append(
+            f"""SELECT '{table}' AS _table, 'upsert' AS _op, CAST(t.{key} AS VARCHAR) AS _key, hash(t) AS _hash, t.*
+                FROM {table} t
+                LEFT JOIN sync_shadow s ON s.table_name = '{table}' AND s.row_key = CAST(t.{key} AS VARCHAR)
+                WHERE s.row_hash IS DISTINCT FROM hash(t)"""  # nosec B608
+        )
+        parts.append(f"""SELECT '{table}' AS _table, 'delete' AS _op, s.row_key AS _key
+                FROM sync_shadow s
+                WHERE s.table_name = '{table}'
+                  AND s.row_key NOT IN (SELECT CAST({key} AS VARCHAR) FROM {table})""")  # nosec B608
+
+    with db.transaction():
+        # COPY takes no parameter for its target, so the path is quoted as a SQL literal
+        target = str(segment_path).replace("'", "''")
+        _execute(db, f"COPY ({' UNION ALL BY NAME '.join(parts)}) TO '{target}' (FORMAT PARQUET)")
+        count: int = _execute(db, "SELECT COUNT(*) FROM read_parquet(?)", (str(segment_path),))[0][0]
+
+    if not count:
+        segment_path.unlink(missing_ok=True)
+    return count
+
+
+def apply_segment(db: DatabaseManager, segment_path: Path, replay: bool, shipped: bool = True) -> None:
+    """
+    Apply a segment: replay its changes to the tables and/or record them as shipped.
+
+    Args:
+        db: Database to update (inside the caller's transaction)
+        segment_path: Parquet segment file
+        replay: Apply the row changes (bootstrap); False only records them in the shadow
+            (the segment was captured from this database)
+        shipped: Record the changes as shipped; False keeps them pending, so that local
+            changes carried over to a newer snapshot are shipped by the next sync
+    """
+    # Each statement reads the segment once, through the path parameter
+    segment = "read_parquet(?)"
+    path = (str(segment_path),)
+    segment_columns = {row[0] for row in _execute(db, f"DESCRIBE SELECT * FROM {segment}", path)}
+
+    if replay:
+        for table, key in SYNCED_TABLES.items():
+            table_columns = [row[1] for row in _execute(db, f"PRAGMA table_info('{table}')")]
+            # Segments written before a column existed simply leave it NULL
+            columns = ", ".join(column for column in table_columns if column in segment_columns)
+            _execute(
+                db,
+                f"DELETE FROM {table} WHERE CAST({key} AS VARCHAR) IN "  # nosec B608
+                f"(SELECT _key FROM {segment} WHERE _table = '{table}')",
+                path,
+            )
+            if columns:
+                _execute(
+                    db,
+                    f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {segment} "  # nosec B608
+                    f"WHERE _table = '{table}' AND _op = 'upsert'",
+                    path,
+                )
+
+    if shipped:
+        _execute(
+            db,
+            f"""DELETE FROM sync_shadow USING (SELECT _table, _key FROM {segment}) c
+                WHERE sync_shadow.table_name = c._table AND sync_shadow.row_key = c._key""",  # nosec B608
+            path,
+        )
+        if not replay:
+            _execute(
+                db,
+                f"INSERT INTO sync_shadow SELECT _table, _key, _hash FROM {segment} WHERE _op = 'upsert'",  # nosec B608
+                path,
+            )
+        else:
+            # Record the hash of the row as replayed here: a segment from an instance with another
+            # schema version hashes a different set of columns, and must not look changed locally
+            for table, key in SYNCED_TABLES.items():
+                _execute(
+                    db,
+                    f"""INSERT INTO sync_shadow SELECT '{table}', CAST(t.{key} AS VARCHAR), hash(t) FROM {table} t
+                        WHERE CAST(t.{key} AS VARCHAR) IN
+                              (SELECT _key FROM {segment} WHERE _table = '{table}' AND _op = 'upsert')""",  # nosec B608
+                    path,
+                )
+    logger.debug("change_log_segment_applied", segment=str(segment_path), replay=replay, shipped=shipped)
@@ -0,0 +1,165 @@
+"""
+Disk quota for the local metadata database cache.
+
+Every user's DuckDB file lives in the cache directory (/tmp by default). On
+Cloud Run /tmp is an in-memory filesystem, so each cached database counts
+against the instance's memory limit. A DatabaseCache accounts for the database
+files in its directory (the .db file and its write-ahead log) and, when they
+exceed the byte quota, evicts the least recently used databases until they
+fit again.
+
+The cache only decides what to evict; the caller's evict function does it,
+because only the metadata layer knows whether a database is open or still has
+writes that are not in GCS. Databases the evict function refuses to remove
+are skipped, so an unsynced database is never lost to the quota.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+from ..logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Database files in the cache directory, and the files that belong to each of them
+DATABASE_PATTERN = "metadata_*.db"
+DATABASE_SIDE_FILES = (".wal",)
+
+
+class DatabaseCache:
+    """Byte quota with LRU eviction for the local database files in a directory."""
+
+    def __init__(self, directory: str | Path, quota_bytes: int):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Directory holding the database files
+            quota_bytes: Maximum total size of the database files; 0 or less disables the quota
+        """
+        self.directory = Path(directory)
+        self.quota_bytes = quota_bytes
+        self._lock = threading.Lock()
+        # Database path -> time it was last used in this process
+        self._last_used: dict[Path, float] = {}
+        self._evictions = 0
+        self._evicted_bytes = 0
+
+    def touch(self, db_path: str | Path) -> None:
+        """
+        Record that a database is being used.
+
+        Args:
+            db_path: Database file path
+        """
+        with self._lock:
+            self._last_used[Path(db_path)] = time.time()
+
+    def forget(self, db_path: str | Path) -> None:
+        """
+        Stop tracking a database, e.g. after its file was deleted.
+
+        Args:
+            db_path: Database file path
+        """
+        with self._lock:
+            self._last_used.pop(Path(db_path), None)
+
+    def database_sizes(self) -> dict[Path, int]:
+        """
+        Measure the database files in the cache directory.
+
+        Returns:
+            dict: Bytes used by each database, including its side files
+        """
+        sizes: dict[Path, int] = {}
+        for db_path in self.directory.glob(DATABASE_PATTERN):
+            size = 0
+            for path in (db_path, *(db_path.with_name(db_path.name + suffix) for suffix in DATABASE_SIDE_FILES)):
+                try:
+                    size += path.stat().st_size
+                except FileNotFoundError:
+                    continue
+            sizes[db_path] = size
+        return sizes
+
+    def usage(self) -> dict[str, Any]:
+        """
+        Report the cache directory's usage.
+
+        Returns:
+            dict: 'directory', 'quota_bytes', 'used_bytes', 'databases', 'over_quota',
+                and the 'evictions' and 'evicted_bytes' counters
+        """
+        sizes = self.database_sizes()
+        used = sum(sizes.values())
+        with self._lock:
+            return {
+                "directory": str(self.directory),
+                "quota_bytes": self.quota_bytes,
+                "used_bytes": used,
+                "databases": len(sizes),
+                "over_quota": 0 < self.quota_bytes < used,
+                "evictions": self._evictions,
+                "evicted_bytes": self._evicted_bytes,
+            }
+
+    def enforce(self, evict: Callable[[Path], bool], protect: Iterable[str | Path] = ()) -> int:
+        """
+        Evict the least recently used databases until the cache fits its quota.
+
+        Args:
+            evict: Removes a database file; returns False if it must be kept
+            protect: Databases that are never evicted, e.g. the one being opened
+
+        Returns:
+            int: Number of evicted databases
+        """
+        if self.quota_bytes <= 0:
+            return 0
+
+        sizes = self.database_sizes()
+        used = sum(sizes.values())
+        if used <= self.quota_bytes:
+            return 0
+
+        protected = {Path(path) for path in protect}
+        with self._lock:
+            # Databases not used by this process count as oldest, by modification time
+            last_used = {
+                path: self._last_used.get(path, self._modified_at(path)) for path in sizes if path not in protected
+            }
+
+        evicted = 0
+        for path in sorted(last_used, key=last_used.__getitem__):
+            if used <= self.quota_bytes:
+                break
+            try:
+                removed = evict(path)
+            except Exception as e:
+                logger.warning("database_cache_eviction_failed", path=str(path), error=str(e))
+                continue
+            if not removed:
+                continue
+
+            used -= sizes[path]
+            evicted += 1
+            with self._lock:
+                self._last_used.pop(path, None)
+                self._evictions += 1
+                self._evicted_bytes += sizes[path]
+            logger.info("database_cache_evicted", path=str(path), freed_bytes=sizes[path], used_bytes=used)
+
+        if used > self.quota_bytes:
+            logger.warning("database_cache_over_quota", used_bytes=used, quota_bytes=self.quota_bytes)
+        return evicted
+
+    @staticmethod
+    def _modified_at(path: Path) -> float:
+        try:
+            return path.stat().st_mtime
+        except FileNotFoundError:
+            return 0.0
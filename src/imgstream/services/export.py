@@ -0,0 +1,292 @@
+"""
+Streaming ZIP export of original photos.
+
+Originals are fetched from GCS as parallel ranged chunks (see
+StorageService.iter_object_chunks) and fed straight into a ZIP writer whose
+output is emitted in small pieces. Neither the archive nor any whole photo is
+held in memory or written to local disk, so exports of many gigabytes fit in a
+Cloud Run instance's memory limit. The archive can be streamed to a local file
+or uploaded to GCS with a resumable upload and handed out as a signed URL.
+"""
+
+import time
+import uuid
+import zipfile
+from collections.abc import Callable, Iterator, Sequence
+from datetime import datetime
+from pathlib import PurePosixPath
+from typing import IO, Any, BinaryIO
+
+from ..logging_config import get_logger, log_performance, log_user_action
+from ..models.photo import PhotoMetadata
+from .metadata import MetadataService, get_metadata_service
+from .storage import StorageService, get_storage_service
+
+logger = get_logger(__name__)
+
+# Lifetime of the signed download URL of an exported archive (seconds)
+EXPORT_URL_EXPIRATION = 6 * 3600
+
+# Photos are already compressed; storing them avoids burning CPU for no gain
+EXPORT_COMPRESSION = zipfile.ZIP_STORED
+
+ExportProgressCallback = Callable[[dict[str, Any]], None]
+
+
+class _ChunkSink:
+    """Write-only, non-seekable file object that collects ZipFile output for draining."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+            self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _archive_name(photo: PhotoMetadata, used_names: set[str]) -> str:
+    """Build a unique archive member name, grouping photos into year folders."""
+    taken_at = photo.created_at or photo.uploaded_at
+    folder = str(taken_at.year) if taken_at else "unknown"
+    candidate = f"{folder}/{photo.filename}"
+    stem, suffix = PurePosixPath(photo.filename).stem, PurePosixPath(photo.filename).suffix
+
+    counter = 1
+    while candidate.lower() in used_names:
+        candidate = f"{folder}/{stem} ({counter}){suffix}"
+        counter += 1
+
+    used_names.add(candidate.lower())
+    return candidate
+
+
+def _zip_info(name: str, photo: PhotoMetadata) -> zipfile.ZipInfo:
+    """Create the ZIP member header, keeping the photo's creation time as the file time."""
+    taken_at = photo.created_at or photo.uploaded_at or datetime.now()
+    # ZIP timestamps cannot predate 1980
+    date_time = (
+        max(taken_at.year, 1980),
+        taken_at.month,
+        taken_at.day,
+        taken_at.hour,
+        taken_at.minute,
+        taken_at.second,
+    )
+    info = zipfile.ZipInfo(name, date_time=date_time)
+    info.compress_type = EXPORT_COMPRESSION
+    info.file_size = photo.file_size or 0
+    return info
+
+
+class PhotoExportService:
+    """Build ZIP archives of a user's original photos without buffering them."""
+
+    def __init__(
+        self,
+        user_id: str,
+        storage_service: StorageService | None = None,
+        metadata_service: MetadataService | None = None,
+    ):
+        """
+        Initialize the export service for a specific user.
+
+        Args:
+            user_id: User identifier
+            storage_service: Storage service to use (defaults to the global instance)
+            metadata_service: Metadata service to use (defaults to the user's global instance)
+        """
+        self.user_id = user_id
+        self.storage_service = storage_service or get_storage_service()
+        self.metadata_service = metadata_service or get_metadata_service(user_id)
+
+    def select_photos(self, photo_ids: list[str] | None = None, year: int | None = None) -> Sequence[PhotoMetadata]:
+        """
+        Resolve the photos to export.
+
+        Args:
+            photo_ids: Explicit photo IDs (takes precedence over year)
+            year: Export every photo created in this year; None with no IDs exports everything
+
+        Returns:
+            Sequence[PhotoMetadata]: Photos in archive order
+        """
+        if photo_ids:
+            found = self.metadata_service.get_photos_by_ids(photo_ids)
+            return [found[photo_id] for photo_id in dict.fromkeys(photo_ids) if photo_id in found]
+
+        if year is not None:
+            return self.metadata_service.get_photos_created_between(datetime(year, 1, 1), datetime(year + 1, 1, 1))
+        return self.metadata_service.get_photos_created_between()
+
+    def iter_zip(
+        self,
+        photos: Sequence[PhotoMetadata],
+        progress_callback: ExportProgressCallback | None = None,
+        max_workers: int | None = None,
+    ) -> Iterator[bytes]:
+        """
+        Generate a ZIP archive of the photos' originals piece by piece.
+
+        Args:
+            photos: Photos to include
+            progress_callback: Called after every downloaded chunk with a progress dict
+                ('files_done', 'total_files', 'bytes_done', 'total_bytes', 'current_file')
+            max_workers: Concurrent chunk downloads (defaults to GCS_DOWNLOAD_MAX_WORKERS)
+
+        Yields:
+            bytes: Consecutive pieces of the archive
+
+        Raises:
+            StorageError: If an original cannot be downloaded
+        """
+        progress: dict[str, Any] = {
+            "files_done": 0,
+            "total_files": len(photos),
+            "bytes_done": 0,
+            "total_bytes": sum(photo.file_size or 0 for photo in photos),
+            "current_file": None,
+        }
+        sink = _ChunkSink()
+        used_names: set[str] = set()
+        entry: IO[bytes] | None = None
+        current_index = -1
+
+        chunks = self.storage_service.iter_object_chunks(
+            [(photo.original_path, photo.file_size or 0) for photo in photos], max_workers=max_workers
+        )
+
+        with zipfile.ZipFile(sink, mode="w", compression=EXPORT_COMPRESSION, allowZip64=True) as archive:
+            for index, data in chunks:
+                if entry is None or index != current_index:
+                    if entry is not None:
+                        entry.close()
+                        progress["files_done"] += 1
+                    current_index = index
+                    photo = photos[index]
+                    # file_size in the header lets zipfile decide whether the member needs ZIP64
+                    entry = archive.open(_zip_info(_archive_name(photo, used_names), photo), mode="w")
+                    progress["current_file"] = photo.filename
+
+                entry.write(data)
+                progress["bytes_done"] += len(data)
+                if progress_callback:
+                    progress_callback(dict(progress))
+
+                piece = sink.drain()
+                if piece:
+                    yield piece
+
+            if entry is not None:
+                entry.close()
+                progress["files_done"] += 1
+
+        progress["current_file"] = None
+        if progress_callback:
+            progress_callback(dict(progress))
+        yield sink.drain()
+
+    def export_to_file(
+        self,
+        photos: Sequence[PhotoMetadata],
+        output: BinaryIO,
+        progress_callback: ExportProgressCallback | None = None,
+        max_workers: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Stream a ZIP archive of the photos into a writable file object.
+
+        Args:
+            photos: Photos to include
+            output: Destination file object (need not be seekable)
+            progress_callback: See iter_zip
+            max_workers: Concurrent chunk downloads
+
+        Returns:
+            dict: Summary with 'files', 'photo_bytes', 'archive_bytes' and 'duration_seconds'
+
+        Raises:
+            StorageError: If an original cannot be downloaded or written
+        """
+        start_time = time.perf_counter()
+        archive_bytes = 0
+        for piece in self.iter_zip(photos, progress_callback, max_workers):
+            output.write(piece)
+            archive_bytes += len(piece)
+
+        duration = time.perf_counter() - start_time
+        summary = {
+            "files": len(photos),
+            "photo_bytes": sum(photo.file_size or 0 for photo in photos),
+            "archive_bytes": archive_bytes,
+            "duration_seconds": round(duration, 3),
+        }
+        log_performance(
+            "photo_export",
+            duration,
+            user_id=self.user_id,
+            files=summary["files"],
+            archive_bytes=archive_bytes,
+        )
+        return summary
+
+    def export_to_gcs(
+        self,
+        photos: Sequence[PhotoMetadata],
+        progress_callback: ExportProgressCallback | None = None,
+        max_workers: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Stream a ZIP archive of the photos into the photos bucket and sign a download URL.
+
+        Archives are written to photos/{user_id}/exports/, outside the prefixes
+        that orphan reconciliation scans; a bucket lifecycle rule should expire them.
+
+        Args:
+            photos: Photos to include
+            progress_callback: See iter_zip
+            max_workers: Concurrent chunk downloads
+
+        Returns:
+            dict: export_to_file summary plus 'gcs_path', 'filename' and 'download_url'
+
+        Raises:
+            StorageError: If downloading, uploading or signing fails
+        """
+        filename = f"imgstream_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        gcs_path = f"photos/{self.user_id}/exports/{uuid.uuid4().hex}/{filename}"
+
+        writer = self.storage_service.open_export_writer(gcs_path, "application/zip", filename)
+        try:
+            summary = self.export_to_file(photos, writer, progress_callback, max_workers)
+        except BaseException:
+            # Without close() the resumable upload is never finalized and no object is created
+            logger.warning("photo_export_aborted", user_id=self.user_id, gcs_path=gcs_path)
+            raise
+        writer.close()
+
+        summary.update(
+            {
+                "gcs_path": gcs_path,
+                "filename": filename,
+                "download_url": self.storage_service.get_signed_url(gcs_path, expiration=EXPORT_URL_EXPIRATION),
+            }
+        )
+        log_user_action(self.user_id, "photos_exported", files=summary["files"], archive_bytes=summary["archive_bytes"])
+        return summary
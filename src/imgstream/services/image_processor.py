@@ -1,5 +1,6 @@
 """Image processing service for imgstream application."""
 
+import base64
 import io
 import os
 from datetime import datetime
@@ -49,6 +50,10 @@ class ImageProcessor:
         self.DEFAULT_THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_MAX_SIZE", 300))  # Default: 300px
         self.DEFAULT_THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", 85))  # Default: 85
 
+        # Placeholder settings - tiny inline previews shown while thumbnails load
+        self.PLACEHOLDER_SIZE = int(os.getenv("PLACEHOLDER_MAX_SIZE", 16))  # Default: 16px
+        self.PLACEHOLDER_QUALITY = 40
+
         if not HEIF_AVAILABLE:
             logger.warning(
                 "heif_support_unavailable",
@@ -236,13 +241,16 @@ class ImageProcessor:
         start_time = datetime.now()
         try:
             with Image.open(io.BytesIO(image_data)) as image:
+                exif = image.getexif()
                 info = {
                     "format": image.format,
                     "mode": image.mode,
                     "size": image.size,
                     "width": image.width,
                     "height": image.height,
-                    "has_exif": bool(image.getexif()),
+                    "has_exif": bool(exif),
+                    # EXIF orientation (1-8) the display rotation is derived from, None if absent
+                    "orientation": exif.get(ExifTags.Base.Orientation),
                 }
 
                 duration = (datetime.now() - start_time).total_seconds()
@@ -514,6 +522,50 @@ class ImageProcessor:
                 original_exception=e,
             ) from e
 
+    def generate_placeholder(self, image_data: bytes, max_size: int | None = None) -> str:
+        """
+        Generate a tiny inline preview to show while the thumbnail loads.
+
+        Args:
+            image_data: Raw image data as bytes (the thumbnail is enough)
+            max_size: Maximum width and height in pixels
+
+        Returns:
+            str: data: URI of a small JPEG, a few hundred bytes
+
+        Raises:
+            ImageProcessingError: If placeholder generation fails
+        """
+        if max_size is None:
+            max_size = self.PLACEHOLDER_SIZE
+
+        try:
+            with Image.open(io.BytesIO(image_data)) as source:
+                # Apply EXIF orientation to correct rotation
+                image: Image.Image = ImageOps.exif_transpose(source)
+                if image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+
+                image.thumbnail((max_size, max_size), Image.Resampling.BILINEAR)
+                buffer = io.BytesIO()
+                image.save(buffer, format="JPEG", quality=self.PLACEHOLDER_QUALITY, optimize=True)
+
+            return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+        except Exception as e:
+            log_error(e, {"operation": "generate_placeholder", "file_size": len(image_data)})
+            raise ImageProcessingError(
+                f"Failed to generate placeholder: {e}",
+                code="placeholder_generation_failed",
+                user_message="プレースホルダー画像の生成に失敗しました。",
+                details={
+                    "file_size": len(image_data),
+                    "max_size": max_size,
+                    "operation": "generate_placeholder",
+                },
+                original_exception=e,
+            ) from e
+
     def _calculate_thumbnail_size(self, original_size: tuple[int, int], max_size: tuple[int, int]) -> tuple[int, int]:
         """
         Calculate thumbnail size while preserving aspect ratio.
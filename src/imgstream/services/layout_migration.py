@@ -0,0 +1,156 @@
+"""
+Migration of existing photo libraries to the content-addressed object layout.
+
+Photos uploaded with the filename layout live at photos/{user}/original/{filename}
+and photos/{user}/thumbs/{stem}_thumb.jpg. This module copies each of those
+objects to its SHA-256 keyed location, repoints the photos rows in one
+transaction, and optionally removes the old objects once the updated database
+has been uploaded to GCS.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from ..logging_config import get_logger, log_performance, log_user_action
+from .metadata import MetadataService, get_metadata_service
+from .storage import StorageService, get_storage_service, is_content_addressed_path, is_pack_thumbnail_path
+
+logger = get_logger(__name__)
+
+
+def _is_migrated_thumbnail(thumbnail_path: str) -> bool:
+    """Packed thumbnails are not copied; they already live in immutable pack objects."""
+    return is_content_addressed_path(thumbnail_path) or is_pack_thumbnail_path(thumbnail_path)
+
+
+class ObjectLayoutMigrator:
+    """
+    Move a user's photos from filename-based keys to content-addressed keys.
+
+    The migration is idempotent: photos whose paths are already content-addressed
+    are skipped, and copying to an existing content address is a no-op.
+    """
+
+    def __init__(
+        self,
+        user_id: str,
+        storage_service: StorageService | None = None,
+        metadata_service: MetadataService | None = None,
+    ):
+        """
+        Initialize the migrator for a specific user.
+
+        Args:
+            user_id: User identifier
+            storage_service: Storage service to use (defaults to the global instance)
+            metadata_service: Metadata service to use (defaults to the user's global instance)
+        """
+        self.user_id = user_id
+        self.storage_service = storage_service or get_storage_service()
+        self.metadata_service = metadata_service or get_metadata_service(user_id)
+
+    def _migrate_photo(self, photo_id: str, original_path: str, thumbnail_path: str) -> dict[str, Any]:
+        """Copy one photo's objects to content addresses and return the outcome."""
+        try:
+            new_original = original_path
+            new_thumbnail = thumbnail_path
+            deduplicated = 0
+
+            if not is_content_addressed_path(original_path):
+                copied = self.storage_service.copy_to_content_address(self.user_id, original_path, "original")
+                new_original = copied["gcs_path"]
+                deduplicated += int(copied["deduplicated"])
+
+            if not _is_migrated_thumbnail(thumbnail_path):
+                copied = self.storage_service.copy_to_content_address(self.user_id, thumbnail_path, "thumbs")
+                new_thumbnail = copied["gcs_path"]
+                deduplicated += int(copied["deduplicated"])
+
+            return {
+                "photo_id": photo_id,
+                "success": True,
+                "original_path": new_original,
+                "thumbnail_path": new_thumbnail,
+                "old_paths": [p for p, n in ((original_path, new_original), (thumbnail_path, new_thumbnail)) if p != n],
+                "deduplicated": deduplicated,
+                "error": None,
+            }
+
+        except Exception as e:
+            return {"photo_id": photo_id, "success": False, "error": str(e)}
+
+    def migrate(self, dry_run: bool = True, delete_old: bool = False, max_workers: int = 8) -> dict[str, Any]:
+        """
+        Migrate every filename-layout photo of the user to content-addressed keys.
+
+        Args:
+            dry_run: Only report the photos that would be migrated
+            delete_old: Delete the old objects after the updated database is uploaded
+            max_workers: Maximum photos copied concurrently
+
+        Returns:
+            dict: Report with counts, per-photo failures and deletion results
+
+        Raises:
+            MetadataError: If reading or updating the photos table fails
+        """
+        start_time = time.perf_counter()
+        photo_paths = self.metadata_service.get_photo_paths()
+        pending = [
+            (photo_id, original, thumbnail)
+            for photo_id, original, thumbnail in photo_paths
+            if not (is_content_addressed_path(original) and _is_migrated_thumbnail(thumbnail))
+        ]
+
+        report: dict[str, Any] = {
+            "user_id": self.user_id,
+            "dry_run": dry_run,
+            "total_photos": len(photo_paths),
+            "already_migrated": len(photo_paths) - len(pending),
+            "pending": len(pending),
+            "migrated": 0,
+            "deduplicated_objects": 0,
+            "failed": [],
+            "deleted_old_objects": 0,
+        }
+        if dry_run or not pending:
+            return report
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="layout-migration") as executor:
+            outcomes = list(executor.map(lambda args: self._migrate_photo(*args), pending))
+
+        succeeded = [outcome for outcome in outcomes if outcome["success"]]
+        report["failed"] = [
+            {"photo_id": outcome["photo_id"], "error": outcome["error"]}
+            for outcome in outcomes
+            if not outcome["success"]
+        ]
+        report["deduplicated_objects"] = sum(outcome["deduplicated"] for outcome in succeeded)
+        report["migrated"] = self.metadata_service.update_photo_paths_bulk(
+            [(outcome["photo_id"], outcome["original_path"], outcome["thumbnail_path"]) for outcome in succeeded]
+        )
+
+        if delete_old and succeeded:
+            # Old objects may only go once GCS holds a database that no longer references them
+            self.metadata_service.wait_for_sync_completion()
+            self.metadata_service.upload_to_gcs(force=True)
+
+            old_paths = [path for outcome in succeeded for path in outcome["old_paths"]]
+            # Thumbnails of photo.jpg and photo.heic share a key; keep it while any row still uses it
+            still_referenced = self.metadata_service.get_referenced_paths(old_paths)
+            old_paths = [path for path in old_paths if path not in still_referenced]
+            results = self.storage_service.delete_files(old_paths)
+            report["deleted_old_objects"] = sum(1 for result in results.values() if result["status"] == "deleted")
+
+        log_performance(
+            "object_layout_migration",
+            time.perf_counter() - start_time,
+            user_id=self.user_id,
+            migrated=report["migrated"],
+            failed=len(report["failed"]),
+        )
+        log_user_action(
+            self.user_id, "object_layout_migrated", migrated=report["migrated"], failed=len(report["failed"])
+        )
+        return report
@@ -26,6 +26,7 @@ The service provides multiple methods for detecting filename collisions:
 
 Database Operations:
 - save_or_update_photo_metadata(): Save new or update existing metadata
+- delete_photos(): Bulk delete photos (objects and rows) with one transaction and one sync
 - force_reload_from_gcs(): Reset local database from GCS backup
 - validate_database_integrity(): Check and repair database consistency
 
@@ -51,10 +52,14 @@ Usage Examples:
     result = service.save_or_update_photo_metadata(photo_metadata, is_overwrite=True)
 """
 
+import atexit
+import os
 import threading
 import time
+from collections.abc import Iterable, Iterator
 from concurrent.futures import ThreadPoolExecutor
-from datetime import UTC, datetime
+from contextlib import contextmanager
+from datetime import UTC, date, datetime, timedelta
 from pathlib import Path
 from typing import Any
 
@@ -62,12 +67,78 @@ from google.cloud.exceptions import NotFound
 
 from imgstream.ui.handlers.error import DatabaseError, StorageError
 from ..logging_config import get_logger, log_error, log_performance, log_user_action
-from ..models.database import DatabaseManager, create_database, get_database_manager
-from ..models.photo import PhotoMetadata
-from .storage import get_storage_service
+from ..models.database import DatabaseManager, SharedDatabaseManager, create_database, get_database_manager
+from ..models.photo import PHOTO_COLUMNS, PhotoMetadata, PhotoPage
+from ..models.schema import PHOTO_DETAIL_COLUMNS, get_thumbnail_pack_statements
+from . import change_log, search_index
+from .db_cache import DatabaseCache
+from .service_registry import ServiceRegistry
+from .single_flight import SingleFlight
+from .sync_scheduler import SyncScheduler
+from .storage import GenerationConflictError, get_storage_service, is_pack_thumbnail_path
 
 logger = get_logger(__name__)
 
+# Concurrent first accesses to the same local database share one download/creation
+_database_bootstrap = SingleFlight("database_bootstrap")
+
+# How often a local database is compared with the GCS snapshot generation it was based on
+DATABASE_REVALIDATE_SECONDS = float(os.getenv("METADATA_DB_REVALIDATE_SECONDS", "30"))
+
+# Attempts to ship a delta segment when other instances keep taking its sequence number
+DELTA_UPLOAD_ATTEMPTS = 3
+
+# Attempts to rebase onto the current snapshot when other instances keep replacing it
+REBASE_ATTEMPTS = 3
+
+# Directory of the local database files, and the most bytes they may use (0 disables the quota)
+METADATA_CACHE_DIR = os.getenv("METADATA_CACHE_DIR", "/tmp")  # nosec B108
+METADATA_CACHE_QUOTA_MB = int(os.getenv("METADATA_CACHE_QUOTA_MB", "512"))
+
+_database_cache = DatabaseCache(METADATA_CACHE_DIR, METADATA_CACHE_QUOTA_MB * 1024 * 1024)
+
+_database_checked_at: dict[str, float] = {}
+_database_checked_lock = threading.Lock()
+
+
+def _revalidation_due(db_path: str) -> bool:
+    """Check whether a local database should be compared with GCS again, noting the check if so."""
+    now = time.monotonic()
+    with _database_checked_lock:
+        checked_at = _database_checked_at.get(db_path)
+        if checked_at is not None and now - checked_at < DATABASE_REVALIDATE_SECONDS:
+            return False
+        _database_checked_at[db_path] = now
+        return True
+
+
+def _mark_database_checked(db_path: str, forget: bool = False) -> None:
+    """Record that a local database matches GCS as of now, or forget it (forget=True)."""
+    with _database_checked_lock:
+        if forget:
+            _database_checked_at.pop(db_path, None)
+        else:
+            _database_checked_at[db_path] = time.monotonic()
+
+
+# Keyset pagination position: (sort timestamp in ISO format, photo ID)
+PageCursor = tuple[str, str]
+
+# Bucket sizes of the date histogram
+DATE_GRANULARITIES = ("year", "month", "day")
+
+# Select list of the columns a PhotoMetadata is built from
+_PHOTO_SELECT = ", ".join(PHOTO_COLUMNS)
+
+# Assignments of the image detail columns, for statements that write a whole photo
+_DETAILS_SET = ", ".join(f"{column} = ?" for column in PHOTO_DETAIL_COLUMNS)
+
+
+def _detail_values(photo: PhotoMetadata) -> tuple:
+    """Get a photo's image detail values, in PHOTO_DETAIL_COLUMNS order."""
+    return tuple(getattr(photo, column) for column in PHOTO_DETAIL_COLUMNS)
+
+
 # Global thread pool for async operations
 _sync_executor: ThreadPoolExecutor | None = None
 _sync_executor_lock = threading.Lock()
@@ -99,6 +170,8 @@ def shutdown_sync_executor() -> None:
     This should be called during application shutdown to ensure
     all background tasks complete properly and resources are cleaned up.
     """
+    shutdown_sync_scheduler()
+
     global _sync_executor
     if _sync_executor is not None:
         with _sync_executor_lock:
@@ -107,6 +180,48 @@ def shutdown_sync_executor() -> None:
                 _sync_executor = None
 
 
+# Debounce of background syncs: quiet period after the last write, and the longest a write may wait
+SYNC_QUIET_SECONDS = float(os.getenv("METADATA_SYNC_QUIET_SECONDS", "2"))
+SYNC_MAX_STALENESS_SECONDS = float(os.getenv("METADATA_SYNC_MAX_STALENESS_SECONDS", "30"))
+
+_sync_scheduler: SyncScheduler | None = None
+_sync_scheduler_lock = threading.Lock()
+
+
+def get_sync_scheduler() -> SyncScheduler:
+    """
+    Get or create the global scheduler that debounces database syncs.
+
+    Syncs run on the global sync executor. Every dirty database is synced
+    when the process exits.
+
+    Returns:
+        SyncScheduler instance shared by all metadata services
+    """
+    global _sync_scheduler
+    if _sync_scheduler is None:
+        with _sync_scheduler_lock:
+            if _sync_scheduler is None:
+                _sync_scheduler = SyncScheduler(get_sync_executor, SYNC_QUIET_SECONDS, SYNC_MAX_STALENESS_SECONDS)
+                atexit.register(_sync_scheduler.shutdown)
+    return _sync_scheduler
+
+
+def shutdown_sync_scheduler() -> None:
+    """
+    Sync every dirty database and stop the sync scheduler.
+
+    This should be called during application shutdown, before the sync
+    executor is shut down.
+    """
+    global _sync_scheduler
+    with _sync_scheduler_lock:
+        scheduler, _sync_scheduler = _sync_scheduler, None
+    if scheduler is not None:
+        atexit.unregister(scheduler.shutdown)
+        scheduler.shutdown()
+
+
 # Keep backward compatibility alias
 MetadataError = DatabaseError
 
@@ -135,19 +250,19 @@ class MetadataService:
         Internal database operations use appropriate locking mechanisms.
     """
 
-    def __init__(self, user_id: str, temp_dir: str = "/tmp"):  # nosec B108
+    def __init__(self, user_id: str, temp_dir: str | None = None):
         """
         Initialize metadata service for a specific user.
 
         Args:
             user_id: User identifier
-            temp_dir: Temporary directory for local database files
+            temp_dir: Temporary directory for local database files (default: METADATA_CACHE_DIR)
 
         Raises:
             MetadataError: If initialization fails
         """
         self.user_id = user_id
-        self.temp_dir = Path(temp_dir)
+        self.temp_dir = Path(temp_dir or METADATA_CACHE_DIR)
         self.local_db_path = self.temp_dir / f"metadata_{user_id}.db"
         self.gcs_db_path = f"databases/{user_id}/metadata.db"
 
@@ -157,11 +272,18 @@ class MetadataService:
         except Exception as e:
             raise MetadataError(f"Failed to initialize storage service: {e}") from e
 
-        # Database manager will be initialized when needed
+        # Database manager will be initialized when needed; it keeps one connection open across calls
         self._db_manager: DatabaseManager | None = None
+        self._db_manager_lock = threading.Lock()
+
+        # Photos per day, and the local database file version they were counted from
+        self._day_counts: tuple[tuple, list[tuple[date, int]]] | None = None
+        self._day_counts_lock = threading.Lock()
 
-        # Async sync management
-        self._sync_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"metadata-sync-{user_id}")
+        # Whether the search index may miss photos, e.g. of a local database left by an earlier process
+        self._search_index_stale = True
+
+        # Async sync management (syncs are scheduled by the global sync scheduler)
         self._sync_lock = threading.Lock()
         self._last_sync_time: datetime | None = None
         self._sync_pending = False
@@ -177,17 +299,70 @@ class MetadataService:
     @property
     def db_manager(self) -> DatabaseManager:
         """Get database manager, initializing if needed."""
-        if self._db_manager is None:
-            self._db_manager = get_database_manager(str(self.local_db_path), create_if_missing=True)
-        return self._db_manager
+        with self._db_manager_lock:
+            if self._db_manager is None:
+                self._db_manager = get_database_manager(str(self.local_db_path), create_if_missing=True, shared=True)
+            return self._db_manager
+
+    @contextmanager
+    def _checkpointed_database(self) -> Iterator[None]:
+        """
+        Make the local database file complete and hold off other users while it is read.
+
+        The shared connection keeps recent changes in DuckDB's write-ahead log,
+        so they are checkpointed into the file before it is copied.
+        """
+        manager = self._db_manager
+        with self._exclusive_database():
+            if isinstance(manager, SharedDatabaseManager):
+                manager.checkpoint()
+            yield
+
+    @contextmanager
+    def _exclusive_database(self) -> Iterator[None]:
+        """Hold off other users of the shared connection, e.g. while the database file is replaced."""
+        manager = self._db_manager
+        if not isinstance(manager, SharedDatabaseManager):
+            yield
+            return
+
+        with manager.exclusive():
+            yield
 
     def ensure_local_database(self) -> bool:
         """
         Ensure local database exists, downloading from GCS if needed.
 
+        An existing local database is compared with GCS when first seen and then
+        every METADATA_DB_REVALIDATE_SECONDS, so that changes made by other
+        instances are picked up.
+
         Returns:
             bool: True if database was downloaded from GCS, False if created new
 
+        Raises:
+            MetadataError: If database setup fails
+        """
+        key = str(self.local_db_path)
+
+        # A file that is still being created by another session is not ready yet
+        if self.local_db_path.exists() and not _database_bootstrap.in_flight(key):
+            if _revalidation_due(key):
+                return _database_bootstrap.do(key, self._revalidate_local_database)
+            logger.debug("local_database_exists", user_id=self.user_id, path=key)
+            return False
+
+        return _database_bootstrap.do(key, self._bootstrap_local_database)
+
+    def _bootstrap_local_database(self) -> bool:
+        """
+        Download the database from GCS, or create a new one, unless it already exists.
+
+        Runs once per database path at a time (see ensure_local_database).
+
+        Returns:
+            bool: True if database was downloaded from GCS, False otherwise
+
         Raises:
             MetadataError: If database setup fails
         """
@@ -199,13 +374,19 @@ class MetadataService:
 
             # Try to download from GCS
             if self._download_from_gcs():
+                _mark_database_checked(str(self.local_db_path))
                 log_user_action(self.user_id, "database_downloaded_from_gcs", gcs_path=self.gcs_db_path)
-                return True
+                downloaded = True
             else:
                 # Create new database
                 self._create_new_database()
+                _mark_database_checked(str(self.local_db_path))
                 log_user_action(self.user_id, "new_database_created", local_path=str(self.local_db_path))
-                return False
+                downloaded = False
+
+            # Make room for the new file by evicting cold databases
+            enforce_database_cache_quota(protect=[self.local_db_path])
+            return downloaded
 
         except Exception as e:
             raise MetadataError(f"Failed to ensure local database: {e}") from e
@@ -220,23 +401,31 @@ class MetadataService:
         Raises:
             MetadataError: If download fails
         """
+        partial_path = self.local_db_path.with_name(f"{self.local_db_path.name}.download")
         try:
             # Check if database exists in GCS
             if not self._gcs_database_exists():
                 return False
 
-            # Download database file from database bucket
-            db_data = self.storage_service.download_database_file(self.user_id, "metadata.db")
+            # Download database file from database bucket, with the generation it is based on
+            db_data, generation = self.storage_service.download_database_snapshot(self.user_id, "metadata.db")
 
             # Ensure temp directory exists
             self.temp_dir.mkdir(parents=True, exist_ok=True)
 
-            # Write to local file
-            with open(self.local_db_path, "wb") as f:
+            # Write to a temporary file and rename it, so the database never appears half-written
+            with open(partial_path, "wb") as f:
                 f.write(db_data)
+            os.replace(partial_path, self.local_db_path)
 
             # Verify the downloaded database
             self._verify_database_integrity()
+            self._record_base_generation(generation)
+
+            # Bring the base snapshot up to date with the changes shipped after it
+            self._replay_deltas()
+            with self.db_manager as db:
+                self._refresh_search_index(db)
 
             return True
 
@@ -249,6 +438,7 @@ class MetadataService:
                 raise
         except Exception as e:
             # Clean up partial download
+            partial_path.unlink(missing_ok=True)
             if self.local_db_path.exists():
                 self.local_db_path.unlink()
             log_error(e, {"operation": "download_from_gcs", "user_id": self.user_id, "gcs_path": self.gcs_db_path})
@@ -258,6 +448,141 @@ class MetadataService:
         """Check if database exists in GCS."""
         return self.storage_service.file_exists(self.gcs_db_path)
 
+    def _record_base_generation(self, generation: int) -> None:
+        """Record the GCS generation of the snapshot the local database is now based on."""
+        with self.db_manager as db:
+            change_log.ensure_change_log_tables(db)
+            change_log.write_sync_state(db, base_generation=generation)
+
+    def _revalidate_local_database(self) -> bool:
+        """
+        Compare the local database with GCS and catch up with changes made elsewhere.
+
+        Runs once per database path at a time (see ensure_local_database). If the
+        snapshot still has the generation the local database is based on, only
+        newer delta segments are applied, without downloading the snapshot;
+        otherwise the local database is rebased onto the new snapshot.
+
+        Returns:
+            bool: True if a newer snapshot was downloaded
+        """
+        try:
+            with self.db_manager as db:
+                change_log.ensure_change_log_tables(db)
+                # A local database left by an older version is migrated when first seen
+                change_log.migrate_schema(db)
+                generation = change_log.read_sync_state(db).get("base_generation")
+
+            # Not based on a GCS snapshot yet; its first upload is create-only and resolves any conflict
+            if generation is None:
+                return False
+
+            return self._catch_up_with_gcs(generation)
+
+        except Exception as e:
+            # The local copy keeps serving; the next check or a conditional upload catches up
+            logger.warning("local_database_revalidation_failed", user_id=self.user_id, error=str(e))
+            return False
+
+    def _catch_up_with_gcs(self, generation: int) -> bool:
+        """
+        Apply the changes shipped by other instances since the local database's base.
+
+        Args:
+            generation: GCS generation of the snapshot the local database is based on
+
+        Returns:
+            bool: True if the snapshot changed and the local database was rebased onto it,
+                False if only newer delta segments of its snapshot were applied
+        """
+        db_data, remote_generation = self.storage_service.download_database_snapshot_if_changed(
+            self.user_id, "metadata.db", generation
+        )
+        if db_data is None:
+            self._replay_deltas()
+            return False
+
+        self._rebase_local_database(db_data, remote_generation)
+        return True
+
+    def _rebase_on_latest_snapshot(self, pending_changes: Path | None = None) -> int:
+        """Download the current GCS snapshot and rebase the local database onto it."""
+        db_data, generation = self.storage_service.download_database_snapshot(self.user_id, "metadata.db")
+        return self._rebase_local_database(db_data, generation, pending_changes)
+
+    def _rebase_local_database(self, db_data: bytes, generation: int, pending_changes: Path | None = None) -> int:
+        """
+        Replace the local database with a newer GCS snapshot, keeping unsynced local changes.
+
+        Local rows changed since the last shipped change are applied on top of
+        the new snapshot and its delta segments and stay marked as unshipped,
+        so the next sync uploads them as a delta. Where another instance
+        changed the same row, the local change wins.
+
+        Args:
+            db_data: Content of the newer snapshot
+            generation: GCS generation of the snapshot
+            pending_changes: Segment of the unsynced local changes, if already captured
+
+        Returns:
+            int: Number of local changes carried over
+        """
+        partial_path = self.local_db_path.with_name(f"{self.local_db_path.name}.download")
+        carried_path = pending_changes or self.temp_dir / f"metadata_{self.user_id}.rebase.parquet"
+        partial_path.write_bytes(db_data)
+        manager = self.db_manager
+
+        try:
+            with self._exclusive_database():
+                if pending_changes is None:
+                    with manager as db:
+                        change_log.ensure_change_log_tables(db)
+                        change_log.capture_changes(db, carried_path)
+
+                replay_error: GenerationConflictError | None = None
+                for attempt in range(1, REBASE_ATTEMPTS + 1):
+                    manager.close()
+                    os.replace(partial_path, self.local_db_path)
+
+                    self._verify_database_integrity()
+                    self._record_base_generation(generation)
+                    try:
+                        self._replay_deltas(allow_rebase=False)
+                        replay_error = None
+                        break
+                    except GenerationConflictError as e:
+                        # The snapshot was replaced while its segments were read: start over from the newer one
+                        replay_error = e
+                        if attempt == REBASE_ATTEMPTS:
+                            break
+                        logger.info("database_rebase_restarted", user_id=self.user_id, generation=generation)
+                        db_data, generation = self.storage_service.download_database_snapshot(
+                            self.user_id, "metadata.db"
+                        )
+                        partial_path.write_bytes(db_data)
+
+                # The local changes are kept even if the rebase gives up; they ship on top of the snapshot
+                carried = 0
+                with manager as db:
+                    if carried_path.exists():
+                        with db.transaction():
+                            rows = db.execute_query("SELECT COUNT(*) FROM read_parquet(?)", (str(carried_path),))
+                            carried = rows[0][0]
+                            change_log.apply_segment(db, carried_path, replay=True, shipped=False)
+                    self._refresh_search_index(db)
+                if replay_error is not None:
+                    raise replay_error
+        finally:
+            partial_path.unlink(missing_ok=True)
+            if pending_changes is None:
+                carried_path.unlink(missing_ok=True)
+
+        _mark_database_checked(str(self.local_db_path))
+        log_user_action(self.user_id, "database_rebased_on_gcs", generation=generation, carried_changes=carried)
+        if carried:
+            self.trigger_async_sync()
+        return carried
+
     def _create_new_database(self) -> None:
         """Create a new local database with schema."""
         try:
@@ -286,12 +611,23 @@ class MetadataService:
                 if not db.verify_schema():
                     raise MetadataError("Database schema verification failed")
 
+                # Databases written by older versions are migrated to the current schema
+                change_log.migrate_schema(db)
+
         except Exception as e:
             raise MetadataError(f"Database integrity check failed: {e}") from e
 
     def upload_to_gcs(self, force: bool = False) -> bool:
         """
-        Upload local database to GCS.
+        Upload the whole local database to GCS as the new base snapshot.
+
+        The snapshot includes every delta segment shipped so far, so those
+        segments are deleted once it is stored (this is the change log compaction).
+
+        The upload only replaces the snapshot generation this database is based
+        on (or only creates the object, for a database not based on one). If
+        another instance replaced it first, the local database is rebased onto
+        that snapshot and its unsynced changes are shipped as a delta instead.
 
         Args:
             force: Force upload even if file hasn't changed
@@ -302,16 +638,38 @@ class MetadataService:
         Raises:
             MetadataError: If upload fails
         """
+        pending_path = self.temp_dir / f"metadata_{self.user_id}.pending.parquet"
         try:
             if not self.local_db_path.exists():
                 raise MetadataError("Local database does not exist")
 
-            # Read database file
-            with open(self.local_db_path, "rb") as f:
-                db_data = f.read()
+            with self._exclusive_database():
+                state = self._mark_snapshot_base(pending_path)
+
+                # Read database file
+                with self._checkpointed_database(), open(self.local_db_path, "rb") as f:
+                    db_data = f.read()
+
+            precondition = {} if state is None else {"if_generation_match": state.get("base_generation", 0)}
+            try:
+                # Upload to GCS database bucket
+                result = self.storage_service.upload_database_file(self.user_id, db_data, "metadata.db", **precondition)
+            except GenerationConflictError:
+                logger.info("database_snapshot_conflict", user_id=self.user_id, **precondition)
+                self._rebase_on_latest_snapshot(pending_path)
+                return self.sync_to_gcs()
+            except Exception:
+                if state is not None:
+                    # Deltas need a stored base, so the next sync has to upload a snapshot again
+                    with self.db_manager as db:
+                        change_log.clear_sync_state(db, "base_seq")
+                raise
 
-            # Upload to GCS database bucket
-            result = self.storage_service.upload_database_file(self.user_id, db_data, "metadata.db")
+            if state is not None:
+                if result.get("generation"):
+                    self._record_base_generation(int(result["generation"]))
+                if "base_generation" in state:
+                    self._delete_compacted_deltas(state["base_generation"], state["base_seq"])
 
             log_user_action(
                 self.user_id, "database_uploaded_to_gcs", gcs_path=result["gcs_path"], file_size=len(db_data)
@@ -321,6 +679,247 @@ class MetadataService:
         except Exception as e:
             log_error(e, {"operation": "upload_to_gcs", "user_id": self.user_id, "local_path": str(self.local_db_path)})
             raise MetadataError(f"Failed to upload database to GCS: {e}") from e
+        finally:
+            pending_path.unlink(missing_ok=True)
+
+    def _mark_snapshot_base(self, pending_path: Path) -> dict[str, int] | None:
+        """
+        Record in the database that it is about to become the base snapshot.
+
+        Args:
+            pending_path: File to save the unsynced changes to first; if the upload
+                conflicts, these are the changes carried over to the newer snapshot
+
+        Returns:
+            dict | None: Sync state of the snapshot ('base_seq' is the last delta sequence
+                number it includes), or None if the change log could not be updated (the
+                snapshot is uploaded anyway, unconditionally)
+        """
+        try:
+            with self.db_manager as db:
+                change_log.ensure_change_log_tables(db)
+                change_log.capture_changes(db, pending_path)
+                with db.transaction():
+                    state = change_log.read_sync_state(db)
+                    base_seq = state.get("last_seq", 0)
+                    change_log.reset_shadow(db)
+                    change_log.write_sync_state(db, base_seq=base_seq, last_seq=base_seq)
+            return {**state, "base_seq": base_seq, "last_seq": base_seq}
+        except Exception as e:
+            logger.warning("change_log_base_not_recorded", user_id=self.user_id, error=str(e))
+            return None
+
+    def _delete_compacted_deltas(self, previous_generation: int, base_seq: int) -> None:
+        """
+        Delete the delta segments of the snapshot the new base replaced (best effort).
+
+        Segments another instance shipped on the previous snapshot after this
+        database last replayed them are not in the new base. They are applied
+        here as unshipped local changes and shipped again on the new base before
+        any segment is deleted, so they are never only held locally.
+
+        Args:
+            previous_generation: GCS generation of the replaced snapshot
+            base_seq: Last delta sequence number the new base includes
+        """
+        try:
+            deltas = self.storage_service.list_database_deltas(self.user_id, previous_generation)
+            missed = [(seq, path) for seq, path in deltas if seq > base_seq]
+            if missed:
+                logger.info("database_deltas_missed_by_base", user_id=self.user_id, segments=len(missed))
+                self._apply_remote_deltas(missed, shipped=False)
+                self.sync_to_gcs()
+            if deltas:
+                deleted = self.storage_service.delete_database_deltas([path for _, path in deltas])
+                log_user_action(self.user_id, "database_deltas_compacted", base_seq=base_seq, deleted=deleted)
+        except Exception as e:
+            logger.warning("database_delta_cleanup_failed", user_id=self.user_id, error=str(e))
+
+    def sync_to_gcs(self) -> bool:
+        """
+        Ship local changes to GCS.
+
+        Rows changed since the last sync are uploaded as one small delta
+        segment. A full snapshot is uploaded instead when GCS holds no base for
+        this database yet, and after COMPACT_AFTER_SEGMENTS segments the log is
+        compacted into a new base.
+
+        Returns:
+            bool: True if anything was uploaded, False if there were no changes
+
+        Raises:
+            MetadataError: If the upload fails
+        """
+        if not self.local_db_path.exists():
+            raise MetadataError("Local database does not exist")
+
+        try:
+            with self.db_manager as db:
+                change_log.ensure_change_log_tables(db)
+                state = change_log.read_sync_state(db)
+        except Exception as e:
+            logger.warning("change_log_unavailable", user_id=self.user_id, error=str(e))
+            state = {}
+
+        # Deltas need a stored base whose generation is known
+        if "base_seq" not in state or "base_generation" not in state:
+            return self.upload_to_gcs(force=True)
+
+        seq = state.get("last_seq", state["base_seq"]) + 1
+        try:
+            for attempt in range(1, DELTA_UPLOAD_ATTEMPTS + 1):
+                try:
+                    changed_rows = self._ship_delta(seq, state["base_generation"])
+                    break
+                except GenerationConflictError:
+                    if attempt == DELTA_UPLOAD_ATTEMPTS:
+                        raise
+                    # Another instance shipped this sequence number or a new snapshot first: take its changes,
+                    # then capture again
+                    logger.info("database_delta_conflict", user_id=self.user_id, seq=seq, attempt=attempt)
+                    self._catch_up_with_gcs(state["base_generation"])
+                    with self.db_manager as db:
+                        state = change_log.read_sync_state(db)
+                    seq = state.get("last_seq", state["base_seq"]) + 1
+
+        except Exception as e:
+            log_error(e, {"operation": "sync_to_gcs", "user_id": self.user_id, "seq": seq})
+            raise MetadataError(f"Failed to sync database changes to GCS: {e}") from e
+
+        if not changed_rows:
+            logger.debug("database_delta_empty", user_id=self.user_id)
+            return False
+
+        log_user_action(self.user_id, "database_delta_uploaded", seq=seq, rows=changed_rows)
+
+        if seq - state["base_seq"] >= change_log.COMPACT_AFTER_SEGMENTS:
+            self.upload_to_gcs(force=True)
+        return True
+
+    def _ship_delta(self, seq: int, base_generation: int) -> int:
+        """
+        Capture the changed rows and upload them as delta segment seq of the base snapshot.
+
+        A segment only counts as shipped if the base snapshot is still current
+        after the upload: an instance that compacted the log into a new snapshot
+        in the meantime may not have seen it.
+
+        Args:
+            seq: Sequence number of the segment
+            base_generation: GCS generation of the snapshot the local database is based on
+
+        Returns:
+            int: Number of changed rows shipped (0: nothing was uploaded)
+
+        Raises:
+            GenerationConflictError: If another instance already shipped segment seq, or
+                replaced the base snapshot (the rows stay unshipped)
+        """
+        segment_path = self.temp_dir / f"metadata_{self.user_id}.delta-{seq}.parquet"
+        try:
+            with self.db_manager as db:
+                changed_rows = change_log.capture_changes(db, segment_path)
+            if not changed_rows:
+                return 0
+
+            self.storage_service.upload_database_delta(self.user_id, base_generation, seq, segment_path.read_bytes())
+            current_generation = self.storage_service.get_database_generation(self.user_id, "metadata.db")
+            if current_generation != base_generation:
+                raise GenerationConflictError(
+                    f"Database snapshot changed from generation {base_generation} to {current_generation}"
+                )
+
+            # Only what was uploaded counts as shipped; later writes show up in the next segment
+            with self.db_manager as db:
+                with db.transaction():
+                    change_log.apply_segment(db, segment_path, replay=False)
+                    change_log.write_sync_state(db, last_seq=seq)
+            return changed_rows
+        finally:
+            segment_path.unlink(missing_ok=True)
+
+    def _replay_deltas(self, allow_rebase: bool = True) -> int:
+        """
+        Apply the delta segments shipped after the last one this database includes.
+
+        Unsynced local changes are kept on top of the replayed ones and still
+        ship with the next sync.
+
+        Args:
+            allow_rebase: Rebase onto the current snapshot if segments are missing
+                because another instance compacted them into a new snapshot
+
+        Returns:
+            int: Number of segments applied
+
+        Raises:
+            GenerationConflictError: If segments are missing and allow_rebase is False
+            StorageError: If a segment cannot be listed or downloaded
+        """
+        with self.db_manager as db:
+            change_log.ensure_change_log_tables(db)
+            state = change_log.read_sync_state(db)
+
+        # Snapshots uploaded before the change log existed, or without a known generation, have no deltas
+        if "base_seq" not in state or "base_generation" not in state:
+            return 0
+
+        last_seq = state.get("last_seq", state["base_seq"])
+        deltas = list(
+            self.storage_service.list_database_deltas(self.user_id, state["base_generation"], after_seq=last_seq)
+        )
+        if not deltas:
+            return 0
+        if deltas[0][0] != last_seq + 1:
+            logger.warning("database_delta_gap", user_id=self.user_id, expected=last_seq + 1, found=deltas[0][0])
+            if not allow_rebase:
+                # Replaying across the gap would skip the missing changes for good
+                raise GenerationConflictError(
+                    f"Delta segments {last_seq + 1}-{deltas[0][0] - 1} of snapshot generation "
+                    f"{state['base_generation']} are missing"
+                )
+            self._rebase_on_latest_snapshot()
+            return len(deltas)
+
+        self._apply_remote_deltas(deltas)
+        log_user_action(self.user_id, "database_deltas_replayed", segments=len(deltas), last_seq=deltas[-1][0])
+        return len(deltas)
+
+    def _apply_remote_deltas(self, deltas: list[tuple[int, str]], shipped: bool = True) -> None:
+        """
+        Download delta segments and apply them, keeping unsynced local changes on top.
+
+        Args:
+            deltas: (sequence number, GCS path) of the segments, in sequence order
+            shipped: Record the segments as shipped and advance last_seq; False keeps their
+                changes pending, so that the next sync ships them again
+        """
+        segment_paths = []
+        pending_path = self.temp_dir / f"metadata_{self.user_id}.replay-pending.parquet"
+        try:
+            for seq, gcs_path in deltas:
+                segment_path = self.temp_dir / f"metadata_{self.user_id}.replay-{seq}.parquet"
+                segment_path.write_bytes(self.storage_service.download_database_delta(gcs_path))
+                segment_paths.append(segment_path)
+
+            with self._exclusive_database(), self.db_manager as db:
+                pending = change_log.capture_changes(db, pending_path)
+                with db.transaction():
+                    for segment_path in segment_paths:
+                        change_log.apply_segment(db, segment_path, replay=True, shipped=shipped)
+                    if pending:
+                        change_log.apply_segment(db, pending_path, replay=True, shipped=False)
+                    if shipped:
+                        change_log.write_sync_state(db, last_seq=deltas[-1][0])
+                replayed = db.execute_query(
+                    "SELECT DISTINCT _key FROM read_parquet(?) WHERE _table = 'photos'",
+                    ([str(path) for path in segment_paths],),
+                )
+                self._refresh_search_index(db, [row[0] for row in replayed])
+        finally:
+            pending_path.unlink(missing_ok=True)
+            for segment_path in segment_paths:
+                segment_path.unlink(missing_ok=True)
 
     def disable_async_sync(self) -> None:
         """Disable async sync operations."""
@@ -408,19 +1007,26 @@ class MetadataService:
         except Exception as e:
             raise MetadataError(f"Failed to get database info: {e}") from e
 
-    def cleanup_local_database(self) -> None:
-        """Clean up local database file."""
+    def cleanup_local_database(self, delete_file: bool = True) -> None:
+        """
+        Clean up local database file.
+
+        Args:
+            delete_file: Delete the local database file after closing it; a kept file
+                is revalidated against GCS when the user's service is created again
+        """
         try:
-            # Shutdown sync executor
-            if hasattr(self, "_sync_executor"):
-                self._sync_executor.shutdown(wait=True)
+            # Finish outstanding syncs before the local database goes away
+            get_sync_scheduler().remove(self)
 
             if self._db_manager:
                 self._db_manager.close()
                 self._db_manager = None
 
-            if self.local_db_path.exists():
+            _mark_database_checked(str(self.local_db_path), forget=True)
+            if delete_file and self.local_db_path.exists():
                 self.local_db_path.unlink()
+                _database_cache.forget(self.local_db_path)
                 log_user_action(self.user_id, "local_database_cleaned_up", local_path=str(self.local_db_path))
 
         except Exception as e:
@@ -455,50 +1061,57 @@ class MetadataService:
         Returns:
             dict: Sync status information
         """
+        pending = get_sync_scheduler().is_pending(self)
         with self._sync_lock:
             return {
                 "enabled": self._sync_enabled,
-                "pending": self._sync_pending,
+                "pending": self._sync_pending or pending,
                 "last_sync_time": self._last_sync_time.isoformat() if self._last_sync_time else None,
                 "user_id": self.user_id,
             }
 
-    def _sync_to_gcs_async(self) -> None:
+    def _sync_to_gcs_async(self) -> bool:
         """
         Internal method to sync database to GCS asynchronously.
-        This runs in a background thread.
+        This runs in a background thread, started by the sync scheduler.
+
+        Returns:
+            bool: False if the sync failed and should be retried
         """
         try:
             with self._sync_lock:
                 if not self._sync_enabled:
                     logger.debug("async_sync_skipped_disabled", user_id=self.user_id)
-                    return
+                    return True
 
                 self._sync_pending = True
 
-            # Perform the actual sync
+            # Perform the actual sync (a delta segment, or a full snapshot when needed)
             start_time = datetime.now()
-            success = self.upload_to_gcs(force=False)
+            self.sync_to_gcs()
             duration = (datetime.now() - start_time).total_seconds()
 
             with self._sync_lock:
                 self._sync_pending = False
-                if success:
-                    self._last_sync_time = datetime.now(UTC)
-                    log_performance("async_sync_to_gcs", duration, user_id=self.user_id, success=True)
-                    log_user_action(self.user_id, "async_sync_completed")
-                else:
-                    logger.warning("async_sync_failed", user_id=self.user_id)
+                self._last_sync_time = datetime.now(UTC)
+            log_performance("async_sync_to_gcs", duration, user_id=self.user_id, success=True)
+            log_user_action(self.user_id, "async_sync_completed")
+            return True
 
         except Exception as e:
             with self._sync_lock:
                 self._sync_pending = False
             log_error(e, {"operation": "async_sync_to_gcs", "user_id": self.user_id})
+            return False
 
     def trigger_async_sync(self) -> None:
         """
         Trigger asynchronous synchronization to GCS.
-        This method returns immediately and sync happens in background.
+
+        This method returns immediately. Writes are coalesced: the sync starts
+        once writes have been quiet for METADATA_SYNC_QUIET_SECONDS, and at most
+        METADATA_SYNC_MAX_STALENESS_SECONDS after the first unsynced write. A
+        write made while a sync is running is synced by a following run.
         """
         try:
             with self._sync_lock:
@@ -506,20 +1119,15 @@ class MetadataService:
                     logger.debug("async_sync_trigger_disabled", user_id=self.user_id)
                     return
 
-                if self._sync_pending:
-                    logger.debug("async_sync_already_pending", user_id=self.user_id)
-                    return
-
-            # Submit sync task to executor
-            self._sync_executor.submit(self._sync_to_gcs_async)
-            logger.debug("async_sync_task_submitted", user_id=self.user_id)
+            get_sync_scheduler().mark_dirty(self, self._sync_to_gcs_async)
+            logger.debug("async_sync_scheduled", user_id=self.user_id)
 
         except Exception as e:
             log_error(e, {"operation": "trigger_async_sync", "user_id": self.user_id})
 
     def wait_for_sync_completion(self, timeout: float = 30.0) -> bool:
         """
-        Wait for any pending sync operations to complete.
+        Sync outstanding writes now and wait for the sync to complete.
 
         Args:
             timeout: Maximum time to wait in seconds
@@ -528,13 +1136,16 @@ class MetadataService:
             bool: True if sync completed, False if timeout
         """
         start_time = time.time()
+        scheduler = get_sync_scheduler()
+        scheduler.flush(self)
 
-        while time.time() - start_time < timeout:
-            with self._sync_lock:
-                if not self._sync_pending:
-                    return True
+        if scheduler.wait(self, timeout):
+            while time.time() - start_time < timeout:
+                with self._sync_lock:
+                    if not self._sync_pending:
+                        return True
 
-            time.sleep(0.1)
+                time.sleep(0.1)
 
         logger.warning("sync_completion_timeout", user_id=self.user_id, timeout_seconds=timeout)
         return False
@@ -581,10 +1192,11 @@ class MetadataService:
                 if existing:
                     # Update existing record
                     db.execute_query(
-                        """UPDATE photos SET
-                           user_id = ?, filename = ?, original_path = ?, thumbnail_path = ?,
-                           created_at = ?, uploaded_at = ?, file_size = ?, mime_type = ?
-                           WHERE id = ?""",
+                        f"""UPDATE photos SET
+                            user_id = ?, filename = ?, original_path = ?, thumbnail_path = ?,
+                            created_at = ?, uploaded_at = ?, file_size = ?, mime_type = ?, sort_ts = ?,
+                            {_DETAILS_SET}
+                            WHERE id = ?""",
                         (
                             photo_metadata.user_id,
                             photo_metadata.filename,
@@ -594,6 +1206,8 @@ class MetadataService:
                             photo_metadata.uploaded_at.isoformat(),
                             photo_metadata.file_size,
                             photo_metadata.mime_type,
+                            photo_metadata.sort_timestamp.isoformat(),
+                            *_detail_values(photo_metadata),
                             photo_metadata.id,
                         ),
                     )
@@ -606,10 +1220,10 @@ class MetadataService:
                 else:
                     # Insert new record
                     db.execute_query(
-                        """INSERT INTO photos
-                           (id, user_id, filename, original_path, thumbnail_path,
-                            created_at, uploaded_at, file_size, mime_type)
-                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                        f"""INSERT INTO photos
+                            (id, user_id, filename, original_path, thumbnail_path,
+                             created_at, uploaded_at, file_size, mime_type, sort_ts, {", ".join(PHOTO_DETAIL_COLUMNS)})
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?{", ?" * len(PHOTO_DETAIL_COLUMNS)})""",
                         (
                             photo_metadata.id,
                             photo_metadata.user_id,
@@ -620,6 +1234,8 @@ class MetadataService:
                             photo_metadata.uploaded_at.isoformat(),
                             photo_metadata.file_size,
                             photo_metadata.mime_type,
+                            photo_metadata.sort_timestamp.isoformat(),
+                            *_detail_values(photo_metadata),
                         ),
                     )
                     log_user_action(
@@ -630,6 +1246,8 @@ class MetadataService:
                         file_size=photo_metadata.file_size,
                     )
 
+                self._update_search_index(db, [photo_metadata.id])
+
             # Trigger async sync after successful save
             self.trigger_async_sync()
 
@@ -686,16 +1304,19 @@ class MetadataService:
 
                     # Update with preserved creation info
                     db.execute_query(
-                        """UPDATE photos SET
-                           original_path = ?, thumbnail_path = ?, uploaded_at = ?,
-                           file_size = ?, mime_type = ?
-                           WHERE id = ? AND user_id = ?""",
+                        f"""UPDATE photos SET
+                            original_path = ?, thumbnail_path = ?, uploaded_at = ?,
+                            file_size = ?, mime_type = ?, sort_ts = COALESCE(created_at, CAST(? AS TIMESTAMP)),
+                            {_DETAILS_SET}
+                            WHERE id = ? AND user_id = ?""",
                         (
                             photo_metadata.original_path,
                             photo_metadata.thumbnail_path,
                             photo_metadata.uploaded_at.isoformat(),
                             photo_metadata.file_size,
                             photo_metadata.mime_type,
+                            photo_metadata.uploaded_at.isoformat(),
+                            *_detail_values(photo_metadata),
                             existing_id,
                             self.user_id,
                         ),
@@ -712,10 +1333,10 @@ class MetadataService:
                 else:
                     # Standard update without preservation
                     db.execute_query(
-                        """UPDATE photos SET
-                           original_path = ?, thumbnail_path = ?, created_at = ?, uploaded_at = ?,
-                           file_size = ?, mime_type = ?
-                           WHERE id = ? AND user_id = ?""",
+                        f"""UPDATE photos SET
+                            original_path = ?, thumbnail_path = ?, created_at = ?, uploaded_at = ?,
+                            file_size = ?, mime_type = ?, sort_ts = ?, {_DETAILS_SET}
+                            WHERE id = ? AND user_id = ?""",
                         (
                             photo_metadata.original_path,
                             photo_metadata.thumbnail_path,
@@ -723,6 +1344,8 @@ class MetadataService:
                             photo_metadata.uploaded_at.isoformat(),
                             photo_metadata.file_size,
                             photo_metadata.mime_type,
+                            photo_metadata.sort_timestamp.isoformat(),
+                            *_detail_values(photo_metadata),
                             photo_metadata.id,
                             self.user_id,
                         ),
@@ -840,6 +1463,136 @@ class MetadataService:
             else:
                 raise MetadataError(f"Failed to save photo metadata for {photo_metadata.filename}: {e}") from e
 
+    def save_photos_metadata_bulk(
+        self, photos: list[PhotoMetadata], overwrites: list[bool] | None = None
+    ) -> dict[str, Any]:
+        """
+        Save metadata for many photos in a single transaction.
+
+        An overwrite photo whose filename already exists for the user replaces
+        that record in place, keeping its ID and creation date (the same result
+        as save_or_update_photo_metadata with is_overwrite=True); if a filename
+        is overwritten more than once, the last photo wins. Every other photo is
+        inserted as a new record, like save_photo_metadata. Only one GCS sync is
+        triggered for the whole batch.
+
+        Args:
+            photos: PhotoMetadata instances to save
+            overwrites: Per photo, whether it overwrites the record with its filename
+                (the upload's is_overwrite); None overwrites for every photo
+
+        Returns:
+            dict: 'saved', 'inserted' and 'updated' counts, and 'photo_ids' mapping
+                each photo's ID to the ID of the record holding it after the save
+
+        Raises:
+            MetadataError: If validation or the transaction fails (no rows are changed in that case)
+        """
+        if not photos:
+            return {"saved": 0, "inserted": 0, "updated": 0, "photo_ids": {}}
+
+        try:
+            if overwrites is None:
+                overwrites = [True] * len(photos)
+            if len(overwrites) != len(photos):
+                raise MetadataError(f"Expected {len(photos)} overwrite flags, got {len(overwrites)}")
+            for photo in photos:
+                if not photo.validate():
+                    raise MetadataError(f"Invalid photo metadata: {photo.filename}")
+                if photo.user_id != self.user_id:
+                    raise MetadataError(f"User ID mismatch: expected {self.user_id}, got {photo.user_id}")
+
+            replacing = {
+                photo.filename: photo for photo, overwrite in zip(photos, overwrites, strict=True) if overwrite
+            }
+            latest = [
+                *replacing.values(),
+                *(photo for photo, overwrite in zip(photos, overwrites, strict=True) if not overwrite),
+            ]
+            columns = (
+                [photo.id for photo in latest],
+                [photo.filename for photo in latest],
+                [photo.original_path for photo in latest],
+                [photo.thumbnail_path for photo in latest],
+                [photo.created_at.isoformat() if photo.created_at else None for photo in latest],
+                [photo.uploaded_at.isoformat() for photo in latest],
+                [photo.file_size for photo in latest],
+                [photo.mime_type for photo in latest],
+                [index < len(replacing) for index in range(len(latest))],
+                *([getattr(photo, column) for photo in latest] for column in PHOTO_DETAIL_COLUMNS),
+            )
+            details = ", ".join(
+                f"UNNEST(?::{column_type}[]) AS {column}" for column, column_type in PHOTO_DETAIL_COLUMNS.items()
+            )
+            incoming = f"""SELECT UNNEST(?::VARCHAR[]) AS id,
+                                  UNNEST(?::VARCHAR[]) AS filename,
+                                  UNNEST(?::VARCHAR[]) AS original_path,
+                                  UNNEST(?::VARCHAR[]) AS thumbnail_path,
+                                  CAST(UNNEST(?::VARCHAR[]) AS TIMESTAMP) AS created_at,
+                                  CAST(UNNEST(?::VARCHAR[]) AS TIMESTAMP) AS uploaded_at,
+                                  UNNEST(?::BIGINT[]) AS file_size,
+                                  UNNEST(?::VARCHAR[]) AS mime_type,
+                                  UNNEST(?::BOOLEAN[]) AS overwrite,
+                                  {details}"""
+
+            self.ensure_local_database()
+
+            with self.db_manager as db:
+                with db.transaction():
+                    updated_rows = db.execute_query(
+                        f"""UPDATE photos
+                            SET original_path = i.original_path, thumbnail_path = i.thumbnail_path,
+                                uploaded_at = i.uploaded_at, file_size = i.file_size, mime_type = i.mime_type,
+                                sort_ts = COALESCE(photos.created_at, i.uploaded_at),
+                                {", ".join(f"{column} = i.{column}" for column in PHOTO_DETAIL_COLUMNS)}
+                            FROM ({incoming}) i
+                            WHERE photos.user_id = ? AND photos.filename = i.filename AND i.overwrite
+                            RETURNING photos.filename, photos.id""",
+                        (*columns, self.user_id),
+                    )
+                    inserted_rows = db.execute_query(
+                        f"""INSERT INTO photos
+                            (id, user_id, filename, original_path, thumbnail_path,
+                             created_at, uploaded_at, file_size, mime_type, sort_ts, {", ".join(PHOTO_DETAIL_COLUMNS)})
+                            SELECT i.id, ?, i.filename, i.original_path, i.thumbnail_path,
+                                   i.created_at, i.uploaded_at, i.file_size, i.mime_type,
+                                   COALESCE(i.created_at, i.uploaded_at),
+                                   {", ".join(f"i.{column}" for column in PHOTO_DETAIL_COLUMNS)}
+                            FROM ({incoming}) i
+                            WHERE NOT (i.overwrite AND i.filename IN (SELECT UNNEST(?::VARCHAR[])))
+                            RETURNING filename, id""",
+                        (self.user_id, *columns, [row[0] for row in updated_rows]),
+                    )
+
+                # Replaced records keep their filename, so only new ones need indexing
+                self._update_search_index(db, [row[1] for row in inserted_rows])
+
+            replaced_ids = dict(updated_rows)
+            photo_ids = {
+                photo.id: replaced_ids.get(photo.filename, replacing[photo.filename].id) if overwrite else photo.id
+                for photo, overwrite in zip(photos, overwrites, strict=True)
+            }
+            result = {
+                "saved": len(inserted_rows) + len(replaced_ids),
+                "inserted": len(inserted_rows),
+                "updated": len(replaced_ids),
+                "photo_ids": photo_ids,
+            }
+            log_user_action(
+                self.user_id,
+                "photo_metadata_bulk_saved",
+                inserted=result["inserted"],
+                updated=result["updated"],
+            )
+
+            # One sync for the whole batch
+            self.trigger_async_sync()
+            return result
+
+        except Exception as e:
+            log_error(e, {"operation": "save_photos_metadata_bulk", "user_id": self.user_id, "count": len(photos)})
+            raise MetadataError(f"Failed to bulk save photo metadata: {e}") from e
+
     def save_or_update_photo_metadata_with_fallback(
         self, photo_metadata: PhotoMetadata, is_overwrite: bool = False, enable_fallback: bool = True
     ) -> dict[str, Any]:
@@ -1016,27 +1769,14 @@ class MetadataService:
 
             with self.db_manager as db:
                 result = db.execute_query(
-                    """SELECT id, user_id, filename, original_path, thumbnail_path,
-                              created_at, uploaded_at, file_size, mime_type
-                       FROM photos WHERE id = ? AND user_id = ?""",
+                    f"SELECT {_PHOTO_SELECT} FROM photos WHERE id = ? AND user_id = ?",  # nosec B608
                     (photo_id, self.user_id),
                 )
 
                 if not result:
                     return None
 
-                row = result[0]
-                return PhotoMetadata(
-                    id=row[0],
-                    user_id=row[1],
-                    filename=row[2],
-                    original_path=row[3],
-                    thumbnail_path=row[4],
-                    created_at=row[5],
-                    uploaded_at=row[6],
-                    file_size=row[7],
-                    mime_type=row[8],
-                )
+                return self._row_to_photo(result[0])
 
         except Exception as e:
             log_error(e, {"operation": "get_photo_by_id", "user_id": self.user_id, "photo_id": photo_id})
@@ -1065,7 +1805,7 @@ class MetadataService:
                               created_at, uploaded_at, file_size, mime_type
                        FROM photos
                        WHERE user_id = ?
-                       ORDER BY COALESCE(created_at, uploaded_at) DESC
+                       ORDER BY sort_ts DESC, id DESC
                        LIMIT ? OFFSET ?""",
                     (self.user_id, limit, offset),
                 )
@@ -1103,23 +1843,228 @@ class MetadataService:
             log_error(e, {"operation": "get_photos_by_date", "user_id": self.user_id, "limit": limit, "offset": offset})
             raise MetadataError(f"Failed to get photos by date: {e}") from e
 
-    def get_photos_count(self) -> int:
+    def get_photos_page(
+        self,
+        limit: int = 50,
+        cursor: PageCursor | None = None,
+        oldest_first: bool = False,
+        backward: bool = False,
+        offset: int = 0,
+    ) -> tuple[PhotoPage, bool]:
         """
-        Get total count of photos for the user.
+        Get a page of photos by keyset pagination on (sort_ts, id).
+
+        Each page starts right after (or, with backward, ends right before) the
+        cursor of a photo from the neighbouring page, so every page costs the
+        same however deep it is, unlike LIMIT/OFFSET.
+
+        Args:
+            limit: Maximum number of photos to return
+            cursor: Position to continue from (see page_cursor); None starts at the first photo,
+                or with backward at the last one
+            oldest_first: Order by creation date ascending instead of descending
+            backward: Return the page before the cursor instead of the one after it
+            offset: Photos to skip first; only for jumping to an arbitrary page, which
+                costs as much as LIMIT/OFFSET does
 
         Returns:
-            Total number of photos
+            tuple: (columnar page of photos in display order, whether more photos exist
+                beyond the page in the direction of travel)
 
         Raises:
-            MetadataError: If count fails
+            MetadataError: If retrieval fails
         """
+        # Walking backward is walking forward in the opposite order, then flipping the page
+        descending = oldest_first == backward
+        direction, comparison = ("DESC", "<") if descending else ("ASC", ">")
+
+        conditions = "user_id = ?"
+        parameters: tuple = (self.user_id,)
+        if cursor is not None:
+            # The leading sort_ts bound lets DuckDB skip row groups by their min/max statistics
+            sort_ts, photo_id = cursor
+            conditions += f" AND sort_ts {comparison}= ? AND (sort_ts {comparison} ? OR id {comparison} ?)"
+            parameters += (sort_ts, sort_ts, photo_id)
+
         try:
             self.ensure_local_database()
 
             with self.db_manager as db:
-                result = db.execute_query("SELECT COUNT(*) FROM photos WHERE user_id = ?", (self.user_id,))
+                result = PhotoPage(
+                    db.execute_columns(
+                        f"""SELECT {_PHOTO_SELECT}
+                            FROM photos
+                            WHERE {conditions}
+                            ORDER BY sort_ts {direction}, id {direction}
+                            LIMIT ? OFFSET ?""",
+                        parameters + (limit + 1, offset),
+                    )
+                )
 
-                return result[0][0] if result else 0
+            photos = result[:limit]
+            if backward:
+                photos = photos[::-1]
+
+            logger.debug(
+                "photos_page_retrieved",
+                user_id=self.user_id,
+                photos_count=len(photos),
+                oldest_first=oldest_first,
+                backward=backward,
+            )
+            return photos, len(result) > limit
+
+        except Exception as e:
+            log_error(e, {"operation": "get_photos_page", "user_id": self.user_id, "limit": limit})
+            raise MetadataError(f"Failed to get photos page: {e}") from e
+
+    @staticmethod
+    def page_cursor(photo: PhotoMetadata) -> PageCursor:
+        """
+        Get the keyset pagination cursor of a photo.
+
+        Args:
+            photo: Photo on the edge of a page
+
+        Returns:
+            PageCursor: (sort timestamp in ISO format, photo ID)
+        """
+        return photo.sort_timestamp.isoformat(), photo.id
+
+    @staticmethod
+    def date_cursor(day: date, oldest_first: bool = False) -> PageCursor:
+        """
+        Get a keyset pagination cursor positioned at a date.
+
+        Passed to get_photos_page, the page starts with the newest photo taken
+        on or before day (or, with oldest_first, the oldest photo taken on or
+        after it), so a timeline can jump to any date without paging there.
+
+        Args:
+            day: Date to seek to
+            oldest_first: Order of the pages the cursor is used with
+
+        Returns:
+            PageCursor: Cursor just past the date; its empty ID sorts before every photo ID
+        """
+        if isinstance(day, datetime):
+            day = day.date()
+        boundary = day if oldest_first else day + timedelta(days=1)
+        return datetime.combine(boundary, datetime.min.time()).isoformat(), ""
+
+    def get_date_histogram(self, granularity: str = "month", oldest_first: bool = False) -> list[dict[str, Any]]:
+        """
+        Get photo counts per year, month or day, for timeline navigation.
+
+        Counts are computed by one aggregate query and cached until the local
+        database file changes (a write, a replayed delta or a new snapshot), so
+        repeated calls are answered from memory.
+
+        Args:
+            granularity: 'year', 'month' or 'day'
+            oldest_first: Order the buckets (and count 'offset') oldest first
+
+        Returns:
+            list: One dict per non-empty bucket, in gallery order, with 'period'
+                (first day of the bucket), 'count', 'offset' (photos shown before
+                the bucket in that order) and 'cursor' (see date_cursor) for the
+                page starting at the bucket's first photo in that order
+
+        Raises:
+            MetadataError: If granularity is unknown or counting fails
+        """
+        if granularity not in DATE_GRANULARITIES:
+            raise MetadataError(
+                f"Unknown date granularity '{granularity}', expected one of {', '.join(DATE_GRANULARITIES)}"
+            )
+
+        buckets: dict[date, int] = {}
+        for day, count in self._get_day_counts():
+            if granularity == "year":
+                day = day.replace(month=1, day=1)
+            elif granularity == "month":
+                day = day.replace(day=1)
+            buckets[day] = buckets.get(day, 0) + count
+
+        histogram = []
+        offset = 0
+        for period in sorted(buckets, reverse=not oldest_first):
+            if oldest_first:
+                seek_to = period
+            elif granularity == "year":
+                seek_to = period.replace(month=12, day=31)
+            elif granularity == "month":
+                seek_to = (period + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+            else:
+                seek_to = period
+            histogram.append(
+                {
+                    "period": period,
+                    "count": buckets[period],
+                    "offset": offset,
+                    "cursor": self.date_cursor(seek_to, oldest_first),
+                }
+            )
+            offset += buckets[period]
+        return histogram
+
+    def _database_file_version(self) -> tuple:
+        """Identify the current content of the local database file and its write-ahead log."""
+        version: list[tuple[int, int, int] | None] = []
+        for path in (self.local_db_path, self.local_db_path.with_name(f"{self.local_db_path.name}.wal")):
+            try:
+                stat = path.stat()
+                version.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+            except FileNotFoundError:
+                version.append(None)
+        return tuple(version)
+
+    def _get_day_counts(self) -> list[tuple[date, int]]:
+        """Get photo counts per day, from cache while the database file is unchanged."""
+        try:
+            self.ensure_local_database()
+
+            # Every commit appends to the WAL and a checkpoint or new snapshot rewrites the file
+            version = self._database_file_version()
+            with self._day_counts_lock:
+                if self._day_counts is not None and self._day_counts[0] == version:
+                    return self._day_counts[1]
+
+            with self.db_manager as db:
+                rows = db.execute_query(
+                    """SELECT CAST(sort_ts AS DATE) AS day, COUNT(*) FROM photos
+                       WHERE user_id = ? AND sort_ts IS NOT NULL
+                       GROUP BY day""",
+                    (self.user_id,),
+                )
+
+            day_counts = [(row[0], row[1]) for row in rows]
+            with self._day_counts_lock:
+                self._day_counts = (version, day_counts)
+            logger.debug("photo_day_counts_computed", user_id=self.user_id, days=len(day_counts))
+            return day_counts
+
+        except Exception as e:
+            log_error(e, {"operation": "get_date_histogram", "user_id": self.user_id})
+            raise MetadataError(f"Failed to get date histogram: {e}") from e
+
+    def get_photos_count(self) -> int:
+        """
+        Get total count of photos for the user.
+
+        Returns:
+            Total number of photos
+
+        Raises:
+            MetadataError: If count fails
+        """
+        try:
+            self.ensure_local_database()
+
+            with self.db_manager as db:
+                result = db.execute_query("SELECT COUNT(*) FROM photos WHERE user_id = ?", (self.user_id,))
+
+                return result[0][0] if result else 0
 
         except Exception as e:
             log_error(e, {"operation": "get_photos_count", "user_id": self.user_id})
@@ -1151,6 +2096,7 @@ class MetadataService:
 
                 if deleted:
                     logger.info(f"Deleted photo metadata: {photo_id}")
+                    self._update_search_index(db, [photo_id], deleted=True)
                     # Trigger async sync after successful deletion
                     self.trigger_async_sync()
                 else:
@@ -1161,6 +2107,511 @@ class MetadataService:
         except Exception as e:
             raise MetadataError(f"Failed to delete photo metadata: {e}") from e
 
+    def get_photos_by_ids(self, photo_ids: list[str]) -> dict[str, PhotoMetadata]:
+        """
+        Get photo metadata for many IDs with a single query.
+
+        Args:
+            photo_ids: Photo IDs to retrieve
+
+        Returns:
+            dict: Mapping of photo ID to PhotoMetadata for the IDs that exist
+
+        Raises:
+            MetadataError: If retrieval fails
+        """
+        if not photo_ids:
+            return {}
+
+        try:
+            self.ensure_local_database()
+
+            with self.db_manager as db:
+                result = db.execute_query(
+                    f"""SELECT {_PHOTO_SELECT} FROM photos
+                        WHERE user_id = ? AND id IN (SELECT UNNEST(?::VARCHAR[]))""",  # nosec B608
+                    (self.user_id, list(photo_ids)),
+                )
+
+                return {row[0]: self._row_to_photo(row) for row in result}
+
+        except Exception as e:
+            log_error(e, {"operation": "get_photos_by_ids", "user_id": self.user_id, "count": len(photo_ids)})
+            raise MetadataError(f"Failed to get photos by IDs: {e}") from e
+
+    def get_photos_created_between(self, start: datetime | None = None, end: datetime | None = None) -> PhotoPage:
+        """
+        Get all photos whose creation date falls in [start, end), oldest first.
+
+        Photos without an EXIF creation date are matched by their upload date,
+        consistent with the gallery ordering.
+
+        Args:
+            start: Inclusive lower bound (None for no bound)
+            end: Exclusive upper bound (None for no bound)
+
+        Returns:
+            PhotoPage: Columnar list of the photos, so that exporting every photo
+                does not build an object per row up front
+
+        Raises:
+            MetadataError: If retrieval fails
+        """
+        try:
+            self.ensure_local_database()
+
+            with self.db_manager as db:
+                return PhotoPage(
+                    db.execute_columns(
+                        f"""SELECT {_PHOTO_SELECT}
+                            FROM photos
+                            WHERE user_id = ?
+                              AND (? IS NULL OR COALESCE(created_at, uploaded_at) >= ?)
+                              AND (? IS NULL OR COALESCE(created_at, uploaded_at) < ?)
+                            ORDER BY COALESCE(created_at, uploaded_at), id""",  # nosec B608
+                        (self.user_id, start, start, end, end),
+                    )
+                )
+
+        except Exception as e:
+            log_error(e, {"operation": "get_photos_created_between", "user_id": self.user_id})
+            raise MetadataError(f"Failed to get photos by creation date range: {e}") from e
+
+    def delete_photos_metadata_bulk(self, photo_ids: list[str]) -> list[str]:
+        """
+        Delete metadata for many photos in a single transaction.
+
+        Only one GCS sync is triggered for the whole batch.
+
+        Args:
+            photo_ids: Photo IDs to delete
+
+        Returns:
+            list[str]: IDs that were actually deleted
+
+        Raises:
+            MetadataError: If deletion fails (no rows are deleted in that case)
+        """
+        if not photo_ids:
+            return []
+
+        try:
+            self.ensure_local_database()
+
+            with self.db_manager as db:
+                with db.transaction():
+                    result = db.execute_query(
+                        """DELETE FROM photos
+                           WHERE user_id = ? AND id IN (SELECT UNNEST(?::VARCHAR[]))
+                           RETURNING id""",
+                        (self.user_id, list(photo_ids)),
+                    )
+                self._update_search_index(db, [row[0] for row in result], deleted=True)
+
+            deleted_ids = [row[0] for row in result]
+            logger.info(
+                "bulk_photo_metadata_deleted",
+                user_id=self.user_id,
+                requested=len(photo_ids),
+                deleted=len(deleted_ids),
+            )
+
+            if deleted_ids:
+                self.trigger_async_sync()
+
+            return deleted_ids
+
+        except Exception as e:
+            log_error(e, {"operation": "delete_photos_metadata_bulk", "user_id": self.user_id, "count": len(photo_ids)})
+            raise MetadataError(f"Failed to bulk delete photo metadata: {e}") from e
+
+    def get_referenced_paths(self, gcs_paths: list[str], excluded_ids: list[str] | None = None) -> set[str]:
+        """
+        Return the subset of paths still referenced by photos outside excluded_ids.
+
+        Args:
+            gcs_paths: GCS object paths to check
+            excluded_ids: Photo IDs to ignore (typically the ones being deleted)
+
+        Returns:
+            set[str]: Paths referenced by at least one other photo
+
+        Raises:
+            MetadataError: If the lookup fails
+        """
+        if not gcs_paths:
+            return set()
+
+        try:
+            self.ensure_local_database()
+
+            with self.db_manager as db:
+                result = db.execute_query(
+                    """SELECT path FROM (
+                           SELECT id, original_path AS path FROM photos WHERE user_id = ?
+                           UNION ALL
+                           SELECT id, thumbnail_path AS path FROM photos WHERE user_id = ?
+                       ) refs
+                       WHERE path IN (SELECT UNNEST(?::VARCHAR[]))
+                         AND id NOT IN (SELECT UNNEST(?::VARCHAR[]))""",
+                    (self.user_id, self.user_id, list(gcs_paths), list(excluded_ids or [])),
+                )
+                return {row[0] for row in result}
+
+        except Exception as e:
+            raise MetadataError(f"Failed to check shared object references: {e}") from e
+
+    def get_photo_paths(self) -> list[tuple[str, str, str]]:
+        """
+        Get the object paths of every photo for the user.
+
+        Returns:
+            list[tuple[str, str, str]]: (photo_id, original_path, thumbnail_path) tuples
+
+        Raises:
+            MetadataError: If retrieval fails
+        """
+        try:
+            self.ensure_local_database()
+
+            with self.db_manager as db:
+                result = db.execute_query(
+                    "SELECT id, original_path, thumbnail_path FROM photos WHERE user_id = ? ORDER BY id",
+                    (self.user_id,),
+                )
+                return [(row[0], row[1], row[2]) for row in result]
+
+        except Exception as e:
+            log_error(e, {"operation": "get_photo_paths", "user_id": self.user_id})
+            raise MetadataError(f"Failed to get photo paths: {e}") from e
+
+    def update_photo_paths_bulk(self, updates: list[tuple[str, str, str]]) -> int:
+        """
+        Point many photos at new object paths in a single transaction.
+
+        Only one GCS sync is triggered for the whole batch. A moved thumbnail's
+        recorded generation no longer applies, so it is cleared.
+
+        Args:
+            updates: (photo_id, original_path, thumbnail_path) tuples
+
+        Returns:
+            int: Number of rows updated
+
+        Raises:
+            MetadataError: If the update fails (no rows are changed in that case)
+        """
+        if not updates:
+            return 0
+
+        try:
+            self.ensure_local_database()
+
+            with self.db_manager as db:
+                with db.transaction():
+                    result = db.execute_query(
+                        """UPDATE photos
+                           SET original_path = u.original_path, thumbnail_path = u.thumbnail_path,
+                               thumbnail_generation = CASE WHEN photos.thumbnail_path = u.thumbnail_path
+                                                           THEN photos.thumbnail_generation END
+                           FROM (
+                               SELECT UNNEST(?::VARCHAR[]) AS id,
+                                      UNNEST(?::VARCHAR[]) AS original_path,
+                                      UNNEST(?::VARCHAR[]) AS thumbnail_path
+                           ) u
+                           WHERE photos.id = u.id AND photos.user_id = ?
+                           RETURNING photos.id""",
+                        (
+                            [update[0] for update in updates],
+                            [update[1] for update in updates],
+                            [update[2] for update in updates],
+                            self.user_id,
+                        ),
+                    )
+
+            updated = len(result)
+            logger.info("bulk_photo_paths_updated", user_id=self.user_id, requested=len(updates), updated=updated)
+
+            if updated:
+                self.trigger_async_sync()
+
+            return updated
+
+        except Exception as e:
+            log_error(e, {"operation": "update_photo_paths_bulk", "user_id": self.user_id, "count": len(updates)})
+            raise MetadataError(f"Failed to bulk update photo paths: {e}") from e
+
+    def get_photos_missing_details(
+        self, columns: Iterable[str], limit: int = 500, after_id: str | None = None
+    ) -> PhotoPage:
+        """
+        Get photos that have no value yet in some of the given detail columns.
+
+        Photos are returned in ID order, so that a backfill walks them in
+        batches by passing the last ID of the previous batch.
+
+        Args:
+            columns: Detail columns to check (keys of PHOTO_DETAIL_COLUMNS)
+            limit: Maximum number of photos
+            after_id: Only return photos with a greater ID
+
+        Returns:
+            PhotoPage: Photos missing any of the columns
+
+        Raises:
+            MetadataError: If retrieval fails
+        """
+        columns = list(columns)
+        unknown = [column for column in columns if column not in PHOTO_DETAIL_COLUMNS]
+        if unknown or not columns:
+            raise MetadataError(f"Unknown photo detail columns: {unknown or columns}")
+
+        try:
+            self.ensure_local_database()
+
+            with self.db_manager as db:
+                return PhotoPage(
+                    db.execute_columns(
+                        f"""SELECT {_PHOTO_SELECT}
+                            FROM photos
+                            WHERE user_id = ? AND (? IS NULL OR id > ?)
+                              AND ({" OR ".join(f"{column} IS NULL" for column in columns)})
+                            ORDER BY id
+                            LIMIT ?""",  # nosec B608
+                        (self.user_id, after_id, after_id, limit),
+                    )
+                )
+
+        except Exception as e:
+            log_error(e, {"operation": "get_photos_missing_details", "user_id": self.user_id})
+            raise MetadataError(f"Failed to get photos missing details: {e}") from e
+
+    def update_photo_details_bulk(self, details: dict[str, dict[str, Any]]) -> int:
+        """
+        Fill image detail columns of many photos in a single transaction.
+
+        Only the given values are written; columns a photo has no value for in
+        details keep their current value. Only one GCS sync is triggered for the
+        whole batch.
+
+        Args:
+            details: Detail values (by column of PHOTO_DETAIL_COLUMNS) by photo ID
+
+        Returns:
+            int: Number of rows updated
+
+        Raises:
+            MetadataError: If the update fails (no rows are changed in that case)
+        """
+        if not details:
+            return 0
+
+        photo_ids = list(details)
+        values = [[details[photo_id].get(column) for photo_id in photo_ids] for column in PHOTO_DETAIL_COLUMNS]
+        incoming = ", ".join(
+            f"UNNEST(?::{column_type}[]) AS {column}" for column, column_type in PHOTO_DETAIL_COLUMNS.items()
+        )
+        assignments = ", ".join(f"{column} = COALESCE(u.{column}, photos.{column})" for column in PHOTO_DETAIL_COLUMNS)
+
+        try:
+            self.ensure_local_database()
+
+            with self.db_manager as db:
+                with db.transaction():
+                    result = db.execute_query(
+                        f"""UPDATE photos SET {assignments}
+                            FROM (SELECT UNNEST(?::VARCHAR[]) AS id, {incoming}) u
+                            WHERE photos.id = u.id AND photos.user_id = ?
+                            RETURNING photos.id""",  # nosec B608
+                        (photo_ids, *values, self.user_id),
+                    )
+
+            updated = len(result)
+            logger.info("bulk_photo_details_updated", user_id=self.user_id, requested=len(details), updated=updated)
+
+            if updated:
+                self.trigger_async_sync()
+
+            return updated
+
+        except Exception as e:
+            log_error(e, {"operation": "update_photo_details_bulk", "user_id": self.user_id, "count": len(details)})
+            raise MetadataError(f"Failed to bulk update photo details: {e}") from e
+
+    def find_unreferenced_objects(self, objects: Iterable[dict], chunk_size: int = 5000) -> list[dict]:
+        """
+        Find GCS objects that no photos row references.
+
+        The object stream is loaded into a temporary table in chunks, and the set
+        difference against original_path/thumbnail_path and the user's thumbnail
+        pack objects is computed with a single anti-join query.
+
+        Args:
+            objects: Iterable of object info dicts with at least 'name' and 'size' keys
+            chunk_size: Number of objects inserted per statement
+
+        Returns:
+            list[dict]: Unreferenced objects as {'name', 'size'}, sorted by name
+
+        Raises:
+            MetadataError: If the comparison fails
+        """
+        try:
+            self.ensure_local_database()
+
+            with self.db_manager as db:
+                for statement in get_thumbnail_pack_statements():
+                    db.execute_query(statement)
+                db.execute_query("CREATE OR REPLACE TEMP TABLE listed_objects (name VARCHAR, size BIGINT)")
+
+                chunk: list[dict] = []
+                for info in objects:
+                    chunk.append(info)
+                    if len(chunk) >= chunk_size:
+                        self._insert_listed_objects(db, chunk)
+                        chunk = []
+                self._insert_listed_objects(db, chunk)
+
+                result = db.execute_query(
+                    """SELECT o.name, o.size
+                       FROM listed_objects o
+                       LEFT JOIN (
+                           SELECT original_path AS path FROM photos WHERE user_id = ?
+                           UNION
+                           SELECT thumbnail_path AS path FROM photos WHERE user_id = ?
+                           UNION
+                           SELECT pack_path AS path FROM thumbnail_packs WHERE user_id = ?
+                       ) referenced ON referenced.path = o.name
+                       WHERE referenced.path IS NULL
+                       ORDER BY o.name""",
+                    (self.user_id, self.user_id, self.user_id),
+                )
+
+                return [{"name": row[0], "size": row[1] or 0} for row in result]
+
+        except Exception as e:
+            log_error(e, {"operation": "find_unreferenced_objects", "user_id": self.user_id})
+            raise MetadataError(f"Failed to find unreferenced objects: {e}") from e
+
+    @staticmethod
+    def _insert_listed_objects(db: DatabaseManager, chunk: list[dict]) -> None:
+        """Insert a chunk of listed objects into the listed_objects temp table."""
+        if not chunk:
+            return
+
+        db.execute_query(
+            "INSERT INTO listed_objects SELECT UNNEST(?::VARCHAR[]), UNNEST(?::BIGINT[])",
+            ([info["name"] for info in chunk], [info.get("size") or 0 for info in chunk]),
+        )
+
+    def delete_photos(self, photo_ids: list[str], max_workers: int | None = None) -> dict[str, Any]:
+        """
+        Delete photos completely: original and thumbnail objects plus metadata rows.
+
+        Objects are deleted in parallel first. Rows are then removed in one
+        transaction, but only for photos whose objects were all removed (or were
+        already missing), so a failed object delete never leaves a row-less orphan
+        behind. A single GCS sync is triggered at the end.
+
+        Args:
+            photo_ids: Photo IDs to delete
+            max_workers: Maximum concurrent GCS delete requests
+
+        Returns:
+            dict: Summary with 'total', 'deleted', 'not_found', 'failed' counts and
+                per-item 'results' ({'photo_id', 'success', 'status', 'error'})
+
+        Raises:
+            MetadataError: If metadata lookup or the row deletion transaction fails
+        """
+        start_time = time.perf_counter()
+        unique_ids = list(dict.fromkeys(photo_ids))
+        photos = self.get_photos_by_ids(unique_ids)
+
+        # Packed thumbnails are left in their pack and reclaimed by pack compaction
+        gcs_paths = [
+            path
+            for photo in photos.values()
+            for path in (photo.original_path, photo.thumbnail_path)
+            if not is_pack_thumbnail_path(path)
+        ]
+        # Deduplicated (content-addressed) objects may still back photos that are not being deleted
+        shared_paths = self.get_referenced_paths(gcs_paths, list(photos))
+        object_results = self.storage_service.delete_files(
+            [path for path in gcs_paths if path not in shared_paths], max_workers=max_workers
+        )
+
+        results: dict[str, dict[str, Any]] = {}
+        deletable_ids = []
+        for photo_id in unique_ids:
+            photo = photos.get(photo_id)
+            if photo is None:
+                results[photo_id] = {"photo_id": photo_id, "success": False, "status": "not_found", "error": None}
+                continue
+
+            errors = [
+                f"{path}: {object_results[path]['error']}"
+                for path in (photo.original_path, photo.thumbnail_path)
+                if path in object_results and object_results[path]["status"] == "error"
+            ]
+            if errors:
+                results[photo_id] = {
+                    "photo_id": photo_id,
+                    "success": False,
+                    "status": "failed",
+                    "error": "; ".join(errors),
+                }
+            else:
+                deletable_ids.append(photo_id)
+
+        deleted_ids = set(self.delete_photos_metadata_bulk(deletable_ids))
+        for photo_id in deletable_ids:
+            if photo_id in deleted_ids:
+                results[photo_id] = {"photo_id": photo_id, "success": True, "status": "deleted", "error": None}
+            else:
+                # Row disappeared between lookup and delete (concurrent deletion)
+                results[photo_id] = {"photo_id": photo_id, "success": False, "status": "not_found", "error": None}
+
+        ordered_results = [results[photo_id] for photo_id in unique_ids]
+        summary = {
+            "total": len(unique_ids),
+            "deleted": sum(1 for r in ordered_results if r["status"] == "deleted"),
+            "not_found": sum(1 for r in ordered_results if r["status"] == "not_found"),
+            "failed": sum(1 for r in ordered_results if r["status"] == "failed"),
+            "results": ordered_results,
+        }
+
+        log_performance(
+            "bulk_delete_photos",
+            time.perf_counter() - start_time,
+            user_id=self.user_id,
+            total=summary["total"],
+            deleted=summary["deleted"],
+            failed=summary["failed"],
+        )
+        log_user_action(self.user_id, "bulk_delete_photos", deleted=summary["deleted"], failed=summary["failed"])
+        return summary
+
+    @staticmethod
+    def _row_to_photo(row: tuple) -> PhotoMetadata:
+        """Build PhotoMetadata from a row of the leading PHOTO_COLUMNS (at least the nine standard ones)."""
+        return PhotoMetadata(**dict(zip(PHOTO_COLUMNS, row, strict=False)))
+
+    @staticmethod
+    def _build_collision_info(existing_photo: PhotoMetadata) -> dict[str, Any]:
+        """Build the collision info dictionary for an existing photo."""
+        return {
+            "existing_photo": existing_photo,
+            "existing_file_info": {
+                "upload_date": existing_photo.uploaded_at,
+                "file_size": existing_photo.file_size,
+                "created_at": existing_photo.created_at,
+                "photo_id": existing_photo.id,
+            },
+            "user_decision": "pending",
+            "warning_shown": False,
+        }
+
     def check_filename_exists(self, filename: str) -> dict | None:
         """
         Check if a photo with the given filename already exists for the user.
@@ -1191,33 +2642,8 @@ class MetadataService:
                     return None
 
                 # Found existing photo
-                row = result[0]
-                existing_photo = PhotoMetadata(
-                    id=row[0],
-                    user_id=row[1],
-                    filename=row[2],
-                    original_path=row[3],
-                    thumbnail_path=row[4],
-                    created_at=row[5],
-                    uploaded_at=row[6],
-                    file_size=row[7],
-                    mime_type=row[8],
-                )
-
-                # Create file info for UI display
-                existing_file_info = {
-                    "upload_date": existing_photo.uploaded_at,
-                    "file_size": existing_photo.file_size,
-                    "created_at": existing_photo.created_at,
-                    "photo_id": existing_photo.id,
-                }
-
-                collision_info = {
-                    "existing_photo": existing_photo,
-                    "existing_file_info": existing_file_info,
-                    "user_decision": "pending",
-                    "warning_shown": False,
-                }
+                collision_info = self._build_collision_info(self._row_to_photo(result[0]))
+                existing_photo = collision_info["existing_photo"]
 
                 logger.info(
                     "filename_collision_detected",
@@ -1241,10 +2667,73 @@ class MetadataService:
             )
             raise MetadataError(f"Failed to check filename collision: {e}") from e
 
+    def check_multiple_filename_exists(self, filenames: list[str]) -> dict[str, dict[str, Any]]:
+        """
+        Check many filenames for collisions with a single query.
+
+        The candidate names are passed as one list parameter and joined against
+        the photos table, so the cost is one round trip regardless of how many
+        files are checked. If several photos share a filename, the most recently
+        uploaded one is reported.
+
+        Args:
+            filenames: Filenames to check for collisions
+
+        Returns:
+            dict: Mapping of colliding filename to collision info (same format as
+                check_filename_exists); filenames without a collision are omitted
+
+        Raises:
+            MetadataError: If collision check fails
+        """
+        if not filenames:
+            return {}
+
+        try:
+            self.ensure_local_database()
+            start_time = time.perf_counter()
+
+            with self.db_manager as db:
+                result = db.execute_query(
+                    """SELECT p.id, p.user_id, p.filename, p.original_path, p.thumbnail_path,
+                              p.created_at, p.uploaded_at, p.file_size, p.mime_type
+                       FROM photos p
+                       JOIN (SELECT DISTINCT UNNEST(?::VARCHAR[]) AS filename) candidates
+                         ON p.filename = candidates.filename
+                       WHERE p.user_id = ?
+                       QUALIFY ROW_NUMBER() OVER (PARTITION BY p.filename ORDER BY p.uploaded_at DESC) = 1""",
+                    (list(filenames), self.user_id),
+                )
+
+            collisions = {row[2]: self._build_collision_info(self._row_to_photo(row)) for row in result}
+
+            log_performance(
+                "check_multiple_filename_exists",
+                time.perf_counter() - start_time,
+                user_id=self.user_id,
+                total_files=len(filenames),
+                collisions_found=len(collisions),
+            )
+            return collisions
+
+        except Exception as e:
+            log_error(
+                e,
+                {
+                    "operation": "check_multiple_filename_exists",
+                    "user_id": self.user_id,
+                    "total_files": len(filenames),
+                },
+            )
+            raise MetadataError(f"Failed to check filename collisions: {e}") from e
+
     def search_photos_by_filename(self, filename_pattern: str, limit: int = 50, offset: int = 0) -> list[PhotoMetadata]:
         """
         Search photos by filename pattern.
 
+        Photos are narrowed down with the search index's trigrams of the
+        pattern's literal parts before the LIKE is checked.
+
         Args:
             filename_pattern: Pattern to search for (supports SQL LIKE patterns)
             limit: Maximum number of photos to return
@@ -1260,14 +2749,20 @@ class MetadataService:
             self.ensure_local_database()
 
             with self.db_manager as db:
+                if self._search_index_stale:
+                    self._refresh_search_index(db)
+                # Without an up-to-date index every photo is checked
+                candidates, candidate_params = (
+                    ("", []) if self._search_index_stale else search_index.build_pattern_filter(filename_pattern)
+                )
                 result = db.execute_query(
-                    """SELECT id, user_id, filename, original_path, thumbnail_path,
-                              created_at, uploaded_at, file_size, mime_type
-                       FROM photos
-                       WHERE user_id = ? AND filename LIKE ?
-                       ORDER BY COALESCE(created_at, uploaded_at) DESC
-                       LIMIT ? OFFSET ?""",
-                    (self.user_id, filename_pattern, limit, offset),
+                    f"""SELECT p.id, p.user_id, p.filename, p.original_path, p.thumbnail_path,
+                               p.created_at, p.uploaded_at, p.file_size, p.mime_type
+                        FROM photos p
+                        WHERE p.user_id = ?{candidates} AND p.filename LIKE ?
+                        ORDER BY COALESCE(p.created_at, p.uploaded_at) DESC
+                        LIMIT ? OFFSET ?""",  # nosec B608
+                    (self.user_id, *candidate_params, filename_pattern, limit, offset),
                 )
 
                 photos = []
@@ -1292,6 +2787,78 @@ class MetadataService:
         except Exception as e:
             raise MetadataError(f"Failed to search photos by filename: {e}") from e
 
+    def search_photos(
+        self, query: str, mode: str = search_index.SUBSTRING, limit: int = 50, offset: int = 0
+    ) -> PhotoPage:
+        """
+        Search photos by filename through the search index, best matches first.
+
+        Unlike search_photos_by_filename, the query is plain text, not a LIKE
+        pattern, and is matched case-insensitively.
+
+        Args:
+            query: Text to search for
+            mode: 'substring' (anywhere in the filename), 'prefix' (words starting
+                with each query word) or 'token' (each query word as a whole word)
+            limit: Maximum number of photos to return
+            offset: Number of photos to skip
+
+        Returns:
+            PhotoPage: Matching photos, ordered by relevance
+
+        Raises:
+            MetadataError: If search fails
+        """
+        try:
+            columns = ", ".join(f"p.{column}" for column in PHOTO_COLUMNS)
+            statement = search_index.build_query(self.user_id, query, mode, columns)
+        except ValueError as e:
+            raise MetadataError(str(e)) from e
+        if statement is None:
+            return PhotoPage.from_rows([])
+
+        try:
+            self.ensure_local_database()
+
+            with self.db_manager as db:
+                if self._search_index_stale:
+                    self._refresh_search_index(db)
+                sql, parameters = statement
+                photos = PhotoPage(db.execute_columns(sql, (*parameters, limit, offset)))
+
+            logger.debug("photos_searched", user_id=self.user_id, mode=mode, results=len(photos))
+            return photos
+
+        except Exception as e:
+            raise MetadataError(f"Failed to search photos: {e}") from e
+
+    def _update_search_index(self, db: DatabaseManager, photo_ids: list[str], deleted: bool = False) -> None:
+        """Index written photos, or drop deleted ones; on failure the next search catches up."""
+        try:
+            if deleted:
+                search_index.remove(db, photo_ids)
+            else:
+                search_index.refresh(db, photo_ids)
+        except Exception as e:
+            self._search_index_stale = True
+            logger.warning("search_index_update_failed", user_id=self.user_id, error=str(e))
+
+    def _refresh_search_index(self, db: DatabaseManager, photo_ids: list[str] | None = None) -> None:
+        """
+        Index photos written behind this service's writes (bootstrap, replayed deltas, rebases).
+
+        Args:
+            db: Local database
+            photo_ids: Photos that may have changed; None checks every photo
+        """
+        try:
+            search_index.refresh(db, photo_ids)
+            if photo_ids is None:
+                self._search_index_stale = False
+        except Exception as e:
+            self._search_index_stale = True
+            logger.warning("search_index_refresh_failed", user_id=self.user_id, error=str(e))
+
     def _check_gcs_database_for_reset(self, local_db_deleted: bool) -> bool:
         """
         Check if GCS database exists for reset operation.
@@ -1366,20 +2933,20 @@ class MetadataService:
             )
             return False
 
-        try:
-            # Download from GCS
-            gcs_data = self.storage_service.download_file(self.gcs_db_path)
+        # The database is replaced, so compare it with GCS again on next use
+        _mark_database_checked(str(self.local_db_path), forget=True)
 
-            # Write to local file
-            with open(self.local_db_path, "wb") as f:
-                f.write(gcs_data)
+        try:
+            # Download the snapshot with its generation and replay the deltas shipped after it
+            if not self._download_from_gcs():
+                return False
 
             logger.info(
                 "database_downloaded_from_gcs",
                 user_id=self.user_id,
                 gcs_path=self.gcs_db_path,
                 local_path=str(self.local_db_path),
-                file_size=len(gcs_data),
+                file_size=self.local_db_path.stat().st_size,
             )
             return True
         except Exception as e:
@@ -1389,6 +2956,9 @@ class MetadataService:
                 gcs_path=self.gcs_db_path,
                 error=str(e),
             )
+            # Start over from an empty database rather than downloading again on reinitialization;
+            # its first sync is rebased onto the GCS snapshot, which it is not based on
+            self._create_new_database()
             return False
 
     def force_reload_from_gcs(self, confirm_reset: bool = False) -> dict[str, Any]:
@@ -1708,28 +3278,133 @@ class MetadataService:
             raise MetadataError(f"Database integrity validation failed: {e}") from e
 
 
+# Local databases kept after their service was released, with every write synced to GCS
+_synced_released_databases: set[Path] = set()
+_synced_released_lock = threading.Lock()
+
+# Bounds of the per-user service registry: instances kept, and idle seconds before one is released
+METADATA_SERVICE_CACHE_SIZE = int(os.getenv("METADATA_SERVICE_CACHE_SIZE", "64"))
+METADATA_SERVICE_IDLE_SECONDS = float(os.getenv("METADATA_SERVICE_IDLE_SECONDS", "1800"))
+# Whether a released service deletes its local database file
+METADATA_SERVICE_EVICT_DELETES_DB = os.getenv("METADATA_SERVICE_EVICT_DELETES_DB", "true").lower() == "true"
+
+
+def _release_metadata_service(service: MetadataService) -> None:
+    """Sync a service's outstanding writes, then close its database."""
+    synced = get_sync_scheduler().remove(service)
+    # A database with unsynced writes is kept, so that its next service ships them
+    service.cleanup_local_database(delete_file=METADATA_SERVICE_EVICT_DELETES_DB and synced)
+    with _synced_released_lock:
+        if synced and service.local_db_path.exists():
+            _synced_released_databases.add(service.local_db_path)
+        else:
+            _synced_released_databases.discard(service.local_db_path)
+
+
 # Global metadata service instances
-_metadata_services: dict[str, MetadataService] = {}
+_metadata_services: ServiceRegistry[MetadataService] = ServiceRegistry(
+    "metadata_services",
+    lambda user_id, temp_dir: MetadataService(user_id, temp_dir),
+    _release_metadata_service,
+    max_size=METADATA_SERVICE_CACHE_SIZE,
+    idle_ttl=METADATA_SERVICE_IDLE_SECONDS,
+)
 
 
-def get_metadata_service(user_id: str, temp_dir: str = "/tmp") -> MetadataService:  # nosec B108
+def get_metadata_service(user_id: str, temp_dir: str | None = None) -> MetadataService:
     """
     Get metadata service instance for a user.
 
+    At most METADATA_SERVICE_CACHE_SIZE services are kept; the least recently
+    used one, and any not requested for METADATA_SERVICE_IDLE_SECONDS, is
+    released: its pending sync is flushed and its database closed.
+
     Args:
         user_id: User identifier
-        temp_dir: Temporary directory for local database files
+        temp_dir: Temporary directory for local database files (used when the service is created;
+            default: METADATA_CACHE_DIR)
 
     Returns:
         MetadataService: Metadata service instance
     """
-    if user_id not in _metadata_services:
-        _metadata_services[user_id] = MetadataService(user_id, temp_dir)
-    return _metadata_services[user_id]
+    service = _metadata_services.get(user_id, temp_dir or METADATA_CACHE_DIR)
+    _database_cache.touch(service.local_db_path)
+    return service
+
+
+def evict_idle_metadata_services() -> int:
+    """
+    Release metadata services that have been idle for longer than the TTL.
+
+    Returns:
+        int: Number of released services
+    """
+    return _metadata_services.evict_idle()
+
+
+def get_metadata_service_stats() -> dict[str, Any]:
+    """
+    Get metadata service registry statistics.
+
+    Returns:
+        dict: Registry size, bounds, and hit, miss, eviction and expiration counters
+    """
+    return _metadata_services.get_stats()
+
+
+def _evict_cached_database(db_path: Path) -> bool:
+    """
+    Release the service of a cached database and delete its file, unless it has unsynced writes.
+
+    Args:
+        db_path: Local database file
+
+    Returns:
+        bool: True if the file was deleted
+    """
+    for service in _metadata_services.values():
+        if service.local_db_path == db_path:
+            _metadata_services.remove(service.user_id)
+            break
+
+    with _synced_released_lock:
+        if db_path.exists() and db_path not in _synced_released_databases:
+            # Unsynced, or left by an earlier process and of unknown state
+            return False
+        _synced_released_databases.discard(db_path)
+        db_path.unlink(missing_ok=True)
+        db_path.with_name(f"{db_path.name}.wal").unlink(missing_ok=True)
+    _mark_database_checked(str(db_path), forget=True)
+    _database_cache.forget(db_path)
+    return True
+
+
+def enforce_database_cache_quota(protect: Iterable[str | Path] = ()) -> int:
+    """
+    Evict the least recently used local databases until they fit METADATA_CACHE_QUOTA_MB.
+
+    Evicting a database releases its service, which syncs outstanding writes
+    first; databases that still have unsynced writes are kept.
+
+    Args:
+        protect: Databases that must not be evicted
+
+    Returns:
+        int: Number of evicted databases
+    """
+    return _database_cache.enforce(_evict_cached_database, protect)
+
+
+def get_database_cache_usage() -> dict[str, Any]:
+    """
+    Get usage of the local database cache directory.
+
+    Returns:
+        dict: Cache directory, quota and used bytes, database count and eviction counters
+    """
+    return _database_cache.usage()
 
 
 def cleanup_metadata_services() -> None:
     """Clean up all metadata service instances."""
-    for service in _metadata_services.values():
-        service.cleanup_local_database()
     _metadata_services.clear()
@@ -0,0 +1,170 @@
+"""
+Orphan reconciliation between GCS photo objects and the photos table.
+
+Uploads store the original first, then the thumbnail, then the metadata row.
+A failure part way through leaves objects in GCS that no row references, and
+overwrites that change a file's extension can leave stale thumbnails behind.
+This module finds those orphans and optionally deletes them.
+
+The object listing under photos/{user_id}/ is streamed page by page, the set
+difference against the photos table is computed in a single DuckDB query, and
+deletions are issued in parallel batches.
+"""
+
+import os
+import time
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from ..logging_config import get_logger, log_performance, log_user_action
+from .metadata import MetadataService, get_metadata_service
+from .storage import StorageService, get_storage_service
+
+logger = get_logger(__name__)
+
+# Prefixes below photos/{user_id}/ that hold photo objects
+PHOTO_PREFIXES = ("original/", "thumbs/")
+
+# Objects listed per list request (GCS maximum)
+OBJECTS_PER_LIST_REQUEST = 1000
+
+
+class ReconciliationService:
+    """
+    Find and remove GCS photo objects that have no photos row.
+
+    Objects updated within the grace period are never reported, so uploads that
+    are still in flight (object written, row not yet saved) are left alone.
+    """
+
+    def __init__(
+        self,
+        user_id: str,
+        storage_service: StorageService | None = None,
+        metadata_service: MetadataService | None = None,
+    ):
+        """
+        Initialize reconciliation for a specific user.
+
+        Args:
+            user_id: User identifier
+            storage_service: Storage service to use (defaults to the global instance)
+            metadata_service: Metadata service to use (defaults to the user's global instance)
+        """
+        self.user_id = user_id
+        self.storage_service = storage_service or get_storage_service()
+        self.metadata_service = metadata_service or get_metadata_service(user_id)
+
+        # Pricing used for cost estimates (USD), overridable for other regions/classes
+        self.storage_price_per_gb_month = float(os.getenv("GCS_STORAGE_PRICE_PER_GB_MONTH", "0.023"))
+        self.class_a_price_per_10k = float(os.getenv("GCS_CLASS_A_PRICE_PER_10K", "0.05"))
+
+    def _iter_candidates(self, cutoff: datetime, stats: dict[str, int]) -> Iterator[dict]:
+        """Stream listed objects, skipping those newer than the cutoff."""
+        for info in self.storage_service.iter_user_files_parallel(self.user_id, PHOTO_PREFIXES):
+            stats["scanned_objects"] += 1
+            stats["scanned_bytes"] += info.get("size") or 0
+
+            updated = info.get("updated")
+            if updated is not None and updated > cutoff:
+                stats["skipped_recent"] += 1
+                continue
+
+            yield info
+
+    def estimate_costs(self, scanned_objects: int, orphan_bytes: int) -> dict[str, Any]:
+        """
+        Estimate the cost of a reconciliation run and the savings from deleting orphans.
+
+        Listing is billed as Class A operations (one per page of objects per prefix);
+        deletes are free.
+
+        Args:
+            scanned_objects: Number of objects listed
+            orphan_bytes: Total size of orphaned objects
+
+        Returns:
+            dict: Request counts and USD estimates
+        """
+        list_requests = max(len(PHOTO_PREFIXES), -(-scanned_objects // OBJECTS_PER_LIST_REQUEST))
+        orphan_gb = orphan_bytes / (1024**3)
+
+        return {
+            "list_requests": list_requests,
+            "list_cost_usd": round(list_requests * self.class_a_price_per_10k / 10_000, 6),
+            "delete_cost_usd": 0.0,
+            "orphan_gb": round(orphan_gb, 4),
+            "monthly_storage_savings_usd": round(orphan_gb * self.storage_price_per_gb_month, 4),
+        }
+
+    def reconcile(
+        self,
+        dry_run: bool = True,
+        grace_period_minutes: int = 60,
+        batch_size: int = 500,
+        max_workers: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Find orphaned objects and delete them unless running in dry-run mode.
+
+        Args:
+            dry_run: Only report orphans without deleting them
+            grace_period_minutes: Ignore objects updated more recently than this
+            batch_size: Number of objects deleted per batch
+            max_workers: Maximum concurrent delete requests within a batch
+
+        Returns:
+            dict: Report with scan counts, orphans, deletion results and cost estimates
+
+        Raises:
+            StorageError: If listing fails
+            MetadataError: If the database comparison fails
+        """
+        start_time = time.perf_counter()
+        cutoff = datetime.now(UTC) - timedelta(minutes=grace_period_minutes)
+        stats = {"scanned_objects": 0, "scanned_bytes": 0, "skipped_recent": 0}
+
+        orphans = self.metadata_service.find_unreferenced_objects(self._iter_candidates(cutoff, stats))
+        orphan_bytes = sum(orphan["size"] for orphan in orphans)
+
+        deleted = 0
+        failed: list[dict[str, Any]] = []
+        if not dry_run:
+            for i in range(0, len(orphans), batch_size):
+                batch = [orphan["name"] for orphan in orphans[i : i + batch_size]]
+                results = self.storage_service.delete_files(batch, max_workers=max_workers)
+                for path, result in results.items():
+                    if result["status"] == "error":
+                        failed.append({"name": path, "error": result["error"]})
+                    else:
+                        deleted += 1
+
+        duration = time.perf_counter() - start_time
+        report = {
+            "user_id": self.user_id,
+            "dry_run": dry_run,
+            **stats,
+            "orphan_count": len(orphans),
+            "orphan_bytes": orphan_bytes,
+            "orphans": orphans,
+            "deleted": deleted,
+            "failed": failed,
+            "cost_estimate": self.estimate_costs(stats["scanned_objects"], orphan_bytes),
+            "duration_seconds": round(duration, 3),
+        }
+
+        log_performance(
+            "orphan_reconciliation",
+            duration,
+            user_id=self.user_id,
+            dry_run=dry_run,
+            scanned_objects=stats["scanned_objects"],
+            orphan_count=len(orphans),
+            deleted=deleted,
+            failed=len(failed),
+        )
+        if not dry_run:
+            log_user_action(self.user_id, "orphan_objects_deleted", deleted=deleted, failed=len(failed))
+
+        return report
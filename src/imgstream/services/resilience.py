@@ -0,0 +1,488 @@
+"""
+Latency budgets, retries, hedged requests and circuit breaking for Google Cloud Storage.
+
+A single slow GCS request used to stall a whole Streamlit rerun, because reads
+ran once with the client library's default retry settings. ResilientReader
+wraps a read with:
+
+- a per-operation deadline that bounds the total time spent, including retries
+- retries of transient errors with jittered exponential backoff
+- an optional hedged duplicate request, issued when the first one is slower
+  than the recently observed p95 latency of the same operation
+
+Retry and hedge counters are kept per operation so the settings can be tuned
+from real traffic (see StorageService.get_read_stats()).
+
+CircuitBreaker stops sending requests while GCS is failing: once the failure
+rate over a sliding window crosses a threshold, calls fail immediately with
+CircuitOpenError for a cool-down period, after which a limited number of probe
+calls decide whether to close the circuit again. The UI uses this to render
+cached URLs or placeholders instead of waiting out a timeout per gallery cell.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+import google.auth.exceptions
+import requests
+from google.api_core import exceptions as api_exceptions
+
+from imgstream.ui.handlers.error import StorageError
+from ..logging_config import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Errors worth retrying: throttling, server-side failures and broken connections
+RETRYABLE_ERRORS: tuple[type[BaseException], ...] = (
+    api_exceptions.TooManyRequests,
+    api_exceptions.InternalServerError,
+    api_exceptions.BadGateway,
+    api_exceptions.ServiceUnavailable,
+    api_exceptions.GatewayTimeout,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    ConnectionError,
+    TimeoutError,
+)
+
+# Latency samples kept per operation for the hedge delay quantile
+LATENCY_WINDOW = 200
+
+# Samples required before the observed quantile replaces the configured minimum delay
+MIN_LATENCY_SAMPLES = 20
+
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when an operation does not finish within its latency budget."""
+
+
+class CircuitOpenError(StorageError):
+    """Raised instead of calling GCS while the circuit breaker is open."""
+
+    def __init__(self, message: str = "Storage is temporarily unavailable", retry_after: float = 0.0):
+        super().__init__(message, details={"retry_after": retry_after})
+        self.retry_after = retry_after
+
+
+@dataclass
+class ReadPolicy:
+    """Deadline, retry and hedging settings for one kind of read."""
+
+    deadline: float = 30.0
+    max_attempts: int = 3
+    initial_backoff: float = 0.1
+    max_backoff: float = 2.0
+    backoff_multiplier: float = 2.0
+    hedge: bool = True
+    hedge_quantile: float = 0.95
+    min_hedge_delay: float = 0.2
+
+    @classmethod
+    def from_env(cls, prefix: str = "GCS_READ", **defaults: Any) -> "ReadPolicy":
+        """
+        Build a policy from environment variables.
+
+        Args:
+            prefix: Variable prefix, e.g. GCS_READ reads GCS_READ_DEADLINE_SECONDS
+            **defaults: Defaults overriding the class defaults for this policy
+
+        Returns:
+            ReadPolicy: Configured policy
+        """
+        base = cls(**defaults)
+        return cls(
+            deadline=float(os.getenv(f"{prefix}_DEADLINE_SECONDS", str(base.deadline))),
+            max_attempts=max(int(os.getenv(f"{prefix}_MAX_ATTEMPTS", str(base.max_attempts))), 1),
+            initial_backoff=float(os.getenv(f"{prefix}_INITIAL_BACKOFF_SECONDS", str(base.initial_backoff))),
+            max_backoff=float(os.getenv(f"{prefix}_MAX_BACKOFF_SECONDS", str(base.max_backoff))),
+            backoff_multiplier=base.backoff_multiplier,
+            hedge=os.getenv(f"{prefix}_HEDGE", str(base.hedge)).lower() == "true",
+            hedge_quantile=float(os.getenv(f"{prefix}_HEDGE_QUANTILE", str(base.hedge_quantile))),
+            min_hedge_delay=float(os.getenv(f"{prefix}_MIN_HEDGE_DELAY_SECONDS", str(base.min_hedge_delay))),
+        )
+
+    def backoff(self, retry_number: int) -> float:
+        """
+        Get the sleep before a retry using exponential backoff with full jitter.
+
+        Args:
+            retry_number: 1 for the first retry, 2 for the second, ...
+
+        Returns:
+            float: Seconds to sleep
+        """
+        ceiling = min(self.max_backoff, self.initial_backoff * self.backoff_multiplier ** (retry_number - 1))
+        return random.uniform(0, ceiling)  # nosec B311 - jitter, not cryptography
+
+
+class ResilientReader:
+    """Run read operations under a ReadPolicy and keep per-operation statistics."""
+
+    def __init__(self, max_workers: int = 32):
+        """
+        Initialize the reader.
+
+        Args:
+            max_workers: Threads available for in-flight attempts (primary and hedged)
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gcs-read")
+        self._lock = threading.Lock()
+        self._latencies: dict[str, deque[float]] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def _record(self, operation: str, **increments: int) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                operation,
+                {
+                    "calls": 0,
+                    "attempts": 0,
+                    "retries": 0,
+                    "hedges": 0,
+                    "hedge_wins": 0,
+                    "deadline_exceeded": 0,
+                    "failures": 0,
+                },
+            )
+            for key, value in increments.items():
+                stats[key] += value
+
+    def _record_latency(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(operation, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def latency_quantile(self, operation: str, quantile: float) -> float | None:
+        """
+        Get a quantile of recent successful attempt latencies.
+
+        Args:
+            operation: Operation name
+            quantile: Quantile between 0 and 1
+
+        Returns:
+            float: Latency in seconds, or None while there are too few samples
+        """
+        with self._lock:
+            samples = sorted(self._latencies.get(operation, ()))
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        return samples[min(int(len(samples) * quantile), len(samples) - 1)]
+
+    def hedge_delay(self, operation: str, policy: ReadPolicy) -> float:
+        """Get how long to wait for the primary attempt before sending a hedged duplicate."""
+        observed = self.latency_quantile(operation, policy.hedge_quantile)
+        return max(observed or 0.0, policy.min_hedge_delay)
+
+    def _timed(self, operation: str, func: Callable[[float], T], timeout: float) -> T:
+        start = time.perf_counter()
+        result = func(timeout)
+        self._record_latency(operation, time.perf_counter() - start)
+        return result
+
+    def _attempt(self, operation: str, func: Callable[[float], T], policy: ReadPolicy, deadline_at: float) -> T:
+        """Run one attempt, racing a hedged duplicate against a slow primary."""
+        remaining = deadline_at - time.monotonic()
+        primary = self._executor.submit(self._timed, operation, func, remaining)
+        pending: set[Future[T]] = {primary}
+
+        if policy.hedge:
+            delay = min(self.hedge_delay(operation, policy), remaining)
+            done, _ = wait(pending, timeout=delay)
+            if not done:
+                hedged = self._executor.submit(self._timed, operation, func, deadline_at - time.monotonic())
+                pending.add(hedged)
+                self._record(operation, hedges=1)
+                logger.debug("gcs_read_hedged", operation=operation, delay=round(delay, 3))
+
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, timeout=max(deadline_at - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self._record(operation, hedge_wins=1)
+                    return future.result()
+                error = future.exception()
+
+        if error is not None and not pending:
+            raise error
+        raise DeadlineExceededError(f"{operation} exceeded its {policy.deadline:.1f}s deadline")
+
+    def call(self, operation: str, func: Callable[[float], T], policy: ReadPolicy) -> T:
+        """
+        Run a read under the policy's deadline, retry and hedging rules.
+
+        Args:
+            operation: Operation name used for statistics and hedge latency tracking
+            func: The read; receives the remaining time budget in seconds as its timeout
+            policy: Policy to apply
+
+        Returns:
+            The read's result
+
+        Raises:
+            DeadlineExceededError: If the deadline passes before any attempt succeeds
+            Exception: The last error if it is not retryable or attempts are exhausted
+        """
+        deadline_at = time.monotonic() + policy.deadline
+        self._record(operation, calls=1)
+
+        for attempt in range(1, policy.max_attempts + 1):
+            self._record(operation, attempts=1)
+            try:
+                return self._attempt(operation, func, policy, deadline_at)
+            except DeadlineExceededError:
+                self._record(operation, deadline_exceeded=1, failures=1)
+                logger.warning("gcs_read_deadline_exceeded", operation=operation, deadline=policy.deadline)
+                raise
+            except RETRYABLE_ERRORS as e:
+                sleep = policy.backoff(attempt)
+                if attempt >= policy.max_attempts or time.monotonic() + sleep >= deadline_at:
+                    self._record(operation, failures=1)
+                    raise
+                self._record(operation, retries=1)
+                logger.info("gcs_read_retry", operation=operation, attempt=attempt, sleep=round(sleep, 3), error=str(e))
+                time.sleep(sleep)
+            except Exception:
+                self._record(operation, failures=1)
+                raise
+
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Get per-operation counters and latency quantiles.
+
+        Returns:
+            dict: {operation: {'calls', 'attempts', 'retries', 'hedges', 'hedge_wins',
+                'deadline_exceeded', 'failures', 'p50_seconds', 'p95_seconds'}}
+        """
+        with self._lock:
+            operations: dict[str, dict[str, Any]] = {name: dict(stats) for name, stats in self._stats.items()}
+        for name, stats in operations.items():
+            stats["p50_seconds"] = self.latency_quantile(name, 0.5)
+            stats["p95_seconds"] = self.latency_quantile(name, 0.95)
+        return operations
+
+    def reset_stats(self) -> None:
+        """Clear counters and latency samples."""
+        with self._lock:
+            self._stats.clear()
+            self._latencies.clear()
+
+
+# Errors that indicate GCS is unhealthy; anything else (e.g. NotFound) is a healthy answer
+BREAKER_FAILURE_ERRORS: tuple[type[BaseException], ...] = RETRYABLE_ERRORS + (
+    DeadlineExceededError,
+    google.auth.exceptions.TransportError,
+)
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker with a half-open probe state.
+
+    CLOSED: calls pass through; outcomes are recorded in a sliding time window.
+    OPEN: calls fail fast with CircuitOpenError until open_seconds have passed.
+    HALF_OPEN: up to half_open_max_calls probes pass through; a success closes
+    the circuit, a failure opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str = "gcs",
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 10,
+        window_seconds: float = 60.0,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            name: Name used in logs and errors
+            failure_rate_threshold: Failure ratio in the window that opens the circuit
+            minimum_calls: Calls required in the window before the rate is evaluated
+            window_seconds: Length of the sliding outcome window
+            open_seconds: Time the circuit stays open before probing
+            half_open_max_calls: Concurrent probe calls allowed while half-open
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._rejected = 0
+        self._times_opened = 0
+
+    @classmethod
+    def from_env(cls, prefix: str = "GCS_CIRCUIT", name: str = "gcs") -> "CircuitBreaker":
+        """
+        Build a circuit breaker from environment variables.
+
+        Args:
+            prefix: Variable prefix, e.g. GCS_CIRCUIT reads GCS_CIRCUIT_FAILURE_RATE
+            name: Breaker name
+
+        Returns:
+            CircuitBreaker: Configured breaker
+        """
+        return cls(
+            name=name,
+            failure_rate_threshold=float(os.getenv(f"{prefix}_FAILURE_RATE", "0.5")),
+            minimum_calls=int(os.getenv(f"{prefix}_MIN_CALLS", "10")),
+            window_seconds=float(os.getenv(f"{prefix}_WINDOW_SECONDS", "60")),
+            open_seconds=float(os.getenv(f"{prefix}_OPEN_SECONDS", "30")),
+            half_open_max_calls=int(os.getenv(f"{prefix}_HALF_OPEN_MAX_CALLS", "1")),
+        )
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from OPEN to HALF_OPEN once the cool-down has passed."""
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+            logger.info("circuit_half_open", breaker=self.name)
+        return self._state
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+        self._times_opened += 1
+        logger.warning("circuit_opened", breaker=self.name, open_seconds=self.open_seconds)
+
+    def _before_call(self) -> bool:
+        """Admit or reject a call; returns True if the call is a half-open probe."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+
+            self._rejected += 1
+            retry_after = max(self.open_seconds - (now - self._opened_at), 0.0) if state == OPEN else 0.0
+        raise CircuitOpenError(f"Circuit '{self.name}' is open; storage is temporarily unavailable", retry_after)
+
+    def _after_call(self, probe: bool, success: bool) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if probe:
+                self._probes_in_flight -= 1
+                if success:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    logger.info("circuit_closed", breaker=self.name)
+                else:
+                    self._open(now)
+                return
+
+            if self._state != CLOSED:
+                return
+            self._outcomes.append((now, success))
+            while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+                self._outcomes.popleft()
+
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if (
+                len(self._outcomes) >= self.minimum_calls
+                and failures / len(self._outcomes) >= self.failure_rate_threshold
+            ):
+                self._open(now)
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """
+        Run the enclosed block as one guarded call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open (the block is not executed)
+        """
+        probe = self._before_call()
+        try:
+            yield
+        except BREAKER_FAILURE_ERRORS:
+            self._after_call(probe, success=False)
+            raise
+        except BaseException:
+            self._after_call(probe, success=True)
+            raise
+        self._after_call(probe, success=True)
+
+    def call(self, func: Callable[[], T]) -> T:
+        """
+        Call a function through the breaker.
+
+        Args:
+            func: Function to call
+
+        Returns:
+            The function's result
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        with self.guard():
+            return func()
+
+    def get_status(self) -> dict[str, Any]:
+        """
+        Get the breaker state and window statistics.
+
+        Returns:
+            dict: 'state', 'failure_rate', 'window_calls', 'rejected_calls', 'times_opened', 'retry_after'
+        """
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            calls = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                "name": self.name,
+                "state": state,
+                "failure_rate": failures / calls if calls else 0.0,
+                "window_calls": calls,
+                "rejected_calls": self._rejected,
+                "times_opened": self._times_opened,
+                "retry_after": max(self.open_seconds - (now - self._opened_at), 0.0) if state == OPEN else 0.0,
+            }
+
+    def reset(self) -> None:
+        """Close the circuit and forget recorded outcomes."""
+        with self._lock:
+            self._state = CLOSED
+            self._outcomes.clear()
+            self._probes_in_flight = 0
@@ -0,0 +1,252 @@
+"""
+Trigram and token index for searching photos by filename.
+
+A LIKE '%term%' filter has to read and compare every filename of the user, and
+gives no notion of which match is best. The search index stores, per photo,
+the distinct trigrams and the words of its searchable text (search_terms), so
+that a query only verifies the photos that contain every trigram (substring
+search) or word (token and prefix search) of the query, and ranks them.
+
+The searchable text of a photo is built from SEARCH_FIELDS, lowercased; adding
+a text column to it indexes that column too. search_documents records the
+hash of each photo's indexed text. Writes index the photos they touch, and
+refresh() brings the index up to date after changes that bypass those writes
+(bootstrap downloads, replayed delta segments, rebases) by re-indexing exactly
+the photos whose text hash differs; it runs once after each such change, not
+on every search. The index is derived data: it is not part of the synced
+change log and can always be rebuilt from the photos table.
+
+LIKE patterns (search_photos_by_filename) use the same trigrams to narrow the
+photos the pattern is checked against (build_pattern_filter).
+"""
+
+import re
+from typing import Any
+
+from ..logging_config import get_logger
+from ..models.database import DatabaseManager
+from ..models.schema import get_search_index_statements
+
+logger = get_logger(__name__)
+
+# Photo columns whose text is searchable
+SEARCH_FIELDS = ("filename",)
+
+# Search modes
+SUBSTRING = "substring"
+PREFIX = "prefix"
+TOKEN = "token"
+SEARCH_MODES = (SUBSTRING, PREFIX, TOKEN)
+
+# Length of the n-grams used for substring search; shorter queries scan instead
+NGRAM = 3
+
+# Kinds of indexed terms
+NGRAM_TERM = "g"
+WORD_TERM = "w"
+
+# Characters that separate words; DuckDB's regexp engine (RE2) knows the Unicode classes
+WORD_SEPARATOR = r"[^\p{L}\p{N}]+"
+_WORD_SEPARATOR_RE = re.compile(r"[\W_]+")
+
+# Upper bound of every string starting with a given prefix
+_MAX_CHAR = chr(0x10FFFF)
+
+# Searchable text of the photo aliased p
+DOCUMENT = f"lower(concat_ws(' ', {', '.join(f'p.{field}' for field in SEARCH_FIELDS)}))"
+
+
+def _execute(db: DatabaseManager, query: str, parameters: tuple | None = None) -> list[tuple]:
+    """Run an index statement on the manager's connection, as its schema methods do."""
+    result = db.connect().execute(query, parameters) if parameters else db.connect().execute(query)
+    return result.fetchall()
+
+
+def ensure_search_index_tables(db: DatabaseManager) -> None:
+    """
+    Create the search index tables if missing.
+
+    Args:
+        db: Database to prepare
+    """
+    for statement in get_search_index_statements():
+        _execute(db, statement)
+
+
+def _scope(photo_ids: list[str] | None, column: str) -> tuple[str, tuple]:
+    if photo_ids is None:
+        return "", ()
+    return f" AND {column} IN (SELECT unnest(?::VARCHAR[]))", (photo_ids,)
+
+
+def refresh(db: DatabaseManager, photo_ids: list[str] | None = None) -> int:
+    """
+    Re-index photos whose searchable text changed, and drop deleted photos.
+
+    Args:
+        db: Database to update
+        photo_ids: Photos to check, e.g. the ones just written; None checks every photo
+
+    Returns:
+        int: Number of photos (re-)indexed
+    """
+    ensure_search_index_tables(db)
+    stale_scope, stale_params = _scope(photo_ids, "d.photo_id")
+    new_scope, new_params = _scope(photo_ids, "p.id")
+
+    stale = f"""SELECT d.photo_id FROM search_documents d
+                LEFT JOIN photos p ON p.id = d.photo_id
+                WHERE (p.id IS NULL OR d.doc_hash <> hash({DOCUMENT})){stale_scope}"""  # nosec B608
+    documents = f"""SELECT p.id AS photo_id, {DOCUMENT} AS doc FROM photos p
+                    WHERE p.id NOT IN (SELECT photo_id FROM search_documents){new_scope}"""  # nosec B608
+
+    with db.transaction():
+        _execute(db, f"DELETE FROM search_terms WHERE photo_id IN ({stale})", stale_params)  # nosec B608
+        _execute(db, f"DELETE FROM search_documents WHERE photo_id IN ({stale})", stale_params)  # nosec B608
+        indexed: int = _execute(db, f"SELECT COUNT(*) FROM ({documents})", new_params)[0][0]  # nosec B608
+        if indexed:
+            _execute(
+                db,
+                f"""INSERT INTO search_terms
+                    SELECT DISTINCT photo_id, '{NGRAM_TERM}', substr(doc, i, {NGRAM})
+                    FROM (SELECT photo_id, doc, unnest(range(1, length(doc) - {NGRAM - 2})) AS i FROM ({documents}))
+                    UNION
+                    SELECT photo_id, '{WORD_TERM}', word
+                    FROM (SELECT photo_id, unnest(regexp_split_to_array(doc, '{WORD_SEPARATOR}')) AS word
+                          FROM ({documents}))
+                    WHERE word <> ''""",  # nosec B608
+                new_params * 2,
+            )
+            _execute(db, f"INSERT INTO search_documents SELECT photo_id, hash(doc) FROM ({documents})", new_params)
+
+    if indexed:
+        logger.debug("search_index_refreshed", indexed=indexed, scoped=photo_ids is not None)
+    return indexed
+
+
+def remove(db: DatabaseManager, photo_ids: list[str]) -> None:
+    """
+    Drop photos from the index.
+
+    Args:
+        db: Database to update
+        photo_ids: Deleted photos
+    """
+    if not photo_ids:
+        return
+    ensure_search_index_tables(db)
+    with db.transaction():
+        for table in ("search_terms", "search_documents"):
+            _execute(
+                db, f"DELETE FROM {table} WHERE photo_id IN (SELECT unnest(?::VARCHAR[]))", (photo_ids,)  # nosec B608
+            )
+
+
+def _ngrams(text: str) -> list[str]:
+    return sorted({text[i : i + NGRAM] for i in range(len(text) - NGRAM + 1)})
+
+
+def build_pattern_filter(pattern: str) -> tuple[str, list[Any]]:
+    """
+    Build a candidate filter for a LIKE pattern on the filename.
+
+    The candidates are the photos holding every trigram of the pattern's
+    literal parts, lowercased; the caller still applies the LIKE itself, so
+    the filter only narrows the photos it is checked against.
+
+    Args:
+        pattern: SQL LIKE pattern ('%' and '_' wildcards)
+
+    Returns:
+        tuple: (' AND p.id IN (...)' clause, parameters), or ('', []) if no
+            literal part is long enough to use the index
+    """
+    grams = sorted({gram for part in re.split(r"[%_]", pattern.lower()) for gram in _ngrams(part)})
+    if not grams:
+        return "", []
+    lookup = f"SELECT photo_id FROM search_terms WHERE kind = '{NGRAM_TERM}' AND term = ?"
+    return f" AND p.id IN ({' INTERSECT '.join([lookup] * len(grams))})", grams
+
+
+def build_query(user_id: str, query: str, mode: str, columns: str) -> tuple[str, list[Any]] | None:
+    """
+    Build the ranked search statement for a query.
+
+    Candidates come from the index: photos holding every trigram of the query
+    (substring), every query word as a word (token), or a word starting with
+    every query word (prefix). Substring candidates are then verified against
+    the text itself. Matches are ranked: the exact text first, then texts
+    starting with the query, a whole word equal to, then starting with, the
+    first query word, and other matches; ties go to shorter, then newer photos.
+
+    Args:
+        user_id: Owner of the photos
+        query: Search text
+        mode: One of SEARCH_MODES
+        columns: Photo columns to select, qualified with 'p.'
+
+    Returns:
+        tuple: (SQL, parameters) expecting LIMIT and OFFSET to be appended to the
+            parameters, or None if the query has nothing to search for
+
+    Raises:
+        ValueError: If mode is unknown
+    """
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{mode}', expected one of {', '.join(SEARCH_MODES)}")
+
+    text = query.strip().lower()
+    words = [word for word in _WORD_SEPARATOR_RE.split(text) if word]
+    if not text or (mode != SUBSTRING and not words):
+        return None
+
+    lookups: list[str] = []
+    parameters: list[Any] = [user_id]
+    if mode == SUBSTRING:
+        for gram in _ngrams(text):
+            lookups.append(f"SELECT photo_id FROM search_terms WHERE kind = '{NGRAM_TERM}' AND term = ?")
+            parameters.append(gram)
+    elif mode == TOKEN:
+        for word in dict.fromkeys(words):
+            lookups.append(f"SELECT photo_id FROM search_terms WHERE kind = '{WORD_TERM}' AND term = ?")
+            parameters.append(word)
+    else:
+        for word in dict.fromkeys(words):
+            lookups.append(f"SELECT photo_id FROM search_terms WHERE kind = '{WORD_TERM}' AND term >= ? AND term < ?")
+            parameters.extend([word, word + _MAX_CHAR])
+
+    # A substring shorter than a trigram has no index entry; its matches are found by the check below
+    candidates = f" AND p.id IN ({' INTERSECT '.join(lookups)})" if lookups else ""
+    verify = f" AND contains({DOCUMENT}, ?)" if mode == SUBSTRING else ""
+    if verify:
+        parameters.append(text)
+
+    first_word = words[0] if words else text
+    parameters.extend([text, text, first_word, first_word])
+    sql = f"""SELECT {columns} FROM photos p
+              WHERE p.user_id = ?{candidates}{verify}
+              ORDER BY CASE WHEN {DOCUMENT} = ? THEN 5
+                            WHEN starts_with({DOCUMENT}, ?) THEN 4
+                            WHEN list_contains(regexp_split_to_array({DOCUMENT}, '{WORD_SEPARATOR}'), ?) THEN 3
+                            WHEN list_bool_or(list_transform(regexp_split_to_array({DOCUMENT}, '{WORD_SEPARATOR}'),
+                                                             w -> starts_with(w, ?))) THEN 2
+                            ELSE 1 END DESC,
+                       length({DOCUMENT}), p.sort_ts DESC NULLS LAST, p.id DESC
+              LIMIT ? OFFSET ?"""  # nosec B608
+    return sql, parameters
+
+
+def get_stats(db: DatabaseManager) -> dict[str, Any]:
+    """
+    Get index size statistics.
+
+    Args:
+        db: Database to inspect
+
+    Returns:
+        dict: 'documents', 'trigrams' and 'words' rows
+    """
+    ensure_search_index_tables(db)
+    counts = dict(_execute(db, "SELECT kind, COUNT(*) FROM search_terms GROUP BY kind"))
+    documents = _execute(db, "SELECT COUNT(*) FROM search_documents")[0][0]
+    return {"documents": documents, "trigrams": counts.get(NGRAM_TERM, 0), "words": counts.get(WORD_TERM, 0)}
@@ -0,0 +1,210 @@
+"""
+Bounded registry of per-user service instances.
+
+A MetadataService holds an open DuckDB connection and a database file in the
+temp directory, so keeping one for every user ever seen leaks file handles and
+tmpfs memory on a long-running instance. A ServiceRegistry keeps at most
+max_size instances in least-recently-used order and releases instances that
+have not been requested for idle_ttl seconds. Expired instances are found
+lazily, whenever the registry is used, so no background thread is needed.
+
+Instances are created and released outside the registry lock: creating one may
+download a database and releasing one may flush a sync to GCS, and neither
+should block lookups for other users. Concurrent first requests for the same
+key still create a single instance.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+from ..logging_config import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class ServiceRegistry(Generic[T]):
+    """Thread-safe LRU map of service instances with an idle TTL."""
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[..., T],
+        release: Callable[[T], Any],
+        max_size: int,
+        idle_ttl: float,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            name: Name used in logs and statistics
+            factory: Creates the instance for a key, called as factory(key, *args)
+            release: Releases an evicted or removed instance
+            max_size: Maximum number of instances kept; 0 or less keeps any number
+            idle_ttl: Seconds since an instance was last requested before it is evicted;
+                0 or less disables idle eviction
+        """
+        self.name = name
+        self.factory = factory
+        self.release = release
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._lock = threading.Lock()
+        # key -> (instance, last request time), least recently used first
+        self._entries: OrderedDict[Hashable, tuple[T, float]] = OrderedDict()
+        self._creating: dict[Hashable, threading.Event] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: Hashable, *args: Any) -> T:
+        """
+        Get the instance for key, creating it if it is not registered.
+
+        Args:
+            key: Instance key
+            *args: Further factory arguments, used only if the instance is created
+
+        Returns:
+            The registered instance
+        """
+        while True:
+            with self._lock:
+                evicted = self._collect_expired(time.monotonic())
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._hits += 1
+                    self._entries[key] = (entry[0], time.monotonic())
+                    self._entries.move_to_end(key)
+                    break
+                pending = self._creating.get(key)
+                if pending is None:
+                    self._misses += 1
+                    creating = self._creating[key] = threading.Event()
+                    break
+            self._release_all(evicted, "expired")
+            # Another thread is creating the instance; use it once registered
+            pending.wait()
+
+        self._release_all(evicted, "expired")
+        if entry is not None:
+            return entry[0]
+
+        try:
+            instance = self.factory(key, *args)
+        except BaseException:
+            with self._lock:
+                del self._creating[key]
+            creating.set()
+            raise
+
+        with self._lock:
+            self._entries[key] = (instance, time.monotonic())
+            del self._creating[key]
+            evicted = []
+            while 0 < self.max_size < len(self._entries):
+                evicted.append(self._entries.popitem(last=False))
+                self._evictions += 1
+        creating.set()
+        self._release_all(evicted, "lru")
+        return instance
+
+    def remove(self, key: Hashable) -> bool:
+        """
+        Remove and release the instance for key.
+
+        Args:
+            key: Instance key
+
+        Returns:
+            bool: True if an instance was registered
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._release_all([(key, entry)], "removed")
+        return True
+
+    def evict_idle(self) -> int:
+        """
+        Release every instance that has been idle for longer than the TTL.
+
+        Returns:
+            int: Number of released instances
+        """
+        with self._lock:
+            evicted = self._collect_expired(time.monotonic())
+        self._release_all(evicted, "expired")
+        return len(evicted)
+
+    def clear(self) -> None:
+        """Remove and release every instance."""
+        with self._lock:
+            evicted = list(self._entries.items())
+            self._entries.clear()
+        self._release_all(evicted, "cleared")
+
+    def values(self) -> list[T]:
+        """
+        Get the registered instances.
+
+        Returns:
+            list: Instances, least recently used first
+        """
+        with self._lock:
+            return [instance for instance, _ in self._entries.values()]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Get registry counters.
+
+        Returns:
+            dict: 'name', 'size', 'max_size', 'idle_ttl_seconds', 'hits', 'misses',
+                'evictions' (to stay within max_size) and 'expirations' (idle)
+        """
+        with self._lock:
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "idle_ttl_seconds": self.idle_ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+    def _collect_expired(self, now: float) -> list[tuple[Hashable, tuple[T, float]]]:
+        if self.idle_ttl <= 0:
+            return []
+        expired = []
+        # Entries are ordered by last request, so expired ones are at the front
+        for key, (_, last_used) in self._entries.items():
+            if now - last_used <= self.idle_ttl:
+                break
+            expired.append(key)
+        self._expirations += len(expired)
+        return [(key, self._entries.pop(key)) for key in expired]
+
+    def _release_all(self, entries: list[tuple[Hashable, tuple[T, float]]], reason: str) -> None:
+        for key, (instance, _) in entries:
+            try:
+                self.release(instance)
+            except Exception as e:
+                logger.warning("service_release_failed", registry=self.name, key=str(key), error=str(e))
+            logger.info("service_evicted", registry=self.name, key=str(key), reason=reason)
@@ -0,0 +1,150 @@
+"""
+Single-flight coalescing of concurrent identical work.
+
+Streamlit runs every session in its own thread, so two tabs (or two users
+opening the same photo) routinely ask for the same expensive result at the same
+moment: downloading a user's database, converting a HEIC original, minting a
+signed URL or checking the same filenames for collisions. A SingleFlight group
+lets the first caller for a key do the work while concurrent callers with the
+same key wait for, and share, its result or exception. Nothing is cached once
+the call finishes; caching stays the job of the callers.
+"""
+
+import threading
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+from ..logging_config import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class _Flight:
+    """An in-flight call: its future and the thread running it."""
+
+    __slots__ = ("future", "thread_id", "waiters")
+
+    def __init__(self) -> None:
+        self.future: Future[Any] = Future()
+        self.thread_id = threading.get_ident()
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key onto one execution."""
+
+    def __init__(self, name: str):
+        """
+        Initialize the group.
+
+        Args:
+            name: Name used in logs and statistics
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, _Flight] = {}
+        self._calls = 0
+        self._executions = 0
+        self._coalesced = 0
+
+        with _groups_lock:
+            _groups.append(self)
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """
+        Run func for key, or wait for the call already running for key.
+
+        Callers that join an in-flight call receive the same result object (or
+        exception) as the caller that ran it. A call made for a key by the thread
+        that is already running it executes directly instead of deadlocking.
+
+        Args:
+            key: Identity of the work
+            func: Function that performs the work
+
+        Returns:
+            The result of func
+        """
+        with self._lock:
+            self._calls += 1
+            running = self._flights.get(key)
+            if running is None:
+                flight = self._flights[key] = _Flight()
+                self._executions += 1
+            elif running.thread_id == threading.get_ident():
+                self._executions += 1
+            else:
+                running.waiters += 1
+                self._coalesced += 1
+
+        if running is not None:
+            if running.thread_id == threading.get_ident():
+                # Re-entrant call from the running thread
+                return func()
+            logger.debug("single_flight_joined", group=self.name, key=str(key))
+            return running.future.result()  # type: ignore[no-any-return]
+
+        try:
+            result = func()
+        except BaseException as e:
+            self._finish(key)
+            flight.future.set_exception(e)
+            raise
+
+        self._finish(key)
+        flight.future.set_result(result)
+        if flight.waiters:
+            logger.debug("single_flight_shared", group=self.name, key=str(key), waiters=flight.waiters)
+        return result
+
+    def _finish(self, key: Hashable) -> None:
+        # Remove the flight before publishing its outcome so later callers start a fresh call
+        with self._lock:
+            self._flights.pop(key, None)
+
+    def in_flight(self, key: Hashable) -> bool:
+        """
+        Check whether a call is currently running for key.
+
+        Args:
+            key: Identity of the work
+
+        Returns:
+            bool: True if a call for key has not finished yet
+        """
+        with self._lock:
+            return key in self._flights
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Get call counters of the group.
+
+        Returns:
+            dict: 'calls', 'executions', 'coalesced' and 'in_flight'
+        """
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._flights),
+            }
+
+
+_groups: list[SingleFlight] = []
+_groups_lock = threading.Lock()
+
+
+def get_single_flight_stats() -> dict[str, dict[str, Any]]:
+    """
+    Get the statistics of every single-flight group in the process.
+
+    Returns:
+        dict: Mapping of group name to its statistics (see SingleFlight.get_stats)
+    """
+    with _groups_lock:
+        groups = list(_groups)
+    return {group.name: group.get_stats() for group in groups}
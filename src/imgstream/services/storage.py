@@ -1,20 +1,111 @@
 """Storage service for Google Cloud Storage operations."""
 
+import base64
+import hashlib
 import os
-from collections.abc import Callable
+import queue
+import re
+import threading
+import uuid
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
 from pathlib import Path
+from typing import Any, TypeGuard, TypeVar
 
 from google.cloud import storage  # type: ignore[attr-defined]
-from google.cloud.exceptions import GoogleCloudError, NotFound
+import google_crc32c
+from google.api_core.exceptions import NotModified
+from google.cloud.exceptions import GoogleCloudError, NotFound, PreconditionFailed
 import google.auth
 import google.auth.transport.requests
 
 from imgstream.ui.handlers.error import StorageError
 from ..logging_config import get_logger
+from .resilience import CircuitBreaker, CircuitOpenError, DeadlineExceededError, ReadPolicy, ResilientReader
+from .single_flight import SingleFlight
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+# Concurrent requests for the same signed URL share one signing call
+_url_signing = SingleFlight("signed_url")
+
+# Field projection for object listings; everything else in the object resource is skipped
+LIST_FIELDS = "items(name,size,generation,updated),prefixes,nextPageToken"
+
+# Object layouts: keys derived from the uploaded filename, or from a SHA-256 of the content
+FILENAME_LAYOUT = "filename"
+CONTENT_LAYOUT = "content"
+
+# Cache-Control for objects whose key changes whenever their content does
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+# Cache-Control for thumbnails overwritten in place: their URLs are pinned to the object
+# generation, so they can be cached as long, but without immutable in case a URL is not pinned
+VERSIONED_CACHE_CONTROL = "private, max-age=31536000"
+
+# Separator between a pack object path and the entry ID in a packed thumbnail_path
+PACK_ENTRY_SEPARATOR = "#"
+
+# Folder of metadata delta segments, under databases/{user_id}/ in the database bucket. Segments
+# are grouped by the generation of the base snapshot they apply to: deltas/{generation}/{seq}.parquet
+DATABASE_DELTA_PREFIX = "deltas/"
+
+
+class GenerationConflictError(StorageError):
+    """A conditional database upload found the object changed since the expected generation."""
+
+
+_CONTENT_ADDRESSED_PATH_RE = re.compile(r"^photos/[^/]+/(original|thumbs)/([0-9a-f]{2})/\2[0-9a-f]{62}\.[A-Za-z0-9]+$")
+
+
+def is_content_addressed_path(gcs_path: str) -> bool:
+    """
+    Check whether a GCS object path uses the content-addressed layout.
+
+    Args:
+        gcs_path: GCS object path
+
+    Returns:
+        bool: True if the path is photos/{user}/{original|thumbs}/{hash[:2]}/{hash}{ext}
+    """
+    return bool(_CONTENT_ADDRESSED_PATH_RE.match(gcs_path))
+
+
+def content_hash_from_path(gcs_path: str) -> str | None:
+    """
+    Get the SHA-256 content hash a content-addressed GCS object path is named after.
+
+    Args:
+        gcs_path: GCS object path
+
+    Returns:
+        str | None: Hex digest, or None if the path is not content-addressed
+    """
+    if not is_content_addressed_path(gcs_path):
+        return None
+    return Path(gcs_path).stem
+
+
+def is_pack_thumbnail_path(thumbnail_path: str | None) -> TypeGuard[str]:
+    """
+    Check whether a thumbnail path points into a thumbnail pack object.
+
+    Args:
+        thumbnail_path: Thumbnail path stored in photo metadata
+
+    Returns:
+        bool: True if the path has the form {pack_path}#{entry_id}
+    """
+    if not thumbnail_path:
+        return False
+    pack_path, separator, entry_id = thumbnail_path.partition(PACK_ENTRY_SEPARATOR)
+    return bool(separator) and pack_path.endswith(".pack") and bool(entry_id)
+
 
 class UploadProgress:
     """Helper class for tracking upload progress."""
@@ -95,6 +186,27 @@ class StorageService:
         self.default_signed_url_expiration = int(os.getenv("GCS_SIGNED_URL_EXPIRATION", "3600"))
         self.lifecycle_enabled = os.getenv("GCS_LIFECYCLE_ENABLED", "true").lower() == "true"
         self.coldline_days = int(os.getenv("GCS_COLDLINE_DAYS", "30"))
+        self.list_page_size = int(os.getenv("GCS_LIST_PAGE_SIZE", "1000"))
+        self.object_layout = os.getenv("GCS_OBJECT_LAYOUT", FILENAME_LAYOUT).lower()
+        self.download_chunk_size = int(os.getenv("GCS_DOWNLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+        self.download_max_workers = int(os.getenv("GCS_DOWNLOAD_MAX_WORKERS", "8"))
+
+        # Deadlines, retries and hedging for reads (GCS_READ_* / GCS_DB_READ_* variables)
+        self.read_policy = ReadPolicy.from_env("GCS_READ", deadline=30.0)
+        self.database_read_policy = ReadPolicy.from_env("GCS_DB_READ", deadline=60.0, hedge=False)
+        self._reader = ResilientReader()
+
+        # Fail fast while GCS is unhealthy instead of waiting out a timeout per call (GCS_CIRCUIT_* variables)
+        self.circuit_breaker = CircuitBreaker.from_env("GCS_CIRCUIT", name="gcs")
+
+        # Signing credentials are cached and only refreshed when their token expires
+        self._signing_credentials: Any = None
+        self._credentials_lock = threading.Lock()
+
+        if self.object_layout not in (FILENAME_LAYOUT, CONTENT_LAYOUT):
+            raise StorageError(
+                f"GCS_OBJECT_LAYOUT must be '{FILENAME_LAYOUT}' or '{CONTENT_LAYOUT}', got '{self.object_layout}'"
+            )
 
         if not self.photos_bucket_name:
             raise StorageError("GCS_PHOTOS_BUCKET environment variable is required")
@@ -152,6 +264,104 @@ class StorageService:
         thumbnail_filename = f"{original_path.stem}_thumb.jpg"
         return f"photos/{user_id}/thumbs/{thumbnail_filename}"
 
+    @staticmethod
+    def _compute_content_hash(data: bytes) -> str:
+        """Compute the SHA-256 hex digest used as a content address."""
+        return hashlib.sha256(data).hexdigest()
+
+    def _get_content_addressed_path(self, user_id: str, kind: str, content_hash: str, extension: str) -> str:
+        """
+        Generate a content-addressed GCS path.
+
+        Objects are spread across 256 hash-prefixed directories so that no single
+        listing prefix grows unbounded.
+
+        Args:
+            user_id: User identifier
+            kind: Object kind directory ('original' or 'thumbs')
+            content_hash: SHA-256 hex digest of the object content
+            extension: File extension including the dot (e.g. '.jpg')
+
+        Returns:
+            str: GCS object path
+        """
+        return f"photos/{user_id}/{kind}/{content_hash[:2]}/{content_hash}{extension.lower()}"
+
+    @staticmethod
+    def _compute_checksums(data: bytes) -> dict[str, str]:
+        """Compute the base64 CRC32C and MD5 digests GCS uses for object hashes."""
+        return {
+            "crc32c": base64.b64encode(google_crc32c.Checksum(data).digest()).decode("ascii"),
+            "md5_hash": base64.b64encode(hashlib.md5(data, usedforsecurity=False).digest()).decode("ascii"),
+        }
+
+    @staticmethod
+    def _verify_checksums(blob: storage.Blob, checksums: dict[str, str]) -> None:
+        """
+        Compare the hashes GCS reports for a stored object with the local ones.
+
+        Raises:
+            StorageError: If a reported hash differs
+        """
+        for field, expected in checksums.items():
+            actual = getattr(blob, field, None)
+            if actual is not None and actual != expected:
+                raise StorageError(f"Checksum mismatch for '{blob.name}': {field} is {actual}, expected {expected}")
+
+    def _upload_with_checksums(
+        self, blob: storage.Blob, data: bytes, content_type: str, **kwargs: Any
+    ) -> dict[str, str]:
+        """
+        Upload data with client-computed CRC32C and MD5 hashes.
+
+        The hashes are sent with the object resource, so GCS rejects the upload if
+        the received bytes do not match them. The object resource returned by the
+        upload is then compared with the local hashes, which replaces a separate
+        exists()/reload() round trip.
+
+        Args:
+            blob: Target blob
+            data: Object content
+            content_type: MIME type
+            **kwargs: Extra arguments for upload_from_string (e.g. if_generation_match)
+
+        Returns:
+            dict: The base64 'crc32c' and 'md5_hash' of the data
+
+        Raises:
+            CircuitOpenError: If the storage circuit breaker is open
+            StorageError: If the stored object's hashes do not match
+        """
+        checksums = self._compute_checksums(data)
+        blob.crc32c = checksums["crc32c"]
+        blob.md5_hash = checksums["md5_hash"]
+        with self.circuit_breaker.guard():
+            blob.upload_from_string(data, content_type=content_type, checksum="crc32c", **kwargs)
+        self._verify_checksums(blob, checksums)
+        return checksums
+
+    def _upload_immutable(self, blob: storage.Blob, data: bytes, content_type: str) -> bool:
+        """
+        Upload a content-addressed object only if it does not exist yet.
+
+        Args:
+            blob: Target blob
+            data: Object content
+            content_type: MIME type
+
+        Returns:
+            bool: True if uploaded, False if an identical object was already stored
+        """
+        blob.cache_control = IMMUTABLE_CACHE_CONTROL
+        try:
+            self._upload_with_checksums(blob, data, content_type, if_generation_match=0)
+            return True
+        except PreconditionFailed:
+            # Same key means same content; the existing object is reused as-is
+            logger.info("content_addressed_object_deduplicated", gcs_path=blob.name)
+            blob.reload()
+            return False
+
     def upload_original_photo(
         self,
         user_id: str,
@@ -162,6 +372,10 @@ class StorageService:
         """
         Upload original photo to GCS with progress tracking.
 
+        With GCS_OBJECT_LAYOUT=content the object key is derived from the SHA-256 of
+        the data and the object is never overwritten; uploading identical content
+        again reuses the existing object without transferring it.
+
         Args:
             user_id: User identifier
             file_data: Raw image data
@@ -175,11 +389,16 @@ class StorageService:
             StorageError: If upload fails
         """
         try:
-            gcs_path = self._get_user_original_path(user_id, filename)
+            content_addressed = self.object_layout == CONTENT_LAYOUT
+            if content_addressed:
+                content_hash = self._compute_content_hash(file_data)
+                gcs_path = self._get_content_addressed_path(user_id, "original", content_hash, Path(filename).suffix)
+            else:
+                gcs_path = self._get_user_original_path(user_id, filename)
             blob = self.photos_bucket.blob(gcs_path)
 
-            # Check if file already exists
-            file_exists = blob.exists()
+            # Check if file already exists (content-addressed objects are never overwritten)
+            file_exists = False if content_addressed else blob.exists()
             if file_exists:
                 logger.warning(f"File already exists, will overwrite: {gcs_path}")
 
@@ -204,18 +423,17 @@ class StorageService:
                 progress_callback(0, len(file_data), "Starting upload...")
 
             # Upload with Standard storage class
-            blob.upload_from_string(file_data, content_type=self._get_content_type(filename))
+            # Uploads carry CRC32C/MD5 hashes; GCS rejects corrupted data and the returned
+            # object resource is checked against them, so no re-check round trip is needed
+            deduplicated = False
+            if content_addressed:
+                deduplicated = not self._upload_immutable(blob, file_data, self._get_content_type(filename))
+            else:
+                self._upload_with_checksums(blob, file_data, self._get_content_type(filename))
 
             if progress_callback:
                 progress_callback(len(file_data), len(file_data), "Upload completed")
 
-            # Verify upload
-            if not blob.exists():
-                raise StorageError(f"Upload verification failed for '{filename}'")
-
-            # Get final blob info
-            blob.reload()
-
             upload_result = {
                 "gcs_path": gcs_path,
                 "file_size": len(file_data),
@@ -225,6 +443,9 @@ class StorageService:
                 "etag": blob.etag,
                 "generation": blob.generation,
                 "was_overwrite": file_exists,
+                "deduplicated": deduplicated,
+                "crc32c": blob.crc32c,
+                "md5_hash": blob.md5_hash,
             }
 
             logger.info(f"Uploaded original photo: {gcs_path} " f"({len(file_data)} bytes, {blob.storage_class} class)")
@@ -250,6 +471,9 @@ class StorageService:
         """
         Upload thumbnail image to GCS with enhanced features.
 
+        With GCS_OBJECT_LAYOUT=content the key is derived from the thumbnail content
+        and identical thumbnails are stored once.
+
         Args:
             user_id: User identifier
             thumbnail_data: Thumbnail image data
@@ -263,11 +487,16 @@ class StorageService:
             StorageError: If upload fails
         """
         try:
-            gcs_path = self._get_user_thumbnail_path(user_id, original_filename)
+            content_addressed = self.object_layout == CONTENT_LAYOUT
+            if content_addressed:
+                content_hash = self._compute_content_hash(thumbnail_data)
+                gcs_path = self._get_content_addressed_path(user_id, "thumbs", content_hash, ".jpg")
+            else:
+                gcs_path = self._get_user_thumbnail_path(user_id, original_filename)
             blob = self.photos_bucket.blob(gcs_path)
 
-            # Check if thumbnail already exists
-            file_exists = blob.exists()
+            # Check if thumbnail already exists (content-addressed objects are never overwritten)
+            file_exists = False if content_addressed else blob.exists()
             if file_exists:
                 logger.warning(f"Thumbnail already exists, will overwrite: {gcs_path}")
 
@@ -288,19 +517,18 @@ class StorageService:
             if progress_callback:
                 progress_callback(0, len(thumbnail_data), "Starting thumbnail upload...")
 
-            # Upload thumbnail (always JPEG) with efficient binary processing
-            blob.upload_from_string(thumbnail_data, content_type="image/jpeg")
+            # Upload thumbnail (always JPEG) with efficient binary processing. Only content-addressed
+            # thumbnails are cached as immutable: a filename-layout path is reused when a photo is overwritten
+            deduplicated = False
+            if content_addressed:
+                deduplicated = not self._upload_immutable(blob, thumbnail_data, "image/jpeg")
+            else:
+                blob.cache_control = VERSIONED_CACHE_CONTROL
+                self._upload_with_checksums(blob, thumbnail_data, "image/jpeg")
 
             if progress_callback:
                 progress_callback(len(thumbnail_data), len(thumbnail_data), "Thumbnail upload completed")
 
-            # Verify upload
-            if not blob.exists():
-                raise StorageError(f"Thumbnail upload verification failed for '{original_filename}'")
-
-            # Get final blob info
-            blob.reload()
-
             upload_result = {
                 "gcs_path": gcs_path,
                 "file_size": len(thumbnail_data),
@@ -310,6 +538,9 @@ class StorageService:
                 "etag": blob.etag,
                 "generation": blob.generation,
                 "was_overwrite": file_exists,
+                "deduplicated": deduplicated,
+                "crc32c": blob.crc32c,
+                "md5_hash": blob.md5_hash,
             }
 
             logger.info(f"Uploaded thumbnail: {gcs_path} " f"({len(thumbnail_data)} bytes, {blob.storage_class} class)")
@@ -325,6 +556,240 @@ class StorageService:
                 progress_callback(0, len(thumbnail_data), f"Unexpected error: {e}")
             raise StorageError(f"Unexpected error uploading thumbnail: {e}") from e
 
+    def copy_to_content_address(self, user_id: str, gcs_path: str, kind: str) -> dict:
+        """
+        Copy an existing object to its content-addressed key.
+
+        The source object is left untouched, so callers can switch metadata over
+        to the new key before deleting the old one.
+
+        Args:
+            user_id: User identifier
+            gcs_path: Existing GCS object path
+            kind: Object kind directory ('original' or 'thumbs')
+
+        Returns:
+            dict: {'gcs_path': new path, 'content_hash': SHA-256 hex digest, 'deduplicated': bool}
+
+        Raises:
+            StorageError: If the source cannot be read or the copy fails
+        """
+        try:
+            source = self.photos_bucket.blob(gcs_path)
+            data = source.download_as_bytes()
+
+            content_hash = self._compute_content_hash(data)
+            extension = ".jpg" if kind == "thumbs" else Path(gcs_path).suffix
+            new_path = self._get_content_addressed_path(user_id, kind, content_hash, extension)
+
+            target = self.photos_bucket.blob(new_path)
+            target.metadata = {
+                "user_id": user_id,
+                "original_filename": Path(gcs_path).name,
+                "uploaded_at": datetime.now().isoformat(),
+                "upload_type": "thumbnail" if kind == "thumbs" else "original_photo",
+                "migrated_from": gcs_path,
+            }
+            if kind != "thumbs":
+                target.storage_class = self.storage_class
+            content_type = "image/jpeg" if kind == "thumbs" else self._get_content_type(gcs_path)
+            deduplicated = not self._upload_immutable(target, data, content_type)
+
+            return {"gcs_path": new_path, "content_hash": content_hash, "deduplicated": deduplicated}
+
+        except NotFound as e:
+            raise StorageError(f"File not found: {gcs_path}") from e
+        except GoogleCloudError as e:
+            raise StorageError(f"Failed to copy '{gcs_path}' to content address: {e}") from e
+        except Exception as e:
+            raise StorageError(f"Unexpected error copying '{gcs_path}': {e}") from e
+
+    def create_pack_object(self, pack_path: str, data: bytes) -> int:
+        """
+        Create a new thumbnail pack object.
+
+        Args:
+            pack_path: GCS object path of the pack
+            data: Initial pack content
+
+        Returns:
+            int: Generation of the created object
+
+        Raises:
+            StorageError: If the pack already exists or the upload fails
+        """
+        try:
+            blob = self.photos_bucket.blob(pack_path)
+            self._upload_with_checksums(blob, data, "application/octet-stream", if_generation_match=0)
+            return int(blob.generation)
+
+        except PreconditionFailed as e:
+            raise StorageError(f"Pack object already exists: {pack_path}") from e
+        except GoogleCloudError as e:
+            raise StorageError(f"Failed to create pack object '{pack_path}': {e}") from e
+        except Exception as e:
+            raise StorageError(f"Unexpected error creating pack object '{pack_path}': {e}") from e
+
+    def append_to_pack_object(self, pack_path: str, data: bytes, if_generation_match: int) -> int:
+        """
+        Append bytes to a pack object using a server-side compose.
+
+        The data is staged as a temporary object and composed onto the end of
+        the pack, so existing byte offsets stay valid. The compose only succeeds
+        if the pack is still at the expected generation.
+
+        Args:
+            pack_path: GCS object path of the pack
+            data: Bytes to append
+            if_generation_match: Generation the pack must currently have
+
+        Returns:
+            int: New generation of the pack object
+
+        Raises:
+            StorageError: If the pack changed concurrently or the append fails
+        """
+        staging = self.photos_bucket.blob(f"{pack_path}.append-{uuid.uuid4().hex}")
+        try:
+            self._upload_with_checksums(staging, data, "application/octet-stream")
+
+            destination = self.photos_bucket.blob(pack_path)
+            destination.content_type = "application/octet-stream"
+            destination.compose([destination, staging], if_generation_match=if_generation_match)
+            return int(destination.generation)
+
+        except PreconditionFailed as e:
+            raise StorageError(f"Pack object '{pack_path}' was modified concurrently") from e
+        except GoogleCloudError as e:
+            raise StorageError(f"Failed to append to pack object '{pack_path}': {e}") from e
+        except Exception as e:
+            raise StorageError(f"Unexpected error appending to pack object '{pack_path}': {e}") from e
+        finally:
+            try:
+                staging.delete()
+            except Exception as e:
+                logger.warning("pack_staging_cleanup_failed", pack_path=pack_path, error=str(e))
+
+    def read_byte_range(self, gcs_path: str, start: int, length: int) -> bytes:
+        """
+        Read a byte range of an object.
+
+        Args:
+            gcs_path: GCS object path
+            start: Offset of the first byte
+            length: Number of bytes to read
+
+        Returns:
+            bytes: The requested bytes
+
+        Raises:
+            StorageError: If the object does not exist or the read fails
+        """
+        try:
+            data: bytes = self._guarded_read(
+                "read_byte_range",
+                lambda timeout: self.photos_bucket.blob(gcs_path).download_as_bytes(
+                    start=start, end=start + length - 1, timeout=timeout, retry=None
+                ),
+                self.read_policy,
+            )
+            return data
+
+        except CircuitOpenError:
+            raise
+        except NotFound as e:
+            raise StorageError(f"File not found: {gcs_path}") from e
+        except DeadlineExceededError as e:
+            raise StorageError(f"Timed out reading range of '{gcs_path}': {e}") from e
+        except GoogleCloudError as e:
+            raise StorageError(f"Failed to read range of '{gcs_path}': {e}") from e
+        except Exception as e:
+            raise StorageError(f"Unexpected error reading range of '{gcs_path}': {e}") from e
+
+    def iter_object_chunks(
+        self,
+        objects: list[tuple[str, int]],
+        chunk_size: int | None = None,
+        max_workers: int | None = None,
+    ) -> Iterator[tuple[int, bytes]]:
+        """
+        Download many objects as ranged chunks in parallel, yielding them in order.
+
+        Chunk requests for the following objects are issued while earlier chunks
+        are consumed, so small files are not downloaded one round-trip at a time.
+        At most max_workers chunks are in flight or buffered at any moment, which
+        bounds memory to roughly max_workers * chunk_size.
+
+        Args:
+            objects: (gcs_path, size) pairs; size is the object size in bytes (0 if unknown)
+            chunk_size: Bytes per ranged request (defaults to GCS_DOWNLOAD_CHUNK_SIZE)
+            max_workers: Concurrent requests (defaults to GCS_DOWNLOAD_MAX_WORKERS)
+
+        Yields:
+            tuple[int, bytes]: (index into objects, chunk) in object and offset order
+
+        Raises:
+            StorageError: If any chunk cannot be downloaded
+        """
+        chunk_size = chunk_size or self.download_chunk_size
+        max_workers = max_workers or self.download_max_workers
+
+        def iter_requests() -> Iterator[tuple[int, Callable[[], bytes]]]:
+            for index, (gcs_path, size) in enumerate(objects):
+                if not size or size <= 0:
+                    # Unknown or empty object: fetch it whole
+                    yield index, partial(self.download_file, gcs_path)
+                    continue
+                for start in range(0, size, chunk_size):
+                    length = min(chunk_size, size - start)
+                    yield index, partial(self.read_byte_range, gcs_path, start, length)
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gcs-download") as executor:
+            in_flight: deque = deque()
+            try:
+                for index, request in iter_requests():
+                    in_flight.append((index, executor.submit(request)))
+                    if len(in_flight) >= max_workers:
+                        done_index, future = in_flight.popleft()
+                        yield done_index, future.result()
+                while in_flight:
+                    done_index, future = in_flight.popleft()
+                    yield done_index, future.result()
+            finally:
+                for _, future in in_flight:
+                    future.cancel()
+
+    def open_export_writer(self, gcs_path: str, content_type: str, download_filename: str) -> Any:
+        """
+        Open a streaming writer for a large generated object such as an export archive.
+
+        Data is sent with a resumable upload in GCS_DOWNLOAD_CHUNK_SIZE pieces, so
+        the object never has to exist in memory or on disk. The object is only
+        created when the writer is closed; abandoning it leaves nothing behind.
+
+        Args:
+            gcs_path: Destination object path
+            content_type: MIME type of the object
+            download_filename: Filename browsers should save the object as
+
+        Returns:
+            A writable binary file object
+
+        Raises:
+            StorageError: If the upload session cannot be started
+        """
+        try:
+            blob = self.photos_bucket.blob(gcs_path)
+            blob.content_disposition = f'attachment; filename="{download_filename}"'
+            # Resumable upload chunks must be a multiple of 256 KiB
+            chunk_size = max(self.download_chunk_size // (256 * 1024), 1) * 256 * 1024
+            return blob.open("wb", chunk_size=chunk_size, content_type=content_type, ignore_flush=True)
+
+        except GoogleCloudError as e:
+            raise StorageError(f"Failed to open writer for '{gcs_path}': {e}") from e
+        except Exception as e:
+            raise StorageError(f"Unexpected error opening writer for '{gcs_path}': {e}") from e
+
     def upload_multiple_thumbnails(
         self,
         user_id: str,
@@ -466,10 +931,34 @@ class StorageService:
         except Exception as e:
             raise StorageError(f"Failed to upload thumbnail with deduplication: {e}") from e
 
+    def _guarded_read(self, operation: str, func: Callable[[float], T], policy: ReadPolicy) -> T:
+        """Run a read under its policy, behind the circuit breaker."""
+        return self.circuit_breaker.call(lambda: self._reader.call(operation, func, policy))
+
+    def get_circuit_state(self) -> dict[str, Any]:
+        """
+        Get the state of the storage circuit breaker.
+
+        Returns:
+            dict: Breaker status (see CircuitBreaker.get_status)
+        """
+        return self.circuit_breaker.get_status()
+
+    def get_read_stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Get retry, hedge and latency statistics of reads since startup.
+
+        Returns:
+            dict: Per-operation counters and p50/p95 latencies (see ResilientReader.get_stats)
+        """
+        return self._reader.get_stats()
+
     def download_file(self, gcs_path: str) -> bytes:
         """
         Download file from GCS.
 
+        The read runs under the GCS_READ_* deadline, retry and hedging policy.
+
         Args:
             gcs_path: GCS object path
 
@@ -480,44 +969,89 @@ class StorageService:
             StorageError: If download fails
         """
         try:
-            blob = self.photos_bucket.blob(gcs_path)
-
-            if not blob.exists():
-                raise StorageError(f"File not found: {gcs_path}")
-
-            file_data: bytes = blob.download_as_bytes()
+            # A missing object surfaces as NotFound, so no separate exists() round trip is needed
+            file_data: bytes = self._guarded_read(
+                "download_file",
+                lambda timeout: self.photos_bucket.blob(gcs_path).download_as_bytes(timeout=timeout, retry=None),
+                self.read_policy,
+            )
             logger.debug(f"Downloaded file: {gcs_path} ({len(file_data)} bytes)")
             return file_data
 
+        except CircuitOpenError:
+            raise
         except NotFound as e:
             raise StorageError(f"File not found: {gcs_path}") from e
+        except DeadlineExceededError as e:
+            raise StorageError(f"Timed out downloading '{gcs_path}': {e}") from e
         except GoogleCloudError as e:
             raise StorageError(f"Failed to download file '{gcs_path}': {e}") from e
         except Exception as e:
             raise StorageError(f"Unexpected error downloading '{gcs_path}': {e}") from e
 
-    def get_signed_url(self, gcs_path: str, expiration: int | None = None) -> str:
+    def _get_signing_credentials(self) -> Any:
+        """
+        Get credentials for URL signing, refreshing them only when they have expired.
+
+        Returns:
+            Default Google credentials
+        """
+        with self._credentials_lock:
+            if self._signing_credentials is None:
+                self._signing_credentials, _ = google.auth.default()
+
+            credentials = self._signing_credentials
+            if not credentials.valid:
+                try:
+                    credentials.refresh(google.auth.transport.requests.Request())
+                except Exception:
+                    # occurred by local env only for Invalid OAuth scope or ID token audience provided
+                    pass
+
+            return credentials
+
+    def _sign_blob_url(self, blob: storage.Blob, expiration_time: datetime, version_kwargs: dict[str, Any]) -> str:
+        """Sign a V4 GET URL for a blob with the cached signing credentials."""
+        credentials = self._get_signing_credentials()
+
+        # Check if credentials have service account email (for service account auth)
+        if hasattr(credentials, 'service_account_email') and credentials.service_account_email:
+            signed_url: str = blob.generate_signed_url(
+                expiration=expiration_time,
+                method="GET",
+                version="v4",
+                service_account_email=credentials.service_account_email,
+                access_token=credentials.token,
+                **version_kwargs,
+            )
+        else:
+            # Fallback for other credential types (e.g., user credentials, ADC)
+            signed_url = blob.generate_signed_url(
+                expiration=expiration_time,
+                method="GET",
+                version="v4",
+                **version_kwargs,
+            )
+        return signed_url
+
+    def get_signed_url(self, gcs_path: str, expiration: int | None = None, generation: int | None = None) -> str:
         """
         Generate signed URL for secure file access.
 
         Args:
             gcs_path: GCS object path
             expiration: URL expiration time in seconds (defaults to configured value)
+            generation: Optional object generation to pin; each version of an object
+                then gets its own URL, which makes long-lived browser caching safe
 
         Returns:
             str: Signed URL
 
         Raises:
+            CircuitOpenError: If the storage circuit breaker is open
             StorageError: If URL generation fails
         """
         try:
-            credentials, _ = google.auth.default()
-            try:
-                credentials.refresh(google.auth.transport.requests.Request())
-            except Exception:
-                # occurred by local env only for Invalid OAuth scope or ID token audience provided
-                pass
-
             blob = self.photos_bucket.blob(gcs_path)
 
             # Use configured default if expiration not specified
@@ -527,26 +1061,19 @@ class StorageService:
             # Generate signed URL
             expiration_time = datetime.now() + timedelta(seconds=expiration)
 
-            # Check if credentials have service account email (for service account auth)
-            if hasattr(credentials, 'service_account_email') and credentials.service_account_email:
-                signed_url: str = blob.generate_signed_url(
-                    expiration=expiration_time,
-                    method="GET",
-                    version="v4",
-                    service_account_email=credentials.service_account_email,
-                    access_token=credentials.token,
-                )
-            else:
-                # Fallback for other credential types (e.g., user credentials, ADC)
-                signed_url: str = blob.generate_signed_url(
-                    expiration=expiration_time,
-                    method="GET",
-                    version="v4",
-                )
+            version_kwargs = {"generation": generation} if generation is not None else {}
+
+            # Token refresh and IAM signing are network calls, so they go through the breaker
+            signed_url: str = _url_signing.do(
+                (self.photos_bucket_name, gcs_path, expiration, generation),
+                lambda: self.circuit_breaker.call(lambda: self._sign_blob_url(blob, expiration_time, version_kwargs)),
+            )
 
             logger.debug(f"Generated signed URL for: {gcs_path} (expires in {expiration}s)")
             return signed_url
 
+        except CircuitOpenError:
+            raise
         except GoogleCloudError as e:
             raise StorageError(f"Failed to generate signed URL for '{gcs_path}': {e}") from e
         except Exception as e:
@@ -738,10 +1265,53 @@ class StorageService:
         except Exception as e:
             raise StorageError(f"Unexpected error deleting '{gcs_path}': {e}") from e
 
+    def delete_files(self, gcs_paths: list[str], max_workers: int | None = None) -> dict[str, dict[str, Any]]:
+        """
+        Delete many files from GCS in parallel.
+
+        Deletes are issued directly without an existence pre-check; a missing
+        object is reported as 'not_found' rather than treated as a failure.
+
+        Args:
+            gcs_paths: GCS object paths to delete
+            max_workers: Maximum concurrent delete requests (defaults to GCS_DELETE_MAX_WORKERS or 32)
+
+        Returns:
+            dict: Mapping of GCS path to {'status': 'deleted' | 'not_found' | 'error', 'error': str | None}
+        """
+        unique_paths = list(dict.fromkeys(path for path in gcs_paths if path))
+        if not unique_paths:
+            return {}
+
+        def delete_one(gcs_path: str) -> dict[str, Any]:
+            try:
+                self.photos_bucket.blob(gcs_path).delete()
+                return {"status": "deleted", "error": None}
+            except NotFound:
+                return {"status": "not_found", "error": None}
+            except Exception as e:
+                return {"status": "error", "error": str(e)}
+
+        workers = min(max_workers or int(os.getenv("GCS_DELETE_MAX_WORKERS", "32")), len(unique_paths))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gcs-delete") as executor:
+            results = dict(zip(unique_paths, executor.map(delete_one, unique_paths), strict=True))
+
+        failed = sum(1 for result in results.values() if result["status"] == "error")
+        logger.info(
+            "bulk_delete_files_completed",
+            total=len(unique_paths),
+            failed=failed,
+            not_found=sum(1 for result in results.values() if result["status"] == "not_found"),
+        )
+        return results
+
     def list_user_files(self, user_id: str, prefix: str = "") -> list[str]:
         """
         List files for a specific user.
 
+        Prefer iter_user_files() for large libraries, this method materializes
+        every object path in memory.
+
         Args:
             user_id: User identifier
             prefix: Additional prefix filter (e.g., 'original/', 'thumbs/')
@@ -752,22 +1322,165 @@ class StorageService:
         Raises:
             StorageError: If listing fails
         """
-        try:
-            user_prefix = f"photos/{user_id}/"
-            if prefix:
-                user_prefix += prefix
+        file_paths = [info["name"] for info in self.iter_user_files(user_id, prefix)]
+
+        logger.debug(f"Listed {len(file_paths)} files for user {user_id} with prefix '{prefix}'")
+        return file_paths
 
-            blobs = self.client.list_blobs(self.photos_bucket, prefix=user_prefix)
-            file_paths = [blob.name for blob in blobs]
+    def iter_user_files(
+        self,
+        user_id: str,
+        prefix: str = "",
+        delimiter: str | None = None,
+        page_size: int | None = None,
+    ) -> Iterator[dict]:
+        """
+        Stream object information for a specific user page by page.
+
+        Only the name, size, generation and updated fields are requested from GCS,
+        and pages are fetched lazily as the caller iterates, so memory use stays
+        constant regardless of library size.
+
+        Args:
+            user_id: User identifier
+            prefix: Additional prefix filter (e.g., 'original/', 'thumbs/')
+            delimiter: Optional delimiter (e.g., '/') to list only direct children of the prefix
+            page_size: Objects per list page (defaults to GCS_LIST_PAGE_SIZE environment variable or 1000)
+
+        Yields:
+            dict: Object info with 'name', 'size', 'generation' and 'updated' keys
+
+        Raises:
+            StorageError: If listing fails
+        """
+        user_prefix = f"photos/{user_id}/"
+        if prefix:
+            user_prefix += prefix
 
-            logger.debug(f"Listed {len(file_paths)} files for user {user_id} with prefix '{prefix}'")
-            return file_paths
+        list_kwargs: dict[str, Any] = {"prefix": user_prefix, "fields": LIST_FIELDS}
+        if delimiter:
+            list_kwargs["delimiter"] = delimiter
+        list_kwargs["page_size"] = page_size or self.list_page_size
+
+        try:
+            for blob in self.client.list_blobs(self.photos_bucket, **list_kwargs):
+                yield {
+                    "name": blob.name,
+                    "size": blob.size,
+                    "generation": blob.generation,
+                    "updated": blob.updated,
+                }
 
         except GoogleCloudError as e:
             raise StorageError(f"Failed to list files for user '{user_id}': {e}") from e
         except Exception as e:
             raise StorageError(f"Unexpected error listing files: {e}") from e
 
+    def list_user_prefixes(self, user_id: str, prefix: str = "") -> list[str]:
+        """
+        List the sub-prefixes directly below a user's prefix (e.g., 'original/', 'thumbs/').
+
+        Args:
+            user_id: User identifier
+            prefix: Additional prefix below photos/{user_id}/
+
+        Returns:
+            list[str]: Sorted sub-prefixes relative to photos/{user_id}/
+
+        Raises:
+            StorageError: If listing fails
+        """
+        user_prefix = f"photos/{user_id}/"
+        try:
+            iterator = self.client.list_blobs(
+                self.photos_bucket,
+                prefix=user_prefix + prefix,
+                delimiter="/",
+                fields="prefixes,nextPageToken",
+            )
+            # Prefixes are only populated once every page has been consumed
+            for _ in iterator:
+                pass
+            return sorted(p[len(user_prefix) :] for p in iterator.prefixes)
+
+        except GoogleCloudError as e:
+            raise StorageError(f"Failed to list prefixes for user '{user_id}': {e}") from e
+        except Exception as e:
+            raise StorageError(f"Unexpected error listing prefixes: {e}") from e
+
+    def iter_user_files_parallel(
+        self,
+        user_id: str,
+        prefixes: list[str] | tuple[str, ...] = ("original/", "thumbs/"),
+        max_workers: int | None = None,
+        buffer_size: int = 1000,
+    ) -> Iterator[dict]:
+        """
+        Stream object information for several prefixes listed concurrently.
+
+        Each prefix is listed on its own thread and results are handed over through
+        a bounded queue, so memory use stays constant. Objects from different
+        prefixes are interleaved in arrival order.
+
+        Args:
+            user_id: User identifier
+            prefixes: Prefixes below photos/{user_id}/ to list
+            max_workers: Maximum concurrent listings (defaults to one per prefix)
+            buffer_size: Maximum number of listed objects buffered ahead of the consumer
+
+        Yields:
+            dict: Object info as returned by iter_user_files()
+
+        Raises:
+            StorageError: If any listing fails
+        """
+        if not prefixes:
+            return
+
+        results: queue.Queue = queue.Queue(maxsize=buffer_size)
+        stop = threading.Event()
+        done_marker = object()
+
+        def put(item: Any) -> bool:
+            # Block while the consumer catches up, but give up once it has gone away
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def list_prefix(prefix: str) -> None:
+            try:
+                for info in self.iter_user_files(user_id, prefix):
+                    if not put(info):
+                        return
+            except Exception as e:
+                put(e)
+            finally:
+                put(done_marker)
+
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers or len(prefixes), thread_name_prefix=f"gcs-list-{user_id}"
+        )
+        try:
+            for prefix in prefixes:
+                executor.submit(list_prefix, prefix)
+
+            remaining = len(prefixes)
+            while remaining:
+                item = results.get()
+                if item is done_marker:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item if isinstance(item, StorageError) else StorageError(f"Parallel listing failed: {item}")
+                else:
+                    yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
+
     def _get_content_type(self, filename: str) -> str:
         """
         Determine content type from filename.
@@ -918,7 +1631,9 @@ class StorageService:
             logger.error(f"Error checking file existence for '{gcs_path}': {e}")
             raise StorageError(f"Failed to check file existence: {e}") from e
 
-    def upload_database_file(self, user_id: str, file_data: bytes, filename: str) -> dict[str, str]:
+    def upload_database_file(
+        self, user_id: str, file_data: bytes, filename: str, if_generation_match: int | None = None
+    ) -> dict[str, str]:
         """
         Upload database file to the database bucket.
 
@@ -926,11 +1641,14 @@ class StorageService:
             user_id: User identifier
             file_data: Database file data as bytes
             filename: Database filename (e.g., 'metadata.db')
+            if_generation_match: Only replace the object if it is still at this
+                generation (0: only create it); None uploads unconditionally
 
         Returns:
-            dict: Upload result with GCS path and metadata
+            dict: Upload result with GCS path, 'generation' and metadata
 
         Raises:
+            GenerationConflictError: If the object is no longer at if_generation_match
             StorageError: If upload fails
         """
         try:
@@ -949,8 +1667,9 @@ class StorageService:
                 "content_type": "application/octet-stream",
             }
 
-            # Upload the file
-            blob.upload_from_string(file_data, content_type="application/octet-stream")
+            # Upload the file with integrity hashes
+            precondition = {} if if_generation_match is None else {"if_generation_match": if_generation_match}
+            checksums = self._upload_with_checksums(blob, file_data, "application/octet-stream", **precondition)
 
             logger.info(
                 "database_file_uploaded",
@@ -967,8 +1686,15 @@ class StorageService:
                 "filename": filename,
                 "file_size": str(len(file_data)),
                 "upload_timestamp": datetime.now().isoformat(),
+                "crc32c": checksums["crc32c"],
+                "generation": str(blob.generation),
             }
 
+        except PreconditionFailed as e:
+            logger.info("database_upload_conflict", user_id=user_id, filename=filename, expected=if_generation_match)
+            raise GenerationConflictError(
+                f"Database file '{filename}' changed since generation {if_generation_match}"
+            ) from e
         except GoogleCloudError as e:
             logger.error("database_upload_failed", user_id=user_id, filename=filename, error=str(e))
             raise StorageError(f"Failed to upload database file '{filename}': {e}") from e
@@ -997,7 +1723,11 @@ class StorageService:
             if not blob.exists():
                 raise StorageError(f"Database file not found: {gcs_path}")
 
-            file_data: bytes = blob.download_as_bytes()
+            file_data: bytes = self._guarded_read(
+                "download_database_file",
+                lambda timeout: blob.download_as_bytes(timeout=timeout, retry=None),
+                self.database_read_policy,
+            )
 
             logger.info(
                 "database_file_downloaded",
@@ -1009,6 +1739,8 @@ class StorageService:
 
             return file_data
 
+        except CircuitOpenError:
+            raise
         except GoogleCloudError as e:
             logger.error("database_download_failed", user_id=user_id, filename=filename, error=str(e))
             raise StorageError(f"Failed to download database file '{filename}': {e}") from e
@@ -1016,6 +1748,231 @@ class StorageService:
             logger.error("database_download_error", user_id=user_id, filename=filename, error=str(e))
             raise StorageError(f"Unexpected error downloading database file '{filename}': {e}") from e
 
+    def download_database_snapshot(self, user_id: str, filename: str) -> tuple[bytes, int]:
+        """
+        Download a database file together with its generation, in a single request.
+
+        Args:
+            user_id: User identifier
+            filename: Database filename (e.g., 'metadata.db')
+
+        Returns:
+            tuple: (data, generation)
+
+        Raises:
+            StorageError: If the file does not exist or the download fails
+        """
+        file_data, generation = self._download_database_snapshot(user_id, filename, None)
+        if file_data is None:
+            # Only a conditional download can come back unmodified
+            raise StorageError(f"Database file '{filename}' was not downloaded")
+        return file_data, generation
+
+    def download_database_snapshot_if_changed(
+        self, user_id: str, filename: str, generation: int
+    ) -> tuple[bytes | None, int]:
+        """
+        Download a database file together with its generation, unless it is still at a known generation.
+
+        Args:
+            user_id: User identifier
+            filename: Database filename (e.g., 'metadata.db')
+            generation: Generation already held locally; the content is only
+                transferred if the object has a different generation
+
+        Returns:
+            tuple: (data, generation); data is None if the object is still at the given generation
+
+        Raises:
+            StorageError: If the file does not exist or the download fails
+        """
+        return self._download_database_snapshot(user_id, filename, generation)
+
+    def _download_database_snapshot(
+        self, user_id: str, filename: str, if_generation_not_match: int | None
+    ) -> tuple[bytes | None, int]:
+        gcs_path = f"databases/{user_id}/{filename}"
+        blob = self.database_bucket.blob(gcs_path)
+        try:
+            file_data: bytes = self._guarded_read(
+                "download_database_file",
+                lambda timeout: blob.download_as_bytes(
+                    timeout=timeout, retry=None, if_generation_not_match=if_generation_not_match
+                ),
+                self.database_read_policy,
+            )
+            generation = int(blob.generation)
+
+            logger.info(
+                "database_file_downloaded",
+                user_id=user_id,
+                filename=filename,
+                gcs_path=gcs_path,
+                file_size=len(file_data),
+                generation=generation,
+            )
+            return file_data, generation
+
+        except NotModified:
+            logger.debug(
+                "database_file_unchanged", user_id=user_id, gcs_path=gcs_path, generation=if_generation_not_match
+            )
+            return None, int(if_generation_not_match or 0)
+        except CircuitOpenError:
+            raise
+        except NotFound as e:
+            raise StorageError(f"Database file not found: {gcs_path}") from e
+        except GoogleCloudError as e:
+            raise StorageError(f"Failed to download database file '{filename}': {e}") from e
+        except Exception as e:
+            raise StorageError(f"Unexpected error downloading database file '{filename}': {e}") from e
+
+    def get_database_generation(self, user_id: str, filename: str) -> int | None:
+        """
+        Get the current generation of a database file, without downloading it.
+
+        Args:
+            user_id: User identifier
+            filename: Database filename (e.g., 'metadata.db')
+
+        Returns:
+            int | None: Generation, or None if the file does not exist
+
+        Raises:
+            StorageError: If the lookup fails
+        """
+        gcs_path = f"databases/{user_id}/{filename}"
+        try:
+            blob = self.database_bucket.get_blob(gcs_path)
+            return int(blob.generation) if blob is not None else None
+        except GoogleCloudError as e:
+            raise StorageError(f"Failed to get generation of database file '{filename}': {e}") from e
+
+    def _get_database_delta_prefix(self, user_id: str, base_generation: int) -> str:
+        """Get the folder of the delta segments of a base snapshot: databases/{user_id}/deltas/{generation}/."""
+        return f"databases/{user_id}/{DATABASE_DELTA_PREFIX}{base_generation}/"
+
+    def _get_database_delta_path(self, user_id: str, base_generation: int, seq: int) -> str:
+        """Get the path of a metadata delta segment: databases/{user_id}/deltas/{generation}/{seq}.parquet."""
+        return f"{self._get_database_delta_prefix(user_id, base_generation)}{seq:012d}.parquet"
+
+    def upload_database_delta(self, user_id: str, base_generation: int, seq: int, data: bytes) -> dict[str, str]:
+        """
+        Upload a metadata delta segment to the database bucket.
+
+        Segments are never overwritten: if another instance already shipped a
+        segment with this sequence number on the same base snapshot, the upload fails.
+
+        Args:
+            user_id: User identifier
+            base_generation: Generation of the base snapshot the segment applies to
+            seq: Sequence number of the segment
+            data: Parquet segment data
+
+        Returns:
+            dict: Upload result with 'gcs_path' and 'file_size'
+
+        Raises:
+            GenerationConflictError: If a segment with this sequence number exists
+            StorageError: If upload fails
+        """
+        gcs_path = self._get_database_delta_path(user_id, base_generation, seq)
+        try:
+            blob = self.database_bucket.blob(gcs_path)
+            self._upload_with_checksums(blob, data, "application/vnd.apache.parquet", if_generation_match=0)
+            logger.info("database_delta_uploaded", user_id=user_id, gcs_path=gcs_path, file_size=len(data))
+            return {"gcs_path": gcs_path, "file_size": str(len(data))}
+
+        except PreconditionFailed as e:
+            raise GenerationConflictError(f"Database delta already exists: {gcs_path}") from e
+        except CircuitOpenError:
+            raise
+        except GoogleCloudError as e:
+            raise StorageError(f"Failed to upload database delta '{gcs_path}': {e}") from e
+        except Exception as e:
+            raise StorageError(f"Unexpected error uploading database delta '{gcs_path}': {e}") from e
+
+    def list_database_deltas(
+        self, user_id: str, base_generation: int | None = None, after_seq: int = 0
+    ) -> list[tuple[int, str]]:
+        """
+        List a user's metadata delta segments in sequence order.
+
+        Args:
+            user_id: User identifier
+            base_generation: Only list the segments of this base snapshot; None lists every segment
+            after_seq: Only list segments with a greater sequence number
+
+        Returns:
+            list: (sequence number, GCS path) tuples
+
+        Raises:
+            StorageError: If listing fails
+        """
+        prefix = (
+            f"databases/{user_id}/{DATABASE_DELTA_PREFIX}"
+            if base_generation is None
+            else self._get_database_delta_prefix(user_id, base_generation)
+        )
+        try:
+            deltas = []
+            for blob in self.client.list_blobs(self.database_bucket, prefix=prefix, fields=LIST_FIELDS):
+                stem = blob.name.rsplit("/", 1)[-1].removesuffix(".parquet")
+                if stem.isdigit() and int(stem) > after_seq:
+                    deltas.append((int(stem), blob.name))
+            return sorted(deltas)
+
+        except GoogleCloudError as e:
+            raise StorageError(f"Failed to list database deltas for user '{user_id}': {e}") from e
+
+    def download_database_delta(self, gcs_path: str) -> bytes:
+        """
+        Download a metadata delta segment from the database bucket.
+
+        Args:
+            gcs_path: Path of the segment
+
+        Returns:
+            bytes: Parquet segment data
+
+        Raises:
+            StorageError: If download fails
+        """
+        blob = self.database_bucket.blob(gcs_path)
+        try:
+            data: bytes = self._guarded_read(
+                "download_database_delta",
+                lambda timeout: blob.download_as_bytes(timeout=timeout, retry=None),
+                self.database_read_policy,
+            )
+            return data
+
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            raise StorageError(f"Failed to download database delta '{gcs_path}': {e}") from e
+
+    def delete_database_deltas(self, gcs_paths: list[str]) -> int:
+        """
+        Delete metadata delta segments that a newer base snapshot includes.
+
+        Args:
+            gcs_paths: Paths of the segments
+
+        Returns:
+            int: Number of segments deleted (missing ones are not counted)
+        """
+        deleted = 0
+        for gcs_path in gcs_paths:
+            try:
+                self.database_bucket.blob(gcs_path).delete()
+                deleted += 1
+            except NotFound:
+                pass
+            except Exception as e:
+                logger.warning("database_delta_delete_failed", gcs_path=gcs_path, error=str(e))
+        return deleted
+
 
 # Global storage service instance
 _storage_service: StorageService | None = None
@@ -0,0 +1,306 @@
+"""
+Debounced, coalescing scheduling of background database syncs.
+
+Every metadata write asks for its user's database to be synced to GCS. Writes
+tend to come in bursts (a batch upload saves dozens of rows within seconds),
+so instead of starting one upload per write, a SyncScheduler marks the user
+dirty and runs one sync once writes have been quiet for quiet_period seconds,
+but never later than max_staleness seconds after the first unsynced write.
+
+At most one sync per key runs at a time. Writes that arrive while a sync is
+running mark the key dirty again, and it is synced again afterwards, so no
+write is left unsynced. A failed sync is retried after max_staleness seconds
+(or sooner on flush). shutdown() syncs every dirty key before the process
+exits.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Hashable
+from concurrent.futures import Executor
+from typing import Any
+
+from ..logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class _Entry:
+    """Sync state of one key."""
+
+    __slots__ = (
+        "sync",
+        "dirty",
+        "running",
+        "dirty_since",
+        "last_write",
+        "retry_at",
+        "flush",
+        "requested",
+        "attempted",
+    )
+
+    def __init__(self, sync: Callable[[], Any]) -> None:
+        self.sync = sync
+        self.dirty = False
+        self.running = False
+        self.dirty_since = 0.0
+        self.last_write = 0.0
+        # Earliest time a failed sync is retried, unless flushed
+        self.retry_at = 0.0
+        self.flush = False
+        # Writes requested and writes covered by a finished attempt, for waiters
+        self.requested = 0
+        self.attempted = 0
+
+
+class SyncScheduler:
+    """Coalesce sync requests per key into debounced runs with bounded staleness."""
+
+    def __init__(self, executor_factory: Callable[[], Executor], quiet_period: float, max_staleness: float):
+        """
+        Initialize the scheduler.
+
+        Args:
+            executor_factory: Returns the executor that runs syncs
+            quiet_period: Seconds without writes before a dirty key is synced
+            max_staleness: Maximum seconds between a key's first unsynced write and the start of its sync
+        """
+        self.executor_factory = executor_factory
+        self.quiet_period = quiet_period
+        self.max_staleness = max(max_staleness, quiet_period)
+        self._condition = threading.Condition()
+        self._entries: dict[Hashable, _Entry] = {}
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+        self._requests = 0
+        self._runs = 0
+        self._reruns = 0
+        self._failures = 0
+
+    def mark_dirty(self, key: Hashable, sync: Callable[[], Any]) -> None:
+        """
+        Record a write for key and schedule its sync.
+
+        Args:
+            key: Identity of the synced resource
+            sync: Function performing the sync; returns a truthy value on success
+        """
+        now = time.monotonic()
+        with self._condition:
+            self._requests += 1
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(sync)
+            entry.sync = sync
+            if not entry.dirty:
+                entry.dirty = True
+                entry.dirty_since = now
+            entry.last_write = now
+            entry.requested += 1
+
+            if self._stopped:
+                # Too late for the scheduler thread; shutdown() or the caller flushes it
+                return
+            self._ensure_thread()
+            self._condition.notify_all()
+
+    def flush(self, key: Hashable | None = None) -> None:
+        """
+        Make dirty keys due immediately, skipping their quiet period and retry delay.
+
+        Args:
+            key: Key to flush, or None for every key
+        """
+        with self._condition:
+            entries = self._entries.values() if key is None else [self._entries[key]] if key in self._entries else []
+            for entry in entries:
+                if entry.dirty:
+                    entry.flush = True
+            self._condition.notify_all()
+
+    def is_pending(self, key: Hashable) -> bool:
+        """
+        Check whether a sync for key is running or a write is waiting for one.
+
+        Writes whose last sync attempt failed and that are waiting for the retry
+        do not count as pending.
+
+        Args:
+            key: Key to check
+
+        Returns:
+            bool: True if key has a sync running or outstanding
+        """
+        with self._condition:
+            entry = self._entries.get(key)
+            return entry is not None and (entry.running or entry.attempted < entry.requested)
+
+    def wait(self, key: Hashable, timeout: float) -> bool:
+        """
+        Wait until the writes recorded for key so far have had a sync attempt.
+
+        Args:
+            key: Key to wait for
+            timeout: Maximum seconds to wait
+
+        Returns:
+            bool: True if no sync is outstanding, False on timeout
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            entry = self._entries.get(key)
+            if entry is None:
+                return True
+            target = entry.requested
+            while (entry.running or entry.attempted < target) and self._entries.get(key) is entry:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def remove(self, key: Hashable, flush: bool = True) -> bool:
+        """
+        Stop scheduling key, after waiting for its running sync.
+
+        Args:
+            key: Key to remove
+            flush: Run an outstanding sync on the calling thread before removing the key
+
+        Returns:
+            bool: True if no write of key was left unsynced
+        """
+        with self._condition:
+            entry = self._entries.get(key)
+            if entry is None:
+                return True
+            while entry.running:
+                self._condition.wait()
+            run = flush and entry.dirty
+            if run:
+                entry.running = True
+                entry.dirty = False
+            synced = not entry.dirty
+        if run:
+            synced = self._run(key, entry)
+        with self._condition:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            self._condition.notify_all()
+        return synced
+
+    def shutdown(self, timeout: float = 60.0) -> bool:
+        """
+        Stop the scheduler and sync every dirty key on the calling thread.
+
+        Args:
+            timeout: Maximum seconds to wait for running syncs
+
+        Returns:
+            bool: True if every dirty key was synced successfully
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+            while any(entry.running for entry in self._entries.values()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning("sync_scheduler_shutdown_timeout", timeout_seconds=timeout)
+                    return False
+                self._condition.wait(remaining)
+            dirty = [(key, entry) for key, entry in self._entries.items() if entry.dirty]
+            for _, entry in dirty:
+                entry.running = True
+                entry.dirty = False
+
+        results = [self._run(key, entry) for key, entry in dirty]
+        logger.info("sync_scheduler_shutdown", flushed=len(dirty), failed=results.count(False))
+        return all(results)
+
+    def get_stats(self) -> dict[str, Any]:
+        """
+        Get scheduler counters.
+
+        Returns:
+            dict: 'requests', 'runs', 'reruns' (runs for writes made during a sync),
+                'failures', 'dirty' and 'running'
+        """
+        with self._condition:
+            return {
+                "requests": self._requests,
+                "runs": self._runs,
+                "reruns": self._reruns,
+                "failures": self._failures,
+                "dirty": sum(entry.dirty for entry in self._entries.values()),
+                "running": sum(entry.running for entry in self._entries.values()),
+            }
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="gcs-sync-scheduler", daemon=True)
+            self._thread.start()
+
+    def _due_at(self, entry: _Entry) -> float:
+        if entry.flush:
+            return 0.0
+        return max(entry.retry_at, min(entry.last_write + self.quiet_period, entry.dirty_since + self.max_staleness))
+
+    def _loop(self) -> None:
+        with self._condition:
+            while not self._stopped:
+                now = time.monotonic()
+                next_due = None
+                for key, entry in list(self._entries.items()):
+                    if not entry.dirty or entry.running:
+                        continue
+                    due_at = self._due_at(entry)
+                    if due_at <= now:
+                        entry.running = True
+                        entry.dirty = False
+                        self._submit(key, entry)
+                    elif next_due is None or due_at < next_due:
+                        next_due = due_at
+                self._condition.wait(None if next_due is None else next_due - now)
+
+    def _submit(self, key: Hashable, entry: _Entry) -> None:
+        try:
+            self.executor_factory().submit(self._run, key, entry)
+        except RuntimeError as e:
+            # The executor is shutting down; leave the key dirty for shutdown() to flush
+            logger.warning("sync_scheduler_submit_failed", key=str(key), error=str(e))
+            entry.running = False
+            entry.dirty = True
+
+    def _run(self, key: Hashable, entry: _Entry) -> bool:
+        with self._condition:
+            target = entry.requested
+            entry.flush = False
+            self._runs += 1
+
+        try:
+            succeeded = bool(entry.sync())
+        except Exception as e:
+            logger.warning("scheduled_sync_failed", key=str(key), error=str(e))
+            succeeded = False
+
+        with self._condition:
+            entry.running = False
+            entry.attempted = target
+            if succeeded:
+                entry.retry_at = 0.0
+            else:
+                self._failures += 1
+                entry.retry_at = time.monotonic() + self.max_staleness
+                if not entry.dirty:
+                    entry.dirty = True
+                    entry.dirty_since = entry.last_write = time.monotonic()
+
+            if entry.requested > target and succeeded:
+                self._reruns += 1
+                logger.debug("scheduled_sync_rerun", key=str(key), writes=entry.requested - target)
+            elif not entry.dirty and self._entries.get(key) is entry:
+                del self._entries[key]
+            self._condition.notify_all()
+        return succeeded
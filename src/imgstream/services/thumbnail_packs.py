@@ -0,0 +1,395 @@
+"""
+Per-user thumbnail pack files.
+
+With THUMBNAIL_STORAGE=pack, thumbnails are appended to large pack objects at
+photos/{user_id}/packs/{pack_id}.pack instead of being stored as one object
+each. The byte offset and length of every thumbnail are kept in the user's
+DuckDB database (thumbnail_pack_entries), and a photo's thumbnail_path points
+at its entry as "{pack_path}#{entry_id}".
+
+Thumbnails are served with ranged reads; adjacent entries requested together
+(a gallery page of recent uploads) are fetched with a single request. Packs are
+sealed once they reach a size or component limit, and a compaction job rewrites
+sealed packs that have accumulated entries no photo references any more.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from imgstream.ui.handlers.error import StorageError
+from ..logging_config import get_logger, log_performance, log_user_action
+from ..models.schema import get_thumbnail_pack_statements
+from .metadata import MetadataError, MetadataService, get_metadata_service
+from .storage import PACK_ENTRY_SEPARATOR, StorageService, get_storage_service, is_pack_thumbnail_path
+
+logger = get_logger(__name__)
+
+# Thumbnail storage modes
+OBJECT_STORAGE = "objects"
+PACK_STORAGE = "pack"
+
+# GCS allows at most 1024 components per composite object
+MAX_PACK_COMPONENTS = 1000
+
+
+def is_pack_thumbnail_enabled() -> bool:
+    """
+    Check whether new thumbnails should be written to pack files.
+
+    Returns:
+        bool: True if THUMBNAIL_STORAGE is 'pack'
+    """
+    return os.getenv("THUMBNAIL_STORAGE", OBJECT_STORAGE).lower() == PACK_STORAGE
+
+
+class ThumbnailPackService:
+    """
+    Append, read and compact thumbnail pack files for a single user.
+
+    Appends are serialized per user in-process; across processes the pack's
+    object generation guards each append, so a concurrent writer causes a
+    retryable StorageError instead of corrupting offsets.
+    """
+
+    def __init__(
+        self,
+        user_id: str,
+        storage_service: StorageService | None = None,
+        metadata_service: MetadataService | None = None,
+    ):
+        """
+        Initialize the pack service for a specific user.
+
+        Args:
+            user_id: User identifier
+            storage_service: Storage service to use (defaults to the global instance)
+            metadata_service: Metadata service to use (defaults to the user's global instance)
+        """
+        self.user_id = user_id
+        self.storage_service = storage_service or get_storage_service()
+        self.metadata_service = metadata_service or get_metadata_service(user_id)
+
+        self.max_pack_bytes = int(os.getenv("THUMBNAIL_PACK_MAX_BYTES", str(64 * 1024 * 1024)))
+        # Entries closer together than this are fetched in one ranged read
+        self.max_read_gap = int(os.getenv("THUMBNAIL_PACK_READ_GAP_BYTES", str(256 * 1024)))
+
+        self._append_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _ensure_schema(self) -> None:
+        """Create the pack tables in databases created before packs existed."""
+        if self._schema_ready:
+            return
+
+        self.metadata_service.ensure_local_database()
+        with self.metadata_service.db_manager as db:
+            for statement in get_thumbnail_pack_statements():
+                db.execute_query(statement)
+        self._schema_ready = True
+
+    def _new_pack_path(self) -> str:
+        """Generate the object path for a new pack."""
+        return f"photos/{self.user_id}/packs/{uuid.uuid4().hex}.pack"
+
+    def append_thumbnail(self, thumbnail_data: bytes) -> str:
+        """
+        Append a thumbnail to the user's open pack, starting a new pack when needed.
+
+        Args:
+            thumbnail_data: JPEG thumbnail bytes
+
+        Returns:
+            str: Thumbnail path to store in photo metadata ({pack_path}#{entry_id})
+
+        Raises:
+            StorageError: If writing the pack fails
+            MetadataError: If recording the entry fails
+        """
+        self._ensure_schema()
+        entry_id = uuid.uuid4().hex
+        length = len(thumbnail_data)
+
+        with self._append_lock:
+            with self.metadata_service.db_manager as db:
+                open_pack = db.execute_query(
+                    """SELECT pack_path, total_bytes, component_count, generation
+                       FROM thumbnail_packs
+                       WHERE user_id = ? AND NOT sealed
+                       ORDER BY created_at DESC LIMIT 1""",
+                    (self.user_id,),
+                )
+
+            if open_pack:
+                pack_path, offset, component_count, generation = open_pack[0]
+                generation = self.storage_service.append_to_pack_object(pack_path, thumbnail_data, generation)
+                component_count += 1
+            else:
+                pack_path, offset, component_count = self._new_pack_path(), 0, 1
+                generation = self.storage_service.create_pack_object(pack_path, thumbnail_data)
+
+            total_bytes = offset + length
+            sealed = total_bytes >= self.max_pack_bytes or component_count >= MAX_PACK_COMPONENTS
+
+            try:
+                with self.metadata_service.db_manager as db:
+                    with db.transaction():
+                        db.execute_query(
+                            """INSERT INTO thumbnail_pack_entries (entry_id, user_id, pack_path, byte_offset, byte_length)
+                               VALUES (?, ?, ?, ?, ?)""",
+                            (entry_id, self.user_id, pack_path, offset, length),
+                        )
+                        if open_pack:
+                            db.execute_query(
+                                """UPDATE thumbnail_packs
+                                   SET total_bytes = ?, entry_count = entry_count + 1, component_count = ?,
+                                       generation = ?, sealed = ?
+                                   WHERE pack_path = ?""",
+                                (total_bytes, component_count, generation, sealed, pack_path),
+                            )
+                        else:
+                            db.execute_query(
+                                """INSERT INTO thumbnail_packs
+                                   (pack_path, user_id, total_bytes, entry_count, component_count, generation, sealed)
+                                   VALUES (?, ?, ?, 1, ?, ?, ?)""",
+                                (pack_path, self.user_id, total_bytes, component_count, generation, sealed),
+                            )
+            except Exception as e:
+                raise MetadataError(f"Failed to record thumbnail pack entry: {e}") from e
+
+        logger.debug("thumbnail_appended_to_pack", user_id=self.user_id, pack_path=pack_path, offset=offset)
+        return f"{pack_path}{PACK_ENTRY_SEPARATOR}{entry_id}"
+
+    def read_thumbnails(
+        self, thumbnail_paths: list[str], max_workers: int = 8, raise_on_error: bool = False
+    ) -> dict[str, bytes | None]:
+        """
+        Read many packed thumbnails with as few ranged requests as possible.
+
+        Entries are grouped by pack and sorted by offset; entries separated by
+        less than THUMBNAIL_PACK_READ_GAP_BYTES are merged into one read.
+
+        Args:
+            thumbnail_paths: Thumbnail paths of the form {pack_path}#{entry_id}
+            max_workers: Maximum concurrent ranged reads
+            raise_on_error: Raise if a pack cannot be read instead of mapping its thumbnails to None
+
+        Returns:
+            dict: Mapping of thumbnail path to bytes, or None if unknown or unreadable
+
+        Raises:
+            StorageError: If raise_on_error is set and a pack read fails
+        """
+        results: dict[str, bytes | None] = dict.fromkeys(thumbnail_paths)
+        entry_paths = {
+            path.partition(PACK_ENTRY_SEPARATOR)[2]: path for path in thumbnail_paths if is_pack_thumbnail_path(path)
+        }
+        if not entry_paths:
+            return results
+
+        self._ensure_schema()
+        with self.metadata_service.db_manager as db:
+            rows = db.execute_query(
+                """SELECT entry_id, pack_path, byte_offset, byte_length
+                   FROM thumbnail_pack_entries
+                   WHERE user_id = ? AND entry_id IN (SELECT UNNEST(?::VARCHAR[]))
+                   ORDER BY pack_path, byte_offset""",
+                (self.user_id, list(entry_paths)),
+            )
+
+        # Merge nearby entries of the same pack into read runs
+        runs: list[dict[str, Any]] = []
+        for entry_id, pack_path, offset, length in rows:
+            run = runs[-1] if runs else None
+            if run and run["pack_path"] == pack_path and offset - run["end"] <= self.max_read_gap:
+                run["end"] = max(run["end"], offset + length)
+                run["entries"].append((entry_id, offset, length))
+            else:
+                runs.append(
+                    {
+                        "pack_path": pack_path,
+                        "start": offset,
+                        "end": offset + length,
+                        "entries": [(entry_id, offset, length)],
+                    }
+                )
+
+        def read_run(run: dict[str, Any]) -> None:
+            try:
+                data = self.storage_service.read_byte_range(run["pack_path"], run["start"], run["end"] - run["start"])
+            except StorageError as e:
+                logger.warning("thumbnail_pack_read_failed", pack_path=run["pack_path"], error=str(e))
+                if raise_on_error:
+                    raise
+                return
+            for entry_id, offset, length in run["entries"]:
+                relative = offset - run["start"]
+                results[entry_paths[entry_id]] = data[relative : relative + length]
+
+        if runs:
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(runs)), thread_name_prefix="pack-read"
+            ) as executor:
+                list(executor.map(read_run, runs))
+
+        logger.debug("thumbnail_pack_read", user_id=self.user_id, thumbnails=len(rows), requests=len(runs))
+        return results
+
+    def compact(self, min_dead_ratio: float = 0.3, dry_run: bool = False) -> dict[str, Any]:
+        """
+        Rewrite sealed packs whose unreferenced bytes exceed min_dead_ratio.
+
+        Live entries (those referenced by a photo's thumbnail_path) are copied into
+        a new sealed pack and their photos are repointed in one transaction. The old
+        pack objects are deleted only after the updated database has been uploaded.
+        Packs without any live entry are deleted outright.
+
+        Args:
+            min_dead_ratio: Minimum fraction of unreferenced bytes that triggers a rewrite
+            dry_run: Only report which packs would be compacted
+
+        Returns:
+            dict: Report with candidate packs, rewritten/removed counts and reclaimed bytes
+
+        Raises:
+            StorageError: If reading or writing pack objects fails
+            MetadataError: If updating the index fails
+        """
+        start_time = time.perf_counter()
+        self._ensure_schema()
+
+        with self.metadata_service.db_manager as db:
+            stats = db.execute_query(
+                """SELECT p.pack_path, p.total_bytes,
+                          COALESCE(SUM(CASE WHEN ph.id IS NOT NULL THEN e.byte_length END), 0) AS live_bytes
+                   FROM thumbnail_packs p
+                   LEFT JOIN thumbnail_pack_entries e ON e.pack_path = p.pack_path
+                   LEFT JOIN photos ph
+                          ON ph.user_id = p.user_id AND ph.thumbnail_path = e.pack_path || '#' || e.entry_id
+                   WHERE p.user_id = ? AND p.sealed
+                   GROUP BY p.pack_path, p.total_bytes
+                   ORDER BY p.pack_path""",
+                (self.user_id,),
+            )
+
+        candidates = [
+            {"pack_path": pack_path, "total_bytes": total, "live_bytes": live}
+            for pack_path, total, live in stats
+            if total and (total - live) / total >= min_dead_ratio
+        ]
+        report: dict[str, Any] = {
+            "user_id": self.user_id,
+            "dry_run": dry_run,
+            "sealed_packs": len(stats),
+            "candidates": candidates,
+            "rewritten": 0,
+            "removed": 0,
+            "reclaimed_bytes": sum(c["total_bytes"] - c["live_bytes"] for c in candidates),
+        }
+        if dry_run or not candidates:
+            return report
+
+        old_packs = []
+        for candidate in candidates:
+            self._compact_pack(candidate["pack_path"], rewrite=candidate["live_bytes"] > 0)
+            report["rewritten" if candidate["live_bytes"] > 0 else "removed"] += 1
+            old_packs.append(candidate["pack_path"])
+
+        # Old packs may only go once GCS holds a database that no longer references them
+        self.metadata_service.wait_for_sync_completion()
+        self.metadata_service.upload_to_gcs(force=True)
+        self.storage_service.delete_files(old_packs)
+
+        log_performance(
+            "thumbnail_pack_compaction",
+            time.perf_counter() - start_time,
+            user_id=self.user_id,
+            rewritten=report["rewritten"],
+            removed=report["removed"],
+            reclaimed_bytes=report["reclaimed_bytes"],
+        )
+        log_user_action(self.user_id, "thumbnail_packs_compacted", rewritten=report["rewritten"])
+        return report
+
+    def _compact_pack(self, pack_path: str, rewrite: bool) -> None:
+        """Copy the live entries of one pack into a new pack and drop the old index rows."""
+        with self.metadata_service.db_manager as db:
+            live_entries = db.execute_query(
+                """SELECT e.entry_id, e.byte_offset, e.byte_length
+                   FROM thumbnail_pack_entries e
+                   JOIN photos ph ON ph.user_id = e.user_id AND ph.thumbnail_path = e.pack_path || '#' || e.entry_id
+                   WHERE e.pack_path = ?
+                   ORDER BY e.byte_offset""",
+                (pack_path,),
+            )
+
+        new_pack_path = None
+        new_offsets: list[int] = []
+        if rewrite and live_entries:
+            old_data = self.storage_service.read_byte_range(
+                pack_path, 0, max(offset + length for _, offset, length in live_entries)
+            )
+            chunks = []
+            position = 0
+            for _, offset, length in live_entries:
+                chunks.append(old_data[offset : offset + length])
+                new_offsets.append(position)
+                position += length
+
+            new_pack_path = self._new_pack_path()
+            generation = self.storage_service.create_pack_object(new_pack_path, b"".join(chunks))
+
+        try:
+            with self.metadata_service.db_manager as db:
+                with db.transaction():
+                    if new_pack_path:
+                        entry_ids = [entry[0] for entry in live_entries]
+                        db.execute_query(
+                            """INSERT INTO thumbnail_packs
+                               (pack_path, user_id, total_bytes, entry_count, component_count, generation, sealed)
+                               VALUES (?, ?, ?, ?, 1, ?, TRUE)""",
+                            (new_pack_path, self.user_id, position, len(entry_ids), generation),
+                        )
+                        db.execute_query(
+                            """UPDATE thumbnail_pack_entries
+                               SET pack_path = $1, byte_offset = moved.new_offset
+                               FROM (SELECT UNNEST($2::VARCHAR[]) AS entry_id, UNNEST($3::BIGINT[]) AS new_offset) moved
+                               WHERE thumbnail_pack_entries.entry_id = moved.entry_id""",
+                            (new_pack_path, entry_ids, new_offsets),
+                        )
+                        db.execute_query(
+                            """UPDATE photos
+                               SET thumbnail_path = $1 || '#' || moved.entry_id
+                               FROM (SELECT UNNEST($2::VARCHAR[]) AS entry_id) moved
+                               WHERE photos.user_id = $3 AND photos.thumbnail_path = $4 || '#' || moved.entry_id""",
+                            (new_pack_path, entry_ids, self.user_id, pack_path),
+                        )
+                    db.execute_query("DELETE FROM thumbnail_pack_entries WHERE pack_path = ?", (pack_path,))
+                    db.execute_query("DELETE FROM thumbnail_packs WHERE pack_path = ?", (pack_path,))
+        except Exception as e:
+            raise MetadataError(f"Failed to update thumbnail pack index for '{pack_path}': {e}") from e
+
+        self.metadata_service.trigger_async_sync()
+
+
+_pack_services: dict[str, ThumbnailPackService] = {}
+_pack_services_lock = threading.Lock()
+
+
+def get_thumbnail_pack_service(user_id: str) -> ThumbnailPackService:
+    """
+    Get the thumbnail pack service for a user.
+
+    Args:
+        user_id: User identifier
+
+    Returns:
+        ThumbnailPackService: Shared instance for the user
+    """
+    with _pack_services_lock:
+        if user_id not in _pack_services:
+            _pack_services[user_id] = ThumbnailPackService(user_id)
+        return _pack_services[user_id]
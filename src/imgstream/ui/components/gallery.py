@@ -10,15 +10,63 @@ from ..handlers.gallery import (
     convert_heic_to_web_display,
     convert_utc_to_jst,
     download_original_photo,
+    export_photos_zip,
+    get_photo_cursor,
     get_photo_original_url,
     get_photo_thumbnail_url,
+    get_photo_version,
+    get_user_date_histogram,
     is_heic_file,
+    is_storage_degraded,
     parse_datetime_string,
+    prefetch_packed_thumbnails,
 )
+from ...services.metadata import PageCursor
+from ...services.storage import is_pack_thumbnail_path
 
 logger = structlog.get_logger(__name__)
 
 
+def _get_thumbnail_source(
+    photo: dict[str, Any], packed_thumbnails: dict[str, bytes | None] | None = None
+) -> str | bytes | None:
+    """Get a signed URL, or image bytes for packed thumbnails, that st.image can display."""
+    thumbnail_path = photo.get("thumbnail_path")
+    if is_pack_thumbnail_path(thumbnail_path):
+        if packed_thumbnails is None or thumbnail_path not in packed_thumbnails:
+            packed_thumbnails = prefetch_packed_thumbnails([photo])
+        return packed_thumbnails.get(thumbnail_path)
+
+    return get_photo_thumbnail_url(
+        thumbnail_path, photo.get("id"), get_photo_version(photo), photo.get("thumbnail_generation")
+    )
+
+
+def render_thumbnail_placeholder(filename: str | None) -> None:
+    """
+    Render a neutral placeholder in place of a thumbnail that cannot be shown.
+
+    Args:
+        filename: Photo filename shown under the placeholder
+    """
+    st.markdown(
+        """
+        <div style='aspect-ratio: 1; display: flex; align-items: center; justify-content: center;
+                    background-color: #f0f2f6; border-radius: 0.5rem; font-size: 2.5rem; color: #bbb;'>
+            📷
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+    st.caption(filename or "不明")
+
+
+def render_degraded_mode_banner() -> None:
+    """Show a notice while storage is unavailable and the gallery serves cached content."""
+    if is_storage_degraded():
+        st.warning("⚠️ ストレージに一時的に接続できません。キャッシュ済みの画像のみ表示しています。しばらくしてから再読み込みしてください。")
+
+
 def render_photo_grid(photos: list[dict[str, Any]]) -> None:
     """
     Render photos in a grid layout with thumbnails.
@@ -28,6 +76,7 @@ def render_photo_grid(photos: list[dict[str, Any]]) -> None:
     """
     # Grid configuration
     cols_per_row = 4
+    packed_thumbnails = prefetch_packed_thumbnails(photos)
 
     # Process photos in chunks for grid layout
     for i in range(0, len(photos), cols_per_row):
@@ -38,7 +87,7 @@ def render_photo_grid(photos: list[dict[str, Any]]) -> None:
             if photo_index < len(photos):
                 photo = photos[photo_index]
                 with col:
-                    render_photo_thumbnail(photo)
+                    render_photo_thumbnail(photo, packed_thumbnails=packed_thumbnails)
             else:
                 # Empty column for alignment
                 with col:
@@ -52,12 +101,13 @@ def render_photo_list(photos: list[dict[str, Any]]) -> None:
     Args:
         photos: List of photo metadata dictionaries
     """
+    packed_thumbnails = prefetch_packed_thumbnails(photos)
     for photo in photos:
         with st.container():
             col1, col2 = st.columns([1, 3])
 
             with col1:
-                render_photo_thumbnail(photo, size="small")
+                render_photo_thumbnail(photo, size="small", packed_thumbnails=packed_thumbnails)
 
             with col2:
                 render_photo_details(photo)
@@ -65,19 +115,20 @@ def render_photo_list(photos: list[dict[str, Any]]) -> None:
             st.divider()
 
 
-def render_photo_thumbnail(photo: dict[str, Any], size: str = "medium") -> None:
+def render_photo_thumbnail(
+    photo: dict[str, Any], size: str = "medium", packed_thumbnails: dict[str, bytes | None] | None = None
+) -> None:
     """
     Render a single photo thumbnail with click functionality.
 
     Args:
         photo: Photo metadata dictionary
         size: Thumbnail size ("small", "medium", "large")
+        packed_thumbnails: Prefetched packed thumbnails of the current page
     """
     try:
-        # Get thumbnail URL
-        thumbnail_path = photo.get("thumbnail_path")
-        photo_id = photo.get("id")
-        thumbnail_url = get_photo_thumbnail_url(thumbnail_path, photo_id)
+        # Get thumbnail URL (or image bytes for packed thumbnails)
+        thumbnail_url = _get_thumbnail_source(photo, packed_thumbnails)
 
         if thumbnail_url:
             # Display thumbnail image
@@ -108,9 +159,8 @@ def render_photo_thumbnail(photo: dict[str, Any], size: str = "medium") -> None:
                 show_photo_dialog()
 
         else:
-            # Fallback for missing thumbnail
-            st.error("📷 サムネイルが利用できません")
-            st.caption(photo.get("filename", "不明"))
+            # Placeholder for missing thumbnail (e.g. while storage is unavailable)
+            render_thumbnail_placeholder(photo.get("filename"))
 
     except Exception as e:
         logger.error("render_thumbnail_error", photo_id=photo.get("id"), error=str(e))
@@ -235,11 +285,9 @@ def render_heic_fallback_display(photo: dict[str, Any]) -> None:
         photo: Photo metadata dictionary
     """
     st.warning("🔄 HEIC画像の変換に失敗したため、サムネイルを表示しています")
-    thumbnail_path = photo.get("thumbnail_path")
-    photo_id = photo.get("id")
 
     # Try to display thumbnail as fallback
-    thumbnail_url = get_photo_thumbnail_url(thumbnail_path, photo_id)
+    thumbnail_url = _get_thumbnail_source(photo)
     if thumbnail_url:
         try:
             st.image(
@@ -303,13 +351,15 @@ def render_gallery_header(photos: list[dict[str, Any]], total_count: int, has_mo
             st.markdown(f"**{total_pages}ページ中 {current_page_display}ページ目**")
 
 
-def render_pagination_controls(has_more: bool, total_count: int) -> None:
+def render_pagination_controls(has_more: bool, total_count: int, has_previous: bool | None = None) -> None:
     """
     Render pagination controls.
 
     Args:
         has_more: Whether there are more photos to load
         total_count: Total number of photos
+        has_previous: Whether photos come before the current page (defaults to not being on page 1);
+            after a timeline jump the page number does not tell
     """
     if total_count <= st.session_state.gallery_page_size:
         return  # No pagination needed
@@ -322,16 +372,22 @@ def render_pagination_controls(has_more: bool, total_count: int) -> None:
 
     col1, col2, col3, col4, col5 = st.columns([1, 1, 2, 1, 1])
 
-    # Previous page button
+    # Neighbouring pages are loaded from the cursor of the photo next to them
+    photos = st.session_state.get("gallery_photos") or []
+    if has_previous is None:
+        has_previous = current_page > 0
+
+    # First page button
     with col1:
-        if st.button("⏮️ 最初", disabled=current_page == 0, use_container_width=True):
-            st.session_state.gallery_page = 0
+        if st.button("⏮️ 最初", disabled=not has_previous, use_container_width=True):
+            _go_to_gallery_page(0)
             st.rerun()
 
-    # First page button
+    # Previous page button
     with col2:
-        if st.button("⬅️ 前へ", disabled=current_page == 0, use_container_width=True):
-            st.session_state.gallery_page = max(0, current_page - 1)
+        if st.button("⬅️ 前へ", disabled=not has_previous, use_container_width=True):
+            cursor = get_photo_cursor(photos[0]) if photos else None
+            _go_to_gallery_page(max(0, current_page - 1), cursor, backward=cursor is not None)
             st.rerun()
 
     # Page info and jump
@@ -339,22 +395,24 @@ def render_pagination_controls(has_more: bool, total_count: int) -> None:
         # Page selector
         page_options = list(range(1, total_pages + 1))
         if page_options:
-            selected_page = st.selectbox("ページに移動:", page_options, index=current_page, key="page_selector")
+            selected_page = st.selectbox(
+                "ページに移動:", page_options, index=min(current_page, total_pages - 1), key="page_selector"
+            )
 
             if selected_page - 1 != current_page:
-                st.session_state.gallery_page = selected_page - 1
+                _go_to_gallery_page(selected_page - 1)
                 st.rerun()
 
-    # Last page button
+    # Next page button
     with col4:
         if st.button("次へ ➡️", disabled=not has_more, use_container_width=True):
-            st.session_state.gallery_page = current_page + 1
+            _go_to_gallery_page(current_page + 1, get_photo_cursor(photos[-1]) if photos else None)
             st.rerun()
 
-    # Next page button
+    # Last page button
     with col5:
         if st.button("⏭️ 最後", disabled=current_page >= total_pages - 1, use_container_width=True):
-            st.session_state.gallery_page = total_pages - 1
+            _go_to_gallery_page(total_pages - 1, backward=True)
             st.rerun()
 
     # Load more button (alternative to pagination)
@@ -368,6 +426,35 @@ def render_pagination_controls(has_more: bool, total_count: int) -> None:
                 st.rerun()
 
 
+def render_timeline_navigation(user_id: str, sort_order: str) -> None:
+    """
+    Render a month selector that jumps the gallery to the photos of that month.
+
+    Args:
+        user_id: Authenticated user ID
+        sort_order: Current gallery sort order
+    """
+    histogram = get_user_date_histogram(user_id, "month", sort_order)
+    if len(histogram) < 2:
+        return  # Nothing to jump between
+
+    buckets = {f"{bucket['period']:%Y年%m月} ({bucket['count']}枚)": bucket for bucket in histogram}
+
+    def jump_to_period() -> None:
+        bucket = buckets.get(st.session_state.timeline_selector)
+        if bucket is not None:
+            _go_to_gallery_page(bucket["offset"] // st.session_state.gallery_page_size, bucket["cursor"])
+
+    st.selectbox(
+        "📅 撮影月へ移動:",
+        list(buckets),
+        index=None,
+        placeholder="年月を選択",
+        key="timeline_selector",
+        on_change=jump_to_period,
+    )
+
+
 def render_pagination_summary() -> None:
     """Render pagination summary information."""
     current_page = st.session_state.gallery_page
@@ -391,7 +478,7 @@ def render_pagination_summary() -> None:
 
             if new_page_size != page_size:
                 st.session_state.gallery_page_size = new_page_size
-                st.session_state.gallery_page = 0  # Reset to first page
+                _go_to_gallery_page(0)  # Reset to first page
                 st.rerun()
 
             # Reset pagination button
@@ -400,7 +487,73 @@ def render_pagination_summary() -> None:
                 st.rerun()
 
 
+def render_export_panel(user_id: str) -> None:
+    """
+    Render the ZIP export panel for downloading many originals at once.
+
+    Args:
+        user_id: Authenticated user ID
+    """
+    with st.expander("📦 ZIPでエクスポート", expanded=False):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            scope = st.radio("対象", ["年を指定", "すべての写真"], key="export_scope", horizontal=True)
+
+        with col2:
+            year = st.number_input(
+                "撮影年",
+                min_value=1900,
+                max_value=datetime.now().year,
+                value=datetime.now().year,
+                step=1,
+                key="export_year",
+                disabled=scope != "年を指定",
+            )
+
+        if st.button("📦 ZIPを作成", key="export_start", use_container_width=True):
+            progress_bar = st.progress(0.0, text="エクスポートを準備中...")
+
+            def update_progress(progress: dict[str, Any]) -> None:
+                total = progress["total_bytes"] or 1
+                progress_bar.progress(
+                    min(progress["bytes_done"] / total, 1.0),
+                    text=f"📥 {progress['files_done']}/{progress['total_files']} 枚 "
+                    f"({progress['bytes_done'] / (1024 * 1024):.1f} MB)",
+                )
+
+            summary = export_photos_zip(
+                user_id, int(year) if scope == "年を指定" else None, progress_callback=update_progress
+            )
+            if summary and summary["download_url"]:
+                progress_bar.progress(1.0, text="✅ エクスポートが完了しました")
+                st.link_button(
+                    f"📥 {summary['filename']} をダウンロード ({summary['archive_bytes'] / (1024 * 1024):.1f} MB)",
+                    summary["download_url"],
+                    use_container_width=True,
+                )
+                st.caption("💡 ダウンロードリンクの有効期限は6時間です")
+            else:
+                progress_bar.empty()
+                if summary is not None:
+                    st.info("エクスポート対象の写真がありません")
+
+
+def _go_to_gallery_page(page: int, cursor: PageCursor | None = None, backward: bool = False) -> None:
+    """
+    Move the gallery to a page.
+
+    Args:
+        page: Page number (0-based)
+        cursor: Cursor of the photo next to the page (see load_user_photos_paginated)
+        backward: The page lies before the cursor, or is the last page when there is no cursor
+    """
+    st.session_state.gallery_page = page
+    st.session_state.gallery_cursor = cursor
+    st.session_state.gallery_backward = backward
+
+
 def reset_gallery_pagination() -> None:
     """Reset gallery pagination to first page."""
-    st.session_state.gallery_page = 0
+    _go_to_gallery_page(0)
     st.session_state.gallery_total_loaded = 0
@@ -40,6 +40,7 @@ import os
 from datetime import datetime, timedelta
 
 from ...services.metadata import get_metadata_service, MetadataError
+from ...services.single_flight import SingleFlight
 from ...logging_config import log_error
 
 logger = structlog.get_logger(__name__)
@@ -213,6 +214,9 @@ class CollisionCache:
 # Global cache instance
 _collision_cache = CollisionCache()
 
+# Identical collision checks running at the same time are executed once
+_collision_checks = SingleFlight("collision_check")
+
 
 def check_filename_collisions_with_retry(
     user_id: str, filenames: list[str], max_retries: int = 3, retry_delay: float = 1.0
@@ -287,6 +291,62 @@ def check_filename_collisions_with_retry(
     )
 
 
+def _check_each_filename(
+    metadata_service: Any, user_id: str, filenames: list[str]
+) -> tuple[dict[str, dict[str, Any]], list[str]]:
+    """
+    Check each filename for an existing photo.
+
+    Args:
+        metadata_service: Metadata service of the user
+        user_id: User identifier
+        filenames: Filenames to check
+
+    Returns:
+        tuple: (collision info by filename, filenames whose check failed)
+    """
+    collision_results = {}
+    failed_files = []
+
+    for filename in filenames:
+        try:
+            collision_info = metadata_service.check_filename_exists(filename)
+            if collision_info:
+                collision_results[filename] = collision_info
+                logger.debug(
+                    "collision_detected_in_individual_fallback",
+                    user_id=user_id,
+                    filename=filename,
+                    existing_photo_id=collision_info["existing_photo"].id,
+                )
+
+                # Monitoring functionality removed for personal development use
+
+        except MetadataError as e:
+            failed_files.append(filename)
+            logger.warning(
+                "collision_check_failed_for_file",
+                user_id=user_id,
+                filename=filename,
+                error=str(e),
+            )
+            # Continue with other files even if one fails
+            continue
+        except Exception as e:
+            failed_files.append(filename)
+            logger.error(
+                "collision_check_unexpected_error_for_file",
+                user_id=user_id,
+                filename=filename,
+                error=str(e),
+                error_type=type(e).__name__,
+            )
+            # Continue with other files
+            continue
+
+    return collision_results, failed_files
+
+
 def check_filename_collisions(user_id: str, filenames: list[str], use_cache: bool = True) -> dict[str, dict[str, Any]]:
     """
     Check for filename collisions across multiple files for a user.
@@ -331,45 +391,14 @@ def check_filename_collisions(user_id: str, filenames: list[str], use_cache: boo
             cache_enabled=use_cache,
         )
 
-        # Use individual collision detection for each filename
-        collision_results = {}
-        failed_files = []
-
-        for filename in filenames:
-            try:
-                collision_info = metadata_service.check_filename_exists(filename)
-                if collision_info:
-                    collision_results[filename] = collision_info
-                    logger.debug(
-                        "collision_detected_in_individual_fallback",
-                        user_id=user_id,
-                        filename=filename,
-                        existing_photo_id=collision_info["existing_photo"].id,
-                    )
-
-                    # Monitoring functionality removed for personal development use
-
-            except MetadataError as e:
-                failed_files.append(filename)
-                logger.warning(
-                    "collision_check_failed_for_file",
-                    user_id=user_id,
-                    filename=filename,
-                    error=str(e),
-                )
-                # Continue with other files even if one fails
-                continue
-            except Exception as e:
-                failed_files.append(filename)
-                logger.error(
-                    "collision_check_unexpected_error_for_file",
-                    user_id=user_id,
-                    filename=filename,
-                    error=str(e),
-                    error_type=type(e).__name__,
-                )
-                # Continue with other files
-                continue
+        # Sessions checking the same files at once (e.g. a double-submitted upload) share one check
+        collision_results, failed_files = _collision_checks.do(
+            (user_id, tuple(filenames)),
+            lambda: _check_each_filename(metadata_service, user_id, filenames),
+        )
+        # Callers annotate the per-file entries (e.g. user decisions), so each gets its own copies
+        collision_results = {filename: dict(info) for filename, info in collision_results.items()}
+        failed_files = list(failed_files)
 
         # Log summary including failures
         logger.info(
@@ -833,12 +862,16 @@ def check_filename_collisions_optimized(
     user_id: str, filenames: list[str], batch_size: int = 100
 ) -> dict[str, dict[str, Any]]:
     """
-    Optimized collision detection with batching and caching.
+    Optimized collision detection with a single set-based query and caching.
+
+    All filenames are checked with MetadataService.check_multiple_filename_exists
+    in one query. If that fails, the files are checked in batches of batch_size
+    with the per-file path instead.
 
     Args:
         user_id: User identifier
         filenames: List of filenames to check for collisions
-        batch_size: Maximum number of filenames per batch query
+        batch_size: Maximum number of filenames per batch in the fallback path
 
     Returns:
         dict: Dictionary mapping filename to collision info
@@ -849,6 +882,36 @@ def check_filename_collisions_optimized(
     if not filenames:
         return {}
 
+    cached_results = _collision_cache.get(user_id, filenames)
+    if cached_results is not None:
+        logger.info("collision_detection_cache_hit", user_id=user_id, total_files=len(filenames))
+        return cached_results
+
+    try:
+        metadata_service = get_metadata_service(user_id)
+        collision_results = _collision_checks.do(
+            ("batch", user_id, tuple(filenames)),
+            lambda: metadata_service.check_multiple_filename_exists(filenames),
+        )
+        collision_results = {filename: dict(info) for filename, info in collision_results.items()}
+        _collision_cache.set(user_id, filenames, collision_results)
+
+        logger.info(
+            "set_based_collision_detection_completed",
+            user_id=user_id,
+            total_files=len(filenames),
+            collisions_found=len(collision_results),
+        )
+        return collision_results
+
+    except Exception as e:
+        logger.warning(
+            "set_based_collision_detection_failed",
+            user_id=user_id,
+            total_files=len(filenames),
+            error=str(e),
+        )
+
     # For small lists, use regular collision detection
     if len(filenames) <= batch_size:
         return check_filename_collisions(user_id, filenames, use_cache=True)
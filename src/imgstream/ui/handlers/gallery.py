@@ -1,13 +1,21 @@
 """Gallery handlers for imgstream application."""
 
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta, UTC
 from typing import Any
 
 import streamlit as st
 import structlog
 
-from imgstream.services.metadata import get_metadata_service
-from imgstream.services.storage import get_storage_service
+from imgstream.services.export import PhotoExportService
+from imgstream.services.resilience import CLOSED, CircuitOpenError
+from imgstream.services.single_flight import SingleFlight
+from imgstream.services.metadata import PageCursor, get_metadata_service
+from imgstream.services.storage import get_storage_service, is_pack_thumbnail_path
+from imgstream.services.thumbnail_packs import get_thumbnail_pack_service
 from imgstream.services.image_processor import get_image_processor
 
 logger = structlog.get_logger(__name__)
@@ -15,6 +23,19 @@ logger = structlog.get_logger(__name__)
 # JST timezone (UTC+9)
 JST = timezone(timedelta(hours=9))
 
+# Thumbnail URLs are signed for a long period and reused until shortly before they expire,
+# so the same URL (and the browser's cached copy of the image) is served across visits
+THUMBNAIL_URL_EXPIRATION = int(os.getenv("GCS_THUMBNAIL_URL_EXPIRATION", "86400"))
+THUMBNAIL_URL_CACHE_TTL = max(THUMBNAIL_URL_EXPIRATION - 3600, 60)
+
+# Last successfully signed thumbnail URLs, served while the storage circuit breaker is open
+LAST_KNOWN_URL_MAX_ENTRIES = 20000
+_last_known_thumbnail_urls: OrderedDict[tuple[str, str | None], tuple[str, float]] = OrderedDict()
+_last_known_lock = threading.Lock()
+
+# Sessions opening the same HEIC photo at once share one download and conversion
+_web_display_renditions = SingleFlight("web_display_rendition")
+
 
 def is_heic_file(filename: str | None) -> bool:
     """
@@ -82,11 +103,35 @@ def parse_datetime_string(datetime_str: str) -> datetime | None:
         return None
 
 
+def _render_web_display_jpeg(storage_service: Any, original_path: str, photo_id: str) -> bytes | None:
+    """Download an original and convert it to a web display JPEG."""
+    # Download original image data
+    image_data = storage_service.download_file(original_path)
+    if not image_data:
+        logger.warning("failed_to_download_original", photo_id=photo_id, path=original_path)
+        return None
+
+    # Convert to web display JPEG
+    image_processor = get_image_processor()
+    jpeg_data = image_processor.convert_to_web_display_jpeg(image_data)
+
+    logger.info(
+        "heic_converted_for_web_display",
+        photo_id=photo_id,
+        original_size=len(image_data),
+        jpeg_size=len(jpeg_data),
+    )
+
+    return jpeg_data
+
+
 @st.cache_data(ttl=86400)  # 1 day cache
 def convert_heic_to_web_display(original_path: str, photo_id: str) -> bytes | None:
     """
     Convert HEIC photo to JPEG for web display.
 
+    Concurrent cache misses for the same photo share one download and conversion.
+
     Args:
         original_path: The GCS path to the original photo
         photo_id: The ID of the photo for logging
@@ -102,25 +147,10 @@ def convert_heic_to_web_display(original_path: str, photo_id: str) -> bytes | No
             logger.warning("no_original_path_for_conversion", photo_id=photo_id)
             return None
 
-        # Download original image data
-        image_data = storage_service.download_file(original_path)
-        if not image_data:
-            logger.warning("failed_to_download_original", photo_id=photo_id, path=original_path)
-            return None
-
-        # Convert to web display JPEG
-        image_processor = get_image_processor()
-        jpeg_data = image_processor.convert_to_web_display_jpeg(image_data)
-
-        logger.info(
-            "heic_converted_for_web_display",
-            photo_id=photo_id,
-            original_size=len(image_data),
-            jpeg_size=len(jpeg_data),
+        return _web_display_renditions.do(
+            original_path, lambda: _render_web_display_jpeg(storage_service, original_path, photo_id)
         )
 
-        return jpeg_data
-
     except Exception as e:
         logger.error(
             "heic_conversion_failed",
@@ -133,17 +163,31 @@ def convert_heic_to_web_display(original_path: str, photo_id: str) -> bytes | No
 
 @st.cache_data(ttl=300)
 def load_user_photos_paginated(
-    user_id: str, sort_order: str = "新しい順", page: int = 0, page_size: int = 20, rerun_counter: int = 0
+    user_id: str,
+    sort_order: str = "新しい順",
+    page: int = 0,
+    page_size: int = 20,
+    rerun_counter: int = 0,
+    cursor: PageCursor | None = None,
+    backward: bool = False,
 ) -> tuple[list[dict[str, Any]], int, bool]:
     """
     Load user photos with pagination support.
 
+    Pages are read by keyset pagination from the cursor of a photo on the
+    neighbouring page, so moving to the next or previous page costs the same
+    on any page. Without a cursor, page is reached by offset (page jumps), or
+    with backward the last page is loaded.
+
     Args:
         user_id: User identifier
         sort_order: Sort order for photos
         page: Page number (0-based)
         page_size: Number of photos per page
         rerun_counter: A counter to manually trigger a cache refresh
+        cursor: Cursor of the last photo of the previous page, or with backward of
+            the first photo of the next page (see get_photo_cursor)
+        backward: Load the page before the cursor
 
     Returns:
         tuple: (photos, total_count, has_more)
@@ -151,27 +195,25 @@ def load_user_photos_paginated(
     try:
         metadata_service = get_metadata_service(user_id)
 
-        # Calculate offset
-        offset = page * page_size
-
-        # Get photos with pagination (request one extra to check if there are more)
-        photos = metadata_service.get_photos_by_date(limit=page_size + 1, offset=offset)
-
-        # Check if there are more photos
-        has_more = len(photos) > page_size
-        if has_more:
-            photos = photos[:page_size]  # Remove the extra photo
-
-        # Convert PhotoMetadata objects to dictionaries
-        photo_dicts = [photo.to_dict() for photo in photos]
-
-        # Sort photos based on user preference
-        if sort_order == "古い順":
-            photo_dicts.reverse()
-
         # Get total count (for display purposes)
         total_count = get_user_photos_count(user_id, rerun_counter=rerun_counter)
 
+        oldest_first = sort_order == "古い順"
+        if cursor is not None:
+            photos, more = metadata_service.get_photos_page(page_size, cursor, oldest_first, backward)
+            # Coming back from a later page means there is always a next one
+            has_more = True if backward else more
+        elif backward:
+            # The last page holds the remainder so that earlier pages keep their boundaries
+            last_page_size = min(page_size, max(total_count - page * page_size, 1))
+            photos, _ = metadata_service.get_photos_page(last_page_size, None, oldest_first, backward=True)
+            has_more = False
+        else:
+            photos, has_more = metadata_service.get_photos_page(page_size, None, oldest_first, offset=page * page_size)
+
+        # Convert the columnar page to dictionaries without building PhotoMetadata objects
+        photo_dicts = photos.to_dicts()
+
         logger.info(
             "photos_loaded_paginated",
             user_id=user_id,
@@ -181,6 +223,7 @@ def load_user_photos_paginated(
             total_count=total_count,
             has_more=has_more,
             sort_order=sort_order,
+            keyset=cursor is not None,
         )
 
         return photo_dicts, total_count, has_more
@@ -190,6 +233,22 @@ def load_user_photos_paginated(
         return [], 0, False
 
 
+def get_photo_cursor(photo: dict[str, Any]) -> PageCursor:
+    """
+    Get the keyset pagination cursor of a loaded photo.
+
+    Args:
+        photo: Photo dictionary as returned by load_user_photos_paginated
+
+    Returns:
+        PageCursor: Cursor for load_user_photos_paginated
+    """
+    sort_ts = photo.get("created_at") or photo["uploaded_at"]
+    if isinstance(sort_ts, datetime):
+        sort_ts = sort_ts.isoformat()
+    return sort_ts, photo["id"]
+
+
 @st.cache_data(ttl=300)
 def get_user_photos_count(user_id: str, rerun_counter: int = 0) -> int:
     """
@@ -210,6 +269,57 @@ def get_user_photos_count(user_id: str, rerun_counter: int = 0) -> int:
         return 0
 
 
+@st.cache_data(ttl=300)
+def has_photos_before(user_id: str, sort_order: str, cursor: PageCursor, rerun_counter: int = 0) -> bool:
+    """
+    Check whether any photo comes before a photo in the gallery order.
+
+    Page numbers only approximate the position after a timeline jump, so the
+    gallery asks this instead of comparing the page number with 0.
+
+    Args:
+        user_id: User identifier
+        sort_order: Sort order of the gallery
+        cursor: Cursor of the photo (see get_photo_cursor)
+        rerun_counter: A counter to manually trigger a cache refresh
+
+    Returns:
+        bool: True if there are earlier photos
+    """
+    try:
+        metadata_service = get_metadata_service(user_id)
+        photos, _ = metadata_service.get_photos_page(1, cursor, sort_order == "古い順", backward=True)
+        return len(photos) > 0
+    except Exception as e:
+        logger.error("has_photos_before_error", user_id=user_id, error=str(e))
+        return False
+
+
+def get_user_date_histogram(
+    user_id: str, granularity: str = "month", sort_order: str = "新しい順"
+) -> list[dict[str, Any]]:
+    """
+    Get photo counts per year, month or day for timeline navigation.
+
+    The metadata service caches the counts until the user's database changes,
+    so this is cheap to call on every rerun.
+
+    Args:
+        user_id: User identifier
+        granularity: 'year', 'month' or 'day'
+        sort_order: Sort order of the gallery the buckets are shown in
+
+    Returns:
+        list: Buckets with 'period', 'count', 'offset' and 'cursor' (see MetadataService.get_date_histogram)
+    """
+    try:
+        metadata_service = get_metadata_service(user_id)
+        return metadata_service.get_date_histogram(granularity, oldest_first=sort_order == "古い順")
+    except Exception as e:
+        logger.error("get_date_histogram_error", user_id=user_id, error=str(e))
+        return []
+
+
 def load_user_photos(user_id: str, sort_order: str = "新しい順", rerun_counter: int = 0) -> list[dict[str, Any]]:
     """
     Load user photos from metadata service (legacy function for compatibility).
@@ -226,29 +336,96 @@ def load_user_photos(user_id: str, sort_order: str = "新しい順", rerun_count
     return photos
 
 
-@st.cache_data(ttl=3000)  # 50 minute cache
-def get_photo_thumbnail_url(thumbnail_path: str | None, photo_id: str | None) -> str | None:
+def get_photo_version(photo: dict[str, Any]) -> str | None:
+    """
+    Get a value that changes whenever a photo's objects are replaced.
+
+    Args:
+        photo: Photo metadata dictionary
+
+    Returns:
+        str: Version token (the upload timestamp), or None if unknown
+    """
+    uploaded_at = photo.get("uploaded_at")
+    if uploaded_at is None:
+        return None
+    return uploaded_at.isoformat() if isinstance(uploaded_at, datetime) else str(uploaded_at)
+
+
+@st.cache_data(ttl=THUMBNAIL_URL_CACHE_TTL, max_entries=20000)
+def _sign_thumbnail_url(thumbnail_path: str, version: str | None = None, generation: int | None = None) -> str:
+    """
+    Sign a thumbnail URL, cached per (path, version, generation).
+
+    Failures raise instead of returning None so that they are not cached.
+
+    Args:
+        thumbnail_path: The GCS path to the thumbnail
+        version: Version token of the photo (see get_photo_version)
+        generation: GCS generation of the thumbnail object to pin in the URL, if known
+
+    Returns:
+        str: Signed URL
+    """
+    return get_storage_service().get_signed_url(
+        thumbnail_path, expiration=THUMBNAIL_URL_EXPIRATION, generation=generation
+    )
+
+
+def _remember_thumbnail_url(key: tuple[str, str | None], url: str) -> None:
+    """Keep a signed URL so it can be served while storage is unavailable."""
+    with _last_known_lock:
+        if key not in _last_known_thumbnail_urls:
+            _last_known_thumbnail_urls[key] = (url, time.time() + THUMBNAIL_URL_EXPIRATION)
+        _last_known_thumbnail_urls.move_to_end(key)
+        while len(_last_known_thumbnail_urls) > LAST_KNOWN_URL_MAX_ENTRIES:
+            _last_known_thumbnail_urls.popitem(last=False)
+
+
+def _last_known_thumbnail_url(key: tuple[str, str | None]) -> str | None:
+    """Get a previously signed URL that has not expired yet."""
+    with _last_known_lock:
+        entry = _last_known_thumbnail_urls.get(key)
+    if entry is None or entry[1] <= time.time():
+        return None
+    return entry[0]
+
+
+def get_photo_thumbnail_url(
+    thumbnail_path: str | None, photo_id: str | None, version: str | None = None, generation: int | None = None
+) -> str | None:
     """
     Get signed URL for photo thumbnail.
 
+    The URL is pinned to the thumbnail's object generation when it is known and
+    cached per (path, version, generation): an overwritten thumbnail gets a new
+    URL, while an unchanged one keeps the same URL so browsers can serve it from
+    their cache (thumbnails are stored with a year-long Cache-Control max-age).
+    While the storage circuit breaker is open, the last URL signed for the
+    thumbnail is returned if it is still valid.
+
     Args:
         thumbnail_path: The GCS path to the thumbnail
         photo_id: The ID of the photo for logging
+        version: Version token of the photo (see get_photo_version)
+        generation: GCS generation of the thumbnail object (the photo's thumbnail_generation)
 
     Returns:
         str: Signed URL for thumbnail, or None if failed
     """
-    try:
-        storage_service = get_storage_service()
-
-        if not thumbnail_path:
-            logger.warning("no_thumbnail_path", photo_id=photo_id)
-            return None
+    if not thumbnail_path:
+        logger.warning("no_thumbnail_path", photo_id=photo_id)
+        return None
 
-        # Generate signed URL for thumbnail (1 hour expiration)
-        signed_url = storage_service.get_signed_url(thumbnail_path, expiration=3600)
+    key = (thumbnail_path, version)
+    try:
+        signed_url = _sign_thumbnail_url(thumbnail_path, version, generation)
+        _remember_thumbnail_url(key, signed_url)
         return signed_url
 
+    except CircuitOpenError:
+        return _last_known_thumbnail_url(key)
+
     except Exception as e:
         logger.error(
             "get_thumbnail_url_error",
@@ -259,6 +436,73 @@ def get_photo_thumbnail_url(thumbnail_path: str | None, photo_id: str | None) ->
         return None
 
 
+def is_storage_degraded() -> bool:
+    """
+    Check whether storage calls are currently being short-circuited.
+
+    Returns:
+        bool: True while the storage circuit breaker is open or probing
+    """
+    try:
+        state: str = get_storage_service().get_circuit_state()["state"]
+        return state != CLOSED
+    except Exception as e:
+        logger.warning("circuit_state_check_failed", error=str(e))
+        return False
+
+
+@st.cache_data(ttl=THUMBNAIL_URL_CACHE_TTL, max_entries=200)
+def load_packed_thumbnails(user_id: str, thumbnail_paths: tuple[str, ...]) -> dict[str, bytes | None]:
+    """
+    Load thumbnails stored in pack files with batched ranged reads.
+
+    Packed thumbnails are immutable (an overwrite gets a new entry and path),
+    so the loaded bytes can be cached for as long as signed URLs are.
+    Failures raise instead of returning None entries so that they are not cached.
+
+    Args:
+        user_id: Owner of the thumbnails
+        thumbnail_paths: Packed thumbnail paths ({pack_path}#{entry_id})
+
+    Returns:
+        dict: Mapping of thumbnail path to image bytes, or None if not in any pack
+    """
+    return get_thumbnail_pack_service(user_id).read_thumbnails(list(thumbnail_paths), raise_on_error=True)
+
+
+def prefetch_packed_thumbnails(photos: list[dict[str, Any]]) -> dict[str, bytes | None]:
+    """
+    Load the packed thumbnails of a gallery page in one batch.
+
+    Thumbnails that cannot be read (e.g. while the storage circuit breaker is
+    open) map to None, so the gallery shows its placeholder for them and
+    retries on the next rerun.
+
+    Args:
+        photos: Photo metadata dictionaries of the page
+
+    Returns:
+        dict: Mapping of packed thumbnail path to image bytes (empty if none are packed)
+    """
+    paths_by_user: dict[str, list[str]] = {}
+    for photo in photos:
+        thumbnail_path = photo.get("thumbnail_path")
+        if is_pack_thumbnail_path(thumbnail_path):
+            paths_by_user.setdefault(photo.get("user_id", ""), []).append(thumbnail_path)
+
+    thumbnails: dict[str, bytes | None] = {}
+    for user_id, paths in paths_by_user.items():
+        unique_paths = tuple(sorted(set(paths)))
+        try:
+            thumbnails.update(load_packed_thumbnails(user_id, unique_paths))
+        except CircuitOpenError:
+            thumbnails.update(dict.fromkeys(unique_paths))
+        except Exception as e:
+            logger.error("load_packed_thumbnails_error", user_id=user_id, count=len(unique_paths), error=str(e))
+            thumbnails.update(dict.fromkeys(unique_paths))
+    return thumbnails
+
+
 def download_original_photo(photo: dict[str, Any]) -> None:
     """
     Handle original photo download.
@@ -280,6 +524,34 @@ def download_original_photo(photo: dict[str, Any]) -> None:
         st.error(f"❌ ダウンロードに失敗しました: {str(e)}")
 
 
+def export_photos_zip(user_id: str, year: int | None = None, progress_callback: Any = None) -> dict[str, Any] | None:
+    """
+    Export a user's originals as a streamed ZIP archive and return its download link.
+
+    Args:
+        user_id: User whose photos are exported
+        year: Only export photos created in this year (None for all photos)
+        progress_callback: Called with a progress dict after each downloaded chunk
+
+    Returns:
+        dict: Export summary including 'download_url' ('files' is 0 if nothing matched), or None if it failed
+    """
+    try:
+        export_service = PhotoExportService(user_id)
+        photos = export_service.select_photos(year=year)
+        if not photos:
+            return {"files": 0, "download_url": None}
+
+        summary = export_service.export_to_gcs(photos, progress_callback=progress_callback)
+        logger.info("photos_exported", user_id=user_id, year=year, files=summary["files"])
+        return summary
+
+    except Exception as e:
+        logger.error("export_photos_error", user_id=user_id, year=year, error=str(e))
+        st.error(f"❌ エクスポートに失敗しました: {str(e)}")
+        return None
+
+
 def copy_image_url(photo: dict[str, Any]) -> None:
     """
     Handle copying image URL to clipboard.
@@ -8,9 +8,11 @@ import structlog
 
 from imgstream.models.photo import PhotoMetadata
 from imgstream.services.auth import get_auth_service
+from imgstream.services.backfill import compute_image_details
 from imgstream.services.image_processor import ImageProcessingError, ImageProcessor, UnsupportedFormatError
 from imgstream.services.metadata import get_metadata_service
-from imgstream.services.storage import get_storage_service
+from imgstream.services.storage import get_storage_service, is_content_addressed_path, is_pack_thumbnail_path
+from imgstream.services.thumbnail_packs import get_thumbnail_pack_service, is_pack_thumbnail_enabled
 from imgstream.ui.handlers.collision_detection import (
     check_filename_collisions_with_fallback,
     check_filename_collisions_optimized,
@@ -263,13 +265,63 @@ def get_file_size_limits() -> tuple[int, int]:
     return image_processor.MIN_FILE_SIZE, image_processor.MAX_FILE_SIZE
 
 
-def process_single_upload(file_info: dict[str, Any], is_overwrite: bool = False) -> dict[str, Any]:
+def _store_thumbnail(
+    storage_service: Any, user_id: str, thumbnail_data: bytes, filename: str
+) -> tuple[str, int | None]:
+    """
+    Store a thumbnail as its own object or, with THUMBNAIL_STORAGE=pack, in the user's pack file.
+
+    Args:
+        storage_service: Storage service used for per-object thumbnails
+        user_id: User identifier
+        thumbnail_data: Thumbnail image data
+        filename: Original filename
+
+    Returns:
+        tuple: Thumbnail path to store in photo metadata, and the GCS generation of the
+            thumbnail object (None for packed thumbnails, which are not served by URL)
+    """
+    if is_pack_thumbnail_enabled():
+        return get_thumbnail_pack_service(user_id).append_thumbnail(thumbnail_data), None
+
+    upload_result = storage_service.upload_thumbnail(user_id, thumbnail_data, filename)
+    thumbnail_path: str = upload_result["gcs_path"]
+    generation: int | None = upload_result.get("generation")
+    return thumbnail_path, generation
+
+
+def _image_details(image_processor: ImageProcessor, file_data: bytes, thumbnail_data: bytes) -> dict[str, Any]:
+    """
+    Get the image detail fields of an upload.
+
+    Details that cannot be read here are left empty, for the details backfill to fill in.
+
+    Args:
+        image_processor: Image processor of the upload
+        file_data: Original image data
+        thumbnail_data: Generated thumbnail data
+
+    Returns:
+        dict: Detail fields to pass to PhotoMetadata.create_new
+    """
+    try:
+        return compute_image_details(file_data, thumbnail_data, image_processor)
+    except Exception as e:
+        logger.warning("image_details_extraction_failed", error=str(e))
+        return {}
+
+
+def process_single_upload(
+    file_info: dict[str, Any], is_overwrite: bool = False, defer_metadata: bool = False
+) -> dict[str, Any]:
     """
     Process a single file upload through the complete pipeline.
 
     Args:
         file_info: Dictionary containing file information from validation
         is_overwrite: Whether this is an overwrite operation
+        defer_metadata: Skip saving the metadata and return it as 'photo_metadata'
+            so the caller can save a whole batch with save_photos_metadata_bulk
 
     Returns:
         dict: Processing result with success status and details
@@ -312,8 +364,9 @@ def process_single_upload(file_info: dict[str, Any], is_overwrite: bool = False)
 
         # Step 4: Upload thumbnail to GCS
         logger.info("uploading_thumbnail", filename=filename, is_overwrite=is_overwrite)
-        thumbnail_upload_result = storage_service.upload_thumbnail(user_info.user_id, thumbnail_data, filename)
-        thumbnail_gcs_path = thumbnail_upload_result["gcs_path"]
+        thumbnail_gcs_path, thumbnail_generation = _store_thumbnail(
+            storage_service, user_info.user_id, thumbnail_data, filename
+        )
 
         # Step 5: Save or update metadata in DuckDB
         logger.info("saving_metadata", filename=filename, is_overwrite=is_overwrite)
@@ -333,15 +386,18 @@ def process_single_upload(file_info: dict[str, Any], is_overwrite: bool = False)
             mime_type=mime_type,
             created_at=created_at,
             uploaded_at=datetime.now(),
+            thumbnail_generation=thumbnail_generation,
+            **_image_details(image_processor, file_data, thumbnail_data),
         )
 
         # Use the new save_or_update method based on operation type
-        metadata_service.save_or_update_photo_metadata(photo_metadata, is_overwrite=is_overwrite)
+        if not defer_metadata:
+            metadata_service.save_or_update_photo_metadata(photo_metadata, is_overwrite=is_overwrite)
 
         operation_message = "overwritten" if is_overwrite else "uploaded"
         logger.info("upload_processing_completed", filename=filename, operation_type=operation_type)
 
-        return {
+        result = {
             "success": True,
             "filename": filename,
             "original_path": original_gcs_path,
@@ -350,6 +406,9 @@ def process_single_upload(file_info: dict[str, Any], is_overwrite: bool = False)
             "is_overwrite": is_overwrite,
             "message": f"正常にアップロードしました {operation_message} {filename}",
         }
+        if defer_metadata:
+            result["photo_metadata"] = photo_metadata
+        return result
 
     except Exception as e:
         operation_type = "overwrite" if is_overwrite else "upload"
@@ -463,7 +522,11 @@ def _update_progress_after_processing(
 ) -> None:
     """Update progress after processing a file."""
     if progress_callback:
-        if result["success"]:
+        if result["success"] and "photo_metadata" in result:
+            # The objects are stored, but the metadata is only saved with the rest of the batch
+            status = "⏳ Metadata pending"
+            stage = "processing"
+        elif result["success"]:
             status = "✅ Overwritten" if is_overwrite else "✅ Uploaded"
             stage = "completed"
         else:
@@ -479,6 +542,105 @@ def _update_progress_after_processing(
         )
 
 
+def _discard_deferred_objects(results: list[dict[str, Any]]) -> None:
+    """
+    Delete the objects stored by new uploads whose metadata could not be saved.
+
+    Overwrites keep their objects, which the existing record still points to.
+    Content-addressed objects and pack entries may be shared with other photos,
+    so they are only logged and left to orphan reconciliation.
+    """
+    paths = [
+        path
+        for result in results
+        if not result.get("is_overwrite")
+        for path in (result.get("original_path"), result.get("thumbnail_path"))
+        if path
+    ]
+    shared = [path for path in paths if is_content_addressed_path(path) or is_pack_thumbnail_path(path)]
+    if shared:
+        logger.warning("deferred_upload_objects_left_for_reconciliation", paths=shared)
+
+    orphaned = [path for path in paths if path not in shared]
+    if not orphaned:
+        return
+    try:
+        outcomes = get_storage_service().delete_files(orphaned)
+        failed = [path for path, outcome in outcomes.items() if outcome["status"] == "error"]
+        if failed:
+            logger.warning("deferred_upload_objects_not_deleted", paths=failed)
+    except Exception as e:
+        logger.warning("deferred_upload_objects_not_deleted", paths=orphaned, error=str(e))
+
+
+def _report_deferred_outcome(progress_callback: Any, result: dict[str, Any], total_files: int) -> None:
+    """Update progress once the deferred metadata of a file is saved or has failed."""
+    if progress_callback:
+        if result["success"]:
+            status = "✅ Overwritten" if result.get("is_overwrite") else "✅ Uploaded"
+            stage = "completed"
+        else:
+            status = "❌ Failed"
+            stage = "failed"
+
+        progress_callback(
+            current_file=result["filename"],
+            current_step=status,
+            completed=total_files,
+            total=total_files,
+            stage=stage,
+        )
+
+
+def _save_deferred_metadata(results: list[dict[str, Any]], progress_callback: Any = None) -> tuple[int, int]:
+    """
+    Save the metadata held back by deferred uploads with a single bulk upsert.
+
+    Only results with is_overwrite replace the record with their filename; the
+    others are inserted. Saved results get the 'photo_id' of their record and
+    are reported as completed. If the bulk save fails, the affected results are
+    marked as failed in place and the objects of new uploads are deleted.
+
+    Args:
+        results: Upload results; successful deferred ones carry 'photo_metadata'
+        progress_callback: Optional callback function for progress updates
+
+    Returns:
+        tuple: Number of results that failed, and how many of them were overwrites
+    """
+    deferred = [result for result in results if result.get("success") and "photo_metadata" in result]
+    if not deferred:
+        return 0, 0
+
+    photos = [result.pop("photo_metadata") for result in deferred]
+    try:
+        saved = get_metadata_service(photos[0].user_id).save_photos_metadata_bulk(
+            photos, [bool(result.get("is_overwrite")) for result in deferred]
+        )
+    except Exception as e:
+        logger.error("batch_metadata_save_failed", files=len(photos), error=str(e))
+        for result in deferred:
+            result.update(
+                {
+                    "success": False,
+                    "error": str(e),
+                    "error_type": type(e).__name__,
+                    "message": f"Failed to save metadata for {result['filename']}: {str(e)}",
+                }
+            )
+            _report_deferred_outcome(progress_callback, result, len(results))
+        _discard_deferred_objects(deferred)
+        return len(deferred), sum(1 for result in deferred if result.get("is_overwrite"))
+
+    for result, photo in zip(deferred, photos, strict=True):
+        is_overwrite = bool(result.get("is_overwrite"))
+        result["photo_id"] = saved["photo_ids"][photo.id]
+        result["processing_steps"][-1] = "メタデータを更新完了" if is_overwrite else "メタデータを保存完了"
+        result["message"] = f"Successfully {'overwritten' if is_overwrite else 'uploaded'} {result['filename']}"
+        _report_deferred_outcome(progress_callback, result, len(results))
+    return 0, 0
+
+
 def process_batch_upload(
     valid_files: list[dict[str, Any]], collision_results: dict[str, Any] | None = None, progress_callback: Any = None
 ) -> dict[str, Any]:
@@ -542,7 +704,7 @@ def process_batch_upload(
         # Process the file with detailed step tracking
         is_overwrite = processing_action["is_overwrite"]
         result = process_single_upload_with_progress(
-            file_info, progress_callback, index, total_files, is_overwrite=is_overwrite
+            file_info, progress_callback, index, total_files, is_overwrite=is_overwrite, defer_metadata=True
         )
         results.append(result)
 
@@ -554,6 +716,12 @@ def process_batch_upload(
         # Update progress after processing
         _update_progress_after_processing(progress_callback, filename, result, is_overwrite, index, total_files)
 
+    # Save the metadata of every uploaded file in one transaction
+    bulk_failures, bulk_overwrite_failures = _save_deferred_metadata(results, progress_callback)
+    successful_uploads -= bulk_failures
+    failed_uploads += bulk_failures
+    overwrite_uploads -= bulk_overwrite_failures
+
     # Create summary
     batch_result = {
         "success": failed_uploads == 0,
@@ -584,6 +752,7 @@ def process_single_upload_with_progress(
     file_index: int = 0,
     total_files: int = 1,
     is_overwrite: bool = False,
+    defer_metadata: bool = False,
 ) -> dict[str, Any]:
     """
     Process a single file upload with detailed progress tracking.
@@ -594,6 +763,8 @@ def process_single_upload_with_progress(
         file_index: Index of current file in batch
         total_files: Total number of files in batch
         is_overwrite: Whether this is an overwrite operation
+        defer_metadata: Skip saving the metadata and return it as 'photo_metadata'
+            so the caller can save a whole batch with save_photos_metadata_bulk
 
     Returns:
         dict: Processing result with success status and details
@@ -653,8 +824,9 @@ def process_single_upload_with_progress(
         else:
             update_progress("🔄 サムネイルをアップロード中...")
         logger.info("uploading_thumbnail", filename=filename, is_overwrite=is_overwrite)
-        thumbnail_upload_result = storage_service.upload_thumbnail(user_info.user_id, thumbnail_data, filename)
-        thumbnail_gcs_path = thumbnail_upload_result["gcs_path"]
+        thumbnail_gcs_path, thumbnail_generation = _store_thumbnail(
+            storage_service, user_info.user_id, thumbnail_data, filename
+        )
 
         # Step 5: Save or update metadata in DuckDB
         if is_overwrite:
@@ -679,13 +851,20 @@ def process_single_upload_with_progress(
             mime_type=mime_type,
             created_at=created_at,
             uploaded_at=datetime.now(),
+            thumbnail_generation=thumbnail_generation,
+            **_image_details(image_processor, file_data, thumbnail_data),
         )
 
         # Use the new save_or_update method based on operation type
-        metadata_service.save_or_update_photo_metadata(photo_metadata, is_overwrite=is_overwrite)
+        if not defer_metadata:
+            metadata_service.save_or_update_photo_metadata(photo_metadata, is_overwrite=is_overwrite)
 
-        completion_text = "✅ 上書き完了！" if is_overwrite else "✅ アップロード完了！"
-        update_progress(completion_text, "success")
+        if defer_metadata:
+            # Completion is only reported once the caller has saved the metadata
+            update_progress("⏳ メタデータ保存待ち...")
+        else:
+            completion_text = "✅ 上書き完了！" if is_overwrite else "✅ アップロード完了！"
+            update_progress(completion_text, "success")
         logger.info("upload_processing_completed", filename=filename, operation_type=operation_type)
 
         operation_message = "overwritten" if is_overwrite else "uploaded"
@@ -696,7 +875,7 @@ def process_single_upload_with_progress(
                 "サムネイル生成完了",
                 "元画像を上書き完了",
                 "サムネイルを上書き完了",
-                "メタデータを更新完了",
+                "メタデータを更新待ち" if defer_metadata else "メタデータを更新完了",
             ]
         else:
             processing_steps = [
@@ -705,10 +884,10 @@ def process_single_upload_with_progress(
                 "サムネイル生成完了",
                 "元画像をアップロード完了",
                 "サムネイルをアップロード完了",
-                "メタデータを保存完了",
+                "メタデータを保存待ち" if defer_metadata else "メタデータを保存完了",
             ]
 
-        return {
+        result = {
             "success": True,
             "filename": filename,
             "original_path": original_gcs_path,
@@ -719,6 +898,10 @@ def process_single_upload_with_progress(
             "processing_steps": processing_steps,
             "message": f"Successfully {operation_message} {filename}",
         }
+        if defer_metadata:
+            result["photo_metadata"] = photo_metadata
+            result["message"] = f"Stored {filename}, metadata pending"
+        return result
 
     except Exception as e:
         operation_type = "overwrite" if is_overwrite else "upload"
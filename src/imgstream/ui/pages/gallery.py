@@ -6,15 +6,18 @@ import structlog
 from imgstream.services.auth import get_auth_service
 from imgstream.ui.components.common import render_empty_state, render_error_message
 from imgstream.ui.components.gallery import (
+    render_degraded_mode_banner,
     render_gallery_header,
     render_pagination_controls,
     render_pagination_summary,
+    render_export_panel,
     render_photo_grid,
     render_photo_list,
+    render_timeline_navigation,
     reset_gallery_pagination,
 )
 from imgstream.ui.handlers.auth import require_authentication
-from imgstream.ui.handlers.gallery import load_user_photos_paginated
+from imgstream.ui.handlers.gallery import get_photo_cursor, has_photos_before, load_user_photos_paginated
 
 logger = structlog.get_logger(__name__)
 
@@ -43,6 +46,9 @@ def render_gallery_page() -> None:
 
         st.divider()
 
+        # Notice while storage is failing and thumbnails come from cached URLs
+        render_degraded_mode_banner()
+
         # Initialize pagination state
         initialize_gallery_pagination()
 
@@ -59,6 +65,8 @@ def render_gallery_page() -> None:
             st.session_state.gallery_page,
             st.session_state.gallery_page_size,
             rerun_counter=rerun_counter,
+            cursor=st.session_state.gallery_cursor,
+            backward=st.session_state.gallery_backward,
         )
 
         if total_count == 0:
@@ -77,6 +85,9 @@ def render_gallery_page() -> None:
             # Display photo count and pagination info
             render_gallery_header(photos, total_count, has_more)
 
+            # Jump to a month without paging there
+            render_timeline_navigation(user_info.user_id, sort_order)
+
             # Render photos based on view mode
             if view_mode == "グリッド":
                 render_photo_grid(photos)
@@ -84,11 +95,17 @@ def render_gallery_page() -> None:
                 render_photo_list(photos)
 
             # Render pagination controls
-            render_pagination_controls(has_more, total_count)
+            has_previous = bool(photos) and has_photos_before(
+                user_info.user_id, sort_order, get_photo_cursor(photos[0]), rerun_counter=rerun_counter
+            )
+            render_pagination_controls(has_more, total_count, has_previous)
 
             # Render pagination summary
             render_pagination_summary()
 
+            # Render ZIP export panel
+            render_export_panel(user_info.user_id)
+
     except Exception as e:
         logger.error("gallery_page_error", error=str(e))
         render_error_message("ギャラリーエラー", "写真コレクションの読み込みに失敗しました。", str(e))
@@ -104,3 +121,7 @@ def initialize_gallery_pagination() -> None:
         st.session_state.gallery_sort_order = "新しい順"
     if "gallery_total_loaded" not in st.session_state:
         st.session_state.gallery_total_loaded = 0
+    if "gallery_cursor" not in st.session_state:
+        st.session_state.gallery_cursor = None
+    if "gallery_backward" not in st.session_state:
+        st.session_state.gallery_backward = False
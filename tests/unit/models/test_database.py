@@ -3,7 +3,10 @@ Unit tests for database module.
 """
 
 import os
+import shutil
 import tempfile
+import threading
+from datetime import datetime
 from unittest.mock import patch
 
 import duckdb
@@ -11,9 +14,11 @@ import pytest
 
 from src.imgstream.models.database import (
     DatabaseManager,
+    SharedDatabaseManager,
     create_database,
     get_database_manager,
 )
+from src.imgstream.models.schema import SCHEMA_VERSION
 
 
 class TestDatabaseManager:
@@ -98,6 +103,47 @@ class TestDatabaseManager:
             with pytest.raises(RuntimeError, match="Schema is not compatible"):
                 manager.initialize_schema()
 
+    def test_upgrade_schema_migrates_old_database(self):
+        """Test that a database written before schema versioning is migrated and stamped on open."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "test.db")
+            conn = duckdb.connect(db_path)
+            conn.execute("""CREATE TABLE photos (
+                       id TEXT PRIMARY KEY, user_id TEXT NOT NULL, filename TEXT NOT NULL,
+                       original_path TEXT NOT NULL, thumbnail_path TEXT NOT NULL, created_at TIMESTAMP,
+                       uploaded_at TIMESTAMP NOT NULL, file_size INTEGER NOT NULL, mime_type TEXT NOT NULL)""")
+            conn.execute(
+                "INSERT INTO photos VALUES ('p1', 'u1', 'a.jpg', 'o/a.jpg', 't/a.jpg', NULL, '2024-01-02', 1, 'image/jpeg')"
+            )
+            conn.close()
+
+            manager = DatabaseManager(db_path)
+            assert manager.get_schema_version() == 0
+            assert manager.pending_migrations() == list(range(1, SCHEMA_VERSION + 1))
+
+            manager.initialize_schema()
+
+            assert manager.get_schema_version() == SCHEMA_VERSION
+            assert manager.pending_migrations() == []
+            assert manager.upgrade_schema() == []
+            row = manager.execute_query("SELECT sort_ts, width, content_hash, renditions FROM photos")[0]
+            assert row == (datetime(2024, 1, 2), None, None, None)
+            assert manager.execute_query("SELECT COUNT(*) FROM schema_version") == [(1,)]
+
+            manager.close()
+
+    def test_upgrade_schema_leaves_newer_database_alone(self):
+        """Test that a database migrated by newer code is not downgraded."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manager = DatabaseManager(os.path.join(tmp_dir, "test.db"))
+            manager.initialize_schema()
+            manager.execute_query("UPDATE schema_version SET version = ?", (SCHEMA_VERSION + 1,))
+
+            assert manager.upgrade_schema() == []
+            assert manager.get_schema_version() == SCHEMA_VERSION + 1
+
+            manager.close()
+
     def test_verify_schema_success(self):
         """Test successful schema verification."""
         with tempfile.TemporaryDirectory() as tmp_dir:
@@ -187,6 +233,21 @@ class TestDatabaseManager:
 
             manager.close()
 
+    def test_execute_columns(self):
+        """Test fetching a result column by column, with and without NumPy."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manager = DatabaseManager(os.path.join(tmp_dir, "test.db"))
+            query = "SELECT * FROM (VALUES ('a', 1), ('b', NULL)) t(name, value) ORDER BY name"
+
+            columns = manager.execute_columns(query)
+            assert list(columns) == ["name", "value"]
+            assert columns["value"].tolist() == [1, None]
+
+            with patch("src.imgstream.models.database.NUMPY_AVAILABLE", False):
+                assert manager.execute_columns(query) == {"name": ["a", "b"], "value": [1, None]}
+
+            manager.close()
+
     def test_execute_query_error(self):
         """Test query execution error handling."""
         with tempfile.TemporaryDirectory() as tmp_dir:
@@ -288,3 +349,83 @@ class TestDatabaseFunctions:
                 mock_init.assert_called_once()
 
                 manager.close()
+
+
+class TestSharedDatabaseManager:
+    """Test cases for SharedDatabaseManager."""
+
+    def test_connection_survives_context_exit(self):
+        """Test that leaving the context keeps the shared connection open."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manager = get_database_manager(os.path.join(tmp_dir, "test.db"), shared=True)
+            assert isinstance(manager, SharedDatabaseManager)
+
+            with manager as db:
+                db.connect().execute("SELECT 1")
+            connection = manager._connection
+
+            with manager as db:
+                assert db.execute_query("SELECT COUNT(*) FROM photos") == [(0,)]
+
+            assert manager._connection is connection
+            assert manager._cursors == {}
+
+            manager.close()
+            assert manager._connection is None
+
+    def test_threads_get_separate_cursors(self):
+        """Test that each thread uses its own cursor on the shared connection."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manager = get_database_manager(os.path.join(tmp_dir, "test.db"), shared=True)
+            cursors = []
+            barrier = threading.Barrier(3)
+
+            def use():
+                with manager as db:
+                    cursors.append(db.connect())
+                    db.execute_query("SELECT COUNT(*) FROM photos")
+                    barrier.wait(timeout=5)
+
+            threads = [threading.Thread(target=use) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=5)
+
+            assert len({id(cursor) for cursor in cursors}) == 3
+            manager.close()
+
+    def test_close_if_idle(self):
+        """Test that the connection is closed only after the idle timeout."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            create_database(os.path.join(tmp_dir, "test.db")).close()
+            manager = SharedDatabaseManager(os.path.join(tmp_dir, "test.db"), idle_timeout=0)
+
+            with manager as db:
+                db.connect()
+                assert manager.close_if_idle() is False
+
+            assert manager.close_if_idle() is True
+            assert manager._connection is None
+
+    def test_checkpoint_writes_changes_to_file(self):
+        """Test that a checkpoint makes a copy of the file contain recent writes."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "test.db")
+            manager = get_database_manager(db_path, shared=True)
+
+            with manager as db:
+                db.connect().execute(
+                    "INSERT INTO photos (id, user_id, filename, original_path, thumbnail_path, created_at, "
+                    "uploaded_at, file_size, mime_type) VALUES ('p1', 'u1', 'a.jpg', 'o', 't', now(), now(), 1, "
+                    "'image/jpeg')"
+                )
+
+            with manager.exclusive():
+                manager.checkpoint()
+                shutil.copy(db_path, os.path.join(tmp_dir, "copy.db"))
+
+            copy = duckdb.connect(os.path.join(tmp_dir, "copy.db"))
+            assert copy.execute("SELECT COUNT(*) FROM photos").fetchone() == (1,)
+            copy.close()
+            manager.close()
@@ -4,7 +4,7 @@ Unit tests for PhotoMetadata model.
 
 from datetime import UTC, datetime, timedelta
 
-from src.imgstream.models.photo import PhotoMetadata
+from src.imgstream.models.photo import PHOTO_COLUMNS, PhotoMetadata, PhotoPage
 
 
 class TestPhotoMetadata:
@@ -85,6 +85,13 @@ class TestPhotoMetadata:
             "uploaded_at": "2023-01-01T12:05:00",
             "file_size": 1024000,
             "mime_type": "image/jpeg",
+            "width": None,
+            "height": None,
+            "orientation": None,
+            "content_hash": None,
+            "renditions": None,
+            "placeholder": None,
+            "thumbnail_generation": None,
         }
 
         assert result == expected
@@ -303,3 +310,41 @@ class TestPhotoMetadata:
 
         # Should be equal
         assert original == reconstructed
+
+
+class TestPhotoPage:
+    """Test cases for the columnar PhotoPage."""
+
+    def _photos(self):
+        return [
+            PhotoMetadata(
+                id=f"id_{i}",
+                user_id="user123",
+                filename=f"photo_{i}.jpg",
+                original_path=f"photos/user123/original/photo_{i}.jpg",
+                thumbnail_path=f"photos/user123/thumbs/photo_{i}.jpg",
+                created_at=datetime(2023, 1, i + 1) if i % 2 else None,
+                uploaded_at=datetime(2023, 2, 1, i),
+                file_size=1000 + i,
+                mime_type="image/jpeg",
+            )
+            for i in range(5)
+        ]
+
+    def test_rows_slices_and_dicts_match_photo_metadata(self):
+        """Test that a page reads like the list of photos it was built from."""
+        photos = self._photos()
+        page = PhotoPage.from_rows([tuple(getattr(photo, name) for name in PHOTO_COLUMNS) for photo in photos])
+
+        assert len(page) == 5
+        assert list(page) == photos
+        assert page[-1] == photos[-1]
+        assert list(page[1:4]) == photos[1:4]
+        assert list(page[:4][::-1]) == photos[:4][::-1]
+        assert page[::-1].column("id") == ["id_4", "id_3", "id_2", "id_1", "id_0"]
+        assert page[1:3].to_dicts() == [photo.to_dict() for photo in photos[1:3]]
+
+        empty = PhotoPage.from_rows([])
+        assert len(empty) == 0
+        assert not empty
+        assert empty.to_dicts() == []
@@ -3,9 +3,12 @@ Unit tests for database schema module.
 """
 
 from src.imgstream.models.schema import (
+    PHOTO_DETAIL_COLUMNS,
     PHOTOS_TABLE_INDEXES,
     PHOTOS_TABLE_SCHEMA,
+    SCHEMA_VERSION,
     get_index_creation_statements,
+    get_migrations,
     get_schema_statements,
     get_table_creation_statement,
     validate_schema_compatibility,
@@ -133,3 +136,16 @@ class TestSchema:
         for statement in get_schema_statements():
             assert isinstance(statement, str)
             assert len(statement.strip()) > 0
+
+    def test_migrations_run_in_version_order_from_current_version(self):
+        """Test that only the migrations newer than a database's version are pending, oldest first."""
+        versions = [version for version, _ in get_migrations(0)]
+        assert versions == list(range(1, SCHEMA_VERSION + 1))
+        assert [version for version, _ in get_migrations(1)] == versions[1:]
+        assert get_migrations(SCHEMA_VERSION) == []
+
+    def test_table_schema_has_every_migrated_column(self):
+        """Test that a new database gets the columns migrations add to old ones."""
+        for column in PHOTO_DETAIL_COLUMNS:
+            assert column in PHOTOS_TABLE_SCHEMA
+            assert any(column in statement for _, statements in get_migrations(0) for statement in statements)
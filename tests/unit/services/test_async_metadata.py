@@ -0,0 +1,195 @@
+"""Tests for the asyncio metadata facade."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from imgstream.services import async_metadata
+from imgstream.services.async_metadata import AsyncMetadataService
+
+
+class TestAsyncMetadataService:
+    """Test cases for AsyncMetadataService."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_metadata = MagicMock()
+        self.mock_metadata.user_id = "u"
+        self.service = AsyncMetadataService(self.mock_metadata)
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        self.service.close()
+
+    @pytest.mark.asyncio
+    async def test_calls_are_serialized_on_one_thread(self):
+        """Test that all DuckDB calls for a user run on the same thread."""
+        threads = set()
+
+        def record_thread(*args, **kwargs):
+            threads.add(threading.get_ident())
+            return 0
+
+        self.mock_metadata.get_photos_count.side_effect = record_thread
+
+        await asyncio.gather(*(self.service.get_photos_count() for _ in range(5)))
+
+        assert self.mock_metadata.get_photos_count.call_count == 5
+        assert len(threads) == 1
+        assert threading.get_ident() not in threads
+
+    @pytest.mark.asyncio
+    async def test_calls_never_overlap(self):
+        """Test that a call only starts once the previous one for the user has finished."""
+        active = []
+        overlaps = []
+
+        def query(*args, **kwargs):
+            active.append(1)
+            overlaps.append(len(active) > 1)
+            time.sleep(0.02)
+            active.pop()
+            return []
+
+        self.mock_metadata.get_photos_by_date.side_effect = query
+        self.mock_metadata.search_photos_by_filename.side_effect = query
+
+        await asyncio.gather(
+            *(self.service.get_photos_by_date(limit=10) for _ in range(3)),
+            *(self.service.search_photos_by_filename("%a%") for _ in range(3)),
+        )
+
+        assert overlaps == [False] * 6
+
+    @pytest.mark.asyncio
+    async def test_event_loop_is_not_blocked(self):
+        """Test that other coroutines keep running while a query blocks its thread."""
+        started = threading.Event()
+
+        def slow_count():
+            started.set()
+            time.sleep(0.2)
+            return 3
+
+        self.mock_metadata.get_photos_count.side_effect = slow_count
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while not started.is_set():
+                await asyncio.sleep(0.005)
+            for _ in range(5):
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        count, _ = await asyncio.gather(self.service.get_photos_count(), tick())
+
+        assert count == 3
+        assert ticks == 5
+
+    @pytest.mark.asyncio
+    async def test_arguments_and_results_are_delegated(self):
+        """Test that arguments reach the sync service and its results come back unchanged."""
+        page = MagicMock()
+        self.mock_metadata.get_photos_page.return_value = (page, True)
+        self.mock_metadata.save_photos_metadata_bulk.return_value = {"saved": 1}
+        cursor = ("2024-01-01T00:00:00", "p1")
+
+        assert await self.service.get_photos_page(20, cursor, oldest_first=True) == (page, True)
+        assert await self.service.save_photos_metadata_bulk(["photo"], [False]) == {"saved": 1}
+
+        self.mock_metadata.get_photos_page.assert_called_once_with(20, cursor, True, False, 0)
+        self.mock_metadata.save_photos_metadata_bulk.assert_called_once_with(["photo"], [False])
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_to_the_caller(self):
+        """Test that an exception raised by the sync service is raised by the coroutine."""
+        from imgstream.services.metadata import MetadataError
+
+        self.mock_metadata.delete_photo_metadata.side_effect = MetadataError("delete failed")
+
+        with pytest.raises(MetadataError, match="delete failed"):
+            await self.service.delete_photo_metadata("p1")
+
+        # The executor keeps serving calls after a failure
+        self.mock_metadata.get_photos_count.return_value = 0
+        assert await self.service.get_photos_count() == 0
+
+    def test_instances_follow_the_metadata_service(self):
+        """Test that the facade is reused per metadata service and replaced along with it."""
+        first, second = MagicMock(user_id="cached_user"), MagicMock(user_id="cached_user")
+        with patch.object(async_metadata, "get_metadata_service", side_effect=[first, first, second]):
+            service = async_metadata.get_async_metadata_service("cached_user")
+            assert async_metadata.get_async_metadata_service("cached_user") is service
+            rebound = async_metadata.get_async_metadata_service("cached_user")
+
+        assert rebound is not service
+        assert rebound.metadata_service is second
+
+        async_metadata.cleanup_async_metadata_services()
+        assert len(async_metadata._async_metadata_services) == 0
+        for facade in (service, rebound):
+            with pytest.raises(RuntimeError):
+                facade._executor.submit(lambda: None)
+
+    def test_idle_instances_are_released(self):
+        """Test that facades are bounded like metadata services, shutting down their threads."""
+        registry = async_metadata._async_metadata_services
+        with patch.object(
+            async_metadata, "get_metadata_service", side_effect=lambda user_id: MagicMock(user_id=user_id)
+        ):
+            with patch.object(registry, "idle_ttl", 0.01):
+                idle = async_metadata.get_async_metadata_service("idle_user")
+                time.sleep(0.02)
+                assert registry.evict_idle() == 1
+
+        assert len(registry) == 0
+        with pytest.raises(RuntimeError):
+            idle._executor.submit(lambda: None)
+
+    @pytest.mark.asyncio
+    async def test_against_a_local_database(self, tmp_path):
+        """Test saving and reading photos through the facade with a real DuckDB file."""
+        from datetime import datetime
+
+        from imgstream.models.photo import PhotoMetadata
+        from imgstream.services.metadata import MetadataService
+
+        storage = MagicMock()
+        storage.file_exists.return_value = False
+        with patch("imgstream.services.metadata.get_storage_service", return_value=storage):
+            metadata_service = MetadataService("async_user", str(tmp_path))
+        metadata_service.disable_async_sync()
+        service = AsyncMetadataService(metadata_service)
+        photos = [
+            PhotoMetadata(
+                id=f"p{i}",
+                user_id="async_user",
+                filename=f"beach_{i}.jpg",
+                original_path=f"photos/async_user/original/beach_{i}.jpg",
+                thumbnail_path=f"photos/async_user/thumbs/beach_{i}_thumb.jpg",
+                created_at=datetime(2024, 1, i + 1),
+                uploaded_at=datetime(2024, 2, 1),
+                file_size=100,
+                mime_type="image/jpeg",
+            )
+            for i in range(3)
+        ]
+
+        try:
+            await service.save_photos_metadata_bulk(photos)
+            count, latest, found = await asyncio.gather(
+                service.get_photos_count(),
+                service.get_photos_by_date(limit=1),
+                service.search_photos("beach_1"),
+            )
+        finally:
+            service.close()
+            metadata_service.cleanup_local_database()
+
+        assert count == 3
+        assert [photo.id for photo in latest] == ["p2"]
+        assert [photo.filename for photo in found] == ["beach_1.jpg"]
@@ -0,0 +1,102 @@
+"""Tests for the asyncio storage facade."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from imgstream.services.async_storage import AsyncStorageService, run_async
+from imgstream.ui.handlers.error import StorageError
+
+
+class TestAsyncStorageService:
+    """Test cases for AsyncStorageService."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_storage = MagicMock()
+        self.service = AsyncStorageService(storage_service=self.mock_storage, max_concurrency=8)
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        self.service.close()
+
+    @pytest.mark.asyncio
+    async def test_download_file_delegates(self):
+        """Test that downloads are delegated to the sync service."""
+        self.mock_storage.download_file.return_value = b"data"
+
+        result = await self.service.download_file("photos/u/original/a.jpg")
+
+        assert result == b"data"
+        self.mock_storage.download_file.assert_called_once_with("photos/u/original/a.jpg")
+
+    @pytest.mark.asyncio
+    async def test_get_signed_urls_run_concurrently(self):
+        """Test that batch signing overlaps the blocking calls."""
+
+        def slow_sign(path, expiration):
+            time.sleep(0.2)
+            return f"https://signed/{path}"
+
+        self.mock_storage.get_signed_url.side_effect = slow_sign
+        paths = [f"photos/u/thumbs/{i}_thumb.jpg" for i in range(8)]
+
+        start = time.perf_counter()
+        results = await self.service.get_signed_urls(paths, expiration=60)
+        elapsed = time.perf_counter() - start
+
+        assert results == {path: f"https://signed/{path}" for path in paths}
+        # Sequential execution would take 1.6 seconds
+        assert elapsed < 1.0
+
+    @pytest.mark.asyncio
+    async def test_upload_photos_reports_per_file_results(self):
+        """Test that one failed upload does not fail the whole batch."""
+
+        def upload(user_id, file_data, filename, progress_callback):
+            if filename == "bad.jpg":
+                raise StorageError("upload failed")
+            return {"gcs_path": f"photos/{user_id}/original/{filename}"}
+
+        self.mock_storage.upload_original_photo.side_effect = upload
+
+        results = await self.service.upload_photos("u", [(b"1", "good.jpg"), (b"2", "bad.jpg")])
+
+        assert results[0]["success"] is True
+        assert results[0]["result"]["gcs_path"] == "photos/u/original/good.jpg"
+        assert results[1]["success"] is False
+        assert "upload failed" in results[1]["error"]
+
+    @pytest.mark.asyncio
+    async def test_download_to_path_writes_file(self, tmp_path):
+        """Test downloading an object to the local filesystem."""
+        self.mock_storage.download_file.return_value = b"x" * 10
+
+        written = await self.service.download_to_path("photos/u/original/a.jpg", tmp_path / "out" / "a.jpg")
+
+        assert written == 10
+        assert (tmp_path / "out" / "a.jpg").read_bytes() == b"x" * 10
+
+    @pytest.mark.asyncio
+    async def test_upload_from_missing_path_raises_storage_error(self, tmp_path):
+        """Test that local read errors surface as StorageError."""
+        with pytest.raises(StorageError, match="Failed to read local file"):
+            await self.service.upload_original_photo_from_path("u", tmp_path / "missing.jpg")
+
+    def test_run_async_without_running_loop(self):
+        """Test running a coroutine from synchronous code."""
+        self.mock_storage.file_exists.return_value = True
+
+        assert run_async(self.service.file_exists("photos/u/original/a.jpg")) is True
+
+    @pytest.mark.asyncio
+    async def test_run_async_inside_running_loop(self):
+        """Test that run_async works when called from a running loop."""
+
+        async def answer():
+            return 42
+
+        assert run_async(answer()) == 42
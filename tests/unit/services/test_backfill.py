@@ -0,0 +1,109 @@
+"""Tests for the photo details backfill."""
+
+import hashlib
+import io
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from PIL import Image
+
+from imgstream.models.photo import PhotoMetadata
+from imgstream.services.backfill import PhotoDetailsBackfill
+from imgstream.services.image_processor import ImageProcessor
+from imgstream.services.metadata import MetadataService
+
+
+def _jpeg(size):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color="red").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class TestPhotoDetailsBackfill:
+    """Test cases for PhotoDetailsBackfill."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.user_id = "backfill_user"
+
+        self.mock_storage = MagicMock()
+        self.mock_storage.file_exists.return_value = False
+        with patch("imgstream.services.metadata.get_storage_service", return_value=self.mock_storage):
+            self.metadata_service = MetadataService(self.user_id, self.temp_dir)
+        self.metadata_service.disable_async_sync()
+
+        # A content-addressed original, whose hash is its name, and a filename-layout one
+        self.originals = {"a": _jpeg((40, 30)), "b": _jpeg((20, 60))}
+        self.digest_a = hashlib.sha256(self.originals["a"]).hexdigest()
+        self.objects = {
+            f"photos/{self.user_id}/original/{self.digest_a[:2]}/{self.digest_a}.jpg": self.originals["a"],
+            f"photos/{self.user_id}/original/b.jpg": self.originals["b"],
+            f"photos/{self.user_id}/thumbs/a_thumb.jpg": _jpeg((8, 6)),
+            f"photos/{self.user_id}/thumbs/b_thumb.jpg": _jpeg((4, 12)),
+        }
+        for name, original_path in (("a", list(self.objects)[0]), ("b", list(self.objects)[1])):
+            photo = PhotoMetadata.create_new(
+                user_id=self.user_id,
+                filename=f"{name}.jpg",
+                original_path=original_path,
+                thumbnail_path=f"photos/{self.user_id}/thumbs/{name}_thumb.jpg",
+                file_size=100,
+                mime_type="image/jpeg",
+            )
+            photo.id = f"id_{name}"
+            self.metadata_service.save_photo_metadata(photo)
+
+        self.mock_storage.download_file.side_effect = lambda path: self.objects[path]
+        self.mock_storage.read_byte_range.side_effect = lambda path, start, length: self.objects[path][
+            start : start + length
+        ]
+        self.backfill = PhotoDetailsBackfill(self.user_id, self.mock_storage, self.metadata_service, ImageProcessor())
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_dry_run_reports_pending_photos(self):
+        """Test that dry-run counts photos without reading any object."""
+        report = self.backfill.backfill(dry_run=True, batch_size=1)
+
+        assert report["pending"] == 2
+        assert report["backfilled"] == 0
+        self.mock_storage.download_file.assert_not_called()
+        self.mock_storage.read_byte_range.assert_not_called()
+
+    def test_backfill_fills_missing_details(self):
+        """Test that every job fills its columns, reading whole originals only when needed."""
+        report = self.backfill.backfill(dry_run=False, batch_size=1, max_workers=2)
+
+        assert report["pending"] == 2
+        assert report["backfilled"] == 2
+        assert report["failed"] == []
+
+        photos = self.metadata_service.get_photos_by_ids(["id_a", "id_b"])
+        assert photos["id_a"].content_hash == self.digest_a
+        assert photos["id_b"].content_hash == hashlib.sha256(self.originals["b"]).hexdigest()
+        assert (photos["id_a"].width, photos["id_a"].height, photos["id_a"].orientation) == (40, 30, 1)
+        assert (photos["id_b"].width, photos["id_b"].height) == (20, 60)
+        assert all(photo.placeholder.startswith("data:image/jpeg;base64,") for photo in photos.values())
+
+        # Only the filename-layout original is downloaded whole, for its hash
+        downloaded = [call.args[0] for call in self.mock_storage.download_file.call_args_list]
+        assert [path for path in downloaded if "/original/" in path] == [f"photos/{self.user_id}/original/b.jpg"]
+
+        assert self.backfill.backfill(dry_run=True)["pending"] == 0
+
+    def test_backfill_runs_selected_jobs_and_reports_failures(self):
+        """Test that only the selected jobs run and a failing photo does not stop the others."""
+        del self.objects[f"photos/{self.user_id}/original/b.jpg"]
+
+        report = self.backfill.backfill(jobs=["dimensions"], dry_run=False)
+
+        assert report["backfilled"] == 1
+        assert [failure["photo_id"] for failure in report["failed"]] == ["id_b"]
+        photo = self.metadata_service.get_photo_by_id("id_a")
+        assert photo.width == 40
+        assert photo.content_hash is None
+        assert photo.placeholder is None
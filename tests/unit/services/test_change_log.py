@@ -0,0 +1,365 @@
+"""Tests for incremental metadata sync through delta segments."""
+
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from imgstream.models.photo import PhotoMetadata
+from imgstream.models.schema import PHOTO_DETAIL_COLUMNS
+from imgstream.services import change_log, metadata
+from imgstream.services.metadata import MetadataService
+from imgstream.services.storage import GenerationConflictError, StorageError
+
+
+class FakeDatabaseStorage:
+    """In-memory stand-in for the database bucket, with object generations."""
+
+    def __init__(self):
+        self.snapshot = None
+        self.generation = 0
+        self.deltas = {}
+        self.snapshot_uploads = 0
+        self.snapshot_downloads = 0
+
+    def file_exists(self, gcs_path):
+        return self.snapshot is not None
+
+    def upload_database_file(self, user_id, data, filename, if_generation_match=None):
+        if if_generation_match is not None and if_generation_match != self.generation:
+            raise GenerationConflictError(f"expected generation {if_generation_match}, found {self.generation}")
+        self.snapshot = data
+        self.generation += 1
+        self.snapshot_uploads += 1
+        return {"gcs_path": f"databases/{user_id}/{filename}", "generation": str(self.generation)}
+
+    def download_database_snapshot(self, user_id, filename):
+        if self.snapshot is None:
+            raise StorageError("Database file not found")
+        self.snapshot_downloads += 1
+        return self.snapshot, self.generation
+
+    def download_database_snapshot_if_changed(self, user_id, filename, generation):
+        if self.snapshot is not None and generation == self.generation:
+            return None, self.generation
+        return self.download_database_snapshot(user_id, filename)
+
+    def get_database_generation(self, user_id, filename):
+        return self.generation if self.snapshot is not None else None
+
+    def upload_database_delta(self, user_id, base_generation, seq, data):
+        gcs_path = f"databases/{user_id}/deltas/{base_generation}/{seq:012d}.parquet"
+        if gcs_path in self.deltas:
+            raise GenerationConflictError(f"Database delta already exists: {gcs_path}")
+        self.deltas[gcs_path] = (base_generation, seq, data)
+
+    def list_database_deltas(self, user_id, base_generation=None, after_seq=0):
+        return sorted(
+            (seq, path)
+            for path, (generation, seq, _) in self.deltas.items()
+            if base_generation in (None, generation) and seq > after_seq
+        )
+
+    def download_database_delta(self, gcs_path):
+        return self.deltas[gcs_path][2]
+
+    def delete_database_deltas(self, paths):
+        return sum(self.deltas.pop(path, None) is not None for path in paths)
+
+
+class TestIncrementalSync:
+    """Test that changes reach GCS as deltas and are replayed on bootstrap."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.user_id = "delta_user"
+        self.temp_dirs = []
+        self.storage = FakeDatabaseStorage()
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        for temp_dir in self.temp_dirs:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _create_service(self):
+        temp_dir = tempfile.mkdtemp()
+        self.temp_dirs.append(temp_dir)
+        with patch("imgstream.services.metadata.get_storage_service", return_value=self.storage):
+            service = MetadataService(self.user_id, temp_dir)
+        service.disable_async_sync()
+        service.ensure_local_database()
+        return service
+
+    def _photo(self, index):
+        return PhotoMetadata(
+            id=f"id_{index}",
+            user_id=self.user_id,
+            filename=f"photo_{index}.jpg",
+            original_path=f"photos/{self.user_id}/original/photo_{index}.jpg",
+            thumbnail_path=f"photos/{self.user_id}/thumbs/photo_{index}.jpg",
+            created_at=datetime(2024, 1, 1, index),
+            uploaded_at=datetime(2024, 1, 2, index),
+            file_size=1000,
+            mime_type="image/jpeg",
+        )
+
+    def test_changes_are_shipped_as_deltas_and_replayed(self):
+        """Test that a second device sees the base snapshot plus every delta."""
+        writer = self._create_service()
+        writer.save_photo_metadata(self._photo(1))
+        writer.save_photo_metadata(self._photo(2))
+
+        # No base in GCS yet, so the first sync uploads a snapshot
+        assert writer.sync_to_gcs() is True
+        assert self.storage.snapshot_uploads == 1
+        assert writer.sync_to_gcs() is False
+
+        writer.save_photo_metadata(self._photo(3))
+        writer.delete_photos_metadata_bulk(["id_1"])
+        assert writer.sync_to_gcs() is True
+        updated = self._photo(2)
+        updated.file_size = 2000
+        writer.save_photos_metadata_bulk([updated])
+        assert writer.sync_to_gcs() is True
+
+        assert self.storage.snapshot_uploads == 1
+        assert [seq for seq, _ in self.storage.list_database_deltas(self.user_id)] == [1, 2]
+
+        reader = self._create_service()
+        photos = {photo.id: photo.file_size for photo in reader.get_photos_by_date()}
+        assert photos == {"id_2": 2000, "id_3": 1000}
+
+        with reader.db_manager as db:
+            assert change_log.read_sync_state(db) == {"base_seq": 0, "last_seq": 2, "base_generation": 1}
+
+        writer.cleanup_local_database()
+        reader.cleanup_local_database()
+
+    def test_compaction_uploads_new_base_and_deletes_deltas(self):
+        """Test that reaching the segment limit folds the deltas into a new snapshot."""
+        writer = self._create_service()
+        writer.sync_to_gcs()
+
+        with patch.object(change_log, "COMPACT_AFTER_SEGMENTS", 2):
+            writer.save_photo_metadata(self._photo(1))
+            writer.sync_to_gcs()
+            assert len(self.storage.deltas) == 1
+
+            writer.save_photo_metadata(self._photo(2))
+            writer.sync_to_gcs()
+
+        assert self.storage.snapshot_uploads == 2
+        assert self.storage.deltas == {}
+
+        reader = self._create_service()
+        assert {photo.id for photo in reader.get_photos_by_date()} == {"id_1", "id_2"}
+        with reader.db_manager as db:
+            assert change_log.read_sync_state(db) == {"base_seq": 2, "last_seq": 2, "base_generation": 2}
+
+        writer.cleanup_local_database()
+        reader.cleanup_local_database()
+
+    def _filenames(self, service):
+        return sorted(photo.filename for photo in service.get_photos_by_date())
+
+    def test_unchanged_generation_replays_deltas_without_download(self):
+        """Test that revalidating a local database only fetches the deltas shipped since."""
+        writer = self._create_service()
+        writer.save_photo_metadata(self._photo(1))
+        writer.sync_to_gcs()
+        reader = self._create_service()
+        assert self.storage.snapshot_downloads == 1
+        assert [photo.filename for photo in reader.search_photos("photo")] == ["photo_1.jpg"]
+
+        writer.save_photo_metadata(self._photo(2))
+        writer.sync_to_gcs()
+
+        with patch("imgstream.services.metadata.DATABASE_REVALIDATE_SECONDS", 0):
+            assert reader.ensure_local_database() is False
+
+        assert self.storage.snapshot_downloads == 1
+        assert self._filenames(reader) == ["photo_1.jpg", "photo_2.jpg"]
+        # Replayed photos are indexed as they are applied
+        assert [photo.filename for photo in reader.search_photos("photo_2")] == ["photo_2.jpg"]
+
+        writer.cleanup_local_database()
+        reader.cleanup_local_database()
+
+    def test_concurrent_instances_do_not_lose_updates(self):
+        """Test that conflicting delta and snapshot uploads merge instead of overwriting."""
+        first = self._create_service()
+        first.save_photo_metadata(self._photo(1))
+        first.sync_to_gcs()
+        second = self._create_service()
+
+        # Both instances ship their next change as delta 1; the second one replays the first's and ships delta 2
+        first.save_photo_metadata(self._photo(2))
+        second.save_photo_metadata(self._photo(3))
+        assert first.sync_to_gcs() is True
+        assert second.sync_to_gcs() is True
+        assert [seq for seq, _ in self.storage.list_database_deltas(self.user_id)] == [1, 2]
+        assert self._filenames(second) == ["photo_1.jpg", "photo_2.jpg", "photo_3.jpg"]
+
+        # The first instance compacts; the second one's snapshot upload conflicts and is rebased instead
+        first.upload_to_gcs(force=True)
+        second.save_photo_metadata(self._photo(4))
+        assert second.upload_to_gcs(force=True) is True
+        assert self.storage.generation == 2
+
+        reader = self._create_service()
+        assert self._filenames(reader) == ["photo_1.jpg", "photo_2.jpg", "photo_3.jpg", "photo_4.jpg"]
+
+        for service in (first, second, reader):
+            service.cleanup_local_database()
+
+    def test_user_id_with_quote_ships_replays_and_rebases(self):
+        """Test that segment paths containing a quote are not spliced into the SQL."""
+        self.user_id = "o'brien"
+        first = self._create_service()
+        first.save_photo_metadata(self._photo(1))
+        first.sync_to_gcs()
+        second = self._create_service()
+
+        first.save_photo_metadata(self._photo(2))
+        assert first.sync_to_gcs() is True
+        first.upload_to_gcs(force=True)
+        second.save_photo_metadata(self._photo(3))
+        assert second.upload_to_gcs(force=True) is True
+
+        reader = self._create_service()
+        assert self._filenames(reader) == ["photo_1.jpg", "photo_2.jpg", "photo_3.jpg"]
+
+        for service in (first, second, reader):
+            service.cleanup_local_database()
+
+    def test_force_reload_replays_deltas_of_the_downloaded_snapshot(self):
+        """Test that a reset database is based on the snapshot generation and includes every delta."""
+        writer = self._create_service()
+        writer.save_photo_metadata(self._photo(1))
+        writer.upload_to_gcs(force=True)
+        writer.save_photo_metadata(self._photo(2))
+        writer.sync_to_gcs()
+
+        reader = self._create_service()
+        result = reader.force_reload_from_gcs(confirm_reset=True)
+
+        assert result["download_successful"] is True
+        assert self._filenames(reader) == ["photo_1.jpg", "photo_2.jpg"]
+        with reader.db_manager as db:
+            assert change_log.read_sync_state(db)["base_generation"] == self.storage.generation
+
+        # The next change is shipped as a delta on the same snapshot, without a conflict
+        reader.save_photo_metadata(self._photo(3))
+        assert reader.sync_to_gcs() is True
+        assert self.storage.snapshot_uploads == 1
+        assert [seq for seq, _ in self.storage.list_database_deltas(self.user_id)] == [1, 2]
+
+        writer.cleanup_local_database()
+        reader.cleanup_local_database()
+
+    def test_delta_shipped_after_compaction_is_not_lost(self):
+        """Test that a delta shipped on a snapshot another instance already replaced is shipped again."""
+        first = self._create_service()
+        first.save_photo_metadata(self._photo(1))
+        first.sync_to_gcs()
+        first.save_photo_metadata(self._photo(2))
+        first.sync_to_gcs()
+
+        # The second instance ships segment 3, compacts the log into a new snapshot and deletes the old segments
+        second = self._create_service()
+        second.save_photo_metadata(self._photo(3))
+        second.sync_to_gcs()
+        second.upload_to_gcs(force=True)
+        assert self.storage.generation == 2
+        assert self.storage.deltas == {}
+
+        # The first instance still holds the old base at segment 2; its segment 3 must not end up orphaned
+        first.save_photo_metadata(self._photo(4))
+        assert first.sync_to_gcs() is True
+        with first.db_manager as db:
+            assert change_log.read_sync_state(db)["base_generation"] == 2
+
+        reader = self._create_service()
+        assert self._filenames(reader) == ["photo_1.jpg", "photo_2.jpg", "photo_3.jpg", "photo_4.jpg"]
+
+        for service in (first, second, reader):
+            service.cleanup_local_database()
+
+    def test_compaction_folds_in_deltas_it_had_not_replayed(self):
+        """Test that segments shipped on the old snapshot behind a compacting instance's back are kept."""
+        first = self._create_service()
+        first.save_photo_metadata(self._photo(1))
+        first.sync_to_gcs()
+        second = self._create_service()
+
+        # Shipped after the second instance last caught up, which then compacts without replaying it
+        first.save_photo_metadata(self._photo(2))
+        first.sync_to_gcs()
+        second.upload_to_gcs(force=True)
+
+        # The missed segment is shipped again on the new snapshot before the old one is deleted
+        assert list(self.storage.deltas) == [f"databases/{self.user_id}/deltas/2/000000000001.parquet"]
+        reader = self._create_service()
+        assert self._filenames(reader) == ["photo_1.jpg", "photo_2.jpg"]
+
+        for service in (first, second, reader):
+            service.cleanup_local_database()
+
+    def test_rebase_does_not_replay_across_missing_segments(self):
+        """Test that a rebase meeting a gap in the segments retries and gives up instead of skipping them."""
+        writer = self._create_service()
+        writer.save_photo_metadata(self._photo(1))
+        writer.sync_to_gcs()
+        writer.save_photo_metadata(self._photo(2))
+        writer.sync_to_gcs()
+        writer.save_photo_metadata(self._photo(3))
+        writer.sync_to_gcs()
+
+        reader = self._create_service()
+        reader.save_photo_metadata(self._photo(4))
+        del self.storage.deltas[f"databases/{self.user_id}/deltas/1/000000000001.parquet"]
+        downloads = self.storage.snapshot_downloads
+
+        with pytest.raises(GenerationConflictError, match="missing"):
+            reader._rebase_on_latest_snapshot()
+
+        assert self.storage.snapshot_downloads - downloads == metadata.REBASE_ATTEMPTS
+        # Neither the missing segment's successors are applied nor the unsynced local change lost
+        assert self._filenames(reader) == ["photo_1.jpg", "photo_4.jpg"]
+        with reader.db_manager as db:
+            assert change_log.read_sync_state(db)["last_seq"] == 0
+
+        writer.cleanup_local_database()
+        reader.cleanup_local_database()
+
+    def test_schema_migration_keeps_shipped_rows_shipped(self):
+        """Test that migrating an older database ships only the rows changed locally, not every row."""
+        service = self._create_service()
+        service.save_photo_metadata(self._photo(1))
+        service.save_photo_metadata(self._photo(2))
+        service.sync_to_gcs()
+
+        # Turn the synced database into one written by schema version 1, with an unshipped change
+        with service.db_manager as db:
+            db.execute_query(
+                f"CREATE TABLE photos_v1 AS SELECT * EXCLUDE ({', '.join(PHOTO_DETAIL_COLUMNS)}) FROM photos"
+            )
+            db.execute_query("DROP TABLE photos")
+            db.execute_query("ALTER TABLE photos_v1 RENAME TO photos")
+            db.execute_query("UPDATE schema_version SET version = 1")
+            change_log.reset_shadow(db)
+            db.execute_query("UPDATE photos SET file_size = 2000 WHERE id = 'id_2'")
+
+            assert change_log.migrate_schema(db) == [2, 3]
+            assert change_log.migrate_schema(db) == []
+
+            segment_path = Path(tempfile.mkdtemp()) / "segment.parquet"
+            self.temp_dirs.append(str(segment_path.parent))
+            assert change_log.capture_changes(db, segment_path) == 1
+            keys = db.execute_query("SELECT _key FROM read_parquet(?)", (str(segment_path),))
+            assert keys == [("id_2",)]
+
+        service.cleanup_local_database()
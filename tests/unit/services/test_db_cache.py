@@ -0,0 +1,95 @@
+"""Tests for the local database cache quota."""
+
+import os
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from imgstream.services import metadata
+from imgstream.services.db_cache import DatabaseCache
+
+
+class TestDatabaseCache:
+    """Test cases for DatabaseCache."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name)
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        self.temp_dir.cleanup()
+
+    def _database(self, user_id, size, modified_at=None, wal_size=0):
+        path = self.directory / f"metadata_{user_id}.db"
+        path.write_bytes(b"x" * size)
+        if wal_size:
+            path.with_name(f"{path.name}.wal").write_bytes(b"x" * wal_size)
+        if modified_at is not None:
+            os.utime(path, (modified_at, modified_at))
+        return path
+
+    def _evict(self, path):
+        path.unlink()
+        return True
+
+    def test_usage_counts_databases_and_write_ahead_logs(self):
+        """Test that usage covers database files and their WAL, and nothing else."""
+        self._database("a", 100, wal_size=20)
+        self._database("b", 50)
+        (self.directory / "unrelated.txt").write_bytes(b"x" * 1000)
+
+        usage = DatabaseCache(self.directory, quota_bytes=100).usage()
+
+        assert usage["used_bytes"] == 170
+        assert usage["databases"] == 2
+        assert usage["over_quota"] is True
+
+    def test_enforce_evicts_least_recently_used_first(self):
+        """Test that cold databases are evicted until the cache fits its quota."""
+        cache = DatabaseCache(self.directory, quota_bytes=250)
+        old = self._database("old", 100, modified_at=1_000)
+        used = self._database("used", 100, modified_at=2_000)
+        new = self._database("new", 100, modified_at=3_000)
+        cache.touch(used)
+
+        assert cache.enforce(self._evict) == 1
+
+        assert not old.exists()
+        assert used.exists() and new.exists()
+        assert cache.usage()["evicted_bytes"] == 100
+        assert cache.enforce(self._evict) == 0
+
+    def test_refused_and_protected_databases_are_kept(self):
+        """Test that databases the evict function keeps, or the caller protects, survive."""
+        cache = DatabaseCache(self.directory, quota_bytes=150)
+        unsynced = self._database("unsynced", 100, modified_at=1_000)
+        opening = self._database("opening", 100, modified_at=2_000)
+        synced = self._database("synced", 100, modified_at=3_000)
+
+        evicted = cache.enforce(lambda path: path != unsynced and self._evict(path), protect=[opening])
+
+        assert evicted == 1
+        assert unsynced.exists() and opening.exists()
+        assert not synced.exists()
+
+    def test_zero_quota_disables_eviction(self):
+        """Test that a quota of 0 never evicts."""
+        path = self._database("a", 100)
+
+        assert DatabaseCache(self.directory, quota_bytes=0).enforce(self._evict) == 0
+        assert path.exists()
+
+    def test_released_database_is_deleted_only_when_synced(self):
+        """Test that quota eviction keeps databases whose writes have not reached GCS."""
+        path = self._database("user", 100)
+
+        with patch.object(metadata, "_synced_released_databases", set()) as synced:
+            assert metadata._evict_cached_database(path) is False
+            assert path.exists()
+
+            synced.add(path)
+            assert metadata._evict_cached_database(path) is True
+            assert not path.exists()
+            assert synced == set()
@@ -0,0 +1,100 @@
+"""Tests for streaming ZIP export."""
+
+import io
+import zipfile
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+
+from imgstream.models.photo import PhotoMetadata
+from imgstream.services.export import PhotoExportService
+from imgstream.ui.handlers.error import StorageError
+
+
+def _photo(photo_id: str, filename: str, data: bytes, created_at: datetime | None) -> PhotoMetadata:
+    return PhotoMetadata(
+        id=photo_id,
+        user_id="export_user",
+        filename=filename,
+        original_path=f"photos/export_user/original/{photo_id}",
+        thumbnail_path=f"photos/export_user/thumbs/{photo_id}_thumb.jpg",
+        created_at=created_at,
+        uploaded_at=datetime(2024, 6, 1),
+        file_size=len(data),
+        mime_type="image/jpeg",
+    )
+
+
+class TestPhotoExportService:
+    """Test cases for PhotoExportService."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.contents = {"p1": b"a" * 10, "p2": b"b" * 7, "p3": b"c" * 3}
+        self.photos = [
+            _photo("p1", "IMG_1.jpg", self.contents["p1"], datetime(2023, 12, 31, 23, 59)),
+            _photo("p2", "IMG_1.jpg", self.contents["p2"], datetime(2023, 1, 2)),
+            _photo("p3", "IMG_3.heic", self.contents["p3"], None),
+        ]
+
+        def iter_object_chunks(objects, chunk_size=None, max_workers=None):
+            # Two-byte chunks exercise entries spanning many chunks
+            for index, (path, _) in enumerate(objects):
+                data = self.contents[path.rsplit("/", 1)[1]]
+                for start in range(0, len(data), 2):
+                    yield index, data[start : start + 2]
+
+        self.mock_storage = MagicMock()
+        self.mock_storage.iter_object_chunks.side_effect = iter_object_chunks
+        self.service = PhotoExportService("export_user", self.mock_storage, MagicMock())
+
+    def test_export_to_file_writes_valid_archive(self):
+        """Test that the streamed archive is a valid ZIP with unique, dated names."""
+        output = io.BytesIO()
+        progress = []
+
+        summary = self.service.export_to_file(self.photos, output, progress_callback=progress.append)
+
+        archive = zipfile.ZipFile(io.BytesIO(output.getvalue()))
+        assert archive.testzip() is None
+        assert archive.namelist() == ["2023/IMG_1.jpg", "2023/IMG_1 (1).jpg", "2024/IMG_3.heic"]
+        assert archive.read("2023/IMG_1 (1).jpg") == self.contents["p2"]
+        assert archive.getinfo("2023/IMG_1.jpg").date_time == (2023, 12, 31, 23, 59, 0)
+        assert summary["files"] == 3
+        assert summary["archive_bytes"] == len(output.getvalue())
+        assert progress[-1]["files_done"] == 3
+        assert progress[-1]["bytes_done"] == progress[-1]["total_bytes"] == 20
+
+    def test_iter_zip_streams_small_pieces(self):
+        """Test that the archive is emitted incrementally rather than in one buffer."""
+        pieces = list(self.service.iter_zip(self.photos))
+
+        # One piece per downloaded chunk (5 + 4 + 2) plus the central directory
+        assert len(pieces) == 12
+        assert zipfile.ZipFile(io.BytesIO(b"".join(pieces))).testzip() is None
+
+    def test_export_to_gcs_discards_upload_on_failure(self):
+        """Test that a failed export never finalizes the GCS object."""
+        writer = MagicMock()
+        self.mock_storage.open_export_writer.return_value = writer
+        self.mock_storage.iter_object_chunks.side_effect = StorageError("download failed")
+
+        with pytest.raises(StorageError):
+            self.service.export_to_gcs(self.photos)
+
+        writer.close.assert_not_called()
+        self.mock_storage.get_signed_url.assert_not_called()
+
+    def test_export_to_gcs_returns_signed_url(self):
+        """Test that a successful export closes the upload and signs a link."""
+        writer = MagicMock()
+        self.mock_storage.open_export_writer.return_value = writer
+        self.mock_storage.get_signed_url.return_value = "https://signed/export.zip"
+
+        summary = self.service.export_to_gcs(self.photos)
+
+        writer.close.assert_called_once()
+        assert summary["gcs_path"].startswith("photos/export_user/exports/")
+        assert summary["download_url"] == "https://signed/export.zip"
+        assert summary["files"] == 3
@@ -2,6 +2,7 @@
 Unit tests for image processing service.
 """
 
+import base64
 import io
 from datetime import datetime
 from unittest.mock import MagicMock, patch
@@ -66,6 +67,17 @@ class TestImageProcessor:
         assert info["width"] == 200
         assert info["height"] == 150
         assert isinstance(info["has_exif"], bool)
+        assert info["orientation"] is None
+
+    def test_generate_placeholder(self):
+        """Test generating a tiny inline preview."""
+        image_data = self.create_test_image("JPEG", (200, 100))
+
+        placeholder = self.processor.generate_placeholder(image_data)
+
+        assert placeholder.startswith("data:image/jpeg;base64,")
+        preview = base64.b64decode(placeholder.split(",", 1)[1])
+        assert self.processor.get_image_info(preview)["size"] == (16, 8)
 
     def test_get_image_info_invalid_data(self):
         """Test getting image info with invalid data."""
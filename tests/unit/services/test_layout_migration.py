@@ -0,0 +1,100 @@
+"""Tests for the content-addressed layout migration."""
+
+import hashlib
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from imgstream.models.photo import PhotoMetadata
+from imgstream.services.layout_migration import ObjectLayoutMigrator
+from imgstream.services.metadata import MetadataService
+
+
+def _content_path(user_id, kind, data, extension):
+    digest = hashlib.sha256(data).hexdigest()
+    return f"photos/{user_id}/{kind}/{digest[:2]}/{digest}{extension}"
+
+
+class TestObjectLayoutMigrator:
+    """Test cases for ObjectLayoutMigrator."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.user_id = "migrate_user"
+
+        self.mock_storage = MagicMock()
+        self.mock_storage.file_exists.return_value = False
+        with patch("imgstream.services.metadata.get_storage_service", return_value=self.mock_storage):
+            self.metadata_service = MetadataService(self.user_id, self.temp_dir)
+        self.metadata_service.disable_async_sync()
+
+        for i, name in enumerate(["a.jpg", "b.heic"]):
+            photo = PhotoMetadata.create_new(
+                user_id=self.user_id,
+                filename=name,
+                original_path=f"photos/{self.user_id}/original/{name}",
+                thumbnail_path=f"photos/{self.user_id}/thumbs/{name.split('.')[0]}_thumb.jpg",
+                file_size=100,
+                mime_type="image/jpeg",
+                thumbnail_generation=100 + i,
+            )
+            photo.id = f"id_{i}"
+            self.metadata_service.save_photo_metadata(photo)
+
+        def copy_to_content_address(user_id, gcs_path, kind):
+            # Both originals share content, so the second copy is deduplicated
+            data = b"same-original" if kind == "original" else gcs_path.encode()
+            extension = ".jpg" if kind == "thumbs" else "." + gcs_path.rsplit(".", 1)[1]
+            return {
+                "gcs_path": _content_path(user_id, kind, data, extension),
+                "content_hash": hashlib.sha256(data).hexdigest(),
+                "deduplicated": gcs_path.endswith("b.heic"),
+            }
+
+        self.mock_storage.copy_to_content_address.side_effect = copy_to_content_address
+        self.mock_storage.delete_files.side_effect = lambda paths, max_workers=None: {
+            path: {"status": "deleted", "error": None} for path in paths
+        }
+        self.migrator = ObjectLayoutMigrator(self.user_id, self.mock_storage, self.metadata_service)
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_dry_run_reports_pending_photos(self):
+        """Test that dry-run counts photos without copying anything."""
+        report = self.migrator.migrate(dry_run=True)
+
+        assert report["pending"] == 2
+        assert report["migrated"] == 0
+        self.mock_storage.copy_to_content_address.assert_not_called()
+
+    def test_migrate_repoints_rows_and_deletes_old_objects(self):
+        """Test a full migration with old object cleanup."""
+        with patch.object(self.metadata_service, "upload_to_gcs") as mock_upload:
+            report = self.migrator.migrate(dry_run=False, delete_old=True, max_workers=2)
+
+        assert report["migrated"] == 2
+        assert report["deduplicated_objects"] == 1
+        assert report["deleted_old_objects"] == 4
+        mock_upload.assert_called_once()
+
+        photo = self.metadata_service.get_photo_by_id("id_1")
+        assert photo.original_path == _content_path(self.user_id, "original", b"same-original", ".heic")
+        # The generation recorded for the old thumbnail object does not apply to the copy
+        assert photo.thumbnail_generation is None
+
+        # A second run finds nothing left to migrate
+        assert self.migrator.migrate(dry_run=False)["pending"] == 0
+
+    def test_delete_photos_keeps_shared_objects(self):
+        """Test that bulk delete keeps objects still referenced by other photos."""
+        shared = _content_path(self.user_id, "original", b"same-original", ".jpg")
+        thumb_a = _content_path(self.user_id, "thumbs", b"a", ".jpg")
+        thumb_b = _content_path(self.user_id, "thumbs", b"b", ".jpg")
+        self.metadata_service.update_photo_paths_bulk([("id_0", shared, thumb_a), ("id_1", shared, thumb_b)])
+
+        self.metadata_service.delete_photos(["id_0"])
+
+        self.mock_storage.delete_files.assert_called_once_with([thumb_a], max_workers=None)
@@ -2,9 +2,10 @@
 
 import tempfile
 import time
-from datetime import UTC, datetime
+from dataclasses import replace
+from datetime import UTC, date, datetime
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, PropertyMock, patch
 
 import pytest
 
@@ -82,7 +83,7 @@ class TestMetadataService:
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
         mock_storage.file_exists.return_value = True
-        mock_storage.download_database_file.return_value = b"fake_db_data"
+        mock_storage.download_database_snapshot.return_value = (b"fake_db_data", 1)
         mock_db_manager = MagicMock()
         mock_get_db_manager.return_value = mock_db_manager
         mock_db_manager.__enter__ = MagicMock(return_value=mock_db_manager)
@@ -95,9 +96,9 @@ class TestMetadataService:
 
         assert result is True  # Downloaded from GCS
         assert service.local_db_path.exists()
-        # download_database_file is called once for actual download (existence check uses file_exists)
-        assert mock_storage.download_database_file.call_count == 1
-        mock_storage.download_database_file.assert_called_with(self.user_id, "metadata.db")
+        # The snapshot is downloaded once, with its generation (existence check uses file_exists)
+        assert mock_storage.download_database_snapshot.call_count == 1
+        mock_storage.download_database_snapshot.assert_called_with(self.user_id, "metadata.db")
 
     @patch("src.imgstream.services.metadata.get_storage_service")
     @patch("src.imgstream.services.metadata.create_database")
@@ -105,7 +106,7 @@ class TestMetadataService:
         """Test ensure_local_database creating new database."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
 
         service = MetadataService(self.user_id, self.temp_dir)
 
@@ -174,7 +175,7 @@ class TestMetadataService:
         """Test getting database information."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")  # GCS doesn't exist
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")  # GCS doesn't exist
         mock_storage.file_exists.return_value = False  # GCS database doesn't exist
 
         mock_db_manager = MagicMock()
@@ -224,7 +225,7 @@ class TestMetadataService:
         """Test context manager functionality."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
 
         mock_db_manager = MagicMock()
         mock_get_db_manager.return_value = mock_db_manager
@@ -309,8 +310,8 @@ class TestMetadataServiceErrorHandling:
         """Test download from GCS with partial failure cleanup."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        # First call (existence check) succeeds, second call (download) fails
-        mock_storage.download_database_file.side_effect = [b"fake_data", Exception("Download failed")]
+        # Existence check succeeds, download fails
+        mock_storage.download_database_snapshot.side_effect = Exception("Download failed")
 
         service = MetadataService(self.user_id, self.temp_dir)
 
@@ -385,7 +386,7 @@ class TestMetadataServiceCRUD:
         """Test saving new photo metadata."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
 
         mock_db_manager = MagicMock()
         mock_get_db_manager.return_value = mock_db_manager
@@ -414,7 +415,7 @@ class TestMetadataServiceCRUD:
         """Test updating existing photo metadata."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
 
         mock_db_manager = MagicMock()
         mock_get_db_manager.return_value = mock_db_manager
@@ -486,7 +487,7 @@ class TestMetadataServiceCRUD:
         """Test getting photo by ID when found."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
 
         mock_db_manager = MagicMock()
         mock_get_db_manager.return_value = mock_db_manager
@@ -519,7 +520,7 @@ class TestMetadataServiceCRUD:
         """Test getting photo by ID when not found."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
 
         mock_db_manager = MagicMock()
         mock_get_db_manager.return_value = mock_db_manager
@@ -538,7 +539,7 @@ class TestMetadataServiceCRUD:
         """Test getting photos ordered by date."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
 
         # Create sample data for multiple photos
         photo1_data = (
@@ -583,7 +584,7 @@ class TestMetadataServiceCRUD:
                               created_at, uploaded_at, file_size, mime_type
                        FROM photos
                        WHERE user_id = ?
-                       ORDER BY COALESCE(created_at, uploaded_at) DESC
+                       ORDER BY sort_ts DESC, id DESC
                        LIMIT ? OFFSET ?""",
             (self.user_id, 10, 0),
         )
@@ -594,7 +595,7 @@ class TestMetadataServiceCRUD:
         """Test getting total photos count."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
 
         mock_db_manager = MagicMock()
         mock_get_db_manager.return_value = mock_db_manager
@@ -616,7 +617,7 @@ class TestMetadataServiceCRUD:
         """Test successful photo metadata deletion."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
 
         mock_db_manager = MagicMock()
         mock_get_db_manager.return_value = mock_db_manager
@@ -638,7 +639,7 @@ class TestMetadataServiceCRUD:
         """Test photo metadata deletion when not found."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
 
         mock_db_manager = MagicMock()
         mock_get_db_manager.return_value = mock_db_manager
@@ -657,7 +658,7 @@ class TestMetadataServiceCRUD:
         """Test searching photos by filename pattern."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
 
         photo_data = (
             "id1",
@@ -683,15 +684,10 @@ class TestMetadataServiceCRUD:
         assert len(result) == 1
         assert result[0].filename == "vacation_photo.jpg"
 
-        mock_db_manager.execute_query.assert_called_with(
-            """SELECT id, user_id, filename, original_path, thumbnail_path,
-                              created_at, uploaded_at, file_size, mime_type
-                       FROM photos
-                       WHERE user_id = ? AND filename LIKE ?
-                       ORDER BY COALESCE(created_at, uploaded_at) DESC
-                       LIMIT ? OFFSET ?""",
-            (self.user_id, "%vacation%", 10, 0),
-        )
+        sql, params = mock_db_manager.execute_query.call_args.args
+        assert "p.filename LIKE ?" in sql
+        assert "INTERSECT" in sql
+        assert params == (self.user_id, "aca", "ati", "cat", "ion", "tio", "vac", "%vacation%", 10, 0)
 
 
 class TestMetadataServiceAsyncSync:
@@ -715,7 +711,7 @@ class TestMetadataServiceAsyncSync:
         """Test triggering async sync when enabled."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
         mock_storage.upload_database_file.return_value = {"gcs_path": "test/path"}
 
         mock_db_manager = MagicMock()
@@ -836,7 +832,7 @@ class TestMetadataServiceAsyncSync:
         """Test that saving photo metadata triggers async sync."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
         mock_storage.upload_database_file.return_value = {"gcs_path": "test/path"}
 
         mock_db_manager = MagicMock()
@@ -875,7 +871,7 @@ class TestMetadataServiceAsyncSync:
         """Test that deleting photo metadata triggers async sync."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
         mock_storage.upload_database_file.return_value = {"gcs_path": "test/path"}
 
         mock_db_manager = MagicMock()
@@ -918,7 +914,7 @@ class TestMetadataServiceIntegration:
         """Test complete metadata lifecycle: create, read, update, delete."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
         mock_storage.upload_database_file.return_value = {"gcs_path": "test/path"}
 
         mock_db_manager = MagicMock()
@@ -1012,7 +1008,7 @@ class TestMetadataServiceIntegration:
         """Test concurrent metadata operations."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
         mock_storage.upload_database_file.return_value = {"gcs_path": "test/path"}
 
         mock_db_manager = MagicMock()
@@ -1059,8 +1055,8 @@ class TestMetadataServiceIntegration:
 
         # Mock file_exists for GCS database existence check
         mock_storage.file_exists.return_value = True
-        # Mock download_database_file for actual download
-        mock_storage.download_database_file.return_value = b"fake_backup_data"
+        # Mock download_database_snapshot for actual download
+        mock_storage.download_database_snapshot.return_value = (b"fake_backup_data", 1)
 
         mock_db_manager = MagicMock()
         mock_get_db_manager.return_value = mock_db_manager
@@ -1078,7 +1074,7 @@ class TestMetadataServiceIntegration:
         assert service.local_db_path.exists()
 
         # Verify download was called (once for actual download, existence check uses file_exists)
-        assert mock_storage.download_database_file.call_count == 1
+        assert mock_storage.download_database_snapshot.call_count == 1
 
     @patch("src.imgstream.services.metadata.get_storage_service")
     def test_sync_disable_enable_cycle(self, mock_get_storage):
@@ -1119,7 +1115,7 @@ class TestMetadataServiceIntegration:
         """Test pagination and search functionality integration."""
         mock_storage = MagicMock()
         mock_get_storage.return_value = mock_storage
-        mock_storage.download_database_file.side_effect = StorageError("Not found")
+        mock_storage.download_database_snapshot.side_effect = StorageError("Not found")
 
         mock_db_manager = MagicMock()
         mock_get_db_manager.return_value = mock_db_manager
@@ -1182,3 +1178,217 @@ class TestMetadataServiceIntegration:
         # Test count
         total_count = service.get_photos_count()
         assert total_count == 100
+
+
+class TestMetadataServiceBulkDelete:
+    """Test cases for bulk photo deletion against a real local database."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.user_id = "bulk_user"
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _create_service(self, mock_get_storage, photo_count=3):
+        mock_storage = MagicMock()
+        mock_storage.file_exists.return_value = False
+        mock_get_storage.return_value = mock_storage
+
+        service = MetadataService(self.user_id, self.temp_dir)
+        service.disable_async_sync()
+        for i in range(photo_count):
+            photo = PhotoMetadata.create_new(
+                user_id=self.user_id,
+                filename=f"photo_{i}.jpg",
+                original_path=f"photos/{self.user_id}/original/photo_{i}.jpg",
+                thumbnail_path=f"photos/{self.user_id}/thumbs/photo_{i}_thumb.jpg",
+                file_size=1000,
+                mime_type="image/jpeg",
+            )
+            photo.id = f"id_{i}"
+            service.save_photo_metadata(photo)
+        return service, mock_storage
+
+    @patch("src.imgstream.services.metadata.get_storage_service")
+    def test_delete_photos_removes_objects_and_rows(self, mock_get_storage):
+        """Test that objects and rows are removed with per-item results."""
+        service, mock_storage = self._create_service(mock_get_storage)
+        mock_storage.delete_files.side_effect = lambda paths, max_workers=None: {
+            path: {"status": "deleted", "error": None} for path in paths
+        }
+
+        with patch.object(service, "trigger_async_sync") as mock_sync:
+            result = service.delete_photos(["id_0", "id_1", "missing"])
+
+        assert result["deleted"] == 2
+        assert result["not_found"] == 1
+        assert result["failed"] == 0
+        assert [r["status"] for r in result["results"]] == ["deleted", "deleted", "not_found"]
+        assert service.get_photos_count() == 1
+        mock_storage.delete_files.assert_called_once()
+        assert len(mock_storage.delete_files.call_args[0][0]) == 4
+        mock_sync.assert_called_once()
+
+    @patch("src.imgstream.services.metadata.get_storage_service")
+    def test_delete_photos_keeps_rows_when_object_delete_fails(self, mock_get_storage):
+        """Test that a failed object delete keeps the metadata row."""
+        service, mock_storage = self._create_service(mock_get_storage)
+
+        def delete_files(paths, max_workers=None):
+            return {
+                path: (
+                    {"status": "error", "error": "boom"} if "photo_1" in path else {"status": "deleted", "error": None}
+                )
+                for path in paths
+            }
+
+        mock_storage.delete_files.side_effect = delete_files
+
+        result = service.delete_photos(["id_0", "id_1"])
+
+        assert result["deleted"] == 1
+        assert result["failed"] == 1
+        assert "boom" in result["results"][1]["error"]
+        assert service.get_photo_by_id("id_1") is not None
+        assert service.get_photo_by_id("id_0") is None
+
+    @patch("src.imgstream.services.metadata.get_storage_service")
+    def test_delete_photos_metadata_bulk_rolls_back_on_error(self, mock_get_storage):
+        """Test that the bulk delete runs in one transaction."""
+        service, _ = self._create_service(mock_get_storage)
+        original_execute = service.db_manager.execute_query
+
+        def failing_execute(query, parameters=None):
+            if query.lstrip().startswith("DELETE"):
+                original_execute(query, parameters)
+                raise RuntimeError("fail after delete")
+            return original_execute(query, parameters)
+
+        with patch.object(service.db_manager, "execute_query", side_effect=failing_execute):
+            with pytest.raises(MetadataError, match="Failed to bulk delete"):
+                service.delete_photos_metadata_bulk(["id_0", "id_1"])
+
+        assert service.get_photos_count() == 3
+
+
+class TestMetadataServiceKeysetPagination:
+    """Test keyset pagination against a real local database."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.user_id = "keyset_user"
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        import shutil
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _create_service(self, mock_get_storage):
+        mock_storage = MagicMock()
+        mock_storage.file_exists.return_value = False
+        mock_get_storage.return_value = mock_storage
+
+        service = MetadataService(self.user_id, self.temp_dir)
+        service.disable_async_sync()
+        photos = []
+        for i in range(11):
+            # Several photos share a timestamp and some have no creation date
+            photo = PhotoMetadata(
+                id=f"id_{i:02d}",
+                user_id=self.user_id,
+                filename=f"photo_{i}.jpg",
+                original_path=f"photos/{self.user_id}/original/photo_{i}.jpg",
+                thumbnail_path=f"photos/{self.user_id}/thumbs/photo_{i}.jpg",
+                created_at=datetime(2024, 1, 1 + i // 3) if i % 4 else None,
+                uploaded_at=datetime(2024, 1, 2, i),
+                file_size=1000,
+                mime_type="image/jpeg",
+            )
+            service.save_photo_metadata(photo)
+            photos.append(photo)
+        return service, photos
+
+    def _walk(self, service, oldest_first):
+        pages, cursor = [], None
+        while True:
+            page, has_more = service.get_photos_page(4, cursor, oldest_first=oldest_first)
+            pages.append([photo.id for photo in page])
+            if not has_more:
+                return pages
+            cursor = service.page_cursor(page[-1])
+
+    @patch("src.imgstream.services.metadata.get_storage_service")
+    def test_pages_follow_sort_key_in_both_orders(self, mock_get_storage):
+        """Test that walking forward visits every photo once, newest or oldest first."""
+        service, photos = self._create_service(mock_get_storage)
+        newest_first = [p.id for p in sorted(photos, key=lambda p: (p.sort_timestamp, p.id), reverse=True)]
+
+        pages = self._walk(service, oldest_first=False)
+        assert [photo_id for page in pages for photo_id in page] == newest_first
+        assert [len(page) for page in pages] == [4, 4, 3]
+
+        pages = self._walk(service, oldest_first=True)
+        assert [photo_id for page in pages for photo_id in page] == newest_first[::-1]
+
+    @patch("src.imgstream.services.metadata.get_storage_service")
+    def test_backward_pages_mirror_forward_pages(self, mock_get_storage):
+        """Test that the page before a cursor is the page that led to it, and the last page loads directly."""
+        service, _ = self._create_service(mock_get_storage)
+        pages = self._walk(service, oldest_first=False)
+
+        first_of_second = service.get_photo_by_id(pages[1][0])
+        previous, has_more = service.get_photos_page(4, service.page_cursor(first_of_second), backward=True)
+        assert [photo.id for photo in previous] == pages[0]
+        assert has_more is False
+
+        last, _ = service.get_photos_page(3, None, backward=True)
+        assert [photo.id for photo in last] == pages[-1]
+
+        jumped, _ = service.get_photos_page(4, offset=4)
+        assert [photo.id for photo in jumped] == pages[1]
+
+    @patch("src.imgstream.services.metadata.get_storage_service")
+    def test_date_histogram_counts_and_caches_buckets(self, mock_get_storage):
+        """Test per-day and per-month counts, their offsets, and that writes refresh them."""
+        service, photos = self._create_service(mock_get_storage)
+        days = sorted({p.sort_timestamp.date() for p in photos}, reverse=True)
+
+        histogram = service.get_date_histogram("day")
+        assert [bucket["period"] for bucket in histogram] == days
+        assert sum(bucket["count"] for bucket in histogram) == len(photos)
+        assert histogram[1]["offset"] == histogram[0]["count"]
+
+        monthly = service.get_date_histogram("month", oldest_first=True)
+        assert [(bucket["period"], bucket["count"], bucket["offset"]) for bucket in monthly] == [
+            (date(2024, 1, 1), 11, 0)
+        ]
+
+        # Served from cache until the database changes
+        with patch.object(MetadataService, "db_manager", new_callable=PropertyMock) as mock_db_manager:
+            service.get_date_histogram("year")
+            mock_db_manager.assert_not_called()
+
+        newer = replace(photos[0], id="id_new", filename="new.jpg", created_at=datetime(2025, 3, 1))
+        service.save_photo_metadata(newer)
+        assert [(b["period"], b["count"]) for b in service.get_date_histogram("year")] == [
+            (date(2025, 1, 1), 1),
+            (date(2024, 1, 1), 11),
+        ]
+
+    @patch("src.imgstream.services.metadata.get_storage_service")
+    def test_seek_to_date_starts_page_at_bucket(self, mock_get_storage):
+        """Test that a bucket's cursor starts the page at its first photo in either order."""
+        service, photos = self._create_service(mock_get_storage)
+
+        for oldest_first in (False, True):
+            ordered = [p.id for p in sorted(photos, key=lambda p: (p.sort_timestamp, p.id), reverse=not oldest_first)]
+            for bucket in service.get_date_histogram("day", oldest_first=oldest_first):
+                page, _ = service.get_photos_page(3, bucket["cursor"], oldest_first=oldest_first)
+                assert [photo.id for photo in page] == ordered[bucket["offset"] : bucket["offset"] + 3]
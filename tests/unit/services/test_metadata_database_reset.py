@@ -49,7 +49,7 @@ class TestMetadataServiceDatabaseReset:
 
         # Mock GCS operations
         self.mock_storage_service.file_exists.return_value = True
-        self.mock_storage_service.download_file.return_value = b"new_db_content_from_gcs"
+        self.mock_storage_service.download_database_snapshot.return_value = (b"new_db_content_from_gcs", 7)
 
         # Mock database manager
         mock_db_manager = MagicMock()
@@ -74,8 +74,8 @@ class TestMetadataServiceDatabaseReset:
         assert "reset_duration_seconds" in result
 
         # Verify GCS operations were called
-        self.mock_storage_service.file_exists.assert_called_once()
-        self.mock_storage_service.download_file.assert_called_once()
+        self.mock_storage_service.file_exists.assert_called()
+        self.mock_storage_service.download_database_snapshot.assert_called_once_with(self.user_id, "metadata.db")
 
         # Verify logging
         assert mock_log_user_action.call_count >= 2  # initiated and completed
@@ -148,7 +148,7 @@ class TestMetadataServiceDatabaseReset:
         """Test database reset when GCS download fails."""
         # Mock GCS operations to fail
         self.mock_storage_service.file_exists.return_value = True
-        self.mock_storage_service.download_database_file.side_effect = Exception("Download failed")
+        self.mock_storage_service.download_database_snapshot.side_effect = Exception("Download failed")
 
         # Mock database manager
         mock_db_manager = MagicMock()
@@ -326,7 +326,7 @@ class TestDatabaseResetIntegration:
         # Mock storage service
         mock_storage_service = MagicMock()
         mock_storage_service.file_exists.return_value = True
-        mock_storage_service.download_file.return_value = b"reset_db_content"
+        mock_storage_service.download_database_snapshot.return_value = (b"reset_db_content", 7)
         mock_get_storage_service.return_value = mock_storage_service
 
         # Create metadata service
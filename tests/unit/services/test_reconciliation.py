@@ -0,0 +1,93 @@
+"""Tests for orphan reconciliation."""
+
+import shutil
+import tempfile
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from imgstream.models.photo import PhotoMetadata
+from imgstream.services.metadata import MetadataService
+from imgstream.services.reconciliation import ReconciliationService
+
+
+class TestReconciliationService:
+    """Test cases for ReconciliationService."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.user_id = "recon_user"
+        self.old = datetime.now(UTC) - timedelta(days=1)
+
+        self.mock_storage = MagicMock()
+        self.mock_storage.file_exists.return_value = False
+        with patch("imgstream.services.metadata.get_storage_service", return_value=self.mock_storage):
+            self.metadata_service = MetadataService(self.user_id, self.temp_dir)
+        self.metadata_service.disable_async_sync()
+
+        photo = PhotoMetadata.create_new(
+            user_id=self.user_id,
+            filename="kept.jpg",
+            original_path=f"photos/{self.user_id}/original/kept.jpg",
+            thumbnail_path=f"photos/{self.user_id}/thumbs/kept_thumb.jpg",
+            file_size=100,
+            mime_type="image/jpeg",
+        )
+        self.metadata_service.save_photo_metadata(photo)
+
+        self.listing = [
+            {"name": f"photos/{self.user_id}/original/kept.jpg", "size": 100, "updated": self.old},
+            {"name": f"photos/{self.user_id}/thumbs/kept_thumb.jpg", "size": 10, "updated": self.old},
+            {"name": f"photos/{self.user_id}/original/failed.jpg", "size": 2048, "updated": self.old},
+            {"name": f"photos/{self.user_id}/thumbs/old_thumb.jpg", "size": 20, "updated": self.old},
+            {"name": f"photos/{self.user_id}/original/in_flight.jpg", "size": 50, "updated": datetime.now(UTC)},
+        ]
+        self.mock_storage.iter_user_files_parallel.return_value = iter(self.listing)
+        self.service = ReconciliationService(self.user_id, self.mock_storage, self.metadata_service)
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_dry_run_reports_orphans_without_deleting(self):
+        """Test that dry-run finds orphans and skips in-flight uploads."""
+        report = self.service.reconcile(dry_run=True)
+
+        assert [o["name"] for o in report["orphans"]] == [
+            f"photos/{self.user_id}/original/failed.jpg",
+            f"photos/{self.user_id}/thumbs/old_thumb.jpg",
+        ]
+        assert report["orphan_bytes"] == 2068
+        assert report["scanned_objects"] == 5
+        assert report["skipped_recent"] == 1
+        assert report["cost_estimate"]["list_requests"] == 2
+        self.mock_storage.delete_files.assert_not_called()
+
+    def test_reconcile_deletes_orphans_in_batches(self):
+        """Test that orphans are deleted in batches with failures reported."""
+
+        def delete_files(paths, max_workers=None):
+            return {
+                path: (
+                    {"status": "error", "error": "denied"}
+                    if "old_thumb" in path
+                    else {"status": "deleted", "error": None}
+                )
+                for path in paths
+            }
+
+        self.mock_storage.delete_files.side_effect = delete_files
+
+        report = self.service.reconcile(dry_run=False, batch_size=1, max_workers=4)
+
+        assert self.mock_storage.delete_files.call_count == 2
+        assert report["deleted"] == 1
+        assert report["failed"] == [{"name": f"photos/{self.user_id}/thumbs/old_thumb.jpg", "error": "denied"}]
+
+    def test_estimate_costs(self):
+        """Test cost estimation from scan size and orphan bytes."""
+        costs = self.service.estimate_costs(scanned_objects=25_000, orphan_bytes=2 * 1024**3)
+
+        assert costs["list_requests"] == 25
+        assert costs["orphan_gb"] == 2.0
+        assert costs["monthly_storage_savings_usd"] == round(2 * self.service.storage_price_per_gb_month, 4)
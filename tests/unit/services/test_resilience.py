@@ -0,0 +1,159 @@
+"""Tests for deadline, retry, hedging and circuit breaking of GCS calls."""
+
+import threading
+import time
+
+import pytest
+from google.api_core import exceptions as api_exceptions
+
+from imgstream.services.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceededError,
+    ReadPolicy,
+    ResilientReader,
+)
+
+
+class TestResilientReader:
+    """Test cases for ResilientReader."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.reader = ResilientReader(max_workers=4)
+        self.policy = ReadPolicy(deadline=2.0, max_attempts=3, initial_backoff=0.01, max_backoff=0.02, hedge=False)
+
+    def test_retries_transient_errors(self):
+        """Test that transient errors are retried and counted."""
+        calls = []
+
+        def read(timeout):
+            calls.append(timeout)
+            if len(calls) < 3:
+                raise api_exceptions.ServiceUnavailable("busy")
+            return b"data"
+
+        assert self.reader.call("download", read, self.policy) == b"data"
+        assert len(calls) == 3
+        assert all(0 < timeout <= 2.0 for timeout in calls)
+
+        stats = self.reader.get_stats()["download"]
+        assert stats["calls"] == 1
+        assert stats["attempts"] == 3
+        assert stats["retries"] == 2
+        assert stats["failures"] == 0
+
+    def test_does_not_retry_permanent_errors(self):
+        """Test that non-retryable errors are raised immediately."""
+
+        def read(timeout):
+            raise api_exceptions.NotFound("missing")
+
+        with pytest.raises(api_exceptions.NotFound):
+            self.reader.call("download", read, self.policy)
+
+        stats = self.reader.get_stats()["download"]
+        assert stats["attempts"] == 1
+        assert stats["failures"] == 1
+
+    def test_hedged_request_wins_over_slow_primary(self):
+        """Test that a duplicate request is sent after the hedge delay and its result used."""
+        policy = ReadPolicy(deadline=2.0, hedge=True, min_hedge_delay=0.05)
+        first_call = threading.Event()
+
+        def read(timeout):
+            if not first_call.is_set():
+                first_call.set()
+                time.sleep(0.5)
+                return b"slow"
+            return b"fast"
+
+        start = time.perf_counter()
+        assert self.reader.call("download", read, policy) == b"fast"
+        assert time.perf_counter() - start < 0.4
+
+        stats = self.reader.get_stats()["download"]
+        assert stats["hedges"] == 1
+        assert stats["hedge_wins"] == 1
+
+    def test_deadline_is_enforced(self):
+        """Test that a read that outlives its budget fails with DeadlineExceededError."""
+        policy = ReadPolicy(deadline=0.1, hedge=False)
+
+        with pytest.raises(DeadlineExceededError):
+            self.reader.call("download", lambda timeout: time.sleep(0.5), policy)
+
+        assert self.reader.get_stats()["download"]["deadline_exceeded"] == 1
+
+    def test_policy_from_env_and_backoff(self, monkeypatch):
+        """Test environment configuration and jittered backoff bounds."""
+        monkeypatch.setenv("GCS_READ_DEADLINE_SECONDS", "5")
+        monkeypatch.setenv("GCS_READ_MAX_ATTEMPTS", "4")
+        monkeypatch.setenv("GCS_READ_HEDGE", "false")
+
+        policy = ReadPolicy.from_env("GCS_READ", initial_backoff=0.1, max_backoff=0.3)
+
+        assert policy.deadline == 5.0
+        assert policy.max_attempts == 4
+        assert policy.hedge is False
+        assert all(0 <= policy.backoff(n) <= min(0.3, 0.1 * 2 ** (n - 1)) for n in range(1, 6))
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.breaker = CircuitBreaker(failure_rate_threshold=0.5, minimum_calls=4, window_seconds=60, open_seconds=0.05)
+
+    def _fail(self):
+        raise api_exceptions.ServiceUnavailable("down")
+
+    def _missing(self):
+        raise api_exceptions.NotFound("missing")
+
+    def test_opens_after_failure_rate_and_fails_fast(self):
+        """Test that the circuit opens once the failure rate is reached and then rejects calls."""
+        assert self.breaker.call(lambda: "ok") == "ok"
+        for _ in range(3):
+            with pytest.raises(api_exceptions.ServiceUnavailable):
+                self.breaker.call(self._fail)
+
+        assert self.breaker.state == OPEN
+
+        called = []
+        with pytest.raises(CircuitOpenError) as exc_info:
+            self.breaker.call(lambda: called.append(True))
+        assert called == []
+        assert exc_info.value.retry_after > 0
+
+        status = self.breaker.get_status()
+        assert status["rejected_calls"] == 1
+        assert status["times_opened"] == 1
+
+    def test_permanent_errors_do_not_open_circuit(self):
+        """Test that errors such as NotFound are treated as healthy responses."""
+        for _ in range(10):
+            with pytest.raises(api_exceptions.NotFound):
+                self.breaker.call(self._missing)
+
+        assert self.breaker.state == CLOSED
+
+    def test_half_open_probe_closes_or_reopens(self):
+        """Test that a probe after the cool-down closes the circuit on success and reopens it on failure."""
+        for _ in range(4):
+            with pytest.raises(api_exceptions.ServiceUnavailable):
+                self.breaker.call(self._fail)
+        time.sleep(0.06)
+        assert self.breaker.state == HALF_OPEN
+
+        with pytest.raises(api_exceptions.ServiceUnavailable):
+            self.breaker.call(self._fail)
+        assert self.breaker.state == OPEN
+
+        time.sleep(0.06)
+        assert self.breaker.call(lambda: "ok") == "ok"
+        assert self.breaker.state == CLOSED
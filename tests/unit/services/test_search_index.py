@@ -0,0 +1,108 @@
+"""Tests for the filename search index."""
+
+import shutil
+import tempfile
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from imgstream.models.photo import PhotoMetadata
+from imgstream.services import search_index
+from imgstream.services.metadata import MetadataError, MetadataService
+
+
+class TestSearchIndex:
+    """Test ranked filename search and incremental index maintenance."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.user_id = "search_user"
+        storage = MagicMock()
+        storage.file_exists.return_value = False
+        with patch("imgstream.services.metadata.get_storage_service", return_value=storage):
+            self.service = MetadataService(self.user_id, self.temp_dir)
+        self.service.disable_async_sync()
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        self.service.cleanup_local_database()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _photo(self, index, filename):
+        return PhotoMetadata(
+            id=f"id_{index}",
+            user_id=self.user_id,
+            filename=filename,
+            original_path=f"photos/{self.user_id}/original/{filename}",
+            thumbnail_path=f"photos/{self.user_id}/thumbs/{filename}",
+            created_at=datetime(2024, 1, 1, index),
+            uploaded_at=datetime(2024, 1, 2, index),
+            file_size=1000,
+            mime_type="image/jpeg",
+        )
+
+    def _save(self, *filenames):
+        self.service.save_photos_metadata_bulk([self._photo(i, name) for i, name in enumerate(filenames)])
+
+    def _search(self, query, mode=search_index.SUBSTRING):
+        return [photo.filename for photo in self.service.search_photos(query, mode)]
+
+    def test_modes_and_relevance_order(self):
+        """Test substring, prefix and token queries, best match first."""
+        self._save("beach.jpg", "Sunset_Beach_2024.jpg", "longbeachtrip.png", "IMG_0001.JPG", "家族旅行_写真.jpg")
+
+        assert self._search("BEACH") == ["beach.jpg", "Sunset_Beach_2024.jpg", "longbeachtrip.png"]
+        assert self._search("sun bea", search_index.PREFIX) == ["Sunset_Beach_2024.jpg"]
+        assert self._search("beach", search_index.TOKEN) == ["beach.jpg", "Sunset_Beach_2024.jpg"]
+        assert self._search("写真", search_index.TOKEN) == ["家族旅行_写真.jpg"]
+        # Shorter than a trigram: still found
+        assert self._search("旅") == ["家族旅行_写真.jpg"]
+        assert self._search("   ") == []
+
+    def test_index_follows_inserts_renames_and_deletes(self):
+        """Test that writes keep the index up to date, including changes it did not see."""
+        self._save("first_trip.jpg", "second_trip.jpg")
+        renamed = self._photo(0, "holiday.jpg")
+        self.service.save_photo_metadata(renamed)
+        self.service.delete_photos_metadata_bulk(["id_1"])
+
+        assert self._search("trip") == []
+        assert self._search("holiday") == ["holiday.jpg"]
+
+        # A row written behind the service's back is not re-indexed by searches, only by a refresh
+        with self.service.db_manager as db:
+            db.execute_query("UPDATE photos SET filename = 'harbour.jpg' WHERE id = 'id_0'")
+        assert self._search("harb") == []
+        with patch.object(search_index, "refresh", wraps=search_index.refresh) as refresh:
+            self._search("holiday")
+        refresh.assert_not_called()
+
+        with self.service.db_manager as db:
+            self.service._refresh_search_index(db)
+            assert search_index.get_stats(db)["documents"] == 1
+        assert self._search("harb") == ["harbour.jpg"]
+
+    def test_like_pattern_search_uses_the_index(self):
+        """Test that LIKE patterns are narrowed down by trigrams and still matched exactly."""
+        self._save("beach_day.jpg", "Beach_Night.jpg", "mountain.jpg")
+
+        assert search_index.build_pattern_filter("%a%")[1] == []
+        assert search_index.build_pattern_filter("Bea_h%")[1] == ["bea"]
+
+        assert [p.filename for p in self.service.search_photos_by_filename("%each%")] == [
+            "Beach_Night.jpg",
+            "beach_day.jpg",
+        ]
+        assert [p.filename for p in self.service.search_photos_by_filename("Beach%")] == ["Beach_Night.jpg"]
+        assert [p.filename for p in self.service.search_photos_by_filename("%a%")] == [
+            "mountain.jpg",
+            "Beach_Night.jpg",
+            "beach_day.jpg",
+        ]
+
+    def test_unknown_mode_is_rejected(self):
+        """Test that an unknown mode raises MetadataError."""
+        with pytest.raises(MetadataError, match="Unknown search mode"):
+            self.service.search_photos("beach", mode="fuzzy")
@@ -0,0 +1,104 @@
+"""Tests for the bounded service registry."""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from imgstream.services import metadata
+from imgstream.services.service_registry import ServiceRegistry
+
+
+class TestServiceRegistry:
+    """Test cases for ServiceRegistry."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.created = []
+        self.released = []
+
+    def _factory(self, key, *args):
+        self.created.append((key, *args))
+        return f"service:{key}"
+
+    def _registry(self, max_size=2, idle_ttl=60.0):
+        return ServiceRegistry("test", self._factory, self.released.append, max_size=max_size, idle_ttl=idle_ttl)
+
+    def test_least_recently_used_instance_is_released(self):
+        """Test that exceeding max_size releases the least recently used instance."""
+        registry = self._registry()
+
+        registry.get("a", "/tmp")
+        registry.get("b")
+        registry.get("a")
+        registry.get("c")
+
+        assert self.created == [("a", "/tmp"), ("b",), ("c",)]
+        assert self.released == ["service:b"]
+        assert "b" not in registry
+        assert registry.values() == ["service:a", "service:c"]
+        stats = registry.get_stats()
+        assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (1, 3, 1, 2)
+
+    def test_idle_instances_expire(self):
+        """Test that instances not requested within the TTL are released."""
+        registry = self._registry(max_size=0, idle_ttl=0.2)
+        registry.get("a")
+        registry.get("b")
+        time.sleep(0.15)
+        registry.get("b")
+        time.sleep(0.1)
+
+        assert registry.evict_idle() == 1
+        assert self.released == ["service:a"]
+        assert registry.values() == ["service:b"]
+        assert registry.get_stats()["expirations"] == 1
+
+    def test_concurrent_first_requests_create_one_instance(self):
+        """Test that threads asking for the same new key share one instance."""
+        started = threading.Event()
+
+        def slow_factory(key):
+            started.set()
+            time.sleep(0.05)
+            self.created.append(key)
+            return object()
+
+        registry = ServiceRegistry("test", slow_factory, self.released.append, max_size=4, idle_ttl=0)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get("a"))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        assert self.created == ["a"]
+        assert len({id(result) for result in results}) == 1
+        assert registry.get_stats()["misses"] == 1
+
+    def test_release_errors_do_not_break_lookups(self):
+        """Test that a failing release is logged and the instance still dropped."""
+        registry = ServiceRegistry("test", self._factory, MagicMock(side_effect=OSError("busy")), 1, 0)
+
+        registry.get("a")
+        assert registry.get("b") == "service:b"
+        assert len(registry) == 1
+
+
+class TestMetadataServiceRegistry:
+    """Test that evicted metadata services flush their sync and close their database."""
+
+    @patch.object(metadata, "METADATA_SERVICE_EVICT_DELETES_DB", True)
+    def test_evicted_service_keeps_database_with_unsynced_writes(self):
+        """Test that a database whose final sync failed is closed but not deleted."""
+        scheduler = MagicMock()
+        service = MagicMock()
+        with patch.object(metadata, "get_sync_scheduler", return_value=scheduler):
+            scheduler.remove.return_value = True
+            metadata._release_metadata_service(service)
+            service.cleanup_local_database.assert_called_with(delete_file=True)
+
+            scheduler.remove.return_value = False
+            metadata._release_metadata_service(service)
+            service.cleanup_local_database.assert_called_with(delete_file=False)
+
+        scheduler.remove.assert_called_with(service)
@@ -0,0 +1,115 @@
+"""Tests for single-flight coalescing."""
+
+import tempfile
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from imgstream.services.single_flight import SingleFlight, get_single_flight_stats
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight."""
+
+    def _run_concurrently(self, count, target):
+        results = [None] * count
+        errors = [None] * count
+
+        def worker(index):
+            try:
+                results[index] = target()
+            except Exception as e:
+                errors[index] = e
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        return results, errors
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that concurrent calls with the same key run the function once."""
+        group = SingleFlight("test_share")
+        executions = []
+
+        def work():
+            executions.append(True)
+            # Hold the call open until every other caller has joined it
+            deadline = time.monotonic() + 5
+            while group.get_stats()["coalesced"] < 4 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            return {"value": 42}
+
+        results, errors = self._run_concurrently(5, lambda: group.do("key", work))
+
+        assert errors == [None] * 5
+        assert len(executions) == 1
+        assert all(result is results[0] for result in results)
+
+        stats = group.get_stats()
+        assert stats == {"calls": 5, "executions": 1, "coalesced": 4, "in_flight": 0}
+        assert get_single_flight_stats()["test_share"]["executions"] == 1
+
+    def test_exception_is_shared_and_not_remembered(self):
+        """Test that waiters receive the leader's exception and the next call runs again."""
+        group = SingleFlight("test_error")
+
+        def fail():
+            time.sleep(0.1)
+            raise ValueError("boom")
+
+        _, errors = self._run_concurrently(3, lambda: group.do("key", fail))
+
+        assert all(isinstance(error, ValueError) for error in errors)
+        assert group.do("key", lambda: "ok") == "ok"
+
+    def test_reentrant_call_does_not_deadlock(self):
+        """Test that a call for the same key from the running thread executes directly."""
+        group = SingleFlight("test_reentrant")
+
+        assert group.do("key", lambda: group.do("key", lambda: "inner")) == "inner"
+
+
+class TestDatabaseBootstrapCoalescing:
+    """Test that concurrent first accesses bootstrap a database once."""
+
+    def test_concurrent_ensure_local_database_creates_once(self):
+        """Test that two services for the same user create the local database once."""
+        from imgstream.services.metadata import MetadataService
+
+        temp_dir = tempfile.mkdtemp()
+        storage = MagicMock()
+        storage.file_exists.return_value = False
+        created = []
+
+        def slow_create(path):
+            created.append(path)
+            time.sleep(0.1)
+            open(path, "wb").close()
+
+        with (
+            patch("imgstream.services.metadata.get_storage_service", return_value=storage),
+            patch("imgstream.services.metadata.create_database", side_effect=slow_create),
+        ):
+            services = [MetadataService("bootstrap_user", temp_dir) for _ in range(2)]
+            barrier = threading.Barrier(2)
+            errors = []
+
+            def bootstrap(service):
+                barrier.wait()
+                try:
+                    service.ensure_local_database()
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=bootstrap, args=(service,)) for service in services]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=5)
+
+        assert errors == []
+        assert len(created) == 1
+        assert services[0].local_db_path.exists()
+        storage.file_exists.assert_called_once()
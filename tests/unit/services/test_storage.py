@@ -199,13 +199,144 @@ class TestStorageService:
         assert result["was_overwrite"] is False
 
         mock_bucket.blob.assert_called_once_with("photos/user123/original/photo.jpg")
-        mock_blob.upload_from_string.assert_called_once_with(file_data, content_type="image/jpeg")
+        mock_blob.upload_from_string.assert_called_once_with(file_data, content_type="image/jpeg", checksum="crc32c")
+        # Integrity comes from upload checksums, not from re-reading the object
+        mock_blob.exists.assert_called_once()
+        mock_blob.reload.assert_not_called()
+        assert mock_blob.crc32c == result["crc32c"] == "DXlU+w=="
+        assert mock_blob.md5_hash == result["md5_hash"]
 
         # Check metadata was set
         assert mock_blob.metadata["user_id"] == "user123"
         assert mock_blob.metadata["original_filename"] == "photo.jpg"
         assert "uploaded_at" in mock_blob.metadata
 
+    @patch.dict(
+        "os.environ",
+        {
+            "GCS_PHOTOS_BUCKET": "test-photos-bucket",
+            "GCS_DATABASE_BUCKET": "test-database-bucket",
+            "GOOGLE_CLOUD_PROJECT": "test-project",
+        },
+    )
+    @patch("src.imgstream.services.storage.storage.Client")
+    def test_upload_original_photo_checksum_mismatch(self, mock_client_class):
+        """Test that a stored object whose hash differs from the local one fails the upload."""
+        mock_client = MagicMock()
+        mock_bucket = MagicMock()
+        mock_blob = MagicMock()
+
+        mock_client.bucket.return_value = mock_bucket
+        mock_bucket.blob.return_value = mock_blob
+        mock_blob.exists.return_value = False
+
+        def corrupt_upload(data, **kwargs):
+            # Simulate the object resource returned by GCS reporting a different hash
+            mock_blob.crc32c = "AAAAAA=="
+
+        mock_blob.upload_from_string.side_effect = corrupt_upload
+        mock_client_class.return_value = mock_client
+
+        service = StorageService()
+
+        with pytest.raises(StorageError, match="Checksum mismatch"):
+            service.upload_original_photo("user123", b"fake image data", "photo.jpg")
+
+    @patch.dict(
+        "os.environ",
+        {
+            "GCS_PHOTOS_BUCKET": "test-photos-bucket",
+            "GCS_DATABASE_BUCKET": "test-database-bucket",
+            "GOOGLE_CLOUD_PROJECT": "test-project",
+            "GCS_OBJECT_LAYOUT": "content",
+        },
+    )
+    @patch("src.imgstream.services.storage.storage.Client")
+    def test_upload_original_photo_content_layout(self, mock_client_class):
+        """Test content-addressed uploads use hashed keys and never overwrite."""
+        import hashlib
+
+        from google.cloud.exceptions import PreconditionFailed
+
+        from imgstream.services.storage import IMMUTABLE_CACHE_CONTROL, is_content_addressed_path
+
+        mock_client = MagicMock()
+        mock_bucket = MagicMock()
+        mock_blob = MagicMock()
+        mock_client.bucket.return_value = mock_bucket
+        mock_bucket.blob.return_value = mock_blob
+        mock_blob.exists.return_value = True
+        mock_client_class.return_value = mock_client
+
+        service = StorageService()
+        file_data = b"fake image data"
+        digest = hashlib.sha256(file_data).hexdigest()
+
+        result = service.upload_original_photo("user123", file_data, "Photo.JPG")
+
+        assert result["gcs_path"] == f"photos/user123/original/{digest[:2]}/{digest}.jpg"
+        assert is_content_addressed_path(result["gcs_path"])
+        assert result["deduplicated"] is False
+        assert result["was_overwrite"] is False
+        assert mock_blob.cache_control == IMMUTABLE_CACHE_CONTROL
+        mock_blob.upload_from_string.assert_called_once_with(
+            file_data, content_type="image/jpeg", checksum="crc32c", if_generation_match=0
+        )
+
+        # Re-uploading identical content is reported as a deduplicated no-op
+        mock_blob.upload_from_string.side_effect = PreconditionFailed("exists")
+        result = service.upload_original_photo("user123", file_data, "copy.jpg")
+
+        assert result["gcs_path"] == f"photos/user123/original/{digest[:2]}/{digest}.jpg"
+        assert result["deduplicated"] is True
+
+    @patch.dict(
+        "os.environ",
+        {
+            "GCS_PHOTOS_BUCKET": "test-photos-bucket",
+            "GCS_DATABASE_BUCKET": "test-database-bucket",
+            "GOOGLE_CLOUD_PROJECT": "test-project",
+            "GCS_OBJECT_LAYOUT": "bogus",
+        },
+    )
+    @patch("src.imgstream.services.storage.storage.Client")
+    def test_invalid_object_layout(self, mock_client_class):
+        """Test that an unknown object layout is rejected."""
+        with pytest.raises(StorageError, match="GCS_OBJECT_LAYOUT"):
+            StorageService()
+
+    @patch.dict(
+        "os.environ",
+        {
+            "GCS_PHOTOS_BUCKET": "test-photos-bucket",
+            "GCS_DATABASE_BUCKET": "test-database-bucket",
+            "GOOGLE_CLOUD_PROJECT": "test-project",
+        },
+    )
+    @patch("google.auth.default")
+    @patch("src.imgstream.services.storage.storage.Client")
+    def test_get_signed_url_pins_generation_and_reuses_credentials(self, mock_client_class, mock_default):
+        """Test versioned signed URLs and credential caching."""
+        mock_credentials = MagicMock()
+        mock_credentials.service_account_email = "test@example.com"
+        mock_credentials.valid = True
+        mock_default.return_value = (mock_credentials, "test-project")
+
+        mock_client = MagicMock()
+        mock_blob = MagicMock()
+        mock_client.bucket.return_value.blob.return_value = mock_blob
+        mock_client_class.return_value = mock_client
+
+        service = StorageService()
+
+        service.get_signed_url("photos/user123/thumbs/photo_thumb.jpg", generation=42)
+        service.get_signed_url("photos/user123/thumbs/other_thumb.jpg")
+
+        assert mock_blob.generate_signed_url.call_args_list[0].kwargs["generation"] == 42
+        assert "generation" not in mock_blob.generate_signed_url.call_args_list[1].kwargs
+        mock_default.assert_called_once()
+        mock_credentials.refresh.assert_not_called()
+
     @patch.dict(
         "os.environ",
         {
@@ -245,6 +376,8 @@ class TestStorageService:
     @patch("src.imgstream.services.storage.storage.Client")
     def test_upload_thumbnail_success(self, mock_client_class):
         """Test successful thumbnail upload."""
+        from imgstream.services.storage import VERSIONED_CACHE_CONTROL
+
         mock_client = MagicMock()
         mock_bucket = MagicMock()
         mock_blob = MagicMock()
@@ -268,7 +401,12 @@ class TestStorageService:
         assert result["content_type"] == "image/jpeg"
         assert result["was_overwrite"] is False
         mock_bucket.blob.assert_called_once_with("photos/user123/thumbs/photo_thumb.jpg")
-        mock_blob.upload_from_string.assert_called_once_with(thumbnail_data, content_type="image/jpeg")
+        mock_blob.upload_from_string.assert_called_once_with(
+            thumbnail_data, content_type="image/jpeg", checksum="crc32c"
+        )
+        # The path is reused if the photo is overwritten, so it is cached long but not as immutable
+        assert mock_blob.cache_control == VERSIONED_CACHE_CONTROL
+        assert "immutable" not in mock_blob.cache_control
 
     @patch.dict(
         "os.environ",
@@ -296,8 +434,10 @@ class TestStorageService:
         result = service.download_file("photos/user123/original/photo.jpg")
 
         assert result == b"file data"
-        mock_blob.exists.assert_called_once()
+        mock_blob.exists.assert_not_called()
         mock_blob.download_as_bytes.assert_called_once()
+        # Retries are handled by the read policy, not the client library
+        assert mock_blob.download_as_bytes.call_args.kwargs["retry"] is None
 
     @patch.dict(
         "os.environ",
@@ -316,7 +456,7 @@ class TestStorageService:
 
         mock_client.bucket.return_value = mock_bucket
         mock_bucket.blob.return_value = mock_blob
-        mock_blob.exists.return_value = False
+        mock_blob.download_as_bytes.side_effect = NotFound("No such object")
         mock_client_class.return_value = mock_client
 
         service = StorageService()
@@ -416,6 +556,73 @@ class TestStorageService:
         mock_blob.exists.assert_called_once()
         mock_blob.delete.assert_not_called()
 
+    @patch.dict(
+        "os.environ",
+        {
+            "GCS_PHOTOS_BUCKET": "test-photos-bucket",
+            "GCS_DATABASE_BUCKET": "test-database-bucket",
+            "GOOGLE_CLOUD_PROJECT": "test-project",
+        },
+    )
+    @patch("src.imgstream.services.storage.storage.Client")
+    def test_iter_object_chunks_yields_ranges_in_order(self, mock_client_class):
+        """Test parallel chunked downloads across objects preserve order."""
+        objects = {"a/one.jpg": b"0123456789", "a/two.jpg": b"abc"}
+        mock_client = MagicMock()
+        mock_bucket = MagicMock()
+
+        def make_blob(path):
+            blob = MagicMock()
+            blob.download_as_bytes.side_effect = lambda start, end, **kwargs: objects[path][start : end + 1]
+            return blob
+
+        mock_bucket.blob.side_effect = make_blob
+        mock_client.bucket.return_value = mock_bucket
+        mock_client_class.return_value = mock_client
+
+        service = StorageService()
+
+        chunks = list(service.iter_object_chunks([("a/one.jpg", 10), ("a/two.jpg", 3)], chunk_size=4, max_workers=2))
+
+        assert chunks == [(0, b"0123"), (0, b"4567"), (0, b"89"), (1, b"abc")]
+
+    @patch.dict(
+        "os.environ",
+        {
+            "GCS_PHOTOS_BUCKET": "test-photos-bucket",
+            "GCS_DATABASE_BUCKET": "test-database-bucket",
+            "GOOGLE_CLOUD_PROJECT": "test-project",
+        },
+    )
+    @patch("src.imgstream.services.storage.storage.Client")
+    def test_delete_files_reports_per_path_status(self, mock_client_class):
+        """Test parallel bulk deletion with per-path results."""
+        mock_client = MagicMock()
+        mock_bucket = MagicMock()
+
+        def make_blob(path):
+            blob = MagicMock()
+            if path.endswith("missing.jpg"):
+                blob.delete.side_effect = NotFound("gone")
+            elif path.endswith("broken.jpg"):
+                blob.delete.side_effect = GoogleCloudError("boom")
+            return blob
+
+        mock_bucket.blob.side_effect = make_blob
+        mock_client.bucket.return_value = mock_bucket
+        mock_client_class.return_value = mock_client
+
+        service = StorageService()
+
+        result = service.delete_files(["a/ok.jpg", "a/missing.jpg", "a/broken.jpg", "a/ok.jpg"], max_workers=4)
+
+        assert result["a/ok.jpg"] == {"status": "deleted", "error": None}
+        assert result["a/missing.jpg"] == {"status": "not_found", "error": None}
+        assert result["a/broken.jpg"]["status"] == "error"
+        assert "boom" in result["a/broken.jpg"]["error"]
+        # Duplicate paths are deleted once
+        assert mock_bucket.blob.call_count == 3
+
     @patch.dict(
         "os.environ",
         {
@@ -445,7 +652,123 @@ class TestStorageService:
         result = service.list_user_files("user123", "original/")
 
         assert result == ["photos/user123/original/photo1.jpg", "photos/user123/original/photo2.jpg"]
-        mock_client.list_blobs.assert_called_once_with(mock_bucket, prefix="photos/user123/original/")
+        mock_client.list_blobs.assert_called_once_with(
+            mock_bucket,
+            prefix="photos/user123/original/",
+            fields="items(name,size,generation,updated),prefixes,nextPageToken",
+            page_size=1000,
+        )
+
+    @patch.dict(
+        "os.environ",
+        {
+            "GCS_PHOTOS_BUCKET": "test-photos-bucket",
+            "GCS_DATABASE_BUCKET": "test-database-bucket",
+            "GOOGLE_CLOUD_PROJECT": "test-project",
+        },
+    )
+    @patch("src.imgstream.services.storage.storage.Client")
+    def test_iter_user_files_yields_projected_fields(self, mock_client_class):
+        """Test streaming listing with delimiter and page size."""
+        mock_client = MagicMock()
+        mock_blob = MagicMock()
+        mock_blob.name = "photos/user123/thumbs/photo1_thumb.jpg"
+        mock_blob.size = 2048
+        mock_blob.generation = 17
+        mock_blob.updated = datetime(2024, 1, 1)
+
+        mock_client.list_blobs.return_value = iter([mock_blob])
+        mock_client_class.return_value = mock_client
+
+        service = StorageService()
+
+        result = list(service.iter_user_files("user123", "thumbs/", delimiter="/", page_size=50))
+
+        assert result == [
+            {
+                "name": "photos/user123/thumbs/photo1_thumb.jpg",
+                "size": 2048,
+                "generation": 17,
+                "updated": datetime(2024, 1, 1),
+            }
+        ]
+        _, kwargs = mock_client.list_blobs.call_args
+        assert kwargs["delimiter"] == "/"
+        assert kwargs["page_size"] == 50
+
+    @patch.dict(
+        "os.environ",
+        {
+            "GCS_PHOTOS_BUCKET": "test-photos-bucket",
+            "GCS_DATABASE_BUCKET": "test-database-bucket",
+            "GOOGLE_CLOUD_PROJECT": "test-project",
+        },
+    )
+    @patch("src.imgstream.services.storage.storage.Client")
+    def test_list_user_prefixes(self, mock_client_class):
+        """Test listing sub-prefixes with a delimiter."""
+        mock_client = MagicMock()
+        mock_iterator = MagicMock()
+        mock_iterator.__iter__.return_value = iter([])
+        mock_iterator.prefixes = {"photos/user123/thumbs/", "photos/user123/original/"}
+        mock_client.list_blobs.return_value = mock_iterator
+        mock_client_class.return_value = mock_client
+
+        service = StorageService()
+
+        assert service.list_user_prefixes("user123") == ["original/", "thumbs/"]
+
+    @patch.dict(
+        "os.environ",
+        {
+            "GCS_PHOTOS_BUCKET": "test-photos-bucket",
+            "GCS_DATABASE_BUCKET": "test-database-bucket",
+            "GOOGLE_CLOUD_PROJECT": "test-project",
+        },
+    )
+    @patch("src.imgstream.services.storage.storage.Client")
+    def test_iter_user_files_parallel_merges_prefixes(self, mock_client_class):
+        """Test that prefixes are listed concurrently and merged through a bounded buffer."""
+        mock_client = MagicMock()
+
+        def list_blobs(bucket, prefix, **kwargs):
+            blobs = []
+            for i in range(5):
+                blob = MagicMock()
+                blob.name = f"{prefix}{i}.jpg"
+                blobs.append(blob)
+            return iter(blobs)
+
+        mock_client.list_blobs.side_effect = list_blobs
+        mock_client_class.return_value = mock_client
+
+        service = StorageService()
+
+        names = {info["name"] for info in service.iter_user_files_parallel("user123", buffer_size=2)}
+
+        assert len(names) == 10
+        assert "photos/user123/original/0.jpg" in names
+        assert "photos/user123/thumbs/4.jpg" in names
+
+    @patch.dict(
+        "os.environ",
+        {
+            "GCS_PHOTOS_BUCKET": "test-photos-bucket",
+            "GCS_DATABASE_BUCKET": "test-database-bucket",
+            "GOOGLE_CLOUD_PROJECT": "test-project",
+        },
+    )
+    @patch("src.imgstream.services.storage.storage.Client")
+    def test_iter_user_files_parallel_propagates_errors(self, mock_client_class):
+        """Test that a failing listing surfaces as StorageError."""
+        mock_client = MagicMock()
+        mock_client.list_blobs.side_effect = GoogleCloudError("List failed")
+        mock_client_class.return_value = mock_client
+
+        service = StorageService()
+
+        with pytest.raises(StorageError, match="Failed to list files"):
+            list(service.iter_user_files_parallel("user123"))
 
     @patch.dict(
         "os.environ",
@@ -517,6 +840,76 @@ class TestStorageService:
 
         assert result is False
 
+    @patch.dict(
+        "os.environ",
+        {
+            "GCS_PHOTOS_BUCKET": "test-photos-bucket",
+            "GCS_DATABASE_BUCKET": "test-database-bucket",
+            "GOOGLE_CLOUD_PROJECT": "test-project",
+        },
+    )
+    @patch("src.imgstream.services.storage.storage.Client")
+    def test_download_database_snapshot_conditional(self, mock_client_class):
+        """Test that an unchanged database generation is not downloaded again."""
+        from google.api_core.exceptions import NotModified
+
+        mock_client = MagicMock()
+        mock_bucket = MagicMock()
+        mock_blob = MagicMock()
+        mock_client.bucket.return_value = mock_bucket
+        mock_bucket.blob.return_value = mock_blob
+        mock_blob.download_as_bytes.return_value = b"database"
+        mock_blob.generation = 7
+        mock_client_class.return_value = mock_client
+
+        service = StorageService()
+
+        assert service.download_database_snapshot("user123", "metadata.db") == (b"database", 7)
+
+        mock_blob.download_as_bytes.side_effect = NotModified("unchanged")
+        assert service.download_database_snapshot_if_changed("user123", "metadata.db", 7) == (None, 7)
+        assert mock_blob.download_as_bytes.call_args.kwargs["if_generation_not_match"] == 7
+
+        mock_blob.download_as_bytes.side_effect = NotFound("missing")
+        with pytest.raises(StorageError, match="Database file not found"):
+            service.download_database_snapshot("user123", "metadata.db")
+
+    @patch.dict(
+        "os.environ",
+        {
+            "GCS_PHOTOS_BUCKET": "test-photos-bucket",
+            "GCS_DATABASE_BUCKET": "test-database-bucket",
+            "GOOGLE_CLOUD_PROJECT": "test-project",
+        },
+    )
+    @patch("src.imgstream.services.storage.storage.Client")
+    def test_database_uploads_raise_generation_conflict(self, mock_client_class):
+        """Test that a lost generation precondition is reported as a conflict."""
+        from google.cloud.exceptions import PreconditionFailed
+
+        from imgstream.services.storage import GenerationConflictError
+
+        mock_client = MagicMock()
+        mock_bucket = MagicMock()
+        mock_blob = MagicMock()
+        mock_client.bucket.return_value = mock_bucket
+        mock_bucket.blob.return_value = mock_blob
+        mock_blob.generation = 8
+        mock_client_class.return_value = mock_client
+
+        service = StorageService()
+
+        result = service.upload_database_file("user123", b"database", "metadata.db", if_generation_match=7)
+        assert result["generation"] == "8"
+        assert mock_blob.upload_from_string.call_args.kwargs["if_generation_match"] == 7
+
+        mock_blob.upload_from_string.side_effect = PreconditionFailed("generation mismatch")
+        with pytest.raises(GenerationConflictError):
+            service.upload_database_file("user123", b"database", "metadata.db", if_generation_match=7)
+        with pytest.raises(GenerationConflictError, match="already exists"):
+            service.upload_database_delta("user123", 7, 1, b"segment")
+        assert mock_blob.upload_from_string.call_args.kwargs["if_generation_match"] == 0
+
 
 class TestStorageServiceGlobal:
     """Test cases for global storage service functions."""
@@ -664,7 +1057,7 @@ class TestStorageServiceGlobal:
         mock_blob.generation = 12345
 
         # Make second upload fail by checking the blob path
-        def upload_side_effect(data, content_type=None):
+        def upload_side_effect(data, content_type=None, **kwargs):
             # Get the current blob path from the mock
             current_path = mock_bucket.blob.call_args[0][0] if mock_bucket.blob.call_args else ""
             if "photo2.jpg" in current_path:
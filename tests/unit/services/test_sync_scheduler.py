@@ -0,0 +1,107 @@
+"""Tests for the debounced sync scheduler."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from imgstream.services.sync_scheduler import SyncScheduler
+
+
+class TestSyncScheduler:
+    """Test cases for SyncScheduler."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.runs = []
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        self.executor.shutdown(wait=True)
+
+    def _scheduler(self, quiet_period=0.05, max_staleness=5.0):
+        return SyncScheduler(lambda: self.executor, quiet_period, max_staleness)
+
+    def _sync(self, result=True, hold=None):
+        def sync():
+            self.runs.append(time.monotonic())
+            if hold is not None:
+                hold.wait(5)
+            return result
+
+        return sync
+
+    def test_burst_of_writes_is_synced_once(self):
+        """Test that writes within the quiet period coalesce into one sync."""
+        scheduler = self._scheduler()
+
+        for _ in range(10):
+            scheduler.mark_dirty("user", self._sync())
+
+        assert scheduler.is_pending("user")
+        assert scheduler.wait("user", timeout=5)
+        assert len(self.runs) == 1
+        assert not scheduler.is_pending("user")
+        assert scheduler.get_stats()["requests"] == 10
+
+    def test_steady_writes_are_synced_within_max_staleness(self):
+        """Test that a key written more often than the quiet period is still synced."""
+        scheduler = self._scheduler(quiet_period=0.2, max_staleness=0.3)
+        start = time.monotonic()
+
+        while time.monotonic() - start < 0.6:
+            scheduler.mark_dirty("user", self._sync())
+            time.sleep(0.02)
+
+        assert self.runs
+        assert self.runs[0] - start < 0.5
+        scheduler.shutdown()
+
+    def test_write_during_sync_runs_again(self):
+        """Test that a write arriving while a sync runs is synced by a second run."""
+        scheduler = self._scheduler()
+        hold = threading.Event()
+
+        scheduler.mark_dirty("user", self._sync(hold=hold))
+        scheduler.flush("user")
+        deadline = time.monotonic() + 5
+        while not self.runs and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        scheduler.mark_dirty("user", self._sync())
+        hold.set()
+
+        assert scheduler.wait("user", timeout=5)
+        assert len(self.runs) == 2
+        assert scheduler.get_stats()["reruns"] == 1
+
+    def test_failed_sync_is_retried_and_releases_waiters(self):
+        """Test that a failure does not block waiters and is retried on flush."""
+        scheduler = self._scheduler(max_staleness=60)
+
+        scheduler.mark_dirty("user", self._sync(result=False))
+        scheduler.flush("user")
+
+        assert scheduler.wait("user", timeout=5)
+        assert len(self.runs) == 1
+        assert not scheduler.is_pending("user")
+        assert scheduler.get_stats()["dirty"] == 1
+
+        assert scheduler.shutdown() is False
+        assert len(self.runs) == 2
+
+    def test_shutdown_syncs_dirty_keys_on_calling_thread(self):
+        """Test that shutdown flushes every dirty key without waiting for the quiet period."""
+        scheduler = self._scheduler(quiet_period=60, max_staleness=60)
+        threads = []
+
+        def sync():
+            threads.append(threading.current_thread())
+            return True
+
+        scheduler.mark_dirty("user_a", sync)
+        scheduler.mark_dirty("user_b", sync)
+
+        assert scheduler.shutdown() is True
+        assert threads == [threading.current_thread()] * 2
+        assert scheduler.get_stats()["dirty"] == 0
@@ -0,0 +1,149 @@
+"""Tests for thumbnail pack files."""
+
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from imgstream.models.photo import PhotoMetadata
+from imgstream.services.metadata import MetadataService
+from imgstream.services.resilience import CircuitOpenError
+from imgstream.services.storage import is_pack_thumbnail_path
+from imgstream.services.thumbnail_packs import ThumbnailPackService
+
+
+class FakePackStorage:
+    """In-memory stand-in for the pack operations of StorageService."""
+
+    def __init__(self):
+        self.objects: dict[str, bytes] = {}
+        self.generations: dict[str, int] = {}
+        self.range_reads: list[tuple[str, int, int]] = []
+        self.deleted: list[str] = []
+
+    def create_pack_object(self, pack_path, data):
+        self.objects[pack_path] = data
+        self.generations[pack_path] = 1
+        return 1
+
+    def append_to_pack_object(self, pack_path, data, if_generation_match):
+        assert self.generations[pack_path] == if_generation_match
+        self.objects[pack_path] += data
+        self.generations[pack_path] += 1
+        return self.generations[pack_path]
+
+    def read_byte_range(self, gcs_path, start, length):
+        self.range_reads.append((gcs_path, start, length))
+        return self.objects[gcs_path][start : start + length]
+
+    def delete_files(self, gcs_paths, max_workers=None):
+        self.deleted.extend(gcs_paths)
+        for path in gcs_paths:
+            self.objects.pop(path, None)
+        return {path: {"status": "deleted", "error": None} for path in gcs_paths}
+
+
+class TestThumbnailPackService:
+    """Test cases for ThumbnailPackService."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.user_id = "pack_user"
+
+        self.mock_storage = MagicMock()
+        self.mock_storage.file_exists.return_value = False
+        with patch("imgstream.services.metadata.get_storage_service", return_value=self.mock_storage):
+            self.metadata_service = MetadataService(self.user_id, self.temp_dir)
+        self.metadata_service.disable_async_sync()
+        self.metadata_service.upload_to_gcs = MagicMock(return_value=True)
+
+        self.storage = FakePackStorage()
+        self.service = ThumbnailPackService(self.user_id, self.storage, self.metadata_service)
+
+    def teardown_method(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _save_photo(self, name: str, thumbnail_path: str) -> PhotoMetadata:
+        photo = PhotoMetadata.create_new(
+            user_id=self.user_id,
+            filename=f"{name}.jpg",
+            original_path=f"photos/{self.user_id}/original/{name}.jpg",
+            thumbnail_path=thumbnail_path,
+            file_size=100,
+            mime_type="image/jpeg",
+        )
+        self.metadata_service.save_photo_metadata(photo)
+        return photo
+
+    def test_append_and_read_coalesces_adjacent_entries(self):
+        """Test that appends share one pack and adjacent entries are read with one request."""
+        paths = [self.service.append_thumbnail(data) for data in (b"aaa", b"bbbb", b"cc")]
+
+        assert all(is_pack_thumbnail_path(path) for path in paths)
+        assert len({path.split("#")[0] for path in paths}) == 1
+
+        thumbnails = self.service.read_thumbnails(paths + ["photos/pack_user/thumbs/x_thumb.jpg"])
+
+        assert [thumbnails[path] for path in paths] == [b"aaa", b"bbbb", b"cc"]
+        assert thumbnails["photos/pack_user/thumbs/x_thumb.jpg"] is None
+        assert len(self.storage.range_reads) == 1
+
+    def test_pack_is_sealed_at_max_size(self):
+        """Test that a full pack is sealed and the next thumbnail starts a new pack."""
+        self.service.max_pack_bytes = 4
+
+        first = self.service.append_thumbnail(b"12345")
+        second = self.service.append_thumbnail(b"678")
+
+        assert first.split("#")[0] != second.split("#")[0]
+        assert self.service.read_thumbnails([first, second]) == {first: b"12345", second: b"678"}
+        assert len(self.storage.range_reads) == 2
+
+    def test_read_failures_are_reported_or_raised(self):
+        """Test that an unreadable pack maps to None, or raises when raise_on_error is set."""
+        path = self.service.append_thumbnail(b"data")
+        self.storage.read_byte_range = MagicMock(side_effect=CircuitOpenError())
+
+        assert self.service.read_thumbnails([path]) == {path: None}
+        with pytest.raises(CircuitOpenError):
+            self.service.read_thumbnails([path], raise_on_error=True)
+
+    def test_compact_rewrites_live_entries_and_drops_dead_packs(self):
+        """Test that compaction rewrites partly dead packs and removes fully dead ones."""
+        self.service.max_pack_bytes = 6
+        live = self.service.append_thumbnail(b"live")
+        dead = self.service.append_thumbnail(b"dead")  # seals the first pack
+        unused = self.service.append_thumbnail(b"gone!!")  # second pack, sealed, never referenced
+        old_pack, unused_pack = live.split("#")[0], unused.split("#")[0]
+        photo = self._save_photo("live", live)
+        self._save_photo("dead", f"photos/{self.user_id}/thumbs/dead_thumb.jpg")
+
+        dry_run = self.service.compact(min_dead_ratio=0.5, dry_run=True)
+        assert {c["pack_path"] for c in dry_run["candidates"]} == {old_pack, unused_pack}
+        assert dry_run["reclaimed_bytes"] == len(b"dead") + len(b"gone!!")
+        assert self.storage.deleted == []
+
+        report = self.service.compact(min_dead_ratio=0.5)
+
+        assert report["rewritten"] == 1
+        assert report["removed"] == 1
+        assert set(self.storage.deleted) == {old_pack, unused_pack}
+        self.metadata_service.upload_to_gcs.assert_called_once_with(force=True)
+
+        new_path = self.metadata_service.get_photo_by_id(photo.id).thumbnail_path
+        assert new_path != live and new_path.endswith(live.split("#")[1])
+        assert self.service.read_thumbnails([new_path, dead]) == {new_path: b"live", dead: None}
+
+    def test_packs_are_not_reported_as_orphans(self):
+        """Test that pack objects are treated as referenced by reconciliation."""
+        path = self.service.append_thumbnail(b"data")
+        self._save_photo("packed", path)
+
+        orphans = self.metadata_service.find_unreferenced_objects(
+            [{"name": path.split("#")[0], "size": 4}, {"name": f"photos/{self.user_id}/packs/stale.pack", "size": 9}]
+        )
+
+        assert orphans == [{"name": f"photos/{self.user_id}/packs/stale.pack", "size": 9}]
@@ -5,7 +5,7 @@ from unittest.mock import Mock, patch, MagicMock
 import pytest
 import streamlit as st
 
-from src.imgstream.ui.handlers.gallery import is_heic_file, convert_heic_to_web_display
+from src.imgstream.ui.handlers.gallery import is_heic_file, convert_heic_to_web_display, get_photo_version
 
 
 @pytest.fixture
@@ -216,7 +216,10 @@ class TestGalleryHEICDisplay:
 
         # Verify thumbnail was requested with correct arguments
         mock_get_photo_thumbnail_url.assert_called_once_with(
-            self.sample_heic_photo["thumbnail_path"], self.sample_heic_photo["id"]
+            self.sample_heic_photo["thumbnail_path"],
+            self.sample_heic_photo["id"],
+            get_photo_version(self.sample_heic_photo),
+            self.sample_heic_photo.get("thumbnail_generation"),
         )
         mock_st.image.assert_called_once()
 
@@ -235,7 +238,10 @@ class TestGalleryHEICDisplay:
 
         # Verify thumbnail was requested with correct arguments
         mock_get_photo_thumbnail_url.assert_called_once_with(
-            self.sample_heic_photo["thumbnail_path"], self.sample_heic_photo["id"]
+            self.sample_heic_photo["thumbnail_path"],
+            self.sample_heic_photo["id"],
+            get_photo_version(self.sample_heic_photo),
+            self.sample_heic_photo.get("thumbnail_generation"),
         )
 
         # Verify error message was shown when no thumbnail available
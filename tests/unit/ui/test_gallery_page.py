@@ -1,18 +1,31 @@
 "Tests for gallery page functionality."
 
+from datetime import datetime
 from unittest.mock import Mock, patch
 
 import pytest
 
+from src.imgstream.models.photo import PhotoPage
 from src.imgstream.ui.handlers.gallery import (
     get_photo_original_url,
     get_photo_thumbnail_url,
+    get_photo_version,
+    has_photos_before,
     load_user_photos,
     get_user_photos_count,
     load_user_photos_paginated,
+    prefetch_packed_thumbnails,
 )
 
 
+def _photo_page(photo_ids):
+    """Build the columnar page get_photos_page returns."""
+    return PhotoPage.from_rows(
+        (photo_id, "test_user", f"{photo_id}.jpg", "original", "thumb", None, datetime(2024, 1, 1), 1, "image/jpeg")
+        for photo_id in photo_ids
+    )
+
+
 @pytest.fixture
 def mock_paginated_load_user_photos():
     with patch("src.imgstream.ui.handlers.gallery.load_user_photos_paginated") as mock:
@@ -65,12 +78,75 @@ class TestGalleryPage:
         url = get_photo_thumbnail_url("thumbs/test.jpg", "photo1")
         assert url == "https://example.com/thumbnail.jpg"
 
+    def test_get_photo_thumbnail_url_uses_long_lived_url(self, mock_storage_service):
+        """Test that versioned thumbnail URLs are signed with the long thumbnail expiration."""
+        from src.imgstream.ui.handlers.gallery import THUMBNAIL_URL_EXPIRATION
+
+        mock_storage_service.get_signed_url.return_value = "https://example.com/v1"
+
+        url = get_photo_thumbnail_url("thumbs/versioned.jpg", "photo1", "2024-01-01T00:00:00")
+
+        assert url == "https://example.com/v1"
+        mock_storage_service.get_signed_url.assert_called_once_with(
+            "thumbs/versioned.jpg", expiration=THUMBNAIL_URL_EXPIRATION, generation=None
+        )
+
+    def test_get_photo_thumbnail_url_pins_generation(self, mock_storage_service):
+        """Test that the stored thumbnail generation is signed into the URL, one URL per generation."""
+        from src.imgstream.ui.handlers.gallery import THUMBNAIL_URL_EXPIRATION
+
+        mock_storage_service.get_signed_url.side_effect = lambda path, expiration, generation: f"https://x/{generation}"
+
+        assert get_photo_thumbnail_url("thumbs/pinned.jpg", "photo1", "v1", 111) == "https://x/111"
+        assert get_photo_thumbnail_url("thumbs/pinned.jpg", "photo1", "v2", 222) == "https://x/222"
+
+        mock_storage_service.get_signed_url.assert_any_call(
+            "thumbs/pinned.jpg", expiration=THUMBNAIL_URL_EXPIRATION, generation=111
+        )
+
+    def test_get_photo_version(self):
+        """Test version tokens derived from the upload timestamp."""
+        from datetime import datetime
+
+        assert get_photo_version({"uploaded_at": datetime(2024, 1, 1, 12, 0)}) == "2024-01-01T12:00:00"
+        assert get_photo_version({"uploaded_at": "2024-01-01T12:00:00"}) == "2024-01-01T12:00:00"
+        assert get_photo_version({}) is None
+
     def test_get_photo_thumbnail_url_error(self, mock_storage_service):
         """Test getting thumbnail URL when storage service fails."""
         mock_storage_service.get_signed_url.side_effect = Exception("Storage error")
         url = get_photo_thumbnail_url("thumbs/test.jpg", "photo1")
         assert url is None
 
+    def test_get_photo_thumbnail_url_falls_back_while_circuit_open(self, mock_storage_service):
+        """Test that the last signed URL is served while the storage circuit breaker is open."""
+        from imgstream.services.resilience import CircuitOpenError
+
+        mock_storage_service.get_signed_url.return_value = "https://example.com/known.jpg"
+        assert get_photo_thumbnail_url("thumbs/known.jpg", "photo1", "v-fallback") == "https://example.com/known.jpg"
+
+        mock_storage_service.get_signed_url.side_effect = CircuitOpenError()
+        with patch("src.imgstream.ui.handlers.gallery._sign_thumbnail_url", side_effect=CircuitOpenError()):
+            assert get_photo_thumbnail_url("thumbs/known.jpg", "photo1", "v-fallback") == "https://example.com/known.jpg"
+            assert get_photo_thumbnail_url("thumbs/unknown.jpg", "photo2", "v-fallback") is None
+
+
+    def test_failed_packed_thumbnail_reads_are_not_cached(self):
+        """Test that packed thumbnails that fail to load show as placeholders and are retried."""
+        from imgstream.services.resilience import CircuitOpenError
+
+        photo = {"id": "photo1", "user_id": "pack_user", "thumbnail_path": "photos/pack_user/packs/p1.pack#e1"}
+        with patch("src.imgstream.ui.handlers.gallery.get_thumbnail_pack_service") as mock_get_packs:
+            mock_packs = mock_get_packs.return_value
+            mock_packs.read_thumbnails.side_effect = CircuitOpenError()
+            assert prefetch_packed_thumbnails([photo]) == {photo["thumbnail_path"]: None}
+
+            mock_packs.read_thumbnails.side_effect = None
+            mock_packs.read_thumbnails.return_value = {photo["thumbnail_path"]: b"thumb"}
+            assert prefetch_packed_thumbnails([photo]) == {photo["thumbnail_path"]: b"thumb"}
+
+        mock_packs.read_thumbnails.assert_called_with([photo["thumbnail_path"]], raise_on_error=True)
+
 
 class TestGalleryPagination:
     """Test gallery pagination functionality."""
@@ -78,18 +154,45 @@ class TestGalleryPagination:
     def test_load_user_photos_paginated_with_data(self, mock_metadata_service):
         """Test paginated loading with data."""
         with patch("src.imgstream.ui.handlers.gallery.get_user_photos_count", return_value=100):
-            mock_photos = [Mock() for _ in range(21)]
-            for i, photo_mock in enumerate(mock_photos):
-                photo_mock.to_dict.return_value = {"id": f"photo{i}"}
-            
-            mock_metadata_service.get_photos_by_date.return_value = mock_photos
+            mock_photos = _photo_page([f"photo{i}" for i in range(20)])
+
+            mock_metadata_service.get_photos_page.return_value = (mock_photos, True)
             photos, total_count, has_more = load_user_photos_paginated("test_user", page_size=20)
             assert len(photos) == 20
             assert total_count == 100
             assert has_more is True
 
+    def test_load_user_photos_paginated_oldest_first_uses_keyset(self, mock_metadata_service):
+        """Test that oldest-first pages are queried in ascending order from the cursor, not reversed."""
+        from src.imgstream.ui.handlers.gallery import get_photo_cursor
+
+        cursor = get_photo_cursor({"id": "photo9", "created_at": None, "uploaded_at": "2024-01-02T00:00:00"})
+        assert cursor == ("2024-01-02T00:00:00", "photo9")
+
+        with patch("src.imgstream.ui.handlers.gallery.get_user_photos_count", return_value=100):
+            mock_metadata_service.get_photos_page.return_value = (_photo_page(["photo10"]), False)
+
+            photos, _, has_more = load_user_photos_paginated(
+                "keyset_user", "古い順", page=1, page_size=10, cursor=cursor
+            )
+
+        assert [photo["id"] for photo in photos] == ["photo10"]
+        assert has_more is False
+        mock_metadata_service.get_photos_page.assert_called_once_with(10, cursor, True, False)
+
     def test_get_user_photos_count_error(self, mock_metadata_service):
         """Test getting photo count when service fails."""
         mock_metadata_service.get_photos_count.side_effect = Exception("Database error")
         count = get_user_photos_count("test_user")
-        assert count == 0
\ No newline at end of file
+        assert count == 0
+
+    def test_has_photos_before(self, mock_metadata_service):
+        """Test that the previous-page check looks for a photo before the page's first photo."""
+        cursor = (datetime(2024, 3, 1), "photo_jump")
+        mock_metadata_service.get_photos_page.return_value = (_photo_page(["photo_earlier"]), False)
+
+        assert has_photos_before("test_user", "古い順", cursor) is True
+        mock_metadata_service.get_photos_page.assert_called_once_with(1, cursor, True, backward=True)
+
+        mock_metadata_service.get_photos_page.return_value = (_photo_page([]), False)
+        assert has_photos_before("test_user", "新しい順", (datetime(2024, 3, 2), "photo_first")) is False